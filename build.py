@@ -72,7 +72,6 @@ def build_exe():
         "--hidden-import", "psutil",
         "--hidden-import", "pywin32",
         "--hidden-import", "pythonnet",
-        "--hidden-import", "pydantic",
         "--hidden-import", "loguru",
         "--hidden-import", "yaml",
         "--hidden-import", "shougun_remote",
@@ -82,6 +81,31 @@ def build_exe():
         "--hidden-import", "shougun_remote.models",
         "--hidden-import", "shougun_remote.repositories",
         "--hidden-import", "shougun_remote.monitors",
+        "--hidden-import", "shougun_remote.metrics",
+        "--hidden-import", "shougun_remote.integration",
+        "--hidden-import", "shougun_remote.session",
+        # Các module được import muộn (PEP 562 __getattr__ / import trong hàm)
+        "--hidden-import", "shougun_remote.monitors.folder_monitor",
+        "--hidden-import", "shougun_remote.monitors.config_watcher",
+        "--hidden-import", "shougun_remote.monitors.json_reader",
+        "--hidden-import", "shougun_remote.integration.api_server",
+        "--hidden-import", "shougun_remote.integration.bridge_channel",
+        "--hidden-import", "shougun_remote.integration.commands",
+        "--hidden-import", "shougun_remote.integration.csharp_bridge",
+        "--hidden-import", "shougun_remote.integration.shm_ring",
+        "--hidden-import", "shougun_remote.services.instance_guard",
+        "--hidden-import", "shougun_remote.services.async_service",
+        "--hidden-import", "shougun_remote.services.worker_pool",
+        "--hidden-import", "shougun_remote.session.batcher",
+        "--hidden-import", "shougun_remote.session.cache",
+        "--hidden-import", "shougun_remote.session.chunks",
+        "--hidden-import", "shougun_remote.session.compression",
+        "--hidden-import", "shougun_remote.session.damage",
+        "--hidden-import", "shougun_remote.session.encoder",
+        "--hidden-import", "shougun_remote.session.net",
+        "--hidden-import", "shougun_remote.session.rencode",
+        "--hidden-import", "shougun_remote.session.scroll",
+        "--hidden-import", "shougun_remote.session.transport",
         "--hidden-import", "watchdog",
         "--hidden-import", "watchdog.observers",
         "--hidden-import", "watchdog.events",
@@ -0,0 +1,243 @@
+"""
+Benchmark các thành phần nóng của seamless session.
+
+    python examples/session_benchmark.py codec [--iterations N]
+    python examples/session_benchmark.py damage [--iterations N]
+    python examples/session_benchmark.py scroll [--iterations N]
+"""
+
+import argparse
+import json
+import pickle
+import random
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.session.damage import DamageRegion
+from shougun_remote.session.rencode import PacketCodec
+from shougun_remote.session.scroll import ScrollDetector
+
+# Chi phí cố định của một hình chữ nhật trên dây (header packet draw + khởi tạo encoder), byte
+RECT_OVERHEAD_BYTES = 64
+
+
+def packet_mix() -> List[list]:
+    """Hỗn hợp packet điển hình của một phiên tương tác (tỷ lệ theo tần suất thực tế)."""
+    pointer = ["pointer-position", 1, [512, 384], [], []]
+    ack = ["damage-sequence", 12345, 1, 800, 120, 8, ""]
+    key = ["key-action", 1, "a", True, [], 97, "a", 38, 0]
+    draw = ["draw", 1, 0, 480, 800, 2, "rgb", bytes(800 * 2 * 3), 12346, 2400, {}]
+    draw_png = ["draw", 1, 100, 100, 64, 64, "png", b"\x89PNG" + bytes(2000), 12347, 0, {"quality": 90}]
+    metadata = ["window-metadata", 1, {"title": "Terminal - user@host", "class-instance": ["xterm", "XTerm"]}]
+    return [pointer] * 40 + [ack] * 20 + [key] * 10 + [draw] * 10 + [draw_png] * 5 + [metadata] * 2
+
+
+def _codecs() -> Dict[str, Tuple[Callable[[list], bytes], Callable[[bytes], list]]]:
+    plain = PacketCodec(aliases={})
+    aliased = PacketCodec()
+    aliased.set_peer_aliases(aliased.get_aliases())
+
+    def json_dumps(packet: list) -> bytes:
+        return json.dumps([item.hex() if isinstance(item, bytes) else item for item in packet]).encode("utf-8")
+
+    return {
+        "rencodeplus": (plain.encode, plain.decode),
+        "rencodeplus+aliases": (aliased.encode, aliased.decode),
+        "pickle": (pickle.dumps, pickle.loads),
+        "json": (json_dumps, json.loads),
+    }
+
+
+def bench_codec(iterations: int = 200) -> Dict[str, Dict[str, float]]:
+    """
+    Đo thời gian encode/decode hỗn hợp packet.
+
+    Args:
+        iterations: Số lần lặp qua toàn bộ hỗn hợp
+
+    Returns:
+        Dict[str, Dict[str, float]]: Theo codec: µs/packet khi encode, decode và byte trung bình
+    """
+    packets = packet_mix()
+    results = {}
+    for name, (encode, decode) in _codecs().items():
+        encoded = [encode(packet) for packet in packets]
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for packet in packets:
+                encode(packet)
+        encode_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for payload in encoded:
+                decode(payload)
+        decode_time = time.perf_counter() - start
+        count = iterations * len(packets)
+        results[name] = {
+            "encode_us": encode_time / count * 1e6,
+            "decode_us": decode_time / count * 1e6,
+            "bytes": sum(map(len, encoded)) / len(encoded),
+        }
+    return results
+
+
+def merge_regions(regions: List[Tuple[int, int, int, int]], threshold: int = 10) -> List[Tuple[int, int, int, int]]:
+    """Cách gộp cũ (05-rendering.md): sắp xếp rồi chỉ gộp với hình vừa gộp cuối cùng."""
+    if not regions:
+        return []
+    regions = sorted(regions, key=lambda r: (r[1], r[0]))
+    merged = [regions[0]]
+    for x, y, w, h in regions[1:]:
+        lx, ly, lw, lh = merged[-1]
+        if x <= lx + lw + threshold and y <= ly + lh + threshold:
+            nx, ny = min(x, lx), min(y, ly)
+            merged[-1] = (nx, ny, max(x + w, lx + lw) - nx, max(y + h, ly + lh) - ny)
+        else:
+            merged.append((x, y, w, h))
+    return merged
+
+
+def damage_workloads(seed: int = 7) -> Dict[str, List[Tuple[int, int, int, int]]]:
+    """Các chuỗi damage điển hình của một lần flush."""
+    rng = random.Random(seed)
+    # Terminal: mỗi ký tự gõ làm damage một ô, con trỏ nhấp nháy ở dòng cuối
+    terminal = [(col * 9, row * 18, 9, 18) for row in range(40, 44) for col in range(80)]
+    terminal += [(rng.randrange(0, 720, 9), 43 * 18, 9, 18) for _ in range(40)]
+    # Cửa sổ ứng dụng: các cụm damage nhỏ (đồng hồ, thanh tiến trình, danh sách, con trỏ soạn thảo)
+    widgets = []
+    for cx, cy in ((1180, 8), (300, 760), (40, 120), (640, 400), (900, 300)):
+        widgets += [(max(0, cx + rng.randint(-30, 30)), max(0, cy + rng.randint(-12, 12)), rng.randint(6, 40), rng.randint(6, 20))
+                    for _ in range(24)]
+    # Damage nhỏ rải rác khắp cửa sổ
+    scattered = [(rng.randrange(1260), rng.randrange(780), rng.randint(4, 24), rng.randint(4, 24)) for _ in range(120)]
+    # Một vùng lớn được vẽ lại nhiều lần chồng nhau (video, cuộn trang)
+    overlapping = [(200 + rng.randint(-20, 20), 150 + rng.randint(-20, 20), 640, 360) for _ in range(60)]
+    return {"terminal": terminal, "widgets": widgets, "scattered": scattered, "overlapping": overlapping}
+
+
+def _damage_bytes(rects: List[Tuple[int, int, int, int]]) -> int:
+    """Byte RGB gửi đi cho các hình chữ nhật (phần chồng nhau bị tính hai lần như thực tế)."""
+    return sum(w * h * 3 for _, _, w, h in rects) + len(rects) * RECT_OVERHEAD_BYTES
+
+
+def bench_damage(iterations: int = 20) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    So sánh DamageRegion với merge_regions cũ.
+
+    Args:
+        iterations: Số lần lặp mỗi workload
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, float]]]: Theo workload rồi theo cách gộp: số hình, byte gửi đi
+        và µs CPU mỗi lần flush
+    """
+    def naive(damages: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+        return merge_regions(damages)
+
+    def region(damages: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+        damage = DamageRegion()
+        damage.add_rects(damages)
+        return damage.take()
+
+    results = {}
+    for workload, damages in damage_workloads().items():
+        results[workload] = {}
+        for name, merge in (("merge_regions", naive), ("DamageRegion", region)):
+            rects = merge(damages)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                merge(damages)
+            elapsed = time.perf_counter() - start
+            results[workload][name] = {
+                "rects": len(rects),
+                "bytes": _damage_bytes(rects),
+                "cpu_us": elapsed / iterations * 1e6,
+            }
+    return results
+
+
+def scroll_frames(steps: int = 8, step: int = 40, seed: int = 7) -> List[np.ndarray]:
+    """Trình duyệt 1280x800 cuộn trang từng nấc, header và thanh trạng thái đứng yên."""
+    rng = np.random.default_rng(seed)
+    # Trang: nền trắng, các dòng "chữ" cao 18 pixel xen dòng trống
+    page = np.full((800 + steps * step, 1280, 3), 255, dtype=np.uint8)
+    for top in range(0, page.shape[0] - 18, 24):
+        length = int(rng.integers(200, 1200))
+        page[top:top + 18, 40:40 + length] = rng.integers(0, 256, size=(18, length, 3), dtype=np.uint8) // 64 * 64
+    header = np.full((80, 1280, 3), 220, dtype=np.uint8)
+    status = np.full((24, 1280, 3), 200, dtype=np.uint8)
+    return [np.concatenate((header, page[offset:offset + 696], status)) for offset in range(0, steps * step + 1, step)]
+
+
+def bench_scroll(iterations: int = 5) -> Dict[str, Dict[str, float]]:
+    """
+    So sánh gửi lại toàn bộ vùng nội dung với packet cuộn cộng các dòng mới lộ ra.
+
+    Args:
+        iterations: Số lần lặp qua chuỗi frame
+
+    Returns:
+        Dict[str, Dict[str, float]]: Theo cách gửi: byte (zlib) mỗi frame và µs CPU mỗi frame
+    """
+    frames = scroll_frames()
+    count = len(frames) - 1
+
+    full_bytes = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        full_bytes = 0
+        for previous, frame in zip(frames, frames[1:]):
+            changed = np.nonzero((previous != frame).any(axis=(1, 2)))[0]
+            full_bytes += len(zlib.compress(frame[changed[0]:changed[-1] + 1].tobytes(), 1)) + RECT_OVERHEAD_BYTES
+    full_time = time.perf_counter() - start
+
+    scroll_bytes = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        scroll_bytes = 0
+        detector = ScrollDetector()
+        detector.update(frames[0])
+        for frame in frames[1:]:
+            result = detector.update(frame)
+            scroll_bytes += len(result.scrolls) * RECT_OVERHEAD_BYTES
+            for x, y, width, height in result.damage:
+                scroll_bytes += len(zlib.compress(frame[y:y + height, x:x + width].tobytes(), 1)) + RECT_OVERHEAD_BYTES
+    scroll_time = time.perf_counter() - start
+
+    return {
+        "full": {"bytes": full_bytes / count, "cpu_us": full_time / iterations / count * 1e6},
+        "scroll": {"bytes": scroll_bytes / count, "cpu_us": scroll_time / iterations / count * 1e6},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark seamless session")
+    parser.add_argument("target", choices=["codec", "damage", "scroll"])
+    parser.add_argument("--iterations", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.target == "codec":
+        print(f"{'codec':<22}{'encode µs':>12}{'decode µs':>12}{'bytes':>10}")
+        for name, result in bench_codec(args.iterations or 200).items():
+            print(f"{name:<22}{result['encode_us']:>12.2f}{result['decode_us']:>12.2f}{result['bytes']:>10.1f}")
+    elif args.target == "damage":
+        print(f"{'workload':<14}{'merge':<16}{'rects':>8}{'bytes':>12}{'cpu µs':>10}")
+        for workload, results in bench_damage(args.iterations or 20).items():
+            for name, result in results.items():
+                print(f"{workload:<14}{name:<16}{result['rects']:>8}{result['bytes']:>12}{result['cpu_us']:>10.1f}")
+    elif args.target == "scroll":
+        print(f"{'send':<10}{'bytes/frame':>14}{'cpu µs/frame':>14}")
+        for name, result in bench_scroll(args.iterations or 5).items():
+            print(f"{name:<10}{result['bytes']:>14.0f}{result['cpu_us']:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,101 +1,129 @@
 """
 Python service entry point - standalone service.
+
+Tùy chọn:
+    --profile-startup   In thời gian import/khởi tạo của từng thành phần, sau đó dừng service
 """
 
+import argparse
+import multiprocessing
 import sys
 import os
-import time
-import psutil
 import signal
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from shougun_remote.services.factory import ServiceFactory
+# Chỉ import phần nhẹ ở đây - các thành phần còn lại được import trong main() để đo được thời gian
+from shougun_remote.metrics.startup import StartupProfiler
 
+# Thời gian tối đa chờ instance cũ dừng hẳn
+TAKEOVER_TIMEOUT = 10.0
 
-def kill_existing_processes():
-    """Kill tất cả các process ShougunRemoteX_Service đang chạy."""
-    current_process = psutil.Process()
-    process_name = "ShougunRemoteX_Service"
-    killed_processes = []
-    
-    # Tìm và kill tất cả processes có tên giống nhau
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            # Kiểm tra tên process chính xác
-            if proc.info['name'] and process_name.lower() in proc.info['name'].lower():
-                # Bỏ qua process hiện tại
-                if proc.info['pid'] != current_process.pid:
-                    # Kiểm tra thêm cmdline để đảm bảo đúng process
-                    cmdline = proc.info.get('cmdline', [])
-                    if cmdline and any('ShougunRemoteX_Service' in arg for arg in cmdline):
-                        try:
-                            proc.kill()
-                            killed_processes.append(proc.info['pid'])
-                            print(f"Killed existing process PID: {proc.info['pid']}")
-                        except (psutil.NoSuchProcess, psutil.AccessDenied):
-                            pass
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
-    
-    return killed_processes
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse tham số dòng lệnh."""
+    parser = argparse.ArgumentParser(description="ShougunRemoteX Python Service")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="In thời gian import và khởi tạo từng thành phần rồi thoát",
+    )
+    return parser.parse_args(argv)
 
 
-def check_existing_process():
-    """Kiểm tra xem đã có process nào đang chạy chưa."""
-    current_process = psutil.Process()
-    process_name = "ShougunRemoteX_Service"
+def ensure_single_instance(guard, take_over: bool = True) -> bool:
+    """
+    Đảm bảo chỉ một service chạy: lấy lock, nếu instance khác đang giữ thì yêu cầu nó dừng.
     
-    # Tìm tất cả processes có tên giống nhau
-    existing_processes = []
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            # Kiểm tra tên process chính xác
-            if proc.info['name'] and process_name.lower() in proc.info['name'].lower():
-                # Bỏ qua process hiện tại
-                if proc.info['pid'] != current_process.pid:
-                    # Kiểm tra thêm cmdline để đảm bảo đúng process
-                    cmdline = proc.info.get('cmdline', [])
-                    if cmdline and any('ShougunRemoteX_Service' in arg for arg in cmdline):
-                        existing_processes.append(proc.info['pid'])
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
+    Args:
+        guard: Instance guard
+        take_over: False để chỉ thử lấy lock, không dừng instance đang chạy
+        
+    Returns:
+        bool: True nếu process hiện tại đã giữ lock
+    """
+    if guard.acquire():
+        return True
     
-    return existing_processes
+    owner = guard.read_owner()
+    print(f"Found existing ShougunRemoteX Service instance: PID {owner.pid if owner else 'unknown'}")
+    if not take_over:
+        return False
+    print("Requesting graceful shutdown to ensure single instance...")
+    return guard.take_over(timeout=TAKEOVER_TIMEOUT)
 
 
 def main():
     """Main entry point cho Python service."""
+    args = parse_args()
+    profiler = StartupProfiler()
+    
+    with profiler.section("import loguru"):
+        from loguru import logger
+    with profiler.section("import services.factory"):
+        from shougun_remote.services.factory import ServiceFactory
+    with profiler.section("import instance_guard"):
+        from shougun_remote.services.instance_guard import InstanceGuard
+    
+    guard = InstanceGuard(logger)
     try:
-        # Kiểm tra và kill các process cũ đang chạy
-        existing_processes = check_existing_process()
-        if existing_processes:
-            print(f"Found existing ShougunRemoteX Service processes: {existing_processes}")
-            print("Killing existing processes to ensure single instance...")
-            killed_processes = kill_existing_processes()
-            if killed_processes:
-                print(f"Killed {len(killed_processes)} existing processes")
-                # Đợi một chút để các process được kill hoàn toàn
-                time.sleep(2)
+        with profiler.section("instance guard"):
+            # Lần chạy đo khởi động không được dừng instance production đang chạy
+            acquired = ensure_single_instance(guard, take_over=not args.profile_startup)
+        if not acquired:
+            if args.profile_startup:
+                print("Another instance is running, stop it before profiling startup")
             else:
-                print("Could not kill existing processes, exiting...")
-                sys.exit(1)
+                print("Could not stop existing instance, exiting...")
+            sys.exit(1)
         
         print("Starting ShougunRemoteX Python Service...")
         print(f"Process ID: {os.getpid()}")
         
         # Tạo service từ factory
-        service = ServiceFactory.create_shougun_service()
+        with profiler.section("create service"):
+            service = ServiceFactory.create_shougun_service()
+        
+        # SIGTERM (từ instance mới hoặc hệ thống) dừng service như Ctrl+C
+        signal.signal(signal.SIGTERM, lambda signum, frame: service.request_shutdown())
         
         # Khởi động service
-        if service.start():
+        with profiler.section("service.start"):
+            started = service.start()
+        profiler.add_phases("service.start", service.get_startup_timings())
+        
+        if started:
             print("Python service started successfully")
             
-            # Giữ service chạy
-            while True:
-                time.sleep(1)
+            # Mở kênh IPC cho host C# (giữ kết nối, không spawn process cho mỗi lệnh)
+            bridge = None
+            if service.get_config_manager().get("integration.csharp_bridge_enabled", False):
+                with profiler.section("csharp bridge"):
+                    from shougun_remote.integration.csharp_bridge import CSharpBridge
+                    
+                    bridge = CSharpBridge(service)
+                    serving = bridge.serve()
+                if serving:
+                    print(f"C# bridge listening on {bridge.get_endpoint()}")
+                    # Instance sau dùng endpoint này để yêu cầu dừng
+                    guard.update(bridge.get_endpoint())
+                else:
+                    print("Failed to open C# bridge channel, continuing without it")
+            
+            if args.profile_startup:
+                print(profiler.format_report())
+                service.request_shutdown()
+            
+            # Giữ service chạy đến khi có yêu cầu dừng (lệnh shutdown, SIGTERM)
+            while not service.wait_for_shutdown_request(timeout=1.0):
+                pass
+            
+            print("Shutdown requested, stopping service...")
+            service.stop()
+            if bridge:
+                bridge.close()
                 
         else:
             print("Failed to start Python service")
@@ -111,7 +139,11 @@ def main():
         if 'service' in locals():
             service.stop()
         sys.exit(1)
+    finally:
+        guard.release()
 
 
 if __name__ == "__main__":
+    # Bắt buộc với bản build PyInstaller khi bật performance.worker_mode = "process"
+    multiprocessing.freeze_support()
     main()
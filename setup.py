@@ -57,12 +57,34 @@ def create_sample_config():
   "performance": {
     "worker_thread_sleep": 1.0,
     "max_memory_mb": 512,
-    "cpu_threshold": 80.0
+    "cpu_threshold": 80.0,
+    "max_workers": 4,
+    "governor_interval": 5.0,
+    "metrics_interval": 1.0,
+    "shutdown_timeout": 10.0,
+    "async_max_tasks": 1000,
+    "worker_mode": "thread",
+    "worker_processes": 4
+  },
+  "retention": {
+    "enabled": true,
+    "interval": 3600,
+    "archive_dir": "data/archive",
+    "max_age_days": {"completed": 7, "failed": 30, "cancelled": 7},
+    "max_count": {"completed": 10000, "failed": 10000, "cancelled": 10000}
   },
   "integration": {
     "csharp_bridge_enabled": true,
+    "api_enabled": true,
+    "api_host": "127.0.0.1",
     "api_port": 8080,
-    "timeout_seconds": 30
+    "unix_socket": "",
+    "timeout_seconds": 30,
+    "bridge_endpoint": "",
+    "bridge_max_in_flight": 256,
+    "shm_ring_enabled": true,
+    "shm_ring_name": "shougun_status",
+    "shm_ring_capacity": 4096
   }
 }"""
     
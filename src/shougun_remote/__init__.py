@@ -8,14 +8,42 @@ __version__ = "1.0.0"
 __author__ = "Shougun Team"
 __email__ = "team@shougun.com"
 
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 from .core.service_interface import IService
 from .core.config_interface import IConfigManager
-from .services import ShougunService
-# from .integration.csharp_bridge import CSharpBridge  # Commented out - module không tồn tại
+
+if TYPE_CHECKING:
+    from .services import ShougunService
+    from .services.async_service import AsyncShougunService
+    from .integration.csharp_bridge import CSharpBridge
+
+# Import khi truy cập lần đầu (PEP 562): "import shougun_remote" không kéo theo toàn bộ services
+_LAZY_ATTRIBUTES = {
+    "ShougunService": ".services",
+    "AsyncShougunService": ".services.async_service",
+    "CSharpBridge": ".integration.csharp_bridge",
+}
 
 __all__ = [
     "IService",
     "IConfigManager", 
     "ShougunService",
-    # "CSharpBridge",  # Commented out - module không tồn tại
+    "AsyncShougunService",
+    "CSharpBridge",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import class khi được truy cập lần đầu."""
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
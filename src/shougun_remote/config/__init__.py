@@ -2,14 +2,122 @@
 Configuration models và implementations.
 """
 
-from typing import Any, Dict, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 from pathlib import Path
 import json
-import yaml
-from ..core.config_interface import IConfigManager
+import threading
+# Đặt tên khác "logger": import submodule config.logger sẽ ghi đè tên này trong namespace package
+from loguru import logger as _log
+from ..core.config_interface import IConfigManager, IReloadableConfig, ConfigDiff
+from ..core.logger_interface import LogLevel
 
 
-class ConfigManager(IConfigManager):
+# Kiểu dữ liệu hợp lệ cho các key cấu hình mà service đọc khi đang chạy.
+# Key không có trong bảng này được chấp nhận nguyên trạng.
+_CONFIG_SCHEMA: Dict[str, tuple] = {
+    "logging.level": (str,),
+    "performance.worker_thread_sleep": (int, float),
+    "performance.max_memory_mb": (int, float),
+    "performance.cpu_threshold": (int, float),
+    "performance.max_workers": (int,),
+    "performance.governor_interval": (int, float),
+    "performance.metrics_interval": (int, float),
+    "performance.shutdown_timeout": (int, float),
+    "performance.async_max_tasks": (int,),
+    "performance.worker_processes": (int,),
+    "integration.api_port": (int,),
+    "integration.timeout_seconds": (int, float),
+    "integration.bridge_endpoint": (str,),
+    "integration.bridge_max_in_flight": (int,),
+    "integration.shm_ring_name": (str,),
+    "integration.shm_ring_capacity": (int,),
+    "retention.interval": (int, float),
+    "retention.archive_dir": (str,),
+}
+
+
+def validate_config(config: Any) -> List[str]:
+    """
+    Kiểm tra cấu hình trước khi áp dụng.
+    
+    Args:
+        config: Cấu hình vừa đọc từ file
+        
+    Returns:
+        List[str]: Danh sách lỗi, rỗng nếu cấu hình hợp lệ
+    """
+    if not isinstance(config, dict):
+        return ["Cấu hình phải là object/dictionary"]
+    
+    errors = []
+    for key, types in _CONFIG_SCHEMA.items():
+        value = _lookup(config, key)
+        if value is None:
+            continue
+        # bool là subclass của int nên phải loại trừ riêng
+        if isinstance(value, bool) or not isinstance(value, types):
+            errors.append(f"{key}: kiểu dữ liệu không hợp lệ ({type(value).__name__})")
+            continue
+        if key.startswith("performance.") and value <= 0:
+            errors.append(f"{key}: phải lớn hơn 0")
+    
+    level = _lookup(config, "logging.level")
+    if isinstance(level, str) and level.upper() not in LogLevel.__members__:
+        errors.append(f"logging.level: giá trị không hợp lệ ({level})")
+    
+    worker_mode = _lookup(config, "performance.worker_mode")
+    if worker_mode is not None and worker_mode not in ("thread", "process"):
+        errors.append(f"performance.worker_mode: phải là \"thread\" hoặc \"process\" ({worker_mode})")
+    
+    return errors
+
+
+def diff_config(old: Dict[str, Any], new: Dict[str, Any]) -> ConfigDiff:
+    """
+    So sánh hai cấu hình và trả về các key thay đổi.
+    
+    Args:
+        old: Cấu hình cũ
+        new: Cấu hình mới
+        
+    Returns:
+        ConfigDiff: key dạng "section.key" -> (giá trị cũ, giá trị mới)
+    """
+    old_flat = _flatten(old)
+    new_flat = _flatten(new)
+    changes: ConfigDiff = {}
+    for key in old_flat.keys() | new_flat.keys():
+        old_value = old_flat.get(key)
+        new_value = new_flat.get(key)
+        if old_value != new_value:
+            changes[key] = (old_value, new_value)
+    return changes
+
+
+def _lookup(config: Dict[str, Any], key: str) -> Any:
+    """Lấy giá trị theo key dạng "section.key"."""
+    value: Any = config
+    for k in key.split('.'):
+        if isinstance(value, dict) and k in value:
+            value = value[k]
+        else:
+            return None
+    return value
+
+
+def _flatten(config: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Làm phẳng cấu hình lồng nhau thành {"section.key": value}."""
+    flat: Dict[str, Any] = {}
+    for key, value in config.items():
+        full_key = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flat.update(_flatten(value, f"{full_key}."))
+        else:
+            flat[full_key] = value
+    return flat
+
+
+class ConfigManager(IConfigManager, IReloadableConfig):
     """
     Implementation của IConfigManager.
     
@@ -23,6 +131,20 @@ class ConfigManager(IConfigManager):
     def __init__(self):
         self._config: Dict[str, Any] = {}
         self._config_path: Optional[Path] = None
+        self._lock = threading.RLock()
+        self._subscribers: List[Callable[[ConfigDiff], None]] = []
+        self._watcher = None
+    
+    def _read_file(self, config_path: Path) -> Optional[Dict[str, Any]]:
+        """Đọc file cấu hình theo định dạng, trả về None nếu định dạng không hỗ trợ."""
+        with open(config_path, 'r', encoding='utf-8') as f:
+            if config_path.suffix.lower() == '.json':
+                return json.load(f)
+            elif config_path.suffix.lower() in ['.yml', '.yaml']:
+                # Import muộn: phần lớn cấu hình là JSON, không cần trả chi phí import yaml khi khởi động
+                import yaml
+                return yaml.safe_load(f)
+        return None
     
     def load_config(self, config_path: Union[str, Path]) -> bool:
         """Tải cấu hình từ file."""
@@ -32,18 +154,84 @@ class ConfigManager(IConfigManager):
             if not self._config_path.exists():
                 return False
             
-            with open(self._config_path, 'r', encoding='utf-8') as f:
-                if self._config_path.suffix.lower() == '.json':
-                    self._config = json.load(f)
-                elif self._config_path.suffix.lower() in ['.yml', '.yaml']:
-                    self._config = yaml.safe_load(f)
-                else:
-                    return False
+            config = self._read_file(self._config_path)
+            if config is None:
+                return False
+            
+            with self._lock:
+                self._config = config
             
             return True
         except Exception:
             return False
     
+    def reload(self) -> bool:
+        """Nạp lại cấu hình, chỉ áp dụng khi cấu hình mới hợp lệ."""
+        if self._config_path is None:
+            return False
+        
+        try:
+            new_config = self._read_file(self._config_path)
+        except Exception as e:
+            # File có thể đang được ghi dở - giữ nguyên cấu hình cũ
+            _log.warning(f"Không thể đọc file cấu hình {self._config_path}: {e}")
+            return False
+        
+        errors = validate_config(new_config)
+        if errors:
+            _log.warning(f"Bỏ qua cấu hình mới không hợp lệ: {'; '.join(errors)}")
+            return False
+        
+        # Hoán đổi nguyên tử: reader luôn thấy cấu hình cũ hoặc mới, không bao giờ thấy nửa vời
+        with self._lock:
+            changes = diff_config(self._config, new_config)
+            self._config = new_config
+            subscribers = list(self._subscribers)
+        
+        if changes:
+            _log.info(f"Đã nạp lại cấu hình, các key thay đổi: {sorted(changes)}")
+            for callback in subscribers:
+                try:
+                    callback(changes)
+                except Exception as e:
+                    _log.error(f"Lỗi khi thông báo thay đổi cấu hình: {e}")
+        
+        return True
+    
+    def subscribe(self, callback: Callable[[ConfigDiff], None]) -> None:
+        """Đăng ký nhận thông báo khi cấu hình thay đổi."""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback: Callable[[ConfigDiff], None]) -> None:
+        """Hủy đăng ký nhận thông báo."""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+    
+    def start_watching(self) -> bool:
+        """Bắt đầu theo dõi file cấu hình đã load."""
+        if self._config_path is None:
+            return False
+        if self._watcher is not None and self._watcher.is_running():
+            return True
+        
+        # Import muộn để chỉ kéo watchdog vào khi thật sự cần hot reload
+        from ..monitors.config_watcher import ConfigWatcher
+        
+        self._watcher = ConfigWatcher(self._config_path, self.reload)
+        if not self._watcher.start():
+            self._watcher = None
+            return False
+        return True
+    
+    def stop_watching(self) -> None:
+        """Dừng theo dõi file cấu hình."""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+    
     def save_config(self, config_path: Union[str, Path]) -> bool:
         """Lưu cấu hình ra file."""
         try:
@@ -53,6 +241,7 @@ class ConfigManager(IConfigManager):
                 if config_path.suffix.lower() == '.json':
                     json.dump(self._config, f, indent=2, ensure_ascii=False)
                 elif config_path.suffix.lower() in ['.yml', '.yaml']:
+                    import yaml
                     yaml.dump(self._config, f, default_flow_style=False, allow_unicode=True)
                 else:
                     return False
@@ -78,14 +267,16 @@ class ConfigManager(IConfigManager):
         """Đặt giá trị cấu hình."""
         try:
             keys = key.split('.')
-            config = self._config
-            
-            for k in keys[:-1]:
-                if k not in config:
-                    config[k] = {}
-                config = config[k]
             
-            config[keys[-1]] = value
+            with self._lock:
+                config = self._config
+                
+                for k in keys[:-1]:
+                    if k not in config:
+                        config[k] = {}
+                    config = config[k]
+                
+                config[keys[-1]] = value
             return True
         except Exception:
             return False
@@ -2,6 +2,7 @@
 Logger implementation sử dụng loguru.
 """
 
+import threading
 from typing import Any, Optional
 from loguru import logger as loguru_logger
 from ..core.logger_interface import ILogger, LogLevel
@@ -20,7 +21,18 @@ class LoguruLogger(ILogger):
     
     def __init__(self, level: LogLevel = LogLevel.INFO):
         self._level = level
-        self._setup_logger()
+        # Sink (console, file có rotation) được tạo ở lần log đầu tiên thay vì lúc khởi tạo
+        self._configured = False
+        self._setup_lock = threading.Lock()
+    
+    def _ensure_setup(self) -> None:
+        """Thiết lập logger nếu chưa thiết lập."""
+        if self._configured:
+            return
+        with self._setup_lock:
+            if not self._configured:
+                self._setup_logger()
+                self._configured = True
     
     def _setup_logger(self) -> None:
         """Thiết lập logger."""
@@ -45,29 +57,41 @@ class LoguruLogger(ILogger):
     
     def debug(self, message: str, **kwargs: Any) -> None:
         """Log message ở mức DEBUG."""
+        self._ensure_setup()
         loguru_logger.debug(message, **kwargs)
     
     def info(self, message: str, **kwargs: Any) -> None:
         """Log message ở mức INFO."""
+        self._ensure_setup()
         loguru_logger.info(message, **kwargs)
     
     def warning(self, message: str, **kwargs: Any) -> None:
         """Log message ở mức WARNING."""
+        self._ensure_setup()
         loguru_logger.warning(message, **kwargs)
     
     def error(self, message: str, **kwargs: Any) -> None:
         """Log message ở mức ERROR."""
+        self._ensure_setup()
         loguru_logger.error(message, **kwargs)
     
     def critical(self, message: str, **kwargs: Any) -> None:
         """Log message ở mức CRITICAL."""
+        self._ensure_setup()
         loguru_logger.critical(message, **kwargs)
     
     def set_level(self, level: LogLevel) -> None:
         """Đặt mức độ log."""
         self._level = level
-        self._setup_logger()
+        if self._configured:
+            with self._setup_lock:
+                self._setup_logger()
     
     def get_level(self) -> LogLevel:
         """Lấy mức độ log hiện tại."""
         return self._level
+    
+    def flush(self) -> None:
+        """Chờ loguru ghi xong các message đang chờ."""
+        if self._configured:
+            loguru_logger.complete()
@@ -3,13 +3,17 @@ Core interfaces và abstract classes theo nguyên tắc SOLID.
 """
 
 from .service_interface import IService
-from .config_interface import IConfigManager
+from .config_interface import IConfigManager, IReloadableConfig
 from .logger_interface import ILogger
 from .repository_interface import IRepository
+from .result_store_interface import IResultStore, IResultWriter
 
 __all__ = [
     "IService",
     "IConfigManager",
+    "IReloadableConfig",
     "ILogger", 
     "IRepository",
+    "IResultStore",
+    "IResultWriter",
 ]
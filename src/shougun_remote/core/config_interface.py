@@ -4,10 +4,14 @@ Tuân thủ Dependency Inversion Principle (DIP).
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 from pathlib import Path
 
 
+# Diff cấu hình: key dạng "section.key" -> (giá trị cũ, giá trị mới)
+ConfigDiff = Dict[str, Tuple[Any, Any]]
+
+
 class IConfigManager(ABC):
     """
     Interface cho quản lý cấu hình.
@@ -108,3 +112,57 @@ class IConfigManager(ABC):
             Dict[str, Any]: Dictionary chứa toàn bộ cấu hình
         """
         pass
+
+
+class IReloadableConfig(ABC):
+    """
+    Interface cho cấu hình có thể nạp lại khi đang chạy (hot reload).
+    
+    Tuân thủ Interface Segregation Principle (ISP):
+    - Tách riêng khỏi IConfigManager để các implementation đơn giản không bị ép phải hỗ trợ
+    """
+    
+    @abstractmethod
+    def reload(self) -> bool:
+        """
+        Nạp lại cấu hình từ file đã load trước đó.
+        
+        Returns:
+            bool: True nếu cấu hình mới hợp lệ và đã được áp dụng, False nếu không
+        """
+        pass
+    
+    @abstractmethod
+    def subscribe(self, callback: Callable[[ConfigDiff], None]) -> None:
+        """
+        Đăng ký nhận thông báo khi cấu hình thay đổi.
+        
+        Args:
+            callback: Hàm nhận diff giữa cấu hình cũ và mới
+        """
+        pass
+    
+    @abstractmethod
+    def unsubscribe(self, callback: Callable[[ConfigDiff], None]) -> None:
+        """
+        Hủy đăng ký nhận thông báo.
+        
+        Args:
+            callback: Hàm đã đăng ký trước đó
+        """
+        pass
+    
+    @abstractmethod
+    def start_watching(self) -> bool:
+        """
+        Bắt đầu theo dõi file cấu hình để tự động reload.
+        
+        Returns:
+            bool: True nếu bắt đầu thành công, False nếu thất bại
+        """
+        pass
+    
+    @abstractmethod
+    def stop_watching(self) -> None:
+        """Dừng theo dõi file cấu hình."""
+        pass
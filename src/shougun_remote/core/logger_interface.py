@@ -102,3 +102,11 @@ class ILogger(ABC):
             LogLevel: Mức độ log hiện tại
         """
         pass
+    
+    def flush(self) -> None:
+        """
+        Đẩy hết log còn trong buffer ra sink (gọi khi service dừng).
+        
+        Mặc định không làm gì - implementation có buffer/queue nên override.
+        """
+        pass
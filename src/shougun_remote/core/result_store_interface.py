@@ -0,0 +1,132 @@
+"""
+Result store interface - lưu kết quả task (có thể lớn) tách khỏi repository task.
+Tuân thủ Dependency Inversion Principle (DIP).
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, ContextManager, Iterable, Optional
+
+
+class IResultWriter(ABC):
+    """
+    Writer ghi một kết quả theo từng phần (không cần giữ cả kết quả trong bộ nhớ).
+
+    Dùng như context manager: commit() khi thành công, tự abort() nếu có exception.
+    """
+
+    @abstractmethod
+    def write(self, chunk: bytes) -> int:
+        """
+        Ghi thêm một phần dữ liệu.
+
+        Args:
+            chunk: Dữ liệu (bytes-like)
+
+        Returns:
+            int: Số byte đã ghi
+        """
+        pass
+
+    @abstractmethod
+    def commit(self) -> str:
+        """
+        Hoàn tất kết quả.
+
+        Returns:
+            str: ID kết quả (định danh theo nội dung)
+        """
+        pass
+
+    @abstractmethod
+    def abort(self) -> None:
+        """Hủy kết quả đang ghi."""
+        pass
+
+    def __enter__(self) -> "IResultWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        if exc_type is not None:
+            self.abort()
+
+
+class IResultStore(ABC):
+    """
+    Interface cho kho kết quả định danh theo nội dung.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ định nghĩa contract lưu/đọc/xóa blob kết quả
+    """
+
+    @abstractmethod
+    def open_writer(self) -> IResultWriter:
+        """
+        Mở writer cho một kết quả mới.
+
+        Returns:
+            IResultWriter: Writer
+        """
+        pass
+
+    @abstractmethod
+    def open_view(self, result_id: str) -> Optional[ContextManager[memoryview]]:
+        """
+        Mở view chỉ đọc tới nội dung kết quả (không copy vào bộ nhớ).
+
+        Args:
+            result_id: ID kết quả
+
+        Returns:
+            Optional[ContextManager[memoryview]]: Context manager trả về memoryview, None nếu không tồn tại
+        """
+        pass
+
+    @abstractmethod
+    def exists(self, result_id: str) -> bool:
+        """Kiểm tra kết quả có tồn tại không."""
+        pass
+
+    @abstractmethod
+    def size(self, result_id: str) -> Optional[int]:
+        """Kích thước kết quả (byte), None nếu không tồn tại."""
+        pass
+
+    @abstractmethod
+    def delete(self, result_id: str) -> bool:
+        """
+        Xóa kết quả.
+
+        Args:
+            result_id: ID kết quả
+
+        Returns:
+            bool: True nếu đã xóa
+        """
+        pass
+
+    @abstractmethod
+    def collect_garbage(self, live_ids: Iterable[str]) -> int:
+        """
+        Xóa mọi kết quả không còn được tham chiếu.
+
+        Args:
+            live_ids: ID kết quả còn được task tham chiếu
+
+        Returns:
+            int: Số kết quả đã xóa
+        """
+        pass
+
+    def put(self, data: bytes) -> str:
+        """
+        Lưu kết quả có sẵn trong bộ nhớ.
+
+        Args:
+            data: Nội dung
+
+        Returns:
+            str: ID kết quả
+        """
+        with self.open_writer() as writer:
+            writer.write(data)
+            return writer.commit()
@@ -0,0 +1,51 @@
+"""
+Module tích hợp với ứng dụng bên ngoài (C# front end): API server cục bộ, bridge IPC và ring
+shared memory cho luồng sự kiện trạng thái.
+
+Các class được import khi truy cập lần đầu (PEP 562) - asyncio và shared_memory chỉ được nạp
+khi thành phần tương ứng được bật.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .api_server import ApiServer
+    from .bridge_channel import BridgeChannelServer, BridgeClient
+    from .commands import CommandDispatcher
+    from .csharp_bridge import CSharpBridge
+    from .shm_ring import ShmRingConsumer, ShmRingProducer
+
+_LAZY_ATTRIBUTES = {
+    "ApiServer": ".api_server",
+    "BridgeChannelServer": ".bridge_channel",
+    "BridgeClient": ".bridge_channel",
+    "CommandDispatcher": ".commands",
+    "CSharpBridge": ".csharp_bridge",
+    "ShmRingConsumer": ".shm_ring",
+    "ShmRingProducer": ".shm_ring",
+}
+
+__all__ = [
+    "ApiServer",
+    "BridgeChannelServer",
+    "BridgeClient",
+    "CommandDispatcher",
+    "CSharpBridge",
+    "ShmRingConsumer",
+    "ShmRingProducer",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """Import class khi được truy cập lần đầu."""
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,373 @@
+"""
+API server - Endpoint trạng thái và điều khiển cục bộ (loopback TCP và Unix socket).
+"""
+
+import asyncio
+import json
+import re
+import threading
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, ContextManager, List, Optional, Pattern, Set, Tuple
+
+from ..core.logger_interface import ILogger
+from ..core.service_interface import IService
+from ..models import Task, TaskStatus
+from .http import (
+    MAX_HEADER_BYTES,
+    HttpError,
+    HttpRequest,
+    HttpResponse,
+    error_response,
+    json_response,
+    read_request,
+    write_response,
+)
+
+if TYPE_CHECKING:
+    from ..services import TaskService
+
+Handler = Callable[[HttpRequest, "re.Match[str]"], Awaitable[HttpResponse]]
+
+# Số task serialize cho mỗi chunk khi stream danh sách task
+_STREAM_BATCH_SIZE = 256
+
+# Kích thước mỗi chunk khi stream kết quả task
+_RESULT_CHUNK_SIZE = 64 * 1024
+
+
+class ApiServer:
+    """
+    HTTP server asyncio chạy trên event loop riêng trong một thread nền.
+
+    Endpoints:
+        GET    /health             - kiểm tra server còn sống
+        GET    /status             - trạng thái service
+        GET    /info               - get_info() của service
+        GET    /metrics            - metrics dạng Prometheus text
+        GET    /tasks[?status=...] - danh sách task (stream chunked)
+        POST   /tasks              - tạo task {"name", "description"}
+        GET    /tasks/{id}         - lấy task
+        PATCH  /tasks/{id}         - cập nhật trạng thái {"status"}
+        DELETE /tasks/{id}         - xóa task
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ chuyển request HTTP thành lời gọi service, không chứa business logic
+
+    Tuân thủ Dependency Inversion Principle (DIP):
+    - Phụ thuộc vào IService và các callable được inject
+    """
+
+    def __init__(
+        self,
+        logger: ILogger,
+        service: IService,
+        task_service: "TaskService",
+        metrics_text: Callable[[], str],
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        unix_socket: Optional[str] = None,
+        idle_timeout: float = 30.0,
+    ):
+        """
+        Khởi tạo API server.
+
+        Args:
+            logger: Logger
+            service: Service cần expose trạng thái
+            task_service: Service quản lý task
+            metrics_text: Hàm trả về metrics dạng Prometheus text
+            host: Địa chỉ lắng nghe TCP (chỉ nên là loopback)
+            port: Cổng TCP (0 = chọn cổng trống)
+            unix_socket: Đường dẫn Unix socket (tùy chọn, không hỗ trợ trên Windows)
+            idle_timeout: Thời gian giữ kết nối keep-alive khi không có request
+        """
+        self._logger = logger
+        self._service = service
+        self._task_service = task_service
+        self._metrics_text = metrics_text
+        self._host = host
+        self._port = port
+        self._unix_socket = unix_socket
+        self._idle_timeout = idle_timeout
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._servers: List[asyncio.AbstractServer] = []
+        self._connections: Set["asyncio.Task[None]"] = set()
+        self._ready = threading.Event()
+        self._start_error: Optional[BaseException] = None
+        self._bound_port: Optional[int] = None
+
+        self._routes: List[Tuple[str, Pattern[str], Handler]] = [
+            ("GET", re.compile(r"^/health$"), self._health),
+            ("GET", re.compile(r"^/status$"), self._status),
+            ("GET", re.compile(r"^/info$"), self._info),
+            ("GET", re.compile(r"^/metrics$"), self._metrics),
+            ("GET", re.compile(r"^/tasks$"), self._list_tasks),
+            ("POST", re.compile(r"^/tasks$"), self._create_task),
+            ("GET", re.compile(r"^/tasks/(?P<task_id>[^/]+)$"), self._get_task),
+            ("GET", re.compile(r"^/tasks/(?P<task_id>[^/]+)/result$"), self._get_task_result),
+            ("PATCH", re.compile(r"^/tasks/(?P<task_id>[^/]+)$"), self._update_task),
+            ("DELETE", re.compile(r"^/tasks/(?P<task_id>[^/]+)$"), self._delete_task),
+        ]
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self, timeout: float = 5.0) -> bool:
+        """
+        Khởi động server trong thread nền.
+
+        Args:
+            timeout: Thời gian tối đa chờ server bind xong
+
+        Returns:
+            bool: True nếu server đã lắng nghe, False nếu thất bại
+        """
+        if self._thread and self._thread.is_alive():
+            return True
+
+        self._ready.clear()
+        self._start_error = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="ApiServer", daemon=True)
+        self._thread.start()
+
+        if not self._ready.wait(timeout) or self._start_error is not None:
+            self._logger.error(f"Không thể khởi động API server: {self._start_error or 'timeout'}")
+            self.stop()
+            return False
+
+        endpoints = [f"http://{self._host}:{self._bound_port}"]
+        if self._unix_socket:
+            endpoints.append(f"unix:{self._unix_socket}")
+        self._logger.info(f"API server đang lắng nghe: {', '.join(endpoints)}")
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Dừng server và đóng mọi kết nối.
+
+        Args:
+            timeout: Thời gian tối đa chờ thread dừng
+        """
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(loop.stop)
+            except RuntimeError:
+                # Loop đã đóng giữa lúc kiểm tra và lúc gọi
+                pass
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        self._loop = None
+
+    def get_port(self) -> Optional[int]:
+        """Cổng TCP thực tế (hữu ích khi cấu hình port = 0)."""
+        return self._bound_port
+
+    def is_running(self) -> bool:
+        """Kiểm tra server có đang chạy không."""
+        return bool(self._thread and self._thread.is_alive() and self._ready.is_set())
+
+    def _run(self) -> None:
+        """Thân thread: chạy event loop cho đến khi stop()."""
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._start_servers())
+        except BaseException as e:
+            self._start_error = e
+            self._ready.set()
+            loop.run_until_complete(self._close_servers())
+            loop.close()
+            return
+
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(self._close_servers())
+            loop.close()
+
+    async def _start_servers(self) -> None:
+        """Bind TCP và (nếu cấu hình) Unix socket."""
+        tcp_server = await asyncio.start_server(
+            self._handle_connection, self._host, self._port, limit=MAX_HEADER_BYTES
+        )
+        self._servers.append(tcp_server)
+        self._bound_port = tcp_server.sockets[0].getsockname()[1]
+
+        if self._unix_socket:
+            if not hasattr(asyncio, "start_unix_server"):
+                self._logger.warning("Unix socket không được hỗ trợ trên nền tảng này, bỏ qua")
+            else:
+                unix_server = await asyncio.start_unix_server(
+                    self._handle_connection, self._unix_socket, limit=MAX_HEADER_BYTES
+                )
+                self._servers.append(unix_server)
+
+    async def _close_servers(self) -> None:
+        """Ngừng nhận kết nối mới và hủy các kết nối đang mở."""
+        for server in self._servers:
+            server.close()
+        for task in list(self._connections):
+            task.cancel()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers.clear()
+
+    # ------------------------------------------------------------------ connection
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Xử lý một kết nối: đọc và trả lời tuần tự các request (keep-alive, pipelining)."""
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await read_request(reader, self._idle_timeout)
+                except HttpError as e:
+                    # Request lỗi cú pháp - không thể biết request tiếp theo bắt đầu ở đâu nên đóng kết nối
+                    await write_response(writer, error_response(e.status, e.message), keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                response = await self._dispatch(request)
+                keep_alive = request.keep_alive
+                await write_response(writer, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            self._logger.error(f"Lỗi trong kết nối API: {e}")
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _dispatch(self, request: HttpRequest) -> HttpResponse:
+        """Tìm handler theo method và path."""
+        path_matched = False
+        for method, pattern, handler in self._routes:
+            match = pattern.match(request.path)
+            if not match:
+                continue
+            path_matched = True
+            if method != request.method:
+                continue
+            try:
+                return await handler(request, match)
+            except HttpError as e:
+                return error_response(e.status, e.message)
+            except Exception as e:
+                self._logger.error(f"Lỗi xử lý {request.method} {request.path}: {e}")
+                return error_response(500, str(e))
+
+        if path_matched:
+            return error_response(405, f"Method {request.method} not allowed")
+        return error_response(404, f"Unknown path: {request.path}")
+
+    async def _call_blocking(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Chạy lời gọi có I/O file (repository) trong executor để không chặn event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    # ------------------------------------------------------------------ handlers
+
+    async def _health(self, request: HttpRequest, match: "re.Match[str]") -> HttpResponse:
+        """GET /health"""
+        return json_response({"success": True, "data": {"status": "ok"}})
+
+    async def _status(self, request: HttpRequest, match: "re.Match[str]") -> HttpResponse:
+        """GET /status"""
+        return json_response({"success": True, "data": {"status": self._service.get_status().value}})
+
+    async def _info(self, request: HttpRequest, match: "re.Match[str]") -> HttpResponse:
+        """GET /info - get_info() là O(1) nên gọi trực tiếp trên event loop."""
+        return json_response({"success": True, "data": self._service.get_info()})
+
+    async def _metrics(self, request: HttpRequest, match: "re.Match[str]") -> HttpResponse:
+        """GET /metrics"""
+        from ..metrics.prometheus import CONTENT_TYPE
+
+        text = await self._call_blocking(self._metrics_text)
+        return HttpResponse(body=text.encode("utf-8"), content_type=CONTENT_TYPE)
+
+    async def _list_tasks(self, request: HttpRequest, match: "re.Match[str]") -> HttpResponse:
+        """GET /tasks[?status=...] - stream danh sách task theo từng lô."""
+        status = self._parse_status(request.query["status"]) if "status" in request.query else None
+        tasks: List[Task] = await self._call_blocking(self._task_service.get_all_tasks)
+        if status is not None:
+            tasks = [task for task in tasks if task.status == status]
+        return HttpResponse(stream=self._stream_tasks(tasks))
+
+    async def _stream_tasks(self, tasks: List[Task]) -> AsyncIterator[bytes]:
+        """Serialize danh sách task thành JSON theo từng lô để không dựng cả body trong bộ nhớ."""
+        yield b'{"success": true, "data": ['
+        for start in range(0, len(tasks), _STREAM_BATCH_SIZE):
+            batch = tasks[start:start + _STREAM_BATCH_SIZE]
+            body = ",".join(json.dumps(task.to_dict(), ensure_ascii=False) for task in batch)
+            yield (("," if start else "") + body).encode("utf-8")
+        yield b"]}"
+
+    async def _create_task(self, request: HttpRequest, match: "re.Match[str]") -> HttpResponse:
+        """POST /tasks"""
+        payload = request.json()
+        name = payload.get("name") if isinstance(payload, dict) else None
+        if not isinstance(name, str) or not name:
+            raise HttpError(400, "Field 'name' is required")
+        description = payload.get("description")
+
+        task = await self._call_blocking(self._task_service.create_task, name, description)
+        if task is None:
+            raise HttpError(500, "Failed to create task")
+        return json_response({"success": True, "data": task.to_dict()}, status=201)
+
+    async def _get_task(self, request: HttpRequest, match: "re.Match[str]") -> HttpResponse:
+        """GET /tasks/{id}"""
+        task = await self._call_blocking(self._task_service.get_task, match["task_id"])
+        if task is None:
+            raise HttpError(404, f"Task not found: {match['task_id']}")
+        return json_response({"success": True, "data": task.to_dict()})
+
+    async def _get_task_result(self, request: HttpRequest, match: "re.Match[str]") -> HttpResponse:
+        """GET /tasks/{id}/result - stream nội dung kết quả từ view mmap."""
+        view = await self._call_blocking(self._task_service.open_result, match["task_id"])
+        if view is None:
+            raise HttpError(404, f"Result not found: {match['task_id']}")
+        return HttpResponse(content_type="application/octet-stream", stream=self._stream_result(view))
+
+    async def _stream_result(self, view: ContextManager[memoryview]) -> AsyncIterator[bytes]:
+        """Gửi kết quả theo từng khối; mỗi khối được copy vì transport có thể giữ buffer sau khi view đóng."""
+        with view as data:
+            for start in range(0, len(data), _RESULT_CHUNK_SIZE):
+                yield bytes(data[start:start + _RESULT_CHUNK_SIZE])
+
+    async def _update_task(self, request: HttpRequest, match: "re.Match[str]") -> HttpResponse:
+        """PATCH /tasks/{id}"""
+        payload = request.json()
+        if not isinstance(payload, dict) or "status" not in payload:
+            raise HttpError(400, "Field 'status' is required")
+        status = self._parse_status(payload["status"])
+        task_id = match["task_id"]
+
+        if not await self._call_blocking(self._task_service.update_task_status, task_id, status):
+            raise HttpError(404, f"Task not found: {task_id}")
+        task = await self._call_blocking(self._task_service.get_task, task_id)
+        return json_response({"success": True, "data": task.to_dict() if task else None})
+
+    async def _delete_task(self, request: HttpRequest, match: "re.Match[str]") -> HttpResponse:
+        """DELETE /tasks/{id}"""
+        if not await self._call_blocking(self._task_service.delete_task, match["task_id"]):
+            raise HttpError(404, f"Task not found: {match['task_id']}")
+        return HttpResponse(status=204)
+
+    @staticmethod
+    def _parse_status(value: Any) -> TaskStatus:
+        """Chuyển chuỗi thành TaskStatus, báo lỗi 400 nếu không hợp lệ."""
+        try:
+            return TaskStatus(value)
+        except ValueError as e:
+            raise HttpError(400, f"Invalid status: {value}") from e
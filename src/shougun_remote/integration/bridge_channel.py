@@ -0,0 +1,451 @@
+"""
+Kênh IPC bền vững cho host C#: frame nhị phân có tiền tố độ dài trên Unix socket
+(hoặc TCP loopback thay cho named pipe trên Windows).
+
+Host giữ một kết nối duy nhất và gửi nhiều lệnh song song; mỗi response mang request_id
+của lệnh tương ứng nên có thể trả về không theo thứ tự gửi.
+"""
+
+import asyncio
+import errno
+import itertools
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from ..core.logger_interface import ILogger
+from .commands import INVALID_REQUEST, CommandDispatcher
+from .framing import (
+    FRAME_REQUEST,
+    FRAME_RESPONSE,
+    HEADER_SIZE,
+    FrameError,
+    decode_request,
+    encode_request,
+    pack_header,
+    unpack_header,
+)
+
+Address = Union[str, Tuple[str, int]]
+
+# Cổng TCP loopback mặc định khi không có Unix socket (Windows)
+DEFAULT_TCP_PORT = 8081
+
+
+def default_endpoint() -> str:
+    """
+    Endpoint mặc định theo nền tảng.
+
+    Returns:
+        str: "unix:<tempdir>/shougun_bridge.sock" trên POSIX, "tcp:127.0.0.1:8081" trên Windows
+    """
+    if sys.platform == "win32" or not hasattr(socket, "AF_UNIX"):
+        return f"tcp:127.0.0.1:{DEFAULT_TCP_PORT}"
+    return f"unix:{os.path.join(tempfile.gettempdir(), 'shougun_bridge.sock')}"
+
+
+def parse_endpoint(endpoint: str) -> Tuple[str, Address]:
+    """
+    Tách endpoint thành (scheme, address).
+
+    Args:
+        endpoint: "unix:<path>" hoặc "tcp:<host>:<port>"
+
+    Returns:
+        Tuple[str, Address]: ("unix", path) hoặc ("tcp", (host, port))
+
+    Raises:
+        ValueError: Endpoint không hợp lệ
+    """
+    scheme, sep, rest = endpoint.partition(":")
+    if sep and scheme == "unix" and rest:
+        return "unix", rest
+    if sep and scheme == "tcp":
+        host, sep, port = rest.rpartition(":")
+        if sep and host and port.isdigit():
+            return "tcp", (host, int(port))
+    raise ValueError(f"Endpoint không hợp lệ: {endpoint}")
+
+
+class BridgeChannelServer:
+    """
+    Server kênh IPC chạy asyncio trên thread nền (cùng mô hình với ApiServer).
+
+    Mỗi kết nối có một vòng đọc frame. Lệnh inline được trả lời ngay trên event loop;
+    lệnh chặn chạy trong executor và ghi response khi xong, nên một lệnh chậm không
+    giữ chân các lệnh phía sau. Số lệnh đang chạy trên mỗi kết nối bị giới hạn để
+    client gửi dồn không làm phình bộ nhớ.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ lo transport và multiplexing, việc thực thi lệnh do CommandDispatcher đảm nhận
+    """
+
+    def __init__(
+        self,
+        logger: ILogger,
+        dispatcher: CommandDispatcher,
+        endpoint: str,
+        max_in_flight: int = 256,
+    ):
+        """
+        Khởi tạo server.
+
+        Args:
+            logger: Logger
+            dispatcher: Bảng lệnh
+            endpoint: "unix:<path>" hoặc "tcp:<host>:<port>" (port 0 = chọn cổng trống)
+            max_in_flight: Số lệnh chặn tối đa đang chạy trên mỗi kết nối
+        """
+        self._logger = logger
+        self._dispatcher = dispatcher
+        self._scheme, self._address = parse_endpoint(endpoint)
+        self._max_in_flight = max_in_flight
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set["asyncio.Task[None]"] = set()
+        self._ready = threading.Event()
+        self._start_error: Optional[BaseException] = None
+        self._bound_endpoint: Optional[str] = None
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self, timeout: float = 5.0) -> bool:
+        """
+        Khởi động server trong thread nền.
+
+        Args:
+            timeout: Thời gian tối đa chờ server bind xong
+
+        Returns:
+            bool: True nếu server đã lắng nghe, False nếu thất bại
+        """
+        if self._thread and self._thread.is_alive():
+            return True
+
+        self._ready.clear()
+        self._start_error = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="BridgeChannel", daemon=True)
+        self._thread.start()
+
+        if not self._ready.wait(timeout) or self._start_error is not None:
+            self._logger.error(f"Không thể khởi động kênh bridge: {self._start_error or 'timeout'}")
+            self.stop()
+            return False
+
+        self._logger.info(f"Kênh bridge đang lắng nghe: {self._bound_endpoint}")
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Dừng server và đóng mọi kết nối.
+
+        Args:
+            timeout: Thời gian tối đa chờ thread dừng
+        """
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(loop.stop)
+            except RuntimeError:
+                pass
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        self._loop = None
+
+    def get_endpoint(self) -> Optional[str]:
+        """Endpoint thực tế (với TCP port 0 là cổng đã được cấp)."""
+        return self._bound_endpoint
+
+    def is_running(self) -> bool:
+        """Kiểm tra server có đang chạy không."""
+        return bool(self._thread and self._thread.is_alive() and self._ready.is_set())
+
+    def _run(self) -> None:
+        """Thân thread: chạy event loop cho đến khi stop()."""
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._start_server())
+        except BaseException as e:
+            self._start_error = e
+            self._ready.set()
+            loop.run_until_complete(self._close_server())
+            loop.close()
+            return
+
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(self._close_server())
+            loop.close()
+
+    async def _start_server(self) -> None:
+        """Bind Unix socket hoặc TCP loopback."""
+        if self._scheme == "unix":
+            await self._check_unix_path()
+            self._server = await asyncio.start_unix_server(self._handle_connection, self._address)
+            self._bound_endpoint = f"unix:{self._address}"
+        else:
+            host, port = self._address
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+            bound_port = self._server.sockets[0].getsockname()[1]
+            self._bound_endpoint = f"tcp:{host}:{bound_port}"
+
+    async def _check_unix_path(self, timeout: float = 1.0) -> None:
+        """
+        Từ chối bind khi file socket đang có server khác lắng nghe.
+
+        start_unix_server xóa file socket cũ trước khi bind: nếu không kiểm tra, instance thứ hai
+        sẽ lặng lẽ chiếm endpoint của instance đang chạy. File socket không còn ai lắng nghe
+        (instance trước bị kill) thì được dùng lại.
+
+        Raises:
+            OSError: EADDRINUSE nếu endpoint đang được dùng
+        """
+        if not os.path.exists(self._address):
+            return
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_unix_connection(self._address), timeout)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return
+        except asyncio.TimeoutError:
+            # Có listener nhưng backlog đầy - vẫn là endpoint đang sống
+            pass
+        else:
+            writer.close()
+        raise OSError(errno.EADDRINUSE, f"Endpoint đang được instance khác sử dụng: unix:{self._address}")
+
+    async def _close_server(self) -> None:
+        """Ngừng nhận kết nối mới, hủy kết nối đang mở và dọn file socket."""
+        if self._server is not None:
+            self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+        if self._scheme == "unix" and self._bound_endpoint:
+            try:
+                os.unlink(self._address)
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------ connection
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Vòng đọc frame của một kết nối."""
+        task = asyncio.current_task()
+        self._connections.add(task)
+        slots = asyncio.Semaphore(self._max_in_flight)
+        pending: Set["asyncio.Task[None]"] = set()
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(HEADER_SIZE)
+                    length, request_id, kind, _ = unpack_header(header)
+                    payload = await reader.readexactly(length) if length else b""
+                except asyncio.IncompleteReadError:
+                    break
+                if kind != FRAME_REQUEST:
+                    raise FrameError(f"Loại frame không hợp lệ: {kind}")
+
+                try:
+                    command, args = decode_request(payload)
+                except FrameError:
+                    self._write(writer, request_id, INVALID_REQUEST)
+                else:
+                    if self._dispatcher.is_inline(command):
+                        self._write(writer, request_id, self._dispatcher.execute(command, args))
+                    else:
+                        await slots.acquire()
+                        job = asyncio.ensure_future(self._execute_blocking(writer, request_id, command, args, slots))
+                        pending.add(job)
+                        job.add_done_callback(pending.discard)
+
+                # Chỉ vòng đọc gọi drain(): khi client không đọc response, server ngừng đọc request mới
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        except FrameError as e:
+            self._logger.warning(f"Đóng kết nối bridge do frame lỗi: {e}")
+        except Exception as e:
+            self._logger.error(f"Lỗi trong kết nối bridge: {e}")
+        finally:
+            for job in list(pending):
+                job.cancel()
+            self._connections.discard(task)
+            writer.close()
+
+    async def _execute_blocking(
+        self,
+        writer: asyncio.StreamWriter,
+        request_id: int,
+        command: str,
+        args: Dict[str, Any],
+        slots: asyncio.Semaphore,
+    ) -> None:
+        """Chạy lệnh chặn trong executor rồi ghi response."""
+        try:
+            response = await asyncio.get_running_loop().run_in_executor(
+                None, self._dispatcher.execute, command, args
+            )
+            if not writer.is_closing():
+                self._write(writer, request_id, response)
+        finally:
+            slots.release()
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, request_id: int, body: bytes) -> None:
+        """Ghi một frame response (header và body trong cùng một lần ghi)."""
+        writer.writelines([pack_header(len(body), request_id, FRAME_RESPONSE), body])
+
+
+class BridgeClient:
+    """
+    Client đồng bộ cho kênh bridge, tương đương phía C# host.
+
+    Một thread nền đọc response và hoàn thành Future theo request_id, nên nhiều thread
+    có thể gọi call()/submit() đồng thời trên cùng một kết nối.
+    """
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        """
+        Khởi tạo client.
+
+        Args:
+            endpoint: "unix:<path>" hoặc "tcp:<host>:<port>"
+            timeout: Thời gian chờ mặc định cho kết nối và mỗi lệnh
+        """
+        self._scheme, self._address = parse_endpoint(endpoint)
+        self._timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, "Future[Dict[str, Any]]"] = {}
+        self._ids = itertools.count(1)
+        self._reader: Optional[threading.Thread] = None
+
+    def connect(self) -> bool:
+        """
+        Mở kết nối.
+
+        Returns:
+            bool: True nếu kết nối thành công
+        """
+        try:
+            if self._scheme == "unix":
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            else:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.settimeout(self._timeout)
+            sock.connect(self._address)
+            sock.settimeout(None)
+        except OSError:
+            return False
+
+        self._sock = sock
+        self._reader = threading.Thread(target=self._read_loop, name="BridgeClientReader", daemon=True)
+        self._reader.start()
+        return True
+
+    def close(self) -> None:
+        """Đóng kết nối; các lệnh đang chờ nhận ConnectionError."""
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        if self._reader and self._reader is not threading.current_thread():
+            self._reader.join(timeout=self._timeout)
+        self._fail_pending(ConnectionError("Bridge connection closed"))
+
+    def submit(self, command: str, args: Optional[Dict[str, Any]] = None) -> "Future[Dict[str, Any]]":
+        """
+        Gửi lệnh không chờ kết quả.
+
+        Args:
+            command: Tên lệnh
+            args: Tham số lệnh
+
+        Returns:
+            Future[Dict[str, Any]]: Response đã parse
+        """
+        future: "Future[Dict[str, Any]]" = Future()
+        payload = encode_request(command, args)
+        with self._send_lock:
+            if self._sock is None:
+                future.set_exception(ConnectionError("Bridge not connected"))
+                return future
+            request_id = next(self._ids) & 0xFFFFFFFF
+            self._pending[request_id] = future
+            try:
+                self._sock.sendall(pack_header(len(payload), request_id, FRAME_REQUEST) + payload)
+            except OSError as e:
+                self._pending.pop(request_id, None)
+                future.set_exception(ConnectionError(str(e)))
+        return future
+
+    def call(self, command: str, args: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Gửi lệnh và chờ kết quả.
+
+        Args:
+            command: Tên lệnh
+            args: Tham số lệnh
+            timeout: Thời gian chờ (mặc định theo client)
+
+        Returns:
+            Dict[str, Any]: Response đã parse
+        """
+        return self.submit(command, args).result(timeout or self._timeout)
+
+    def _read_loop(self) -> None:
+        """Đọc frame response và hoàn thành Future tương ứng."""
+        sock = self._sock
+        header = bytearray(HEADER_SIZE)
+        try:
+            while True:
+                if not self._recv_exactly(sock, memoryview(header)):
+                    break
+                length, request_id, _, _ = unpack_header(header)
+                body = bytearray(length)
+                if length and not self._recv_exactly(sock, memoryview(body)):
+                    break
+                future = self._pending.pop(request_id, None)
+                if future is not None:
+                    future.set_result(json.loads(body))
+        except (OSError, FrameError, ValueError):
+            pass
+        self._fail_pending(ConnectionError("Bridge connection lost"))
+
+    @staticmethod
+    def _recv_exactly(sock: socket.socket, view: memoryview) -> bool:
+        """Đọc đủ len(view) byte vào buffer có sẵn, False nếu kết nối đóng."""
+        while len(view):
+            received = sock.recv_into(view)
+            if not received:
+                return False
+            view = view[received:]
+        return True
+
+    def _fail_pending(self, error: Exception) -> None:
+        """Báo lỗi cho mọi lệnh còn chờ."""
+        futures: List["Future[Dict[str, Any]]"] = list(self._pending.values())
+        self._pending.clear()
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
@@ -0,0 +1,193 @@
+"""
+Bảng lệnh dùng chung cho CSharpBridge và kênh IPC.
+
+Mọi lệnh trả về response đã serialize sẵn thành bytes JSON để kênh IPC ghi thẳng ra socket.
+Các response không phụ thuộc dữ liệu (trạng thái, lỗi cố định) được dựng một lần rồi dùng lại.
+"""
+
+import json
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+from ..core.service_interface import ServiceStatus
+from ..models import TaskStatus
+
+if TYPE_CHECKING:
+    from ..services import ShougunService
+
+CommandHandler = Callable[[Dict[str, Any]], bytes]
+
+
+def serialize(success: bool, message: str, data: Any = None) -> bytes:
+    """
+    Serialize response theo định dạng {"success", "message", "data"}.
+
+    Args:
+        success: Lệnh thành công hay không
+        message: Thông điệp
+        data: Dữ liệu kèm theo (bỏ qua nếu None)
+
+    Returns:
+        bytes: JSON UTF-8
+    """
+    payload: Dict[str, Any] = {"success": success, "message": message}
+    if data is not None:
+        payload["data"] = data
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+@lru_cache(maxsize=128)
+def _unknown_command(command: str) -> bytes:
+    """Response cho lệnh không tồn tại (cache vì client lỗi thường gửi lặp lại)."""
+    return serialize(False, f"Unknown command: {command}")
+
+
+NOT_INITIALIZED = serialize(False, "Bridge not initialized")
+INVALID_REQUEST = serialize(False, "Invalid request")
+PONG = serialize(True, "pong")
+SHUTDOWN_REQUESTED = serialize(True, "Shutdown requested")
+
+_STATUS_RESPONSES: Dict[ServiceStatus, bytes] = {
+    status: serialize(True, f"Service is {status.value}", {"status": status.value})
+    for status in ServiceStatus
+}
+
+
+class CommandDispatcher:
+    """
+    Ánh xạ tên lệnh sang thao tác trên ShougunService.
+
+    Lệnh "inline" là O(1) và không có I/O nên kênh IPC chạy thẳng trên event loop;
+    các lệnh còn lại chạm tới repository/lifecycle nên được chạy trong executor.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ chuyển lệnh thành lời gọi service và serialize kết quả
+    """
+
+    def __init__(self, service: "ShougunService"):
+        """
+        Khởi tạo dispatcher.
+
+        Args:
+            service: Service nhận lệnh
+        """
+        self._service = service
+        self._commands: Dict[str, Tuple[CommandHandler, bool]] = {
+            "ping": (lambda args: PONG, True),
+            "status": (self._status, True),
+            "info": (self._info, True),
+            "shutdown": (self._shutdown, True),
+            "start": (self._start, False),
+            "stop": (self._stop, False),
+            "restart": (self._restart, False),
+            "metrics": (self._metrics, False),
+            "create_task": (self._create_task, False),
+            "get_task": (self._get_task, False),
+            "list_tasks": (self._list_tasks, False),
+            "update_task": (self._update_task, False),
+            "delete_task": (self._delete_task, False),
+        }
+
+    def get_commands(self) -> Tuple[str, ...]:
+        """Danh sách lệnh được hỗ trợ."""
+        return tuple(self._commands)
+
+    def is_inline(self, command: str) -> bool:
+        """
+        Kiểm tra lệnh có chạy được ngay trên event loop không.
+
+        Args:
+            command: Tên lệnh
+
+        Returns:
+            bool: True nếu lệnh không chặn (hoặc không tồn tại - chỉ trả lỗi)
+        """
+        entry = self._commands.get(command)
+        return entry is None or entry[1]
+
+    def execute(self, command: str, args: Optional[Dict[str, Any]] = None) -> bytes:
+        """
+        Thực thi lệnh.
+
+        Args:
+            command: Tên lệnh
+            args: Tham số lệnh
+
+        Returns:
+            bytes: Response JSON đã serialize
+        """
+        entry = self._commands.get(command)
+        if entry is None:
+            return _unknown_command(command)
+        try:
+            return entry[0](args or {})
+        except Exception as e:
+            return serialize(False, f"Command '{command}' failed: {e}")
+
+    # ------------------------------------------------------------------ service
+
+    def _status(self, args: Dict[str, Any]) -> bytes:
+        return _STATUS_RESPONSES[self._service.get_status()]
+
+    def _info(self, args: Dict[str, Any]) -> bytes:
+        return serialize(True, "OK", self._service.get_info())
+
+    def _shutdown(self, args: Dict[str, Any]) -> bytes:
+        # Chỉ đặt cờ - process chủ tự dừng service và thoát, response vẫn kịp gửi về
+        self._service.request_shutdown()
+        return SHUTDOWN_REQUESTED
+
+    def _start(self, args: Dict[str, Any]) -> bytes:
+        if self._service.start():
+            return serialize(True, "Service started successfully")
+        return serialize(False, "Failed to start service")
+
+    def _stop(self, args: Dict[str, Any]) -> bytes:
+        if self._service.stop():
+            return serialize(True, "Service stopped successfully")
+        return serialize(False, "Failed to stop service")
+
+    def _restart(self, args: Dict[str, Any]) -> bytes:
+        if self._service.restart():
+            return serialize(True, "Service restarted successfully")
+        return serialize(False, "Failed to restart service")
+
+    def _metrics(self, args: Dict[str, Any]) -> bytes:
+        return serialize(True, "OK", self._service.get_metrics_text())
+
+    # ------------------------------------------------------------------ tasks
+
+    def _create_task(self, args: Dict[str, Any]) -> bytes:
+        name = args.get("name")
+        if not isinstance(name, str) or not name:
+            return serialize(False, "Field 'name' is required")
+        task = self._service.get_task_service().create_task(name, args.get("description"))
+        if task is None:
+            return serialize(False, "Failed to create task")
+        return serialize(True, "Task created", task.to_dict())
+
+    def _get_task(self, args: Dict[str, Any]) -> bytes:
+        task = self._service.get_task_service().get_task(str(args.get("id", "")))
+        if task is None:
+            return serialize(False, f"Task not found: {args.get('id')}")
+        return serialize(True, "OK", task.to_dict())
+
+    def _list_tasks(self, args: Dict[str, Any]) -> bytes:
+        tasks = self._service.get_task_service().get_all_tasks()
+        if "status" in args:
+            status = TaskStatus(args["status"])
+            tasks = [task for task in tasks if task.status == status]
+        return serialize(True, "OK", [task.to_dict() for task in tasks])
+
+    def _update_task(self, args: Dict[str, Any]) -> bytes:
+        task_id = str(args.get("id", ""))
+        status = TaskStatus(args.get("status"))
+        if not self._service.get_task_service().update_task_status(task_id, status):
+            return serialize(False, f"Task not found: {task_id}")
+        return serialize(True, "Task updated")
+
+    def _delete_task(self, args: Dict[str, Any]) -> bytes:
+        task_id = str(args.get("id", ""))
+        if not self._service.get_task_service().delete_task(task_id):
+            return serialize(False, f"Task not found: {task_id}")
+        return serialize(True, "Task deleted")
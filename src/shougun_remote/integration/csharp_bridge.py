@@ -0,0 +1,135 @@
+"""
+Bridge cho host C#.
+
+Host có thể gọi trực tiếp các method của CSharpBridge (Python nhúng qua pythonnet) hoặc
+kết nối tới kênh IPC bền vững do serve() mở ra; cả hai đường đều dùng chung CommandDispatcher
+nên nhận cùng một định dạng response JSON {"success", "message", "data"}.
+"""
+
+import json
+from typing import Optional
+
+from loguru import logger
+
+from ..core.service_interface import IService
+from .bridge_channel import BridgeChannelServer, default_endpoint
+from .commands import INVALID_REQUEST, NOT_INITIALIZED, CommandDispatcher
+
+
+class CSharpBridge:
+    """
+    Bridge giữa host C# và ShougunService.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ quản lý vòng đời bridge và kênh IPC, lệnh do CommandDispatcher thực thi
+
+    Tuân thủ Dependency Inversion Principle (DIP):
+    - Service có thể được inject, mặc định tạo qua ServiceFactory
+    """
+
+    def __init__(self, service: Optional[IService] = None):
+        """
+        Khởi tạo bridge.
+
+        Args:
+            service: Service có sẵn (mặc định tạo mới khi initialize())
+        """
+        self._service = service
+        self._dispatcher: Optional[CommandDispatcher] = None
+        self._channel: Optional[BridgeChannelServer] = None
+
+    def initialize(self) -> bool:
+        """
+        Tạo service (nếu chưa có) và bảng lệnh.
+
+        Returns:
+            bool: True nếu thành công
+        """
+        try:
+            if self._service is None:
+                # Import muộn: services.factory import ngược lại package integration
+                from ..services.factory import ServiceFactory
+
+                self._service = ServiceFactory.create_shougun_service()
+            self._dispatcher = CommandDispatcher(self._service)
+            return True
+        except Exception as e:
+            logger.error(f"Không thể khởi tạo CSharpBridge: {e}")
+            return False
+
+    def start_service(self) -> str:
+        """Khởi động service, trả về JSON."""
+        return self.execute_command("start")
+
+    def stop_service(self) -> str:
+        """Dừng service, trả về JSON."""
+        return self.execute_command("stop")
+
+    def get_service_status(self) -> str:
+        """Lấy trạng thái service, trả về JSON."""
+        return self.execute_command("status")
+
+    def execute_command(self, command: str, args: Optional[str] = None) -> str:
+        """
+        Thực thi lệnh.
+
+        Args:
+            command: Tên lệnh
+            args: Tham số dạng chuỗi JSON object (tùy chọn)
+
+        Returns:
+            str: Response JSON
+        """
+        if self._dispatcher is None:
+            return NOT_INITIALIZED.decode("utf-8")
+        try:
+            parsed = json.loads(args) if args else {}
+        except json.JSONDecodeError:
+            return INVALID_REQUEST.decode("utf-8")
+        if not isinstance(parsed, dict):
+            return INVALID_REQUEST.decode("utf-8")
+        return self._dispatcher.execute(command, parsed).decode("utf-8")
+
+    def serve(self, endpoint: Optional[str] = None) -> bool:
+        """
+        Mở kênh IPC bền vững cho host C#.
+
+        Args:
+            endpoint: "unix:<path>" hoặc "tcp:<host>:<port>"; mặc định lấy
+                integration.bridge_endpoint hoặc endpoint mặc định của nền tảng
+
+        Returns:
+            bool: True nếu kênh đã lắng nghe
+        """
+        if self._dispatcher is None and not self.initialize():
+            return False
+        if self._channel and self._channel.is_running():
+            return True
+
+        try:
+            config = self._service.get_config_manager()
+            if endpoint is None:
+                endpoint = config.get("integration.bridge_endpoint") or default_endpoint()
+            max_in_flight = int(config.get("integration.bridge_max_in_flight", 256))
+            self._channel = BridgeChannelServer(logger, self._dispatcher, endpoint, max_in_flight)
+        except Exception as e:
+            logger.error(f"Cấu hình kênh bridge không hợp lệ: {e}")
+            return False
+        return self._channel.start()
+
+    def get_endpoint(self) -> Optional[str]:
+        """
+        Lấy endpoint của kênh IPC.
+
+        Returns:
+            Optional[str]: Endpoint hoặc None nếu kênh chưa mở
+        """
+        if self._channel and self._channel.is_running():
+            return self._channel.get_endpoint()
+        return None
+
+    def close(self) -> None:
+        """Đóng kênh IPC (không dừng service)."""
+        if self._channel:
+            self._channel.stop()
+            self._channel = None
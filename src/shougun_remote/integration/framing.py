@@ -0,0 +1,114 @@
+"""
+Định dạng frame nhị phân của kênh bridge C#.
+
+Mỗi frame gồm header 10 byte (little-endian, khớp BinaryReader của .NET) và payload:
+
+    offset  size  field
+    0       4     payload_length (uint32)
+    4       4     request_id     (uint32) - client tự đánh số, response mang lại đúng id
+    8       1     kind           (uint8)  - FRAME_REQUEST / FRAME_RESPONSE
+    9       1     flags          (uint8)  - dự phòng, hiện luôn là 0
+
+Payload của request: 1 byte độ dài tên lệnh + tên lệnh (UTF-8) + tham số JSON (có thể rỗng).
+Payload của response: JSON UTF-8 {"success": ..., "message": ..., "data": ...}.
+"""
+
+import json
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+HEADER = struct.Struct("<IIBB")
+HEADER_SIZE = HEADER.size
+
+FRAME_REQUEST = 1
+FRAME_RESPONSE = 2
+
+# Giới hạn payload để một client lỗi không làm service cấp phát bộ nhớ vô hạn
+MAX_PAYLOAD_SIZE = 16 * 1024 * 1024
+
+
+class FrameError(Exception):
+    """Frame không hợp lệ."""
+    pass
+
+
+def pack_header(payload_length: int, request_id: int, kind: int, flags: int = 0) -> bytes:
+    """
+    Đóng gói header frame.
+
+    Args:
+        payload_length: Độ dài payload
+        request_id: ID request
+        kind: Loại frame
+        flags: Cờ (dự phòng)
+
+    Returns:
+        bytes: Header 10 byte
+    """
+    return HEADER.pack(payload_length, request_id, kind, flags)
+
+
+def unpack_header(data: bytes) -> Tuple[int, int, int, int]:
+    """
+    Giải mã header frame.
+
+    Args:
+        data: 10 byte header
+
+    Returns:
+        Tuple[int, int, int, int]: (payload_length, request_id, kind, flags)
+
+    Raises:
+        FrameError: Payload vượt giới hạn
+    """
+    length, request_id, kind, flags = HEADER.unpack(data)
+    if length > MAX_PAYLOAD_SIZE:
+        raise FrameError(f"Payload quá lớn: {length} bytes")
+    return length, request_id, kind, flags
+
+
+def encode_request(command: str, args: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Tạo payload của request.
+
+    Args:
+        command: Tên lệnh (tối đa 255 byte UTF-8)
+        args: Tham số lệnh
+
+    Returns:
+        bytes: Payload
+    """
+    name = command.encode("utf-8")
+    if len(name) > 255:
+        raise FrameError("Tên lệnh quá dài")
+    body = json.dumps(args, ensure_ascii=False).encode("utf-8") if args else b""
+    return bytes((len(name),)) + name + body
+
+
+def decode_request(payload: bytes) -> Tuple[str, Dict[str, Any]]:
+    """
+    Giải mã payload của request.
+
+    Args:
+        payload: Payload đã nhận
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: (tên lệnh, tham số)
+
+    Raises:
+        FrameError: Payload không hợp lệ
+    """
+    if not payload:
+        raise FrameError("Payload rỗng")
+    name_length = payload[0]
+    if len(payload) < 1 + name_length:
+        raise FrameError("Payload bị cắt cụt")
+    try:
+        command = payload[1:1 + name_length].decode("utf-8")
+        body = payload[1 + name_length:]
+        args = json.loads(body) if body else {}
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise FrameError(f"Payload không hợp lệ: {e}") from e
+    if not isinstance(args, dict):
+        raise FrameError("Tham số lệnh phải là JSON object")
+    return command, args
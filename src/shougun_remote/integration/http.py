@@ -0,0 +1,210 @@
+"""
+HTTP/1.1 tối giản trên asyncio streams.
+
+Chỉ hỗ trợ những gì API nội bộ cần: keep-alive, pipelining (request được đọc tuần tự từ
+cùng một stream nên các request gửi liên tiếp được xử lý và trả lời theo đúng thứ tự),
+body theo Content-Length và response dạng chunked để stream dữ liệu lớn.
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Giới hạn kích thước để client lỗi không làm tràn bộ nhớ service
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+_REASONS: Dict[int, str] = {
+    200: "OK",
+    201: "Created",
+    202: "Accepted",
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+
+class HttpError(Exception):
+    """Lỗi cần trả về cho client với status code tương ứng."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class HttpRequest:
+    """
+    Request HTTP đã parse.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ chứa dữ liệu request
+    """
+    method: str
+    path: str
+    version: str
+    headers: Dict[str, str]
+    query: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    @property
+    def keep_alive(self) -> bool:
+        """Client có muốn giữ kết nối sau request này không."""
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> Any:
+        """Parse body dạng JSON."""
+        if not self.body:
+            return {}
+        try:
+            return json.loads(self.body)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise HttpError(400, f"Invalid JSON body: {e}") from e
+
+
+@dataclass
+class HttpResponse:
+    """
+    Response HTTP.
+
+    Nếu `stream` khác None, body được gửi dạng chunked từ async iterator thay vì `body`.
+    """
+    status: int = 200
+    body: bytes = b""
+    content_type: str = JSON_CONTENT_TYPE
+    stream: Optional[AsyncIterator[bytes]] = None
+
+
+def json_response(payload: Any, status: int = 200) -> HttpResponse:
+    """Tạo response JSON."""
+    return HttpResponse(status=status, body=json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+
+def error_response(status: int, message: str) -> HttpResponse:
+    """Tạo response lỗi dạng {"success": false, "message": ...}."""
+    return json_response({"success": False, "message": message}, status)
+
+
+async def read_request(reader: asyncio.StreamReader, idle_timeout: float) -> Optional[HttpRequest]:
+    """
+    Đọc một request từ stream.
+
+    Args:
+        reader: Stream của kết nối
+        idle_timeout: Thời gian chờ tối đa cho request tiếp theo trên kết nối keep-alive
+
+    Returns:
+        Optional[HttpRequest]: Request, hoặc None nếu client đóng kết nối/hết thời gian chờ
+
+    Raises:
+        HttpError: Request không hợp lệ
+    """
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=idle_timeout)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError as e:
+        raise HttpError(431, "Request headers too large") from e
+
+    request_line, headers = _parse_head(head)
+    method, target, version = request_line
+    split = urlsplit(target)
+    query = {k: v[-1] for k, v in parse_qs(split.query).items()}
+    request = HttpRequest(method=method, path=unquote(split.path), version=version, headers=headers, query=query)
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HttpError(411, "Chunked request bodies are not supported")
+
+    length_header = headers.get("content-length")
+    if length_header:
+        try:
+            length = int(length_header)
+        except ValueError as e:
+            raise HttpError(400, "Invalid Content-Length") from e
+        if length < 0:
+            raise HttpError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "Request body too large")
+        try:
+            request.body = await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            return None
+
+    return request
+
+
+def _parse_head(head: bytes) -> Tuple[Tuple[str, str, str], Dict[str, str]]:
+    """Parse request line và headers."""
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split(" ")
+    if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+        raise HttpError(400, "Malformed request line")
+
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise HttpError(400, "Malformed header")
+        headers[name.strip().lower()] = value.strip()
+
+    return (parts[0].upper(), parts[1], parts[2]), headers
+
+
+def _head_bytes(status: int, headers: Dict[str, str]) -> bytes:
+    """Tạo status line và headers."""
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def write_response(writer: asyncio.StreamWriter, response: HttpResponse, keep_alive: bool) -> None:
+    """
+    Ghi response ra stream.
+
+    Args:
+        writer: Stream của kết nối
+        response: Response cần ghi
+        keep_alive: Giữ kết nối sau response này không
+    """
+    headers = {
+        "Content-Type": response.content_type,
+        "Connection": "keep-alive" if keep_alive else "close",
+    }
+
+    if response.status == 204:
+        writer.write(_head_bytes(response.status, headers))
+        await writer.drain()
+        return
+
+    if response.stream is None:
+        headers["Content-Length"] = str(len(response.body))
+        # Gộp headers và body thành một lần ghi
+        writer.writelines([_head_bytes(response.status, headers), response.body])
+        await writer.drain()
+        return
+
+    headers["Transfer-Encoding"] = "chunked"
+    writer.write(_head_bytes(response.status, headers))
+    async for chunk in response.stream:
+        if chunk:
+            writer.writelines([b"%X\r\n" % len(chunk), chunk, b"\r\n"])
+            # drain() chỉ chờ khi buffer vượt high-water mark - backpressure với client đọc chậm
+            await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
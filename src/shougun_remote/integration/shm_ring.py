@@ -0,0 +1,401 @@
+"""
+Ring buffer trên shared memory (SPSC) để đẩy luồng sự kiện trạng thái sang host C#.
+
+Bố cục vùng nhớ (little-endian, khớp MemoryMappedFile/BinaryReader của .NET):
+
+    offset  size  field
+    0       4     magic            = 0x42525348 ("HSRB")
+    4       2     version          = 1
+    6       2     record_size      = 64
+    8       4     capacity         (số record, lũy thừa của 2)
+    64      8     write_seq        (chỉ producer ghi - cache line riêng)
+    128     8     read_seq         (chỉ consumer ghi - cache line riêng)
+    136     4     consumer_waiting (consumer đặt 1 trước khi ngủ)
+    140     2     doorbell_port    (cổng UDP loopback consumer lắng nghe, 0 = chỉ polling)
+    192     ...   capacity * 64 byte record
+
+Record 64 byte: sequence u64, timestamp_ns i64, status_code u16, kind u8, reserved u8,
+device_id 20 byte, task_id 24 byte (UTF-8, đệm NUL).
+
+Producer ghi record trước rồi mới tăng write_seq; consumer đọc write_seq trước rồi mới đọc record.
+Khi ring đầy, producer bỏ record (không bao giờ chặn service) và đếm số record bị bỏ.
+Đánh thức: consumer đặt consumer_waiting rồi kiểm tra lại write_seq trước khi chờ datagram
+"doorbell"; producer gửi doorbell khi thấy cờ này. Consumer luôn chờ có timeout nên trường hợp
+hai bên lỡ nhịp nhau chỉ làm chậm một chu kỳ chờ chứ không treo.
+"""
+
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+from ..metrics import MetricsRegistry, get_default_registry
+from ..models import TaskStatus
+
+MAGIC = 0x42525348
+VERSION = 1
+
+_PREAMBLE = struct.Struct("<IHHI")
+_U64 = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
+_U16 = struct.Struct("<H")
+_RECORD = struct.Struct("<QqHBB20s24s")
+
+RECORD_SIZE = _RECORD.size
+HEADER_SIZE = 192
+_WRITE_SEQ_OFFSET = 64
+_READ_SEQ_OFFSET = 128
+_WAITING_OFFSET = 136
+_DOORBELL_OFFSET = 140
+
+DEVICE_ID_SIZE = 20
+TASK_ID_SIZE = 24
+
+
+class RecordKind(IntEnum):
+    """Loại sự kiện trong record."""
+    DEVICE = 1
+    TASK = 2
+
+
+class StatusCode(IntEnum):
+    """Mã trạng thái (giá trị cố định - host C# dùng cùng bảng mã)."""
+    DEVICE_UNKNOWN = 0
+    DEVICE_CONNECTED = 1
+    DEVICE_DISCONNECTED = 2
+    TASK_PENDING = 16
+    TASK_RUNNING = 17
+    TASK_COMPLETED = 18
+    TASK_FAILED = 19
+    TASK_CANCELLED = 20
+
+
+DEVICE_STATUS_CODES: Dict[str, StatusCode] = {
+    "connected": StatusCode.DEVICE_CONNECTED,
+    "disconnected": StatusCode.DEVICE_DISCONNECTED,
+}
+
+TASK_STATUS_CODES: Dict[TaskStatus, StatusCode] = {
+    TaskStatus.PENDING: StatusCode.TASK_PENDING,
+    TaskStatus.RUNNING: StatusCode.TASK_RUNNING,
+    TaskStatus.COMPLETED: StatusCode.TASK_COMPLETED,
+    TaskStatus.FAILED: StatusCode.TASK_FAILED,
+    TaskStatus.CANCELLED: StatusCode.TASK_CANCELLED,
+}
+
+
+@dataclass(frozen=True)
+class StatusRecord:
+    """Một record đã đọc từ ring."""
+    sequence: int
+    timestamp_ns: int
+    kind: int
+    status_code: int
+    device_id: str
+    task_id: str
+
+
+def segment_size(capacity: int) -> int:
+    """
+    Kích thước vùng shared memory cho capacity record.
+
+    Args:
+        capacity: Số record
+
+    Returns:
+        int: Số byte
+    """
+    return HEADER_SIZE + capacity * RECORD_SIZE
+
+
+def _open_segment(name: str) -> shared_memory.SharedMemory:
+    """Mở segment có sẵn mà không đăng ký với resource tracker (segment thuộc producer)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 không có tham số track
+        return shared_memory.SharedMemory(name=name)
+
+
+def _encode_id(value: str, size: int) -> bytes:
+    """Cắt ID về tối đa size byte UTF-8 (struct tự đệm NUL)."""
+    return value.encode("utf-8")[:size]
+
+
+class ShmRingProducer:
+    """
+    Phía ghi của ring (trong service).
+
+    Ring là SPSC giữa hai process; trong service nhiều thread có thể publish nên việc ghi
+    được tuần tự hóa bằng lock cục bộ.
+    """
+
+    def __init__(self, name: str, capacity: int = 4096, metrics: Optional[MetricsRegistry] = None):
+        """
+        Tạo segment shared memory.
+
+        Args:
+            name: Tên segment (host C# mở bằng cùng tên)
+            capacity: Số record, làm tròn lên lũy thừa của 2
+            metrics: Registry metrics (mặc định dùng registry toàn cục)
+        """
+        capacity = 1 << max(capacity - 1, 1).bit_length()
+        self._capacity = capacity
+        self._mask = capacity - 1
+        self._name = name
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=segment_size(capacity))
+        except FileExistsError:
+            # Segment sót lại từ lần chạy trước bị crash
+            stale = _open_segment(name)
+            stale.close()
+            stale.unlink()
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=segment_size(capacity))
+
+        self._buf = self._shm.buf
+        self._buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        _PREAMBLE.pack_into(self._buf, 0, MAGIC, VERSION, RECORD_SIZE, capacity)
+
+        self._lock = threading.Lock()
+        self._write_seq = 0
+        self._doorbell: Optional[socket.socket] = None
+
+        metrics = metrics or get_default_registry()
+        self._published = metrics.counter("shougun_shm_ring_published_total", "Số record đã ghi vào ring")
+        self._dropped = metrics.counter("shougun_shm_ring_dropped_total", "Số record bị bỏ do ring đầy")
+        self._wakeups = metrics.counter("shougun_shm_ring_wakeups_total", "Số lần gửi doorbell đánh thức consumer")
+
+    @property
+    def name(self) -> str:
+        """Tên segment."""
+        return self._name
+
+    @property
+    def capacity(self) -> int:
+        """Số record tối đa trong ring."""
+        return self._capacity
+
+    def publish(
+        self,
+        kind: RecordKind,
+        status_code: int,
+        device_id: str = "",
+        task_id: str = "",
+        timestamp_ns: Optional[int] = None,
+    ) -> bool:
+        """
+        Ghi một record.
+
+        Args:
+            kind: Loại sự kiện
+            status_code: Mã trạng thái
+            device_id: ID thiết bị (tối đa 20 byte)
+            task_id: ID task (tối đa 24 byte)
+            timestamp_ns: Thời điểm (mặc định time.time_ns())
+
+        Returns:
+            bool: False nếu ring đầy hoặc đã đóng
+        """
+        timestamp_ns = time.time_ns() if timestamp_ns is None else timestamp_ns
+        device = _encode_id(device_id, DEVICE_ID_SIZE)
+        task = _encode_id(task_id, TASK_ID_SIZE)
+
+        with self._lock:
+            buf = self._buf
+            if buf is None:
+                return False
+            seq = self._write_seq
+            read_seq = _U64.unpack_from(buf, _READ_SEQ_OFFSET)[0]
+            if seq - read_seq >= self._capacity:
+                self._dropped.inc()
+                return False
+
+            offset = HEADER_SIZE + (seq & self._mask) * RECORD_SIZE
+            _RECORD.pack_into(buf, offset, seq, timestamp_ns, int(status_code), int(kind), 0, device, task)
+            # Công bố record sau khi đã ghi xong nội dung
+            self._write_seq = seq + 1
+            _U64.pack_into(buf, _WRITE_SEQ_OFFSET, seq + 1)
+
+            if _U32.unpack_from(buf, _WAITING_OFFSET)[0]:
+                self._ring_doorbell(_U16.unpack_from(buf, _DOORBELL_OFFSET)[0])
+
+        self._published.inc()
+        return True
+
+    def publish_task(self, task_id: str, status: TaskStatus) -> bool:
+        """
+        Ghi sự kiện chuyển trạng thái task.
+
+        Args:
+            task_id: ID task
+            status: Trạng thái mới
+
+        Returns:
+            bool: False nếu ring đầy
+        """
+        return self.publish(RecordKind.TASK, TASK_STATUS_CODES[status], task_id=task_id)
+
+    def publish_device(self, device_id: str, status: str) -> bool:
+        """
+        Ghi sự kiện trạng thái thiết bị từ folder monitor.
+
+        Args:
+            device_id: ID thiết bị
+            status: Trạng thái trong file JSON ("connected"/"disconnected"/...)
+
+        Returns:
+            bool: False nếu ring đầy
+        """
+        code = DEVICE_STATUS_CODES.get(status, StatusCode.DEVICE_UNKNOWN)
+        return self.publish(RecordKind.DEVICE, code, device_id=device_id)
+
+    def pending(self) -> int:
+        """Số record consumer chưa đọc."""
+        buf = self._buf
+        if buf is None:
+            return 0
+        return self._write_seq - _U64.unpack_from(buf, _READ_SEQ_OFFSET)[0]
+
+    def close(self) -> None:
+        """Đóng và xóa segment."""
+        with self._lock:
+            if self._buf is None:
+                return
+            self._buf.release()
+            self._buf = None
+            if self._doorbell is not None:
+                self._doorbell.close()
+                self._doorbell = None
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _ring_doorbell(self, port: int) -> None:
+        """Gửi một datagram đánh thức consumer."""
+        if not port:
+            return
+        try:
+            if self._doorbell is None:
+                self._doorbell = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self._doorbell.setblocking(False)
+            self._doorbell.sendto(b"\x01", ("127.0.0.1", port))
+            self._wakeups.inc()
+        except OSError:
+            # Consumer đã đi hoặc buffer socket đầy - consumer vẫn tự thức dậy theo timeout
+            pass
+
+
+class ShmRingConsumer:
+    """
+    Phía đọc của ring - tham chiếu cho host C# và dùng trong test.
+    """
+
+    def __init__(self, name: str, doorbell: bool = True):
+        """
+        Mở segment do producer tạo.
+
+        Args:
+            name: Tên segment
+            doorbell: Lắng nghe doorbell UDP (False = chỉ polling)
+
+        Raises:
+            ValueError: Segment không đúng định dạng
+        """
+        self._shm = _open_segment(name)
+        self._buf = self._shm.buf
+        magic, version, record_size, capacity = _PREAMBLE.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            self._buf.release()
+            self._shm.close()
+            raise ValueError(f"Segment {name} không phải ring hợp lệ")
+        self._mask = capacity - 1
+        self._read_seq = _U64.unpack_from(self._buf, _READ_SEQ_OFFSET)[0]
+
+        self._sock: Optional[socket.socket] = None
+        if doorbell:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.bind(("127.0.0.1", 0))
+            _U16.pack_into(self._buf, _DOORBELL_OFFSET, self._sock.getsockname()[1])
+
+    def poll(self, max_records: int = 1024) -> List[StatusRecord]:
+        """
+        Đọc các record mới (không chờ).
+
+        Args:
+            max_records: Số record tối đa mỗi lần đọc
+
+        Returns:
+            List[StatusRecord]: Record theo đúng thứ tự ghi
+        """
+        buf = self._buf
+        available = _U64.unpack_from(buf, _WRITE_SEQ_OFFSET)[0] - self._read_seq
+        count = min(available, max_records)
+        records: List[StatusRecord] = []
+        for seq in range(self._read_seq, self._read_seq + count):
+            offset = HEADER_SIZE + (seq & self._mask) * RECORD_SIZE
+            sequence, timestamp_ns, status_code, kind, _, device, task = _RECORD.unpack_from(buf, offset)
+            records.append(StatusRecord(
+                sequence=sequence,
+                timestamp_ns=timestamp_ns,
+                kind=kind,
+                status_code=status_code,
+                device_id=device.rstrip(b"\0").decode("utf-8", "replace"),
+                task_id=task.rstrip(b"\0").decode("utf-8", "replace"),
+            ))
+        if count:
+            # Trả slot cho producer sau khi đã đọc xong
+            self._read_seq += count
+            _U64.pack_into(buf, _READ_SEQ_OFFSET, self._read_seq)
+        return records
+
+    def wait(self, timeout: float = 0.05) -> bool:
+        """
+        Chờ đến khi có record mới.
+
+        Args:
+            timeout: Thời gian chờ tối đa
+
+        Returns:
+            bool: True nếu có record để đọc
+        """
+        buf = self._buf
+        if _U64.unpack_from(buf, _WRITE_SEQ_OFFSET)[0] != self._read_seq:
+            return True
+        if self._sock is None:
+            time.sleep(timeout)
+            return _U64.unpack_from(buf, _WRITE_SEQ_OFFSET)[0] != self._read_seq
+
+        _U32.pack_into(buf, _WAITING_OFFSET, 1)
+        try:
+            # Kiểm tra lại sau khi đặt cờ để không lỡ record ghi ngay trước đó
+            if _U64.unpack_from(buf, _WRITE_SEQ_OFFSET)[0] != self._read_seq:
+                return True
+            self._sock.settimeout(timeout)
+            try:
+                self._sock.recv(64)
+                # Gom các doorbell dồn lại
+                self._sock.setblocking(False)
+                while True:
+                    self._sock.recv(64)
+            except (BlockingIOError, socket.timeout):
+                pass
+        finally:
+            _U32.pack_into(buf, _WAITING_OFFSET, 0)
+        return _U64.unpack_from(buf, _WRITE_SEQ_OFFSET)[0] != self._read_seq
+
+    def close(self) -> None:
+        """Đóng kết nối tới segment (không xóa segment)."""
+        if self._sock is not None:
+            _U16.pack_into(self._buf, _DOORBELL_OFFSET, 0)
+            self._sock.close()
+            self._sock = None
+        if self._buf is not None:
+            self._buf.release()
+            self._buf = None
+            self._shm.close()
@@ -0,0 +1,16 @@
+"""
+Module metrics trong process: counter, gauge, histogram và exporter Prometheus.
+"""
+
+from .instruments import Counter, Gauge, Histogram
+from .registry import MetricsRegistry, get_default_registry
+from .prometheus import render_prometheus
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "get_default_registry",
+    "render_prometheus",
+]
@@ -0,0 +1,358 @@
+"""
+Các loại metric: Counter, Gauge, Histogram.
+
+Counter và Histogram được chia shard theo thread: mỗi thread chỉ ghi vào ô của chính nó
+nên đường ghi (hot path) không cần lock; chỉ khi đọc mới cộng dồn các shard. Khi thread kết
+thúc, ô của nó được gộp vào ô chung rồi giải phóng (thread pool tạo/hủy thread liên tục không
+làm số ô tăng mãi).
+"""
+
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+# Cặp (tên label, giá trị) đã sắp xếp - dùng làm một phần key của metric
+LabelPairs = Tuple[Tuple[str, str], ...]
+
+_CellT = TypeVar("_CellT")
+
+
+class _CellOwner:
+    """Giữ ô của một thread trong threading.local - bị thu hồi khi thread kết thúc."""
+
+    __slots__ = ("cell", "__weakref__")
+
+    def __init__(self, cell: Any):
+        self.cell = cell
+
+
+class _ThreadCells(Generic[_CellT]):
+    """
+    Ô riêng của từng thread cho một metric.
+
+    threading.local giải phóng dữ liệu của thread khi thread kết thúc; finalizer trên _CellOwner
+    lúc đó gộp ô vào ô chung (retired) và bỏ ô khỏi danh sách.
+    """
+
+    def __init__(self, factory: Callable[[], _CellT], fold: Callable[[_CellT, _CellT], None]):
+        """
+        Args:
+            factory: Tạo ô rỗng
+            fold: Gộp ô thứ hai vào ô thứ nhất
+        """
+        self._factory = factory
+        self._fold = fold
+        self._retired = factory()
+        # Theo id(ô): so sánh bằng == có thể nhầm hai ô cùng giá trị
+        self._cells: Dict[int, _CellT] = {}
+        self._local = threading.local()
+        # RLock: finalizer có thể chạy trên thread đang đọc (khi local của thread khác được thu hồi)
+        self._lock = threading.RLock()
+
+    def get(self) -> _CellT:
+        """Lấy (hoặc tạo) ô của thread hiện tại."""
+        owner = getattr(self._local, "owner", None)
+        if owner is None:
+            cell = self._factory()
+            with self._lock:
+                self._cells[id(cell)] = cell
+            owner = _CellOwner(cell)
+            # Không cần gộp khi interpreter thoát
+            weakref.finalize(owner, self._retire, cell).atexit = False
+            self._local.owner = owner
+        return owner.cell
+
+    def read(self, reducer: Callable[[List[_CellT]], Any]) -> Any:
+        """Áp dụng reducer lên ô chung và ô của các thread còn sống (giữ lock để không đếm trùng)."""
+        with self._lock:
+            return reducer([self._retired, *self._cells.values()])
+
+    def count(self) -> int:
+        """Số ô của thread còn sống."""
+        with self._lock:
+            return len(self._cells)
+
+    def _retire(self, cell: _CellT) -> None:
+        """Gộp ô của thread đã kết thúc vào ô chung."""
+        with self._lock:
+            self._fold(self._retired, cell)
+            del self._cells[id(cell)]
+
+
+class _Metric:
+    """Phần chung của mọi metric: tên, mô tả, label."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: LabelPairs):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+
+
+class Counter(_Metric):
+    """
+    Bộ đếm chỉ tăng.
+
+    Mỗi thread giữ một ô [giá trị] riêng; inc() chỉ cộng vào ô của thread hiện tại
+    nên không bị mất cập nhật dù không có lock.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str = "", labels: LabelPairs = ()):
+        super().__init__(name, help_text, labels)
+        self._cells: _ThreadCells[List[float]] = _ThreadCells(lambda: [0.0], _fold_counter)
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Tăng bộ đếm.
+
+        Args:
+            amount: Giá trị cộng thêm (không âm)
+        """
+        if amount < 0:
+            raise ValueError("Counter chỉ được tăng")
+        self._cells.get()[0] += amount
+
+    def value(self) -> float:
+        """Tổng giá trị của mọi shard."""
+        return self._cells.read(lambda cells: sum(cell[0] for cell in cells))
+
+
+def _fold_counter(target: List[float], cell: List[float]) -> None:
+    target[0] += cell[0]
+
+
+class Gauge(_Metric):
+    """
+    Giá trị tức thời có thể tăng/giảm, hoặc tính từ hàm callback khi đọc.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str = "", labels: LabelPairs = ()):
+        super().__init__(name, help_text, labels)
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        """Đặt giá trị."""
+        self._value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Tăng giá trị."""
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Giảm giá trị."""
+        with self._lock:
+            self._value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """
+        Lấy giá trị từ callback mỗi khi đọc (ví dụ: số đo của MetricsSampler).
+
+        Args:
+            function: Hàm trả về giá trị hiện tại
+        """
+        self._function = function
+
+    def value(self) -> float:
+        """Giá trị hiện tại."""
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception:
+                return float("nan")
+        return self._value
+
+
+# Độ chính xác HDR: 2^5 = 32 sub-bucket cho mỗi lũy thừa của 2 (sai số tương đối < ~3%)
+_SUB_BUCKET_BITS = 5
+_SUB_BUCKET_COUNT = 1 << _SUB_BUCKET_BITS
+_LINEAR_LIMIT = _SUB_BUCKET_COUNT * 2
+
+
+def _bucket_index(value: int) -> int:
+    """
+    Vị trí bucket log-tuyến tính (kiểu HDR histogram) của một giá trị nguyên không âm.
+
+    Giá trị nhỏ hơn 64 có bucket riêng; từ 64 trở lên mỗi khoảng [2^k, 2^(k+1))
+    được chia đều thành 32 bucket.
+    """
+    if value < _LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - (_SUB_BUCKET_BITS + 1)
+    return shift * _SUB_BUCKET_COUNT + (value >> shift)
+
+
+def _bucket_lower(index: int) -> int:
+    """Giá trị nguyên nhỏ nhất thuộc bucket."""
+    if index < _LINEAR_LIMIT:
+        return index
+    shift = index // _SUB_BUCKET_COUNT - 1
+    return (index - shift * _SUB_BUCKET_COUNT) << shift
+
+
+def _bucket_upper(index: int) -> int:
+    """Giá trị nguyên lớn nhất thuộc bucket."""
+    if index < _LINEAR_LIMIT:
+        return index
+    shift = index // _SUB_BUCKET_COUNT - 1
+    mantissa = index - shift * _SUB_BUCKET_COUNT
+    return ((mantissa + 1) << shift) - 1
+
+
+class _HistogramShard:
+    """Dữ liệu histogram của một thread."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def fold(self, other: "_HistogramShard") -> None:
+        """Gộp shard khác vào shard này."""
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+
+class Histogram(_Metric):
+    """
+    Histogram kiểu HDR: bucket log-tuyến tính, bộ nhớ nhỏ, percentile sai số tương đối cố định.
+
+    Giá trị được nhân với `scale` rồi làm tròn thành số nguyên trước khi xếp bucket
+    (mặc định 1e6: đo giây với độ phân giải micro giây).
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str = "", labels: LabelPairs = (), scale: float = 1e6):
+        super().__init__(name, help_text, labels)
+        self.scale = scale
+        self._shards: _ThreadCells[_HistogramShard] = _ThreadCells(_HistogramShard, _HistogramShard.fold)
+
+    def observe(self, value: float) -> None:
+        """
+        Ghi nhận một giá trị.
+
+        Args:
+            value: Giá trị (không âm) theo đơn vị gốc, ví dụ giây
+        """
+        if value < 0:
+            value = 0.0
+        index = _bucket_index(int(value * self.scale))
+        shard = self._shards.get()
+        shard.counts[index] = shard.counts.get(index, 0) + 1
+        shard.count += 1
+        shard.total += value
+        if value > shard.max:
+            shard.max = value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Đo thời gian chạy của khối lệnh (giây)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _merged(self) -> Tuple[Dict[int, int], int, float, float]:
+        """Gộp dữ liệu của mọi shard."""
+        return self._shards.read(self._merge_shards)
+
+    @staticmethod
+    def _merge_shards(shards: List[_HistogramShard]) -> Tuple[Dict[int, int], int, float, float]:
+        counts: Dict[int, int] = {}
+        count = 0
+        total = 0.0
+        maximum = 0.0
+        for shard in shards:
+            # dict.copy() là nguyên tử dưới GIL - thread sở hữu có thể đang thêm bucket
+            for index, n in shard.counts.copy().items():
+                counts[index] = counts.get(index, 0) + n
+            count += shard.count
+            total += shard.total
+            maximum = max(maximum, shard.max)
+        return counts, count, total, maximum
+
+    def count(self) -> int:
+        """Số giá trị đã ghi nhận."""
+        return self._merged()[1]
+
+    def percentiles(self, quantiles: Tuple[float, ...] = (0.5, 0.9, 0.99)) -> Dict[float, float]:
+        """
+        Tính các percentile.
+
+        Args:
+            quantiles: Các phân vị trong khoảng [0, 1]
+
+        Returns:
+            Dict[float, float]: Phân vị -> giá trị (đơn vị gốc, cận trên của bucket)
+        """
+        counts, count, _, maximum = self._merged()
+        result = {q: 0.0 for q in quantiles}
+        if count == 0:
+            return result
+
+        ordered = sorted(counts.items())
+        for q in quantiles:
+            target = max(1, int(q * count + 0.5))
+            seen = 0
+            for index, n in ordered:
+                seen += n
+                if seen >= target:
+                    result[q] = min(_bucket_upper(index) / self.scale, maximum)
+                    break
+        return result
+
+    def cumulative_counts(self, bounds: Tuple[float, ...]) -> List[int]:
+        """
+        Số giá trị <= mỗi cận (dùng cho bucket `le` của Prometheus).
+
+        Bucket chứa cận được tính vào cận đó (so theo cận dưới của bucket): giá trị đúng bằng cận
+        luôn được đếm, giá trị lớn hơn cận nhưng cùng bucket có thể bị đếm thừa (sai số < ~3%).
+
+        Args:
+            bounds: Các cận tăng dần theo đơn vị gốc
+
+        Returns:
+            List[int]: Số đếm tích lũy tương ứng từng cận
+        """
+        counts, _, _, _ = self._merged()
+        ordered = sorted(counts.items())
+        result = []
+        position = 0
+        seen = 0
+        for bound in bounds:
+            limit = bound * self.scale
+            while position < len(ordered) and _bucket_lower(ordered[position][0]) <= limit:
+                seen += ordered[position][1]
+                position += 1
+            result.append(seen)
+        return result
+
+    def summary(self) -> Dict[str, float]:
+        """Tóm tắt: count, sum, max, p50, p90, p99."""
+        _, count, total, maximum = self._merged()
+        p = self.percentiles()
+        return {
+            "count": count,
+            "sum": total,
+            "max": maximum,
+            "p50": p[0.5],
+            "p90": p[0.9],
+            "p99": p[0.99],
+        }
@@ -0,0 +1,78 @@
+"""
+Xuất metrics theo định dạng text của Prometheus (exposition format 0.0.4).
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+from .instruments import Histogram, LabelPairs
+from .registry import MetricsRegistry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Cận bucket `le` (giây) dùng khi xuất histogram độ trễ
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value: str) -> str:
+    """Escape giá trị label theo chuẩn Prometheus."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: LabelPairs, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    """Định dạng {k="v",...}."""
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Định dạng số theo Prometheus (NaN, +Inf)."""
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(registry: MetricsRegistry, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> str:
+    """
+    Xuất toàn bộ registry thành text Prometheus.
+
+    Args:
+        registry: Registry cần xuất
+        buckets: Cận `le` cho histogram
+
+    Returns:
+        str: Nội dung exposition
+    """
+    lines: List[str] = []
+    described: Dict[str, bool] = {}
+
+    for metric in registry.collect():
+        # HELP/TYPE chỉ in một lần cho mỗi tên (các label khác nhau dùng chung)
+        if metric.name not in described:
+            described[metric.name] = True
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+        if isinstance(metric, Histogram):
+            cumulative = metric.cumulative_counts(buckets)
+            summary = metric.summary()
+            for bound, count in zip(buckets, cumulative):
+                lines.append(
+                    f"{metric.name}_bucket{_format_labels(metric.labels, (('le', _format_value(bound)),))} {count}"
+                )
+            lines.append(f"{metric.name}_bucket{_format_labels(metric.labels, (('le', '+Inf'),))} {summary['count']}")
+            lines.append(f"{metric.name}_sum{_format_labels(metric.labels)} {_format_value(summary['sum'])}")
+            lines.append(f"{metric.name}_count{_format_labels(metric.labels)} {summary['count']}")
+        else:
+            lines.append(f"{metric.name}{_format_labels(metric.labels)} {_format_value(metric.value())}")
+
+    return "\n".join(lines) + "\n"
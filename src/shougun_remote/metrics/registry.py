@@ -0,0 +1,94 @@
+"""
+Metrics registry - Quản lý tập hợp các metric của process.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+
+from .instruments import Counter, Gauge, Histogram, LabelPairs, _Metric
+
+M = TypeVar('M', bound=_Metric)
+
+
+def _label_pairs(labels: Optional[Dict[str, Any]]) -> LabelPairs:
+    """Chuẩn hóa label thành tuple đã sắp xếp để dùng làm key."""
+    if not labels:
+        return ()
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+class MetricsRegistry:
+    """
+    Registry chứa counter, gauge và histogram.
+
+    Các hàm counter()/gauge()/histogram() trả về metric đã có nếu trùng tên và label,
+    nên component có thể gọi lại nhiều lần mà không tạo trùng. Nên giữ tham chiếu
+    metric trong component thay vì tra cứu mỗi lần ghi.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ đăng ký và liệt kê metric, việc xuất ra định dạng khác do exporter đảm nhận
+    """
+
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, LabelPairs], _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, metric_type: Type[M], name: str, help_text: str,
+                       labels: Optional[Dict[str, Any]], **kwargs: Any) -> M:
+        """Lấy metric đã đăng ký hoặc tạo mới."""
+        key = (name, _label_pairs(labels))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = metric_type(name, help_text, key[1], **kwargs)
+                    self._metrics[key] = metric
+        if not isinstance(metric, metric_type):
+            raise ValueError(f"Metric {name} đã được đăng ký với kiểu {metric.kind}")
+        return metric
+
+    def counter(self, name: str, help_text: str = "", labels: Optional[Dict[str, Any]] = None) -> Counter:
+        """Lấy hoặc tạo Counter."""
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str = "", labels: Optional[Dict[str, Any]] = None) -> Gauge:
+        """Lấy hoặc tạo Gauge."""
+        return self._get_or_create(Gauge, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str = "", labels: Optional[Dict[str, Any]] = None,
+                  scale: float = 1e6) -> Histogram:
+        """Lấy hoặc tạo Histogram."""
+        return self._get_or_create(Histogram, name, help_text, labels, scale=scale)
+
+    def collect(self) -> List[_Metric]:
+        """Danh sách metric, sắp xếp theo tên rồi label."""
+        with self._lock:
+            items = sorted(self._metrics.items(), key=lambda item: item[0])
+        return [metric for _, metric in items]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Giá trị hiện tại của mọi metric dưới dạng dictionary (dùng cho get_info).
+
+        Returns:
+            Dict[str, Any]: "tên{label=...}" -> giá trị hoặc tóm tắt histogram
+        """
+        result: Dict[str, Any] = {}
+        for metric in self.collect():
+            key = metric.name
+            if metric.labels:
+                key += "{" + ",".join(f"{k}={v}" for k, v in metric.labels) + "}"
+            if isinstance(metric, Histogram):
+                result[key] = metric.summary()
+            else:
+                result[key] = metric.value()
+        return result
+
+
+_default_registry = MetricsRegistry()
+
+
+def get_default_registry() -> MetricsRegistry:
+    """Registry mặc định của process, dùng khi component không được truyền registry riêng."""
+    return _default_registry
@@ -0,0 +1,84 @@
+"""
+Đo thời gian khởi động theo từng thành phần (import và khởi tạo).
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List
+
+
+@dataclass(frozen=True)
+class StartupSection:
+    """Một bước khởi động đã đo."""
+    name: str
+    seconds: float
+    modules_loaded: int
+
+
+class StartupProfiler:
+    """
+    Ghi lại thời gian của từng bước khởi động.
+
+    Mỗi bước cũng ghi số module mới được nạp vào sys.modules, giúp thấy bước nào kéo theo
+    dependency nặng (watchdog, psutil, asyncio...).
+    """
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._sections: List[StartupSection] = []
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        """
+        Đo một bước khởi động.
+
+        Args:
+            name: Tên bước (ví dụ "import services.factory")
+        """
+        modules_before = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._sections.append(StartupSection(
+                name, time.perf_counter() - start, len(sys.modules) - modules_before))
+
+    def add_phases(self, prefix: str, timings: Dict[str, float]) -> None:
+        """
+        Thêm các pha đã được thành phần khác tự đo (ví dụ ShougunService.get_startup_timings()).
+
+        Args:
+            prefix: Tiền tố tên pha
+            timings: Tên pha -> số giây
+        """
+        for name, seconds in timings.items():
+            self._sections.append(StartupSection(f"{prefix}.{name}", seconds, 0))
+
+    def get_sections(self) -> List[StartupSection]:
+        """Danh sách bước theo thứ tự ghi nhận."""
+        return list(self._sections)
+
+    def elapsed(self) -> float:
+        """Số giây kể từ khi tạo profiler."""
+        return time.perf_counter() - self._origin
+
+    def format_report(self) -> str:
+        """
+        Tạo bảng báo cáo dạng text.
+
+        Returns:
+            str: Báo cáo
+        """
+        width = max([len(section.name) for section in self._sections] + [len("Component")])
+        lines = [
+            f"{'Component':<{width}}  {'ms':>9}  {'modules':>7}",
+            "-" * (width + 20),
+        ]
+        for section in self._sections:
+            modules = str(section.modules_loaded) if section.modules_loaded else ""
+            lines.append(f"{section.name:<{width}}  {section.seconds * 1000:>9.1f}  {modules:>7}")
+        lines.append("-" * (width + 20))
+        lines.append(f"{'total (wall clock)':<{width}}  {self.elapsed() * 1000:>9.1f}  {len(sys.modules):>7}")
+        return "\n".join(lines)
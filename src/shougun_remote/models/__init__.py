@@ -32,6 +32,8 @@ class Task:
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # ID kết quả trong result store - kết quả không được lưu trong metadata để tasks.json luôn nhỏ
+    result_id: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Chuyển đổi thành dictionary."""
@@ -43,6 +45,7 @@ class Task:
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
             "metadata": self.metadata,
+            "result_id": self.result_id,
         }
     
     @classmethod
@@ -56,6 +59,7 @@ class Task:
             created_at=datetime.fromisoformat(data["created_at"]),
             updated_at=datetime.fromisoformat(data["updated_at"]),
             metadata=data.get("metadata", {}),
+            result_id=data.get("result_id"),
         )
 
 
@@ -2,12 +2,40 @@
 Module theo dõi folder và đọc file JSON
 
 Module này chứa các class để theo dõi folder ShougunIsConnected và đọc file JSON.
+Các class được import khi truy cập lần đầu (PEP 562) để không nạp watchdog lúc khởi động
+nếu folder monitoring/hot reload không được dùng.
 """
 
-from .folder_monitor import FolderMonitor
-from .json_reader import JsonReader
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .folder_monitor import FolderMonitor
+    from .json_reader import JsonReader
+    from .config_watcher import ConfigWatcher
+
+_LAZY_ATTRIBUTES = {
+    "FolderMonitor": ".folder_monitor",
+    "JsonReader": ".json_reader",
+    "ConfigWatcher": ".config_watcher",
+}
 
 __all__ = [
     "FolderMonitor",
     "JsonReader",
+    "ConfigWatcher",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import class khi được truy cập lần đầu."""
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,160 @@
+"""
+Config Watcher - Theo dõi thay đổi của file cấu hình
+
+Class này dùng watchdog để phát hiện khi file cấu hình (config/service.json) bị sửa đổi
+và gọi callback để nạp lại cấu hình mà không cần restart service.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Union
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+from loguru import logger
+
+
+class ConfigFileHandler(FileSystemEventHandler):
+    """Handler xử lý sự kiện thay đổi của một file cấu hình duy nhất."""
+
+    def __init__(self, file_path: Path, callback: Callable[[], None], debounce_seconds: float = 0.2):
+        """
+        Khởi tạo handler.
+
+        Args:
+            file_path: Đường dẫn file cấu hình cần theo dõi
+            callback: Hàm được gọi khi file cấu hình thay đổi
+            debounce_seconds: Thời gian gom các sự kiện liên tiếp thành một lần reload
+        """
+        self.file_path = os.path.normcase(str(file_path.resolve()))
+        self.callback = callback
+        self.debounce_seconds = debounce_seconds
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def on_created(self, event):
+        """Xử lý khi file được tạo lại (editor lưu bằng cách ghi file mới)."""
+        self._handle(event.src_path, event.is_directory)
+
+    def on_modified(self, event):
+        """Xử lý khi file được sửa đổi."""
+        self._handle(event.src_path, event.is_directory)
+
+    def on_moved(self, event):
+        """Xử lý khi file tạm được rename đè lên file cấu hình (atomic save)."""
+        self._handle(event.dest_path, event.is_directory)
+
+    def _handle(self, path: str, is_directory: bool) -> None:
+        """
+        Lọc sự kiện và lên lịch reload.
+
+        Args:
+            path: Đường dẫn file phát sinh sự kiện
+            is_directory: Sự kiện có phải của thư mục không
+        """
+        if is_directory:
+            return
+
+        # Chỉ quan tâm đến đúng file cấu hình, bỏ qua các file khác trong cùng thư mục
+        if os.path.normcase(os.path.abspath(path)) != self.file_path:
+            return
+
+        # Editor thường ghi file nhiều lần liên tiếp - gom lại thành một lần reload
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce_seconds, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _fire(self) -> None:
+        """Gọi callback sau khi hết thời gian debounce."""
+        with self._lock:
+            self._timer = None
+        try:
+            self.callback()
+        except Exception as e:
+            logger.error(f"Lỗi khi xử lý thay đổi file cấu hình {self.file_path}: {e}")
+
+    def cancel(self) -> None:
+        """Hủy lần reload đang chờ (nếu có)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+class ConfigWatcher:
+    """Class theo dõi một file cấu hình và báo khi nội dung thay đổi."""
+
+    def __init__(self, config_path: Union[str, Path], callback: Callable[[], None], debounce_seconds: float = 0.2):
+        """
+        Khởi tạo config watcher.
+
+        Args:
+            config_path: Đường dẫn file cấu hình
+            callback: Hàm được gọi khi file cấu hình thay đổi
+            debounce_seconds: Thời gian gom các sự kiện liên tiếp
+        """
+        self.config_path = Path(config_path)
+        self.callback = callback
+        self.debounce_seconds = debounce_seconds
+        self.observer = None
+        self.handler: Optional[ConfigFileHandler] = None
+        self.is_watching = False
+
+    def start(self) -> bool:
+        """
+        Bắt đầu theo dõi file cấu hình.
+
+        Returns:
+            bool: True nếu thành công, False nếu thất bại
+        """
+        try:
+            if self.is_watching:
+                return True
+
+            # Watchdog theo dõi thư mục, handler sẽ lọc đúng file cấu hình
+            watch_dir = self.config_path.resolve().parent
+            if not watch_dir.exists():
+                logger.warning(f"Thư mục cấu hình không tồn tại: {watch_dir}")
+                return False
+
+            self.handler = ConfigFileHandler(self.config_path, self.callback, self.debounce_seconds)
+            self.observer = Observer()
+            self.observer.schedule(self.handler, str(watch_dir), recursive=False)
+            self.observer.start()
+
+            self.is_watching = True
+            logger.info(f"Bắt đầu theo dõi file cấu hình: {self.config_path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Lỗi khi bắt đầu theo dõi file cấu hình: {e}")
+            return False
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """
+        Dừng theo dõi file cấu hình.
+
+        Args:
+            timeout: Thời gian tối đa chờ observer dừng
+        """
+        try:
+            if self.handler:
+                self.handler.cancel()
+            if self.observer and self.is_watching:
+                self.observer.stop()
+                self.observer.join(timeout=timeout)
+            self.is_watching = False
+        except Exception as e:
+            logger.error(f"Lỗi khi dừng theo dõi file cấu hình: {e}")
+
+    def is_running(self) -> bool:
+        """
+        Kiểm tra watcher có đang chạy không.
+
+        Returns:
+            bool: True nếu đang chạy, False nếu không
+        """
+        return self.is_watching
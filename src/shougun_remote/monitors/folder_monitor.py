@@ -13,38 +13,98 @@ from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import json
 from loguru import logger
+from ..metrics import MetricsRegistry, get_default_registry
 
 
 class ShougunFolderHandler(FileSystemEventHandler):
     """Handler để xử lý sự kiện thay đổi file trong folder ShougunIsConnected."""
     
-    def __init__(self, callback: Callable[[str, dict], None]):
+    def __init__(self, callback: Callable[[str, dict], None], metrics: Optional[MetricsRegistry] = None):
         """
         Khởi tạo handler.
         
         Args:
             callback: Hàm callback được gọi khi có file JSON thay đổi
+            metrics: Registry để ghi metrics (mặc định dùng registry của process)
         """
         self.callback = callback
         self.json_files = set()  # Set để theo dõi các file JSON đã xử lý
         
+        metrics = metrics or get_default_registry()
+        self._events_received = metrics.counter(
+            "shougun_folder_events_total", "Số sự kiện file JSON nhận từ watchdog")
+        self._events_coalesced = metrics.counter(
+            "shougun_folder_events_coalesced_total", "Số sự kiện bị gộp vì file đã chờ xử lý khi tạm dừng")
+        self._files_parsed = metrics.counter(
+            "shougun_folder_files_parsed_total", "Số file JSON đã parse và xử lý")
+        self._files_failed = metrics.counter(
+            "shougun_folder_files_failed_total", "Số file JSON xử lý thất bại")
+        self._parse_latency = metrics.histogram(
+            "shougun_folder_parse_seconds", "Thời gian đọc, parse và xử lý một file JSON")
+        
+        # Khi bị tạm dừng (quá tải tài nguyên), sự kiện được gom lại theo đường dẫn
+        # và xử lý bù khi tiếp tục - không làm mất trạng thái mới nhất của file
+        self.paused = False
+        self._deferred: set = set()
+        self._pause_lock = threading.Lock()
+        
+    def pause(self):
+        """Tạm dừng nhận sự kiện, các file thay đổi trong lúc dừng sẽ được xử lý sau."""
+        with self._pause_lock:
+            self.paused = True
+    
+    def resume(self):
+        """Tiếp tục nhận sự kiện và xử lý các file đã bị hoãn."""
+        with self._pause_lock:
+            self.paused = False
+            deferred = list(self._deferred)
+            self._deferred.clear()
+        
+        for file_path in deferred:
+            if os.path.exists(file_path):
+                self._process_json_file(file_path)
+    
+    def evict_caches(self):
+        """Giải phóng bộ nhớ cache của handler."""
+        self.json_files.clear()
+    
+    def _dispatch(self, file_path: str):
+        """
+        Xử lý ngay hoặc hoãn lại tùy trạng thái tạm dừng.
+        
+        Args:
+            file_path: Đường dẫn đến file JSON
+        """
+        self._events_received.inc()
+        with self._pause_lock:
+            if self.paused:
+                if file_path in self._deferred:
+                    self._events_coalesced.inc()
+                self._deferred.add(file_path)
+                return
+        self._process_json_file(file_path)
+        
     def on_created(self, event):
         """Xử lý khi có file mới được tạo."""
         if not event.is_directory and event.src_path.endswith('.json'):
-            self._process_json_file(event.src_path)
+            self._dispatch(event.src_path)
     
     def on_modified(self, event):
         """Xử lý khi file được sửa đổi."""
         if not event.is_directory and event.src_path.endswith('.json'):
-            self._process_json_file(event.src_path)
+            self._dispatch(event.src_path)
     
-    def _process_json_file(self, file_path: str):
+    def _process_json_file(self, file_path: str) -> bool:
         """
         Xử lý file JSON.
         
         Args:
             file_path: Đường dẫn đến file JSON
+            
+        Returns:
+            bool: True nếu xử lý thành công, False nếu thất bại
         """
+        start = time.perf_counter()
         try:
             # Đọc nội dung file JSON
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -56,26 +116,36 @@ class ShougunFolderHandler(FileSystemEventHandler):
             # Thêm vào danh sách đã xử lý
             self.json_files.add(file_path)
             
+            self._files_parsed.inc()
             logger.info(f"Đã xử lý file JSON: {file_path}")
+            return True
             
         except json.JSONDecodeError as e:
+            self._files_failed.inc()
             logger.error(f"Lỗi parse JSON từ file {file_path}: {e}")
         except Exception as e:
+            self._files_failed.inc()
             logger.error(f"Lỗi xử lý file {file_path}: {e}")
+        finally:
+            self._parse_latency.observe(time.perf_counter() - start)
+        return False
 
 
 class FolderMonitor:
     """Class theo dõi folder ShougunIsConnected."""
     
-    def __init__(self, callback: Callable[[str, dict], None]):
+    def __init__(self, callback: Callable[[str, dict], None], metrics: Optional[MetricsRegistry] = None):
         """
         Khởi tạo folder monitor.
         
         Args:
             callback: Hàm callback được gọi khi có file JSON thay đổi
+            metrics: Registry để ghi metrics (mặc định dùng registry của process)
         """
         self.callback = callback
+        self.metrics = metrics
         self.observer = None
+        self.handler: Optional[ShougunFolderHandler] = None
         self.monitor_thread = None
         self.is_monitoring = False
         self.target_folder = self._get_shougun_folder_path()
@@ -131,10 +201,10 @@ class FolderMonitor:
             
             # Tạo observer và handler
             self.observer = Observer()
-            handler = ShougunFolderHandler(self.callback)
+            self.handler = ShougunFolderHandler(self.callback, self.metrics)
             
             # Bắt đầu theo dõi
-            self.observer.schedule(handler, self.target_folder, recursive=False)
+            self.observer.schedule(self.handler, self.target_folder, recursive=False)
             self.observer.start()
             
             self.is_monitoring = True
@@ -146,16 +216,59 @@ class FolderMonitor:
             logger.error(f"Lỗi khi bắt đầu theo dõi folder: {e}")
             return False
     
-    def stop_monitoring(self):
-        """Dừng theo dõi folder."""
+    def stop_monitoring(self, timeout: Optional[float] = 5.0) -> bool:
+        """
+        Dừng theo dõi folder.
+        
+        Observer ngừng nhận sự kiện mới ngay, sự kiện đang xử lý được chờ xong trong
+        giới hạn timeout. File chưa kịp xử lý vẫn nằm trong folder và được quét lại
+        ở lần khởi động sau.
+        
+        Args:
+            timeout: Thời gian chờ thread observer kết thúc (None = chờ mãi)
+            
+        Returns:
+            bool: True nếu observer đã dừng hẳn trong thời gian chờ
+        """
         try:
             if self.observer and self.is_monitoring:
                 self.observer.stop()
-                self.observer.join()
+                self.observer.join(timeout)
                 self.is_monitoring = False
+                if self.observer.is_alive():
+                    logger.warning(f"Observer chưa dừng sau {timeout}s - bỏ qua sự kiện đang xử lý")
+                    return False
                 logger.info("Đã dừng theo dõi folder")
+            return True
         except Exception as e:
             logger.error(f"Lỗi khi dừng theo dõi folder: {e}")
+            return False
+    
+    def pause_intake(self):
+        """Tạm dừng xử lý sự kiện folder (dùng khi service quá tải)."""
+        if self.handler:
+            self.handler.pause()
+            logger.info("Tạm dừng nhận sự kiện folder")
+    
+    def resume_intake(self):
+        """Tiếp tục xử lý sự kiện folder, kể cả các sự kiện đã bị hoãn."""
+        if self.handler:
+            self.handler.resume()
+            logger.info("Tiếp tục nhận sự kiện folder")
+    
+    def is_intake_paused(self) -> bool:
+        """
+        Kiểm tra việc nhận sự kiện có đang bị tạm dừng không.
+        
+        Returns:
+            bool: True nếu đang tạm dừng
+        """
+        return bool(self.handler and self.handler.paused)
+    
+    def evict_caches(self):
+        """Giải phóng bộ nhớ cache của monitor."""
+        if self.handler:
+            self.handler.evict_caches()
     
     def get_folder_path(self) -> str:
         """
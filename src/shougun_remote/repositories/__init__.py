@@ -2,11 +2,16 @@
 Repository implementations.
 """
 
-from typing import Any, Dict, List, Optional, TypeVar, Generic
+from typing import Any, Dict, Iterable, List, Optional, TypeVar, Generic
 import json
+import threading
+import time
 from pathlib import Path
 from ..core.repository_interface import IRepository
+from ..metrics import MetricsRegistry, get_default_registry
 from ..models import Task
+from .result_store import ResultStore
+from .task_archive import TaskArchive
 
 T = TypeVar('T')
 
@@ -22,10 +27,26 @@ class FileRepository(IRepository[T], Generic[T]):
     - Mở để mở rộng các loại entity khác nhau
     """
     
-    def __init__(self, file_path: str, entity_class: type):
+    def __init__(self, file_path: str, entity_class: type, metrics: Optional[MetricsRegistry] = None):
         self._file_path = Path(file_path)
         self._entity_class = entity_class
         self._data: Dict[str, T] = {}
+        # Worker chạy song song trong executor - mọi thao tác ghi phải tuần tự
+        self._lock = threading.RLock()
+        
+        metrics = metrics or get_default_registry()
+        labels = {"repository": self._file_path.stem}
+        self._reads = metrics.counter(
+            "shougun_repository_reads_total", "Số lần đọc entity từ repository", labels)
+        self._writes = metrics.counter(
+            "shougun_repository_writes_total", "Số lần ghi file repository", labels)
+        self._write_failures = metrics.counter(
+            "shougun_repository_write_failures_total", "Số lần ghi file repository thất bại", labels)
+        self._bytes_written = metrics.counter(
+            "shougun_repository_bytes_written_total", "Tổng số byte đã ghi ra file repository", labels)
+        self._save_latency = metrics.histogram(
+            "shougun_repository_save_seconds", "Thời gian serialize và ghi file repository", labels)
+        
         self._load_data()
     
     def _load_data(self) -> None:
@@ -46,60 +67,150 @@ class FileRepository(IRepository[T], Generic[T]):
     
     def _save_data(self) -> bool:
         """Lưu dữ liệu ra file."""
+        start = time.perf_counter()
         try:
-            self._file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            data = {}
-            for key, entity in self._data.items():
-                if hasattr(entity, 'to_dict'):
-                    data[key] = entity.to_dict()
-                else:
-                    data[key] = entity
-            
-            with open(self._file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with self._lock:
+                self._file_path.parent.mkdir(parents=True, exist_ok=True)
+                
+                data = {}
+                for key, entity in self._data.items():
+                    if hasattr(entity, 'to_dict'):
+                        data[key] = entity.to_dict()
+                    else:
+                        data[key] = entity
+                
+                # Serialize trước để biết số byte thực sự ghi ra
+                payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+                with open(self._file_path, 'wb') as f:
+                    f.write(payload)
             
+            self._writes.inc()
+            self._bytes_written.inc(len(payload))
             return True
         except Exception:
+            self._write_failures.inc()
             return False
+        finally:
+            self._save_latency.observe(time.perf_counter() - start)
+    
+    def compact(self) -> bool:
+        """
+        Thu gọn bộ nhớ và file dữ liệu.
+        
+        Dict của Python không tự co lại sau khi xóa nhiều phần tử, nên dựng lại dict
+        để trả bộ nhớ, sau đó ghi lại file để loại bỏ dữ liệu thừa.
+        
+        Returns:
+            bool: True nếu thành công, False nếu thất bại
+        """
+        with self._lock:
+            self._data = dict(self._data)
+            return self._save_data()
+    
+    def flush(self) -> bool:
+        """
+        Ghi toàn bộ dữ liệu trong bộ nhớ ra file.
+        
+        Mỗi thao tác ghi đã tự lưu file; flush dùng khi dừng service để chắc chắn file
+        phản ánh trạng thái cuối cùng (kể cả khi lần lưu trước thất bại).
+        
+        Returns:
+            bool: True nếu thành công, False nếu thất bại
+        """
+        with self._lock:
+            return self._save_data()
     
     def create(self, entity: T) -> Optional[T]:
         """Tạo entity mới."""
         if hasattr(entity, 'id'):
             entity_id = str(entity.id)
-            self._data[entity_id] = entity
-            if self._save_data():
-                return entity
+            with self._lock:
+                self._data[entity_id] = entity
+                if self._save_data():
+                    return entity
         return None
     
     def get_by_id(self, entity_id: str) -> Optional[T]:
         """Lấy entity theo ID."""
+        self._reads.inc()
         return self._data.get(entity_id)
     
     def get_all(self) -> List[T]:
         """Lấy tất cả entities."""
+        self._reads.inc()
         return list(self._data.values())
     
     def update(self, entity: T) -> bool:
         """Cập nhật entity."""
         if hasattr(entity, 'id'):
             entity_id = str(entity.id)
-            if entity_id in self._data:
-                self._data[entity_id] = entity
-                return self._save_data()
+            with self._lock:
+                if entity_id in self._data:
+                    self._data[entity_id] = entity
+                    return self._save_data()
         return False
     
+    def update_many(self, entities: Iterable[T]) -> int:
+        """
+        Cập nhật nhiều entity với một lần ghi file.
+        
+        Args:
+            entities: Các entity cần cập nhật (entity không tồn tại bị bỏ qua)
+            
+        Returns:
+            int: Số entity đã cập nhật (0 nếu ghi file thất bại)
+        """
+        with self._lock:
+            updated = {
+                str(entity.id): entity for entity in entities
+                if hasattr(entity, 'id') and str(entity.id) in self._data
+            }
+            if not updated:
+                return 0
+            previous = {key: self._data[key] for key in updated}
+            self._data.update(updated)
+            if not self._save_data():
+                self._data.update(previous)
+                return 0
+        return len(updated)
+    
     def delete(self, entity_id: str) -> bool:
         """Xóa entity theo ID."""
-        if entity_id in self._data:
-            del self._data[entity_id]
-            return self._save_data()
+        with self._lock:
+            if entity_id in self._data:
+                del self._data[entity_id]
+                return self._save_data()
         return False
     
+    def delete_many(self, entity_ids: Iterable[str]) -> int:
+        """
+        Xóa nhiều entity với một lần ghi file.
+        
+        Dict được dựng lại nên bộ nhớ của các entity đã xóa được trả lại ngay (như compact()).
+        
+        Args:
+            entity_ids: ID các entity cần xóa
+            
+        Returns:
+            int: Số entity đã xóa (0 nếu ghi file thất bại)
+        """
+        ids = set(entity_ids)
+        with self._lock:
+            remaining = {key: value for key, value in self._data.items() if key not in ids}
+            removed = len(self._data) - len(remaining)
+            if removed == 0:
+                return 0
+            previous, self._data = self._data, remaining
+            if not self._save_data():
+                self._data = previous
+                return 0
+        return removed
+    
     def find_by(self, criteria: Dict[str, Any]) -> List[T]:
         """Tìm entities theo criteria."""
+        self._reads.inc()
         results = []
-        for entity in self._data.values():
+        for entity in list(self._data.values()):
             match = True
             for key, value in criteria.items():
                 if not hasattr(entity, key) or getattr(entity, key) != value:
@@ -0,0 +1,245 @@
+"""
+Kho kết quả task định danh theo nội dung (content-addressed).
+
+Mỗi kết quả là một file blob đặt tên theo BLAKE2b-256 của nội dung, chia thư mục theo 2 cấp
+tiền tố hash (`ab/cd/abcd...`) để mỗi thư mục không chứa quá nhiều file. Task chỉ giữ ID của
+blob nên `tasks.json` không phình ra theo kích thước kết quả; hai kết quả giống nhau dùng chung blob.
+"""
+
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, ContextManager, Iterable, Optional, Set
+
+from ..core.result_store_interface import IResultStore, IResultWriter
+from ..metrics import MetricsRegistry, get_default_registry
+
+_DIGEST_SIZE = 32
+_RESULT_ID = re.compile(r"^[0-9a-f]{64}$")
+
+# File tạm cũ hơn ngưỡng này (writer bị bỏ dở do crash) được xóa khi thu gom rác
+_STALE_TEMP_SECONDS = 3600.0
+
+
+class _BlobWriter(IResultWriter):
+    """Ghi blob vào file tạm, tính hash trong lúc ghi, rename vào vị trí cuối khi commit."""
+
+    def __init__(self, store: "ResultStore"):
+        self._store = store
+        fd, self._temp_path = tempfile.mkstemp(dir=store.get_temp_dir(), prefix="blob-", suffix=".tmp")
+        self._file = os.fdopen(fd, "wb")
+        self._hash = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+        self._size = 0
+        self._closed = False
+
+    def write(self, chunk: bytes) -> int:
+        """Ghi thêm một phần dữ liệu."""
+        if self._closed:
+            raise ValueError("writer is closed")
+        self._hash.update(chunk)
+        written = self._file.write(chunk)
+        self._size += written
+        return written
+
+    def commit(self) -> str:
+        """Fsync rồi đưa blob vào vị trí theo hash (bỏ qua nếu blob đã tồn tại)."""
+        if self._closed:
+            raise ValueError("writer is closed")
+        self._closed = True
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+
+        result_id = self._hash.hexdigest()
+        target = self._store.get_blob_path(result_id)
+        if target.exists():
+            # Nội dung đã có - giữ blob cũ
+            os.unlink(self._temp_path)
+            self._store.record_write(self._size, deduplicated=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self._temp_path, target)
+            self._store.record_write(self._size, deduplicated=False)
+        return result_id
+
+    def abort(self) -> None:
+        """Hủy blob và xóa file tạm."""
+        if self._closed:
+            return
+        self._closed = True
+        self._file.close()
+        try:
+            os.unlink(self._temp_path)
+        except FileNotFoundError:
+            pass
+
+
+class _MappedView:
+    """
+    Context manager trả về memoryview chỉ đọc của blob qua mmap.
+
+    Không giữ memoryview (hoặc slice của nó) sau khi thoát khỏi khối `with`.
+    """
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+
+    def __enter__(self) -> memoryview:
+        self._file = open(self._path, "rb")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            # mmap không map được file rỗng
+            self._view = memoryview(b"")
+        else:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)
+        return self._view
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self._view.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Còn slice của view đang được giữ - mmap được đóng khi GC thu hồi
+                pass
+        self._file.close()
+
+
+class ResultStore(IResultStore):
+    """
+    Kho kết quả trên đĩa.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ lưu, đọc và xóa blob kết quả; việc task nào tham chiếu blob nào do TaskService quản lý
+    """
+
+    def __init__(self, root: str = "data/results", metrics: Optional[MetricsRegistry] = None):
+        """
+        Khởi tạo kho kết quả.
+
+        Args:
+            root: Thư mục gốc chứa blob
+            metrics: Registry để ghi metrics (mặc định dùng registry của process)
+        """
+        self._root = Path(root)
+        self._temp_dir = self._root / "tmp"
+
+        metrics = metrics or get_default_registry()
+        self._writes = metrics.counter("shougun_result_store_writes_total", "Số kết quả đã ghi vào result store")
+        self._deduplicated = metrics.counter(
+            "shougun_result_store_deduplicated_total", "Số kết quả trùng nội dung với blob đã có")
+        self._bytes_written = metrics.counter(
+            "shougun_result_store_bytes_written_total", "Tổng số byte kết quả đã ghi")
+        self._deleted = metrics.counter("shougun_result_store_deleted_total", "Số blob kết quả đã xóa")
+
+    def get_temp_dir(self) -> Path:
+        """Thư mục file tạm (cùng filesystem với blob để rename là atomic)."""
+        self._temp_dir.mkdir(parents=True, exist_ok=True)
+        return self._temp_dir
+
+    def get_blob_path(self, result_id: str) -> Path:
+        """
+        Đường dẫn blob theo ID.
+
+        Args:
+            result_id: ID kết quả (hex BLAKE2b-256)
+
+        Returns:
+            Path: Đường dẫn file blob
+        """
+        return self._root / result_id[:2] / result_id[2:4] / result_id
+
+    def record_write(self, size: int, deduplicated: bool) -> None:
+        """Ghi metrics cho một lần commit (gọi bởi writer)."""
+        self._writes.inc()
+        if deduplicated:
+            self._deduplicated.inc()
+        else:
+            self._bytes_written.inc(size)
+
+    def open_writer(self) -> IResultWriter:
+        """Mở writer cho một kết quả mới."""
+        return _BlobWriter(self)
+
+    def open_view(self, result_id: str) -> Optional[ContextManager[memoryview]]:
+        """Mở view mmap chỉ đọc, None nếu ID không hợp lệ hoặc blob không tồn tại."""
+        if not self.exists(result_id):
+            return None
+        return _MappedView(self.get_blob_path(result_id))
+
+    def read(self, result_id: str) -> Optional[bytes]:
+        """
+        Đọc toàn bộ kết quả vào bộ nhớ (chỉ nên dùng cho kết quả nhỏ).
+
+        Args:
+            result_id: ID kết quả
+
+        Returns:
+            Optional[bytes]: Nội dung hoặc None nếu không tồn tại
+        """
+        view = self.open_view(result_id)
+        if view is None:
+            return None
+        with view as data:
+            return bytes(data)
+
+    def exists(self, result_id: str) -> bool:
+        """Kiểm tra kết quả có tồn tại không."""
+        return bool(_RESULT_ID.match(result_id)) and self.get_blob_path(result_id).is_file()
+
+    def size(self, result_id: str) -> Optional[int]:
+        """Kích thước kết quả (byte), None nếu không tồn tại."""
+        if not _RESULT_ID.match(result_id):
+            return None
+        try:
+            return self.get_blob_path(result_id).stat().st_size
+        except OSError:
+            return None
+
+    def delete(self, result_id: str) -> bool:
+        """Xóa blob."""
+        if not _RESULT_ID.match(result_id):
+            return False
+        try:
+            self.get_blob_path(result_id).unlink()
+        except OSError:
+            # Không tồn tại, hoặc đang được map trên Windows - lần thu gom sau sẽ thử lại
+            return False
+        self._deleted.inc()
+        return True
+
+    def collect_garbage(self, live_ids: Iterable[str]) -> int:
+        """Xóa blob không còn được tham chiếu và file tạm bị bỏ dở."""
+        live: Set[str] = set(live_ids)
+        removed = 0
+        if not self._root.is_dir():
+            return 0
+
+        for first in os.scandir(self._root):
+            if not first.is_dir() or first.name == self._temp_dir.name:
+                continue
+            for second in os.scandir(first.path):
+                if not second.is_dir():
+                    continue
+                for blob in os.scandir(second.path):
+                    if _RESULT_ID.match(blob.name) and blob.name not in live and self.delete(blob.name):
+                        removed += 1
+
+        if self._temp_dir.is_dir():
+            cutoff = time.time() - _STALE_TEMP_SECONDS
+            for temp in os.scandir(self._temp_dir):
+                try:
+                    if temp.stat().st_mtime < cutoff:
+                        os.unlink(temp.path)
+                except OSError:
+                    pass
+        return removed
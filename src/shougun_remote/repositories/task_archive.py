@@ -0,0 +1,132 @@
+"""
+Archive task đã hết hạn - file JSONL nén gzip, mỗi ngày (theo updated_at của task) một file.
+
+Mỗi lần archive nối thêm một gzip member vào cuối file nên không phải đọc/ghi lại dữ liệu cũ;
+gzip.open đọc liền mạch nhiều member nối tiếp nhau.
+"""
+
+import gzip
+import json
+import re
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from ..models import Task, TaskStatus
+
+_FILE_PATTERN = re.compile(r"^tasks-(\d{4}-\d{2}-\d{2})\.jsonl\.gz$")
+
+
+class TaskArchive:
+    """
+    Kho lưu trữ task đã rời khỏi repository.
+
+    Chỉ đọc khi được truy vấn, và chỉ mở các file nằm trong khoảng ngày được hỏi.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ ghi và truy vấn task đã archive
+    """
+
+    def __init__(self, root: str = "data/archive"):
+        """
+        Khởi tạo archive.
+
+        Args:
+            root: Thư mục chứa file archive
+        """
+        self._root = Path(root)
+        self._lock = threading.Lock()
+
+    def get_path(self, day: date) -> Path:
+        """Đường dẫn file archive của một ngày."""
+        return self._root / f"tasks-{day.isoformat()}.jsonl.gz"
+
+    def append(self, tasks: Iterable[Task]) -> int:
+        """
+        Ghi thêm task vào archive.
+
+        Args:
+            tasks: Task cần archive
+
+        Returns:
+            int: Số task đã ghi
+        """
+        by_day: Dict[date, List[Task]] = {}
+        for task in tasks:
+            by_day.setdefault(task.updated_at.date(), []).append(task)
+        if not by_day:
+            return 0
+
+        written = 0
+        with self._lock:
+            self._root.mkdir(parents=True, exist_ok=True)
+            for day, day_tasks in by_day.items():
+                lines = "".join(json.dumps(task.to_dict(), ensure_ascii=False) + "\n" for task in day_tasks)
+                with gzip.open(self.get_path(day), "ab") as f:
+                    f.write(lines.encode("utf-8"))
+                written += len(day_tasks)
+        return written
+
+    def list_days(self) -> List[date]:
+        """Các ngày có file archive, tăng dần."""
+        if not self._root.is_dir():
+            return []
+        days = []
+        for path in self._root.iterdir():
+            match = _FILE_PATTERN.match(path.name)
+            if match:
+                days.append(date.fromisoformat(match.group(1)))
+        return sorted(days)
+
+    def iter_tasks(
+        self,
+        status: Optional[TaskStatus] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Iterator[Task]:
+        """
+        Duyệt lần lượt task đã archive (không nạp cả archive vào bộ nhớ).
+
+        Args:
+            status: Chỉ lấy task có trạng thái này
+            since: Chỉ lấy task có updated_at >= since
+            until: Chỉ lấy task có updated_at < until
+
+        Returns:
+            Iterator[Task]: Task theo thứ tự ngày
+        """
+        for day in self.list_days():
+            if (since and day < since.date()) or (until and day > until.date()):
+                continue
+            with gzip.open(self.get_path(day), "rt", encoding="utf-8") as f:
+                try:
+                    for line in f:
+                        try:
+                            task = Task.from_dict(json.loads(line))
+                        except (ValueError, KeyError, TypeError):
+                            # Dòng hỏng (bị cắt hoặc sai định dạng) - chỉ bỏ dòng này
+                            continue
+                        if status is not None and task.status != status:
+                            continue
+                        if (since and task.updated_at < since) or (until and task.updated_at >= until):
+                            continue
+                        yield task
+                except (EOFError, gzip.BadGzipFile):
+                    # Member cuối bị cắt (process dừng giữa lúc ghi) - bỏ phần hỏng
+                    continue
+
+    def get_by_id(self, task_id: str) -> Optional[Task]:
+        """
+        Tìm task đã archive theo ID (quét tuần tự - chỉ dùng cho tra cứu thủ công).
+
+        Args:
+            task_id: ID task
+
+        Returns:
+            Optional[Task]: Task hoặc None nếu không có
+        """
+        for task in self.iter_tasks():
+            if task.id == task_id:
+                return task
+        return None
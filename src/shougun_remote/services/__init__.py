@@ -2,18 +2,34 @@
 Service implementations theo nguyên tắc SOLID.
 """
 
+import gc
+import os
 import time
 import threading
-import psutil
-from typing import Any, Dict, Optional
+import uuid
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Union
 from datetime import datetime
 
 from ..core.service_interface import IService, ServiceStatus
-from ..core.logger_interface import ILogger
-from ..core.config_interface import IConfigManager
+from ..core.logger_interface import ILogger, LogLevel
+from ..core.config_interface import IConfigManager, IReloadableConfig, ConfigDiff
+from ..core.result_store_interface import IResultStore
+from ..metrics import MetricsRegistry, get_default_registry, render_prometheus
 from ..models import Task, ServiceInfo, TaskStatus
-from ..repositories import FileRepository
-from ..monitors import FolderMonitor, JsonReader
+from ..repositories import FileRepository, TaskArchive
+from ..monitors.json_reader import JsonReader
+from .concurrency import AdaptiveLimiter
+from .resource_governor import GovernorState, ResourceGovernor
+from .metrics_sampler import MetricsSampler, empty_snapshot
+from .shutdown import DrainDeadline, ShutdownCheckpoint, ShutdownReport
+from .retention import RetentionCompactor, load_policies
+
+if TYPE_CHECKING:
+    from ..monitors.folder_monitor import FolderMonitor
+    from .worker_pool import ShardedWorkerPool
 
 
 class TaskService:
@@ -27,14 +43,48 @@ class TaskService:
     - Phụ thuộc vào abstractions (ILogger, IRepository)
     """
     
-    def __init__(self, logger: ILogger, task_repository: FileRepository[Task]):
+    def __init__(
+        self,
+        logger: ILogger,
+        task_repository: FileRepository[Task],
+        metrics: Optional[MetricsRegistry] = None,
+        result_store: Optional[IResultStore] = None
+    ):
         self._logger = logger
         self._task_repository = task_repository
+        self._result_store = result_store
+        # Blob dùng chung giữa các task trùng nội dung: commit -> gắn vào task và tra cứu tham chiếu
+        # -> xóa blob phải tuần tự, nếu không blob vừa được dùng lại có thể bị xóa trước khi task lưu
+        self._result_lock = threading.RLock()
+        # Đọc trạng thái -> ghi trạng thái mới phải nguyên tử: task bị hủy/đổi trạng thái giữa hai bước
+        # không được bị ghi đè (vd. dispatcher chuyển task vừa bị CANCELLED sang RUNNING)
+        self._status_lock = threading.RLock()
+        
+        metrics = metrics or get_default_registry()
+        self._tasks_created = metrics.counter("shougun_tasks_created_total", "Số task đã tạo")
+        self._tasks_deleted = metrics.counter("shougun_tasks_deleted_total", "Số task đã xóa")
+        self._task_errors = metrics.counter("shougun_task_service_errors_total", "Số lỗi trong TaskService")
+        self._status_updates = {
+            status: metrics.counter(
+                "shougun_task_status_updates_total", "Số lần cập nhật trạng thái task", {"status": status.value})
+            for status in TaskStatus
+        }
+        self._subscribers: List[Callable[[Task], None]] = []
+    
+    def subscribe(self, callback: Callable[[Task], None]) -> None:
+        """
+        Đăng ký nhận thông báo khi task được tạo hoặc đổi trạng thái.
+        
+        Args:
+            callback: Hàm nhận task sau khi đã lưu
+        """
+        self._subscribers.append(callback)
     
     def create_task(self, name: str, description: Optional[str] = None) -> Optional[Task]:
         """Tạo task mới."""
         try:
-            task_id = f"task_{int(time.time())}"
+            # Thêm hậu tố ngẫu nhiên - nhiều task có thể được tạo trong cùng một giây (qua API)
+            task_id = f"task_{int(time.time())}_{uuid.uuid4().hex[:8]}"
             task = Task(
                 id=task_id,
                 name=name,
@@ -43,12 +93,16 @@ class TaskService:
             
             result = self._task_repository.create(task)
             if result:
+                self._tasks_created.inc()
                 self._logger.info(f"Created task: {task_id}")
+                self._notify(result)
                 return result
             else:
+                self._task_errors.inc()
                 self._logger.error(f"Failed to create task: {task_id}")
                 return None
         except Exception as e:
+            self._task_errors.inc()
             self._logger.error(f"Error creating task: {e}")
             return None
     
@@ -60,29 +114,256 @@ class TaskService:
         """Lấy tất cả tasks."""
         return self._task_repository.get_all()
     
+    def get_tasks_by_status(self, status: TaskStatus) -> List[Task]:
+        """Lấy các task có trạng thái cho trước."""
+        return self._task_repository.find_by({"status": status})
+    
     def update_task_status(self, task_id: str, status: TaskStatus) -> bool:
         """Cập nhật trạng thái task."""
         try:
-            task = self._task_repository.get_by_id(task_id)
-            if task:
+            with self._status_lock:
+                task = self._task_repository.get_by_id(task_id)
+                if not task:
+                    return False
                 task.status = status
                 task.updated_at = datetime.now()
-                return self._task_repository.update(task)
+                self._status_updates[status].inc()
+                if not self._task_repository.update(task):
+                    return False
+            self._notify(task)
+            return True
+        except Exception as e:
+            self._task_errors.inc()
+            self._logger.error(f"Error updating task status: {e}")
             return False
+    
+    def update_tasks_status(
+        self,
+        task_ids: Iterable[str],
+        status: TaskStatus,
+        expected: Optional[TaskStatus] = None
+    ) -> List[str]:
+        """
+        Cập nhật trạng thái nhiều task với một lần ghi repository.
+        
+        Args:
+            task_ids: ID các task
+            status: Trạng thái mới
+            expected: Chỉ cập nhật task đang ở trạng thái này (None = mọi task)
+            
+        Returns:
+            List[str]: ID các task đã cập nhật (rỗng nếu ghi thất bại - trạng thái cũ được giữ nguyên)
+        """
+        try:
+            with self._status_lock:
+                tasks = [
+                    task for task in map(self._task_repository.get_by_id, task_ids)
+                    if task and (expected is None or task.status == expected)
+                ]
+                if not tasks:
+                    return []
+                previous = [(task.status, task.updated_at) for task in tasks]
+                now = datetime.now()
+                for task in tasks:
+                    task.status = status
+                    task.updated_at = now
+                if not self._task_repository.update_many(tasks):
+                    for task, (old_status, old_updated_at) in zip(tasks, previous):
+                        task.status = old_status
+                        task.updated_at = old_updated_at
+                    return []
+            self._status_updates[status].inc(len(tasks))
+            for task in tasks:
+                self._notify(task)
+            return [task.id for task in tasks]
         except Exception as e:
+            self._task_errors.inc()
             self._logger.error(f"Error updating task status: {e}")
+            return []
+    
+    def requeue_interrupted(self, exclude: Iterable[str] = ()) -> List[str]:
+        """
+        Đưa các task còn RUNNING (bị gián đoạn khi dừng/crash) về PENDING để chạy lại.
+        
+        Args:
+            exclude: ID task vẫn đang thực sự chạy trong process này
+            
+        Returns:
+            List[str]: ID các task đã được đưa lại hàng đợi
+        """
+        skipped = set(exclude)
+        requeued = []
+        for task in self._task_repository.find_by({"status": TaskStatus.RUNNING}):
+            if task.id not in skipped and self.update_task_status(task.id, TaskStatus.PENDING):
+                requeued.append(task.id)
+        return requeued
+    
+    def flush_storage(self) -> bool:
+        """Ghi dữ liệu task ra file (gọi khi dừng service)."""
+        try:
+            return self._task_repository.flush()
+        except Exception as e:
+            self._logger.error(f"Error flushing task storage: {e}")
+            return False
+    
+    def compact_storage(self) -> bool:
+        """Thu gọn bộ nhớ và file của repository."""
+        try:
+            return self._task_repository.compact()
+        except Exception as e:
+            self._logger.error(f"Error compacting task storage: {e}")
             return False
     
     def delete_task(self, task_id: str) -> bool:
-        """Xóa task."""
+        """Xóa task (và kết quả của task nếu không còn task nào khác dùng chung)."""
         try:
+            task = self._task_repository.get_by_id(task_id)
             result = self._task_repository.delete(task_id)
             if result:
+                self._tasks_deleted.inc()
                 self._logger.info(f"Deleted task: {task_id}")
+                if task and task.result_id:
+                    self._release_result(task.result_id)
             return result
         except Exception as e:
+            self._task_errors.inc()
             self._logger.error(f"Error deleting task: {e}")
             return False
+    
+    def remove_tasks(
+        self,
+        task_ids: Iterable[str],
+        expected: Optional[TaskStatus] = None,
+        before_remove: Optional[Callable[[List[Task]], Any]] = None
+    ) -> int:
+        """
+        Xóa nhiều task với một lần ghi repository (dùng khi compact theo retention).
+        
+        Args:
+            task_ids: ID các task cần xóa
+            expected: Chỉ xóa task vẫn ở trạng thái này (None = mọi task)
+            before_remove: Hàm nhận các task sắp bị xóa (vd. ghi archive) - lỗi của nó hủy việc xóa
+            
+        Returns:
+            int: Số task đã xóa
+        """
+        try:
+            # Giữ status lock: task được đưa lại PENDING giữa lúc chọn và lúc xóa không bị xóa nhầm
+            with self._status_lock:
+                tasks = [
+                    task for task in map(self._task_repository.get_by_id, dict.fromkeys(task_ids))
+                    if task and (expected is None or task.status == expected)
+                ]
+                if not tasks:
+                    return 0
+                if before_remove is not None:
+                    before_remove(tasks)
+                result_ids = {task.result_id for task in tasks if task.result_id}
+                removed = self._task_repository.delete_many(task.id for task in tasks)
+            if removed:
+                self._tasks_deleted.inc(removed)
+            if removed and result_ids and self._result_store:
+                with self._result_lock:
+                    live = {task.result_id for task in self._task_repository.get_all() if task.result_id}
+                    for result_id in result_ids - live:
+                        self._result_store.delete(result_id)
+            return removed
+        except Exception as e:
+            self._task_errors.inc()
+            self._logger.error(f"Error removing tasks: {e}")
+            return 0
+    
+    def store_result(self, task_id: str, data: Union[bytes, Iterable[bytes]]) -> Optional[str]:
+        """
+        Lưu kết quả của task vào result store.
+        
+        Args:
+            task_id: ID task
+            data: Nội dung, hoặc iterable các phần nội dung để ghi dạng stream
+            
+        Returns:
+            Optional[str]: ID kết quả hoặc None nếu thất bại
+        """
+        if self._result_store is None:
+            self._logger.error("Result store is not configured")
+            return None
+        try:
+            task = self._task_repository.get_by_id(task_id)
+            if task is None:
+                return None
+            
+            with self._result_store.open_writer() as writer:
+                if isinstance(data, (bytes, bytearray, memoryview)):
+                    writer.write(data)
+                else:
+                    for chunk in data:
+                        writer.write(chunk)
+                with self._result_lock:
+                    result_id = writer.commit()
+                    previous = task.result_id
+                    task.result_id = result_id
+                    task.updated_at = datetime.now()
+                    if not self._task_repository.update(task):
+                        return None
+            
+            if previous and previous != result_id:
+                self._release_result(previous)
+            return result_id
+        except Exception as e:
+            self._task_errors.inc()
+            self._logger.error(f"Error storing result of task {task_id}: {e}")
+            return None
+    
+    def open_result(self, task_id: str) -> Optional[ContextManager[memoryview]]:
+        """
+        Mở view chỉ đọc tới kết quả của task.
+        
+        Args:
+            task_id: ID task
+            
+        Returns:
+            Optional[ContextManager[memoryview]]: Context manager trả về memoryview, None nếu không có kết quả
+        """
+        task = self._task_repository.get_by_id(task_id)
+        if task is None or not task.result_id or self._result_store is None:
+            return None
+        return self._result_store.open_view(task.result_id)
+    
+    def collect_result_garbage(self) -> int:
+        """
+        Xóa các blob kết quả không còn task nào tham chiếu.
+        
+        Returns:
+            int: Số blob đã xóa
+        """
+        if self._result_store is None:
+            return 0
+        try:
+            with self._result_lock:
+                live = [task.result_id for task in self._task_repository.get_all() if task.result_id]
+                removed = self._result_store.collect_garbage(live)
+            if removed:
+                self._logger.info(f"Đã xóa {removed} kết quả không còn được tham chiếu")
+            return removed
+        except Exception as e:
+            self._logger.error(f"Error collecting result garbage: {e}")
+            return 0
+    
+    def _release_result(self, result_id: str) -> None:
+        """Xóa blob nếu không còn task nào tham chiếu (kết quả trùng nội dung dùng chung blob)."""
+        if self._result_store is None:
+            return
+        with self._result_lock:
+            if not self._task_repository.find_by({"result_id": result_id}):
+                self._result_store.delete(result_id)
+    
+    def _notify(self, task: Task) -> None:
+        """Thông báo task mới/đổi trạng thái cho subscribers."""
+        for callback in self._subscribers:
+            try:
+                callback(task)
+            except Exception as e:
+                self._logger.error(f"Lỗi khi thông báo thay đổi task: {e}")
 
 
 class ShougunService(IService):
@@ -100,20 +381,61 @@ class ShougunService(IService):
         self,
         logger: ILogger,
         config_manager: IConfigManager,
-        task_service: TaskService
+        task_service: TaskService,
+        metrics: Optional[MetricsRegistry] = None,
+        checkpoint: Optional[ShutdownCheckpoint] = None
     ):
         self._logger = logger
         self._config_manager = config_manager
         self._task_service = task_service
+        self._metrics = metrics or get_default_registry()
+        self._checkpoint = checkpoint or ShutdownCheckpoint()
+        
+        # Metrics của worker: thời gian task chờ ở PENDING và thời gian chạy
+        self._queue_wait = self._metrics.histogram(
+            "shougun_task_queue_wait_seconds", "Thời gian task chờ ở trạng thái PENDING trước khi chạy")
+        self._run_time = self._metrics.histogram(
+            "shougun_task_run_seconds", "Thời gian chạy một task")
+        self._tasks_in_flight = self._metrics.gauge(
+            "shougun_tasks_in_flight", "Số task đang chạy trong executor")
+        self._worker_cycles = self._metrics.counter(
+            "shougun_worker_cycles_total", "Số vòng lặp của worker thread")
+        self._tasks_requeued = self._metrics.counter(
+            "shougun_tasks_requeued_total", "Số task RUNNING bị gián đoạn được đưa lại hàng đợi khi khởi động")
+        self._shutdown_seconds = self._metrics.histogram(
+            "shougun_shutdown_seconds", "Thời gian dừng service (drain và flush)")
         
         self._status = ServiceStatus.STOPPED
         self._start_time: Optional[datetime] = None
         self._worker_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        self._shutdown_requested = threading.Event()
+        self._worker_sleep = 1.0
+        self._startup_timings: Dict[str, float] = {}
+        self._shutdown_report: Optional[ShutdownReport] = None
+        
+        # Executor xử lý task, số task đồng thời do limiter quyết định (governor có thể thu hẹp)
+        self._max_workers = 4
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Chế độ performance.worker_mode = "process": task chạy trong các process worker
+        self._worker_pool: Optional["ShardedWorkerPool"] = None
+        self._limiter = AdaptiveLimiter(self._max_workers)
+        # ID task đang chạy trong executor - không đưa lại hàng đợi khi restart trong cùng process
+        self._running_ids: Set[str] = set()
+        # Limiter đã cấp slot cho từng task đang chạy trong worker process
+        self._worker_slots: Dict[str, AdaptiveLimiter] = {}
+        self._running_lock = threading.Lock()
+        self._governor: Optional[ResourceGovernor] = None
+        self._sampler: Optional[MetricsSampler] = None
+        self._api_server = None
+        self._status_ring = None
+        self._retention: Optional[RetentionCompactor] = None
+        self._task_archive: Optional[TaskArchive] = None
+        self._task_service.subscribe(self._publish_task_transition)
         
         # Folder monitoring components
         self._json_reader = JsonReader()
-        self._folder_monitor: Optional[FolderMonitor] = None
+        self._folder_monitor: Optional["FolderMonitor"] = None
     
     def start(self) -> bool:
         """Khởi động service."""
@@ -125,17 +447,49 @@ class ShougunService(IService):
             self._status = ServiceStatus.STARTING
             self._logger.info("Starting Shougun Service...")
             
+            # Thời gian từng pha khởi động (--profile-startup, get_info)
+            self._startup_timings = {}
+            
             # Load configuration
-            if not self._config_manager.load_config("config/service.json"):
-                self._logger.warning("Failed to load config, using defaults")
+            with self._startup_phase("config"):
+                if not self._config_manager.load_config("config/service.json"):
+                    self._logger.warning("Failed to load config, using defaults")
+                self._apply_runtime_config()
+            with self._startup_phase("config_watching"):
+                self._start_config_watching()
+            
+            # Ring shared memory cho host C# - mở trước folder monitoring để không lỡ sự kiện đầu tiên
+            with self._startup_phase("status_ring"):
+                self._init_status_ring()
             
             # Initialize folder monitoring
-            self._init_folder_monitoring()
+            with self._startup_phase("folder_monitoring"):
+                self._init_folder_monitoring()
+            
+            # Start metrics sampler, task executor và resource governor
+            with self._startup_phase("sampler"):
+                self._init_sampler()
+            with self._startup_phase("recovery"):
+                self._recover_interrupted_tasks()
+            with self._startup_phase("result_gc"):
+                self._task_service.collect_result_garbage()
+            with self._startup_phase("executor"):
+                self._init_executor()
+            with self._startup_phase("governor"):
+                self._init_governor()
+            with self._startup_phase("retention"):
+                self._init_retention()
+            
+            # Start API server cho C# front end
+            with self._startup_phase("api_server"):
+                self._init_api_server()
             
             # Start worker thread
-            self._stop_event.clear()
-            self._worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-            self._worker_thread.start()
+            with self._startup_phase("worker"):
+                self._stop_event.clear()
+                self._shutdown_requested.clear()
+                self._worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
+                self._worker_thread.start()
             
             self._start_time = datetime.now()
             self._status = ServiceStatus.RUNNING
@@ -149,7 +503,10 @@ class ShougunService(IService):
             return False
     
     def stop(self) -> bool:
-        """Dừng service."""
+        """
+        Dừng service theo thứ tự: ngừng nhận việc mới, drain việc đang làm trong giới hạn
+        performance.shutdown_timeout, ghi checkpoint task bị gián đoạn rồi flush dữ liệu và log.
+        """
         try:
             if self._status == ServiceStatus.STOPPED:
                 self._logger.warning("Service is already stopped")
@@ -158,18 +515,66 @@ class ShougunService(IService):
             self._status = ServiceStatus.STOPPING
             self._logger.info("Stopping Shougun Service...")
             
-            # Stop folder monitoring
-            self._stop_folder_monitoring()
+            timeout = self._config_manager.get("performance.shutdown_timeout", 10.0)
+            if not isinstance(timeout, (int, float)) or timeout <= 0:
+                timeout = 10.0
+            report = ShutdownReport(float(timeout))
+            deadline = DrainDeadline(report.timeout, report)
             
-            # Signal worker thread to stop
-            self._stop_event.set()
+            # Ngừng nhận việc mới: API server và config hot reload
+            with deadline.phase("intake"):
+                self._stop_api_server()
+                self._stop_config_watching()
             
-            # Wait for worker thread to finish
-            if self._worker_thread and self._worker_thread.is_alive():
-                self._worker_thread.join(timeout=5.0)
+            # Observer ngừng nhận sự kiện, sự kiện đang xử lý được chờ xong
+            with deadline.phase("folder_events"):
+                if not self._stop_folder_monitoring(deadline.remaining()):
+                    deadline.mark_exceeded()
+            
+            # Worker không lấy thêm task PENDING
+            with deadline.phase("worker"):
+                self._stop_event.set()
+                if self._worker_thread and self._worker_thread.is_alive():
+                    self._worker_thread.join(timeout=deadline.remaining())
+                    if self._worker_thread.is_alive():
+                        deadline.mark_exceeded()
+            
+            # Chờ các task đang chạy trong executor hoặc worker process hoàn tất
+            with deadline.phase("tasks"):
+                if not self._limiter.wait_idle(timeout=deadline.remaining()):
+                    deadline.mark_exceeded()
+                if self._executor:
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = None
+                if self._worker_pool:
+                    if not self._worker_pool.stop(deadline.remaining()):
+                        deadline.mark_exceeded()
+                    self._worker_pool = None
+            
+            # Stop resource governor và sampler
+            with deadline.phase("background"):
+                self._stop_governor()
+                self._stop_retention()
+                if self._sampler:
+                    self._sampler.stop()
+            
+            # Task còn RUNNING lúc này là task bị gián đoạn - lần khởi động sau sẽ chạy lại
+            with deadline.phase("checkpoint"):
+                self._write_checkpoint(report)
+            
+            with deadline.phase("flush"):
+                self._task_service.flush_storage()
+                self._stop_status_ring()
+            
+            report.finished_at = datetime.now()
+            self._shutdown_report = report
+            self._shutdown_seconds.observe(report.total_seconds)
             
             self._status = ServiceStatus.STOPPED
-            self._logger.info("Shougun Service stopped successfully")
+            self._logger.info(
+                f"Shougun Service stopped successfully in {report.total_seconds:.3f}s "
+                f"({len(report.interrupted_tasks)} interrupted task(s))")
+            self._logger.flush()
             return True
             
         except Exception as e:
@@ -177,6 +582,83 @@ class ShougunService(IService):
             self._status = ServiceStatus.ERROR
             return False
     
+    def _write_checkpoint(self, report: ShutdownReport) -> None:
+        """
+        Ghi ID các task còn RUNNING vào báo cáo và file checkpoint.
+        
+        Args:
+            report: Báo cáo của lần dừng hiện tại
+        """
+        report.interrupted_tasks = [
+            task.id for task in self._task_service.get_all_tasks() if task.status == TaskStatus.RUNNING]
+        if report.interrupted_tasks:
+            self._logger.warning(f"Task bị gián đoạn khi dừng: {report.interrupted_tasks}")
+        if not self._checkpoint.save(report):
+            self._logger.error(f"Không thể ghi checkpoint: {self._checkpoint.get_path()}")
+    
+    def _recover_interrupted_tasks(self) -> None:
+        """Đưa task bị gián đoạn ở lần chạy trước (dừng quá hạn hoặc crash) về PENDING."""
+        checkpointed = set(self._checkpoint.load())
+        with self._running_lock:
+            still_running = set(self._running_ids)
+        requeued = self._task_service.requeue_interrupted(exclude=still_running)
+        if requeued:
+            self._tasks_requeued.inc(len(requeued))
+            crashed = [task_id for task_id in requeued if task_id not in checkpointed]
+            self._logger.info(f"Đưa lại hàng đợi {len(requeued)} task bị gián đoạn")
+            if crashed:
+                self._logger.warning(f"Task RUNNING không có trong checkpoint (process bị dừng đột ngột?): {crashed}")
+        self._checkpoint.clear()
+    
+    def get_shutdown_report(self) -> Optional[ShutdownReport]:
+        """
+        Lấy báo cáo của lần stop() gần nhất.
+        
+        Returns:
+            Optional[ShutdownReport]: Báo cáo hoặc None nếu service chưa dừng lần nào
+        """
+        return self._shutdown_report
+    
+    @contextmanager
+    def _startup_phase(self, name: str) -> Iterator[None]:
+        """Đo thời gian một pha của start()."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._startup_timings[name] = time.perf_counter() - start
+    
+    def get_startup_timings(self) -> Dict[str, float]:
+        """
+        Lấy thời gian từng pha của lần start() gần nhất.
+        
+        Returns:
+            Dict[str, float]: Tên pha -> số giây, theo thứ tự khởi động
+        """
+        return dict(self._startup_timings)
+    
+    def request_shutdown(self) -> None:
+        """
+        Yêu cầu process chủ dừng service (không chặn).
+        
+        Dùng khi lời gọi đến từ chính thread của service (kênh bridge, signal handler),
+        nơi không thể gọi stop() trực tiếp.
+        """
+        self._logger.info("Nhận yêu cầu dừng service")
+        self._shutdown_requested.set()
+    
+    def wait_for_shutdown_request(self, timeout: Optional[float] = None) -> bool:
+        """
+        Chờ yêu cầu dừng.
+        
+        Args:
+            timeout: Thời gian chờ tối đa (None = chờ mãi)
+            
+        Returns:
+            bool: True nếu đã có yêu cầu dừng
+        """
+        return self._shutdown_requested.wait(timeout)
+    
     def restart(self) -> bool:
         """Khởi động lại service."""
         self._logger.info("Restarting Shougun Service...")
@@ -194,19 +676,41 @@ class ShougunService(IService):
         if self._start_time:
             uptime = (datetime.now() - self._start_time).total_seconds()
         
-        process = psutil.Process()
-        memory_info = process.memory_info()
+        # Snapshot do sampler tính sẵn trong background - không gọi psutil ở đây
+        snapshot = self._sampler.get_latest() if self._sampler else None
+        if snapshot is None:
+            snapshot = empty_snapshot()
         
-        return {
+        info = {
             "name": "ShougunService",
             "version": "1.0.0",
             "status": self._status.value,
             "uptime": uptime,
-            "memory_usage": memory_info.rss / 1024 / 1024,  # MB
-            "cpu_usage": process.cpu_percent(),
-            "pid": process.pid,
-            "thread_count": process.num_threads(),
+            "memory_usage": snapshot.memory_mb,  # MB
+            "cpu_usage": snapshot.cpu_percent,
+            "pid": snapshot.pid,
+            "thread_count": snapshot.thread_count,
+            "sampled_at": snapshot.timestamp,
+            "averages": self._sampler.get_averages() if self._sampler else {},
+            "metrics": self._metrics.snapshot(),
+            "startup_seconds": dict(self._startup_timings),
         }
+        if self._shutdown_report:
+            info["last_shutdown"] = self._shutdown_report.to_dict()
+        if self._governor:
+            info["throttle"] = self._governor.get_state().to_dict()
+        if self._retention:
+            info["retention"] = self._retention.get_last_run()
+        return info
+    
+    def get_metrics_text(self) -> str:
+        """
+        Xuất metrics theo định dạng text của Prometheus.
+        
+        Returns:
+            str: Nội dung exposition
+        """
+        return render_prometheus(self._metrics)
     
     def is_running(self) -> bool:
         """Kiểm tra service có đang chạy không."""
@@ -219,10 +723,11 @@ class ShougunService(IService):
         while not self._stop_event.is_set():
             try:
                 # Do background work here
+                self._worker_cycles.inc()
                 self._process_tasks()
                 
-                # Sleep for a short interval
-                self._stop_event.wait(1.0)
+                # Sleep theo performance.worker_thread_sleep (có thể đổi khi đang chạy)
+                self._stop_event.wait(self._worker_sleep)
                 
             except Exception as e:
                 self._logger.error(f"Error in worker loop: {e}")
@@ -239,19 +744,381 @@ class ShougunService(IService):
             })
             
             for task in pending_tasks:
+                # Worker process phụ trách task đang đầy - task ở lại PENDING, thử task khác
+                if self._worker_pool and not self._worker_pool.can_accept(task.id):
+                    continue
+                
+                # Hết slot (governor có thể đã thu hẹp) - các task còn lại đợi vòng sau
+                # Slot được trả về đúng limiter đã cấp: restart tạo limiter mới trong khi task
+                # của lần chạy trước (drain quá hạn) có thể vẫn đang chạy
+                limiter = self._limiter
+                if (self._executor is None and self._worker_pool is None) or not limiter.acquire(timeout=0):
+                    break
+                
                 self._logger.debug(f"Processing task: {task.id}")
+                # updated_at là thời điểm task chuyển sang PENDING
+                self._queue_wait.observe((datetime.now() - task.updated_at).total_seconds())
                 # Update task status to running
                 self._task_service.update_task_status(task.id, TaskStatus.RUNNING)
-                
-                # Simulate task processing
-                time.sleep(0.1)
-                
-                # Mark task as completed
-                self._task_service.update_task_status(task.id, TaskStatus.COMPLETED)
+                if self._worker_pool:
+                    if not self._submit_to_worker_pool(task, limiter):
+                        # Worker đang khởi động lại - lấy lại ngay sẽ chỉ quay vòng PENDING <-> RUNNING
+                        break
+                    continue
+                try:
+                    self._executor.submit(self._run_task, task.id, limiter)
+                except RuntimeError:
+                    # Executor đã shutdown trong lúc service đang dừng - task chưa chạy, trả về hàng đợi
+                    limiter.release()
+                    self._task_service.update_task_status(task.id, TaskStatus.PENDING)
+                    break
                 
         except Exception as e:
             self._logger.error(f"Error processing tasks: {e}")
     
+    def _run_task(self, task_id: str, limiter: AdaptiveLimiter) -> None:
+        """
+        Chạy một task trong executor.
+        
+        Args:
+            task_id: ID của task
+            limiter: Limiter đã cấp slot cho task (của lần chạy lúc task được lấy)
+        """
+        self._tasks_in_flight.inc()
+        with self._running_lock:
+            self._running_ids.add(task_id)
+        start = time.perf_counter()
+        try:
+            # Simulate task processing
+            time.sleep(0.1)
+            
+            # Mark task as completed
+            self._task_service.update_task_status(task_id, TaskStatus.COMPLETED)
+        except Exception as e:
+            self._logger.error(f"Error running task {task_id}: {e}")
+            self._task_service.update_task_status(task_id, TaskStatus.FAILED)
+        finally:
+            self._run_time.observe(time.perf_counter() - start)
+            self._tasks_in_flight.dec()
+            with self._running_lock:
+                self._running_ids.discard(task_id)
+            limiter.release()
+    
+    def _submit_to_worker_pool(self, task: Task, limiter: AdaptiveLimiter) -> bool:
+        """
+        Gửi task (đã chuyển RUNNING) cho worker process phụ trách.
+        
+        Args:
+            task: Task cần chạy
+            limiter: Limiter đã cấp slot cho task
+            
+        Returns:
+            bool: False nếu worker không nhận (task đã được trả về PENDING)
+        """
+        self._tasks_in_flight.inc()
+        with self._running_lock:
+            self._running_ids.add(task.id)
+            self._worker_slots[task.id] = limiter
+        if self._worker_pool.submit(task.id, task.to_dict()):
+            return True
+        # Worker vừa crash hoặc pool đang dừng - trả task về hàng đợi
+        try:
+            self._task_service.update_task_status(task.id, TaskStatus.PENDING)
+        finally:
+            self._release_worker_slot(task.id)
+        return False
+    
+    def _on_worker_result(self, task_id: str, success: bool, error: Optional[str], seconds: float) -> None:
+        """
+        Ghi kết quả từ worker process vào repository (process chính là nơi duy nhất ghi repository).
+        
+        Args:
+            task_id: ID task
+            success: Kết quả
+            error: Thông điệp lỗi nếu thất bại
+            seconds: Thời gian xử lý trong worker
+        """
+        try:
+            if success:
+                self._task_service.update_task_status(task_id, TaskStatus.COMPLETED)
+            else:
+                self._logger.error(f"Error running task {task_id}: {error}")
+                self._task_service.update_task_status(task_id, TaskStatus.FAILED)
+        finally:
+            self._run_time.observe(seconds)
+            self._release_worker_slot(task_id)
+    
+    def _release_worker_slot(self, task_id: str) -> None:
+        """Trả slot của task chạy trong worker process cho limiter đã cấp."""
+        with self._running_lock:
+            limiter = self._worker_slots.pop(task_id, None)
+            self._running_ids.discard(task_id)
+        if limiter is not None:
+            self._tasks_in_flight.dec()
+            limiter.release()
+    
+    def _init_executor(self) -> None:
+        """Khởi tạo executor theo performance.max_workers hoặc worker process theo performance.worker_mode."""
+        max_workers = self._config_manager.get("performance.max_workers", 4)
+        if not isinstance(max_workers, int) or max_workers < 1:
+            max_workers = 4
+        
+        if self._config_manager.get("performance.worker_mode", "thread") == "process":
+            self._worker_pool = self._create_worker_pool()
+        
+        if self._worker_pool:
+            max_workers = self._worker_pool.get_capacity()
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ShougunTask")
+        self._max_workers = max_workers
+        self._limiter = AdaptiveLimiter(max_workers)
+    
+    def _create_worker_pool(self) -> Optional["ShardedWorkerPool"]:
+        """Khởi động worker process theo performance.worker_processes (mặc định bằng số CPU)."""
+        processes = self._config_manager.get("performance.worker_processes")
+        if not isinstance(processes, int) or processes < 1:
+            processes = os.cpu_count() or 1
+        
+        # Import muộn: chỉ nạp multiprocessing khi bật chế độ process
+        from .worker_pool import ShardedWorkerPool
+        
+        pool = ShardedWorkerPool(self._logger, processes, self._on_worker_result, metrics=self._metrics)
+        if not pool.start():
+            self._logger.warning("Không thể khởi động worker process - dùng thread executor")
+            return None
+        return pool
+    
+    def _init_sampler(self) -> None:
+        """Khởi tạo metrics sampler theo performance.metrics_interval."""
+        interval = self._config_manager.get("performance.metrics_interval", 1.0)
+        if not isinstance(interval, (int, float)) or interval <= 0:
+            interval = 1.0
+        # Giữ sampler qua các lần restart để không mất lịch sử trung bình 1/5/15 phút
+        if self._sampler is None:
+            self._sampler = MetricsSampler(self._logger, float(interval))
+            sampler = self._sampler
+            self._metrics.gauge("shougun_process_resident_memory_mb", "RSS của process (MB)").set_function(
+                lambda: (sampler.get_latest() or empty_snapshot()).memory_mb)
+            self._metrics.gauge("shougun_process_cpu_percent", "CPU của process (%)").set_function(
+                lambda: (sampler.get_latest() or empty_snapshot()).cpu_percent)
+        self._sampler.start()
+    
+    def _init_governor(self) -> None:
+        """Khởi tạo resource governor cho max_memory_mb và cpu_threshold."""
+        self._governor = ResourceGovernor(
+            self._logger,
+            self._config_manager,
+            self._max_workers,
+            self._sampler.get_latest_usage,
+        )
+        self._governor.subscribe(self._on_governor_state)
+        self._governor.add_reclaimer(self._reclaim_memory)
+        self._governor.start()
+    
+    def _init_retention(self) -> None:
+        """Khởi tạo compactor theo cấu hình retention (không bắt buộc)."""
+        if not self._config_manager.get("retention.enabled", False):
+            return
+        policies = load_policies(self._config_manager)
+        if not policies:
+            self._logger.warning("retention.enabled bật nhưng không có chính sách nào - bỏ qua compactor")
+            return
+        
+        self._task_archive = TaskArchive(self._config_manager.get("retention.archive_dir", "data/archive"))
+        self._retention = RetentionCompactor(
+            self._logger,
+            self._task_service,
+            self._task_archive,
+            policies,
+            float(self._config_manager.get("retention.interval", 3600)),
+            self._metrics,
+        )
+        self._retention.start()
+    
+    def _stop_retention(self) -> None:
+        """Dừng compactor."""
+        if self._retention:
+            self._retention.stop()
+            self._retention = None
+    
+    def get_task_archive(self) -> Optional[TaskArchive]:
+        """
+        Lấy archive chứa task đã hết hạn.
+        
+        Returns:
+            Optional[TaskArchive]: Archive hoặc None nếu retention không bật
+        """
+        return self._task_archive
+    
+    def _stop_governor(self) -> None:
+        """Dừng resource governor."""
+        if self._governor:
+            self._governor.stop()
+            self._governor = None
+    
+    def _on_governor_state(self, state: GovernorState) -> None:
+        """
+        Áp dụng trạng thái điều tiết từ governor.
+        
+        Args:
+            state: Trạng thái điều tiết mới
+        """
+        self._limiter.set_limit(state.concurrency)
+        
+        if self._folder_monitor:
+            if state.intake_paused and not self._folder_monitor.is_intake_paused():
+                self._folder_monitor.pause_intake()
+            elif not state.intake_paused and self._folder_monitor.is_intake_paused():
+                self._folder_monitor.resume_intake()
+    
+    def _init_status_ring(self) -> None:
+        """Tạo ring shared memory đẩy sự kiện trạng thái sang host C# (không bắt buộc)."""
+        if not self._config_manager.get("integration.shm_ring_enabled", False):
+            return
+        
+        try:
+            # Import muộn: integration phụ thuộc ngược vào services
+            from ..integration.shm_ring import ShmRingProducer
+            
+            self._status_ring = ShmRingProducer(
+                self._config_manager.get("integration.shm_ring_name", "shougun_status"),
+                self._config_manager.get("integration.shm_ring_capacity", 4096),
+                self._metrics,
+            )
+            self._logger.info(f"Ring trạng thái shared memory: {self._status_ring.name}")
+        except Exception as e:
+            self._logger.warning(f"Không thể tạo ring shared memory: {e} - tiếp tục chạy service mà không có ring")
+            self._status_ring = None
+    
+    def _stop_status_ring(self) -> None:
+        """Đóng và xóa ring shared memory."""
+        ring, self._status_ring = self._status_ring, None
+        if ring:
+            try:
+                ring.close()
+            except Exception as e:
+                self._logger.error(f"Lỗi khi đóng ring shared memory: {e}")
+    
+    def _publish_task_transition(self, task: Task) -> None:
+        """Đẩy sự kiện chuyển trạng thái task vào ring."""
+        ring = self._status_ring
+        if ring:
+            ring.publish_task(task.id, task.status)
+    
+    def _init_api_server(self) -> None:
+        """Khởi tạo API server theo integration.api_port (không bắt buộc)."""
+        if not self._config_manager.get("integration.api_enabled", False):
+            return
+        
+        try:
+            # Import muộn: integration phụ thuộc ngược vào services
+            from ..integration.api_server import ApiServer
+            
+            self._api_server = ApiServer(
+                self._logger,
+                self,
+                self._task_service,
+                self.get_metrics_text,
+                host=self._config_manager.get("integration.api_host", "127.0.0.1"),
+                port=self._config_manager.get("integration.api_port", 8080),
+                unix_socket=self._config_manager.get("integration.unix_socket") or None,
+                idle_timeout=float(self._config_manager.get("integration.timeout_seconds", 30)),
+            )
+            if not self._api_server.start():
+                self._logger.warning("Không thể khởi động API server - tiếp tục chạy service mà không có API")
+                self._api_server = None
+        except Exception as e:
+            self._logger.warning(f"Lỗi khi khởi tạo API server: {e} - tiếp tục chạy service mà không có API")
+            self._api_server = None
+    
+    def _stop_api_server(self) -> None:
+        """Dừng API server."""
+        try:
+            if self._api_server:
+                self._api_server.stop()
+                self._api_server = None
+        except Exception as e:
+            self._logger.error(f"Lỗi khi dừng API server: {e}")
+    
+    def get_task_service(self) -> TaskService:
+        """
+        Lấy TaskService của service.
+        
+        Returns:
+            TaskService: Service quản lý task
+        """
+        return self._task_service
+    
+    def get_config_manager(self) -> IConfigManager:
+        """
+        Lấy config manager của service.
+    
+        Returns:
+            IConfigManager: Config manager
+        """
+        return self._config_manager
+    
+    def get_api_port(self) -> Optional[int]:
+        """
+        Lấy cổng TCP mà API server đang lắng nghe.
+        
+        Returns:
+            Optional[int]: Cổng hoặc None nếu API server không chạy
+        """
+        if self._api_server:
+            return self._api_server.get_port()
+        return None
+    
+    def _reclaim_memory(self) -> None:
+        """Giải phóng cache và compact repository khi quá tải bộ nhớ."""
+        if self._folder_monitor:
+            self._folder_monitor.evict_caches()
+        self._json_reader.clear_processed_files()
+        self._task_service.compact_storage()
+        gc.collect()
+    
+    def _apply_runtime_config(self) -> None:
+        """Áp dụng các giá trị cấu hình có thể thay đổi khi đang chạy."""
+        worker_sleep = self._config_manager.get("performance.worker_thread_sleep", 1.0)
+        if isinstance(worker_sleep, (int, float)) and worker_sleep > 0:
+            self._worker_sleep = float(worker_sleep)
+        
+        level = self._config_manager.get("logging.level")
+        if isinstance(level, str) and level.upper() in LogLevel.__members__:
+            new_level = LogLevel[level.upper()]
+            if new_level != self._logger.get_level():
+                self._logger.set_level(new_level)
+    
+    def _on_config_changed(self, changes: ConfigDiff) -> None:
+        """
+        Callback khi file cấu hình được sửa trong lúc service đang chạy.
+        
+        Args:
+            changes: Các key thay đổi và giá trị (cũ, mới)
+        """
+        self._logger.info(f"Áp dụng cấu hình mới: {sorted(changes)}")
+        self._apply_runtime_config()
+    
+    def _start_config_watching(self) -> None:
+        """Bật hot reload nếu config manager hỗ trợ."""
+        if not isinstance(self._config_manager, IReloadableConfig):
+            return
+        
+        self._config_manager.subscribe(self._on_config_changed)
+        if not self._config_manager.start_watching():
+            self._logger.warning("Không thể theo dõi file cấu hình - hot reload bị tắt")
+    
+    def _stop_config_watching(self) -> None:
+        """Tắt hot reload."""
+        if not isinstance(self._config_manager, IReloadableConfig):
+            return
+        
+        try:
+            self._config_manager.stop_watching()
+            self._config_manager.unsubscribe(self._on_config_changed)
+        except Exception as e:
+            self._logger.error(f"Lỗi khi dừng theo dõi file cấu hình: {e}")
+    
     def _init_folder_monitoring(self) -> None:
         """Khởi tạo folder monitoring."""
         try:
@@ -262,12 +1129,18 @@ class ShougunService(IService):
                 
                 # Xử lý dữ liệu JSON
                 if self._json_reader.process_json_data(file_path, data):
+                    ring = self._status_ring
+                    if ring:
+                        ring.publish_device(str(data.get("device_id") or Path(file_path).stem), str(data.get("status")))
                     self._logger.info(f"Đã xử lý thành công file JSON: {file_path}")
                 else:
                     self._logger.warning(f"Không thể xử lý file JSON: {file_path}")
             
             # Tạo folder monitor
-            self._folder_monitor = FolderMonitor(json_callback)
+            # Import muộn: watchdog chỉ được nạp khi thật sự bật folder monitoring
+            from ..monitors.folder_monitor import FolderMonitor
+            
+            self._folder_monitor = FolderMonitor(json_callback, self._metrics)
             
             # Bắt đầu theo dõi (không bắt buộc)
             if self._folder_monitor.start_monitoring():
@@ -283,14 +1156,25 @@ class ShougunService(IService):
             self._logger.warning(f"Lỗi khi khởi tạo folder monitoring: {e} - tiếp tục chạy service mà không có folder monitoring")
             self._folder_monitor = None  # Set về None để tránh lỗi
     
-    def _stop_folder_monitoring(self) -> None:
-        """Dừng folder monitoring."""
+    def _stop_folder_monitoring(self, timeout: Optional[float] = None) -> bool:
+        """
+        Dừng folder monitoring.
+        
+        Args:
+            timeout: Thời gian chờ sự kiện đang xử lý (None = chờ mãi)
+            
+        Returns:
+            bool: True nếu đã dừng hẳn trong thời gian chờ
+        """
         try:
             if self._folder_monitor:
-                self._folder_monitor.stop_monitoring()
+                stopped = self._folder_monitor.stop_monitoring(timeout)
                 self._logger.info("Đã dừng theo dõi folder")
+                return stopped
+            return True
         except Exception as e:
             self._logger.error(f"Lỗi khi dừng folder monitoring: {e}")
+            return False
     
     def get_monitored_folder_path(self) -> Optional[str]:
         """
@@ -0,0 +1,585 @@
+"""
+Service chạy trên một event loop asyncio duy nhất.
+
+Khác với ShougunService (mỗi task chiếm một thread trong executor), task ở đây là coroutine:
+số task đồng thời chỉ bị giới hạn bởi semaphore, không bởi số thread. Thread chỉ còn dùng cho
+I/O file của repository (executor nhỏ) và cho observer của watchdog.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from ..core.config_interface import ConfigDiff, IConfigManager, IReloadableConfig
+from ..core.logger_interface import ILogger
+from ..core.service_interface import IService, ServiceStatus
+from ..metrics import MetricsRegistry, get_default_registry, render_prometheus
+from ..models import Task, TaskStatus
+from ..monitors.json_reader import JsonReader
+from . import TaskService
+from .shutdown import DrainDeadline, ShutdownCheckpoint, ShutdownReport
+
+if TYPE_CHECKING:
+    from ..monitors.folder_monitor import FolderMonitor
+
+T = TypeVar("T")
+TaskHandler = Callable[[Task], Awaitable[None]]
+
+
+async def _simulate_task(task: Task) -> None:
+    """Handler mặc định - giống thời gian xử lý giả lập của ShougunService."""
+    await asyncio.sleep(0.1)
+
+
+class AsyncShougunService(IService):
+    """
+    Implementation của IService dựa trên asyncio.
+
+    - Sự kiện folder từ thread của watchdog được chuyển vào loop bằng call_soon_threadsafe
+    - Task chạy dưới dạng coroutine, giới hạn bởi performance.async_max_tasks
+    - Thao tác repository (ghi file JSON) chạy trong executor để không chặn loop
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ quản lý lifecycle và lịch chạy task trên event loop
+    """
+
+    def __init__(
+        self,
+        logger: ILogger,
+        config_manager: IConfigManager,
+        task_service: TaskService,
+        metrics: Optional[MetricsRegistry] = None,
+        checkpoint: Optional[ShutdownCheckpoint] = None,
+        task_handler: Optional[TaskHandler] = None
+    ):
+        """
+        Khởi tạo service.
+
+        Args:
+            logger: Logger
+            config_manager: Config manager
+            task_service: Service quản lý task
+            metrics: Registry để ghi metrics (mặc định dùng registry của process)
+            checkpoint: Checkpoint task bị gián đoạn khi dừng
+            task_handler: Coroutine xử lý một task (mặc định giả lập 0.1 giây)
+        """
+        self._logger = logger
+        self._config_manager = config_manager
+        self._task_service = task_service
+        self._metrics = metrics or get_default_registry()
+        self._checkpoint = checkpoint or ShutdownCheckpoint()
+        self._task_handler = task_handler or _simulate_task
+
+        # Cùng tên metric với ShougunService - hai service không chạy cùng lúc trong một process
+        self._queue_wait = self._metrics.histogram(
+            "shougun_task_queue_wait_seconds", "Thời gian task chờ ở trạng thái PENDING trước khi chạy")
+        self._run_time = self._metrics.histogram(
+            "shougun_task_run_seconds", "Thời gian chạy một task")
+        self._tasks_in_flight = self._metrics.gauge(
+            "shougun_tasks_in_flight", "Số task đang chạy trong executor")
+        self._tasks_requeued = self._metrics.counter(
+            "shougun_tasks_requeued_total", "Số task RUNNING bị gián đoạn được đưa lại hàng đợi khi khởi động")
+        self._shutdown_seconds = self._metrics.histogram(
+            "shougun_shutdown_seconds", "Thời gian dừng service (drain và flush)")
+
+        self._status = ServiceStatus.STOPPED
+        self._start_time: Optional[datetime] = None
+        self._shutdown_requested = threading.Event()
+        self._startup_timings: Dict[str, float] = {}
+        self._shutdown_report: Optional[ShutdownReport] = None
+        self._max_concurrency = 1000
+        self._poll_interval = 1.0
+
+        # Trạng thái của event loop - chỉ được truy cập từ thread của loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._running: Dict[str, asyncio.Task] = {}
+
+        self._json_reader = JsonReader()
+        self._folder_monitor: Optional["FolderMonitor"] = None
+        self._task_service.subscribe(self._on_task_changed)
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self) -> bool:
+        """Khởi động service."""
+        try:
+            if self._status == ServiceStatus.RUNNING:
+                self._logger.warning("Service is already running")
+                return True
+
+            self._status = ServiceStatus.STARTING
+            self._logger.info("Starting Async Shougun Service...")
+            self._startup_timings = {}
+            self._shutdown_requested.clear()
+
+            with self._startup_phase("config"):
+                if not self._config_manager.load_config("config/service.json"):
+                    self._logger.warning("Failed to load config, using defaults")
+                self._apply_config()
+            with self._startup_phase("config_watching"):
+                self._start_config_watching()
+            with self._startup_phase("recovery"):
+                self._recover_interrupted_tasks()
+            with self._startup_phase("result_gc"):
+                self._task_service.collect_result_garbage()
+            with self._startup_phase("event_loop"):
+                if not self._start_loop():
+                    raise RuntimeError("event loop did not start")
+            # Monitor khởi động sau loop: callback của watchdog cần loop để chuyển sự kiện vào
+            with self._startup_phase("folder_monitoring"):
+                self._init_folder_monitoring()
+
+            self._start_time = datetime.now()
+            self._status = ServiceStatus.RUNNING
+            self._logger.info(f"Async Shougun Service started (max {self._max_concurrency} concurrent tasks)")
+            return True
+
+        except Exception as e:
+            self._logger.error(f"Failed to start service: {e}")
+            self._stop_loop(1.0)
+            self._status = ServiceStatus.ERROR
+            return False
+
+    def stop(self) -> bool:
+        """Dừng service: ngừng nhận việc, drain coroutine đang chạy rồi ghi checkpoint và flush."""
+        try:
+            if self._status == ServiceStatus.STOPPED:
+                self._logger.warning("Service is already stopped")
+                return True
+
+            self._status = ServiceStatus.STOPPING
+            self._logger.info("Stopping Async Shougun Service...")
+
+            timeout = self._config_manager.get("performance.shutdown_timeout", 10.0)
+            if not isinstance(timeout, (int, float)) or timeout <= 0:
+                timeout = 10.0
+            report = ShutdownReport(float(timeout))
+            deadline = DrainDeadline(report.timeout, report)
+
+            with deadline.phase("intake"):
+                self._stop_config_watching()
+            with deadline.phase("folder_events"):
+                if self._folder_monitor and not self._folder_monitor.stop_monitoring(deadline.remaining()):
+                    deadline.mark_exceeded()
+                self._folder_monitor = None
+            with deadline.phase("tasks"):
+                if not self._drain(deadline.remaining()):
+                    deadline.mark_exceeded()
+            with deadline.phase("event_loop"):
+                if not self._stop_loop(deadline.remaining()):
+                    deadline.mark_exceeded()
+            with deadline.phase("checkpoint"):
+                report.interrupted_tasks = [task.id for task in self._task_service.get_tasks_by_status(TaskStatus.RUNNING)]
+                if report.interrupted_tasks:
+                    self._logger.warning(f"Task bị gián đoạn khi dừng: {report.interrupted_tasks}")
+                if not self._checkpoint.save(report):
+                    self._logger.error(f"Không thể ghi checkpoint: {self._checkpoint.get_path()}")
+            with deadline.phase("flush"):
+                self._task_service.flush_storage()
+
+            report.finished_at = datetime.now()
+            self._shutdown_report = report
+            self._shutdown_seconds.observe(report.total_seconds)
+            self._status = ServiceStatus.STOPPED
+            self._logger.info(f"Async Shougun Service stopped in {report.total_seconds:.3f}s")
+            self._logger.flush()
+            return True
+
+        except Exception as e:
+            self._logger.error(f"Failed to stop service: {e}")
+            self._status = ServiceStatus.ERROR
+            return False
+
+    def restart(self) -> bool:
+        """Khởi động lại service."""
+        self._logger.info("Restarting Async Shougun Service...")
+        if self.stop():
+            return self.start()
+        return False
+
+    def request_shutdown(self) -> None:
+        """Yêu cầu process chủ dừng service (không chặn)."""
+        self._logger.info("Nhận yêu cầu dừng service")
+        self._shutdown_requested.set()
+
+    def wait_for_shutdown_request(self, timeout: Optional[float] = None) -> bool:
+        """
+        Chờ yêu cầu dừng.
+
+        Args:
+            timeout: Thời gian chờ tối đa (None = chờ mãi)
+
+        Returns:
+            bool: True nếu đã có yêu cầu dừng
+        """
+        return self._shutdown_requested.wait(timeout)
+
+    # ------------------------------------------------------------------ truy vấn
+
+    def get_status(self) -> ServiceStatus:
+        """Lấy trạng thái hiện tại của service."""
+        return self._status
+
+    def is_running(self) -> bool:
+        """Kiểm tra service có đang chạy không."""
+        return self._status == ServiceStatus.RUNNING
+
+    def get_info(self) -> Dict[str, Any]:
+        """Lấy thông tin về service."""
+        uptime = 0.0
+        if self._start_time:
+            uptime = (datetime.now() - self._start_time).total_seconds()
+        info = {
+            "name": "AsyncShougunService",
+            "version": "1.0.0",
+            "status": self._status.value,
+            "uptime": uptime,
+            "thread_count": threading.active_count(),
+            "tasks_in_flight": len(self._running),
+            "max_concurrency": self._max_concurrency,
+            "metrics": self._metrics.snapshot(),
+            "startup_seconds": dict(self._startup_timings),
+        }
+        if self._shutdown_report:
+            info["last_shutdown"] = self._shutdown_report.to_dict()
+        return info
+
+    def get_metrics_text(self) -> str:
+        """Xuất metrics theo định dạng text của Prometheus."""
+        return render_prometheus(self._metrics)
+
+    def get_task_service(self) -> TaskService:
+        """Lấy TaskService của service."""
+        return self._task_service
+
+    def get_config_manager(self) -> IConfigManager:
+        """Lấy config manager của service."""
+        return self._config_manager
+
+    def get_startup_timings(self) -> Dict[str, float]:
+        """Lấy thời gian từng pha của lần start() gần nhất."""
+        return dict(self._startup_timings)
+
+    def get_shutdown_report(self) -> Optional[ShutdownReport]:
+        """Lấy báo cáo của lần stop() gần nhất."""
+        return self._shutdown_report
+
+    # ------------------------------------------------------------------ event loop
+
+    def _start_loop(self, timeout: float = 5.0) -> bool:
+        """Tạo event loop trong thread nền và chờ dispatcher sẵn sàng."""
+        self._ready.clear()
+        io_workers = self._config_manager.get("performance.max_workers", 4)
+        if not isinstance(io_workers, int) or io_workers < 1:
+            io_workers = 4
+        self._io_executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="ShougunAsyncIO")
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="AsyncShougunService", daemon=True)
+        self._thread.start()
+        return self._ready.wait(timeout)
+
+    def _run_loop(self) -> None:
+        """Thân thread: chạy event loop cho đến khi _stop_loop()."""
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        loop.set_default_executor(self._io_executor)
+        try:
+            loop.run_until_complete(self._setup_loop())
+            self._ready.set()
+            loop.run_forever()
+        except Exception as e:
+            self._logger.error(f"Lỗi event loop: {e}")
+        finally:
+            pending = [task for task in asyncio.all_tasks(loop) if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    async def _setup_loop(self) -> None:
+        """Tạo primitive asyncio (phải gắn với loop đang chạy) và dispatcher."""
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._running = {}
+        self._dispatcher = asyncio.create_task(self._dispatch_loop(), name="dispatcher")
+
+    def _stop_loop(self, timeout: float) -> bool:
+        """
+        Dừng event loop và executor I/O.
+
+        Args:
+            timeout: Thời gian tối đa chờ thread của loop dừng
+
+        Returns:
+            bool: True nếu loop đã dừng trước timeout
+        """
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(loop.stop)
+            except RuntimeError:
+                # Loop đã đóng giữa lúc kiểm tra và lúc gọi
+                pass
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        stopped = not (self._thread and self._thread.is_alive())
+        if self._io_executor:
+            # Loop chưa dừng kịp thì không chờ thêm I/O của nó - deadline đã hết
+            self._io_executor.shutdown(wait=stopped, cancel_futures=True)
+        self._thread = None
+        self._loop = None
+        self._io_executor = None
+        return stopped
+
+    def _drain(self, timeout: float) -> bool:
+        """
+        Dừng dispatcher và chờ các task coroutine đang chạy.
+
+        Args:
+            timeout: Thời gian chờ tối đa
+
+        Returns:
+            bool: True nếu mọi task hoàn tất trước timeout
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return True
+        future = asyncio.run_coroutine_threadsafe(self._drain_async(timeout), loop)
+        try:
+            # Dư 1 giây cho phần hủy task quá hạn
+            return future.result(timeout + 1.0)
+        except Exception as e:
+            self._logger.error(f"Lỗi khi drain task: {e}")
+            return False
+
+    async def _drain_async(self, timeout: float) -> bool:
+        """Phần chạy trên loop của _drain()."""
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        running = list(self._running.values())
+        if not running:
+            return True
+        _, pending = await asyncio.wait(running, timeout=timeout)
+        # Task bị hủy giữ trạng thái RUNNING và được ghi vào checkpoint
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        return not pending
+
+    async def _run_io(self, function: Callable[..., T], *args: Any) -> T:
+        """Chạy lời gọi có I/O file (repository) trong executor để không chặn event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    # ------------------------------------------------------------------ task
+
+    async def _dispatch_loop(self) -> None:
+        """Lấy task PENDING và chạy dưới dạng coroutine, thức dậy khi có task mới hoặc hết poll interval."""
+        while True:
+            self._wakeup.clear()
+            try:
+                while await self._dispatch_batch():
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._logger.error(f"Error dispatching tasks: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch_batch(self) -> bool:
+        """
+        Chờ một slot trống rồi khởi chạy một lô task PENDING.
+
+        Danh sách PENDING được đọc lại sau mỗi lần chờ slot: task bị hủy hoặc đổi trạng thái trong
+        lúc chờ không được chạy.
+
+        Returns:
+            bool: False nếu không còn task PENDING nào
+        """
+        # Hết slot thì dispatcher chờ ở đây - đây cũng là backpressure cho hàng đợi
+        await self._semaphore.acquire()
+        slots = 1
+        try:
+            pending = await self._run_io(self._task_service.get_tasks_by_status, TaskStatus.PENDING)
+            batch = [task for task in pending if task.id not in self._running]
+            # Lấy thêm mọi slot đang trống (không chờ) để chuyển cả lô sang RUNNING
+            while len(batch) > slots and not self._semaphore.locked():
+                await self._semaphore.acquire()
+                slots += 1
+        except BaseException:
+            for _ in range(slots):
+                self._semaphore.release()
+            raise
+        if not batch:
+            self._semaphore.release()
+            return False
+        await self._start_batch(batch[:slots])
+        return True
+
+    async def _start_batch(self, batch: List[Task]) -> None:
+        """
+        Chuyển một lô task sang RUNNING với một lần ghi repository rồi chạy từng task.
+
+        Task không còn PENDING lúc ghi (bị hủy, đổi trạng thái) được bỏ qua và trả slot.
+
+        Args:
+            batch: Các task PENDING, mỗi task đã giữ một slot của semaphore
+        """
+        # updated_at là thời điểm task chuyển sang PENDING - đọc trước khi bị ghi đè bởi RUNNING
+        queued_at = [task.updated_at for task in batch]
+        started = set(await self._run_io(
+            self._task_service.update_tasks_status, [task.id for task in batch], TaskStatus.RUNNING,
+            TaskStatus.PENDING))
+        now = datetime.now()
+        for task, since in zip(batch, queued_at):
+            if task.id not in started:
+                self._semaphore.release()
+                continue
+            self._queue_wait.observe((now - since).total_seconds())
+            self._running[task.id] = asyncio.create_task(self._run_task(task), name=task.id)
+
+    async def _run_task(self, task: Task) -> None:
+        """
+        Chạy một task.
+
+        Args:
+            task: Task đã chuyển sang RUNNING
+        """
+        self._tasks_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self._task_handler(task)
+            await self._run_io(self._task_service.update_task_status, task.id, TaskStatus.COMPLETED)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._logger.error(f"Error running task {task.id}: {e}")
+            await self._run_io(self._task_service.update_task_status, task.id, TaskStatus.FAILED)
+        finally:
+            self._run_time.observe(time.perf_counter() - start)
+            self._tasks_in_flight.dec()
+            self._running.pop(task.id, None)
+            self._semaphore.release()
+
+    def _on_task_changed(self, task: Task) -> None:
+        """Đánh thức dispatcher khi có task PENDING mới (được gọi từ bất kỳ thread nào)."""
+        if task.status != TaskStatus.PENDING:
+            return
+        loop = self._loop
+        wakeup = self._wakeup
+        if loop is None or wakeup is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            # Loop đã đóng
+            pass
+
+    def _recover_interrupted_tasks(self) -> None:
+        """Đưa task bị gián đoạn ở lần chạy trước về PENDING."""
+        checkpointed = set(self._checkpoint.load())
+        requeued = self._task_service.requeue_interrupted()
+        if requeued:
+            self._tasks_requeued.inc(len(requeued))
+            crashed = [task_id for task_id in requeued if task_id not in checkpointed]
+            self._logger.info(f"Đưa lại hàng đợi {len(requeued)} task bị gián đoạn")
+            if crashed:
+                self._logger.warning(f"Task RUNNING không có trong checkpoint (process bị dừng đột ngột?): {crashed}")
+        self._checkpoint.clear()
+
+    # ------------------------------------------------------------------ folder
+
+    def _init_folder_monitoring(self) -> None:
+        """Khởi tạo folder monitoring, callback được chuyển vào event loop."""
+        try:
+            # Import muộn: watchdog chỉ được nạp khi thật sự bật folder monitoring
+            from ..monitors.folder_monitor import FolderMonitor
+
+            self._folder_monitor = FolderMonitor(self._on_folder_file, self._metrics)
+            if self._folder_monitor.start_monitoring():
+                self._folder_monitor.scan_existing_files()
+            else:
+                self._logger.warning("Không thể bắt đầu theo dõi folder - tiếp tục chạy service mà không có folder monitoring")
+                self._folder_monitor = None
+        except Exception as e:
+            self._logger.warning(f"Lỗi khi khởi tạo folder monitoring: {e} - tiếp tục chạy service mà không có folder monitoring")
+            self._folder_monitor = None
+
+    def _on_folder_file(self, file_path: str, data: Dict[str, Any]) -> None:
+        """Callback trên thread của watchdog: chuyển sự kiện vào event loop."""
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._handle_folder_file, file_path, data)
+        except RuntimeError:
+            # Loop đã đóng trong lúc service đang dừng
+            pass
+
+    def _handle_folder_file(self, file_path: str, data: Dict[str, Any]) -> None:
+        """Xử lý file JSON trên event loop."""
+        if self._json_reader.process_json_data(file_path, data):
+            self._logger.info(f"Đã xử lý thành công file JSON: {file_path}")
+        else:
+            self._logger.warning(f"Không thể xử lý file JSON: {file_path}")
+
+    # ------------------------------------------------------------------ config
+
+    @contextmanager
+    def _startup_phase(self, name: str) -> Iterator[None]:
+        """Đo thời gian một pha của start()."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._startup_timings[name] = time.perf_counter() - start
+
+    def _apply_config(self) -> None:
+        """Đọc giới hạn concurrency và chu kỳ poll."""
+        max_tasks = self._config_manager.get("performance.async_max_tasks", 1000)
+        if isinstance(max_tasks, int) and max_tasks >= 1:
+            self._max_concurrency = max_tasks
+        poll_interval = self._config_manager.get("performance.worker_thread_sleep", 1.0)
+        if isinstance(poll_interval, (int, float)) and poll_interval > 0:
+            self._poll_interval = float(poll_interval)
+
+    def _start_config_watching(self) -> None:
+        """Bật hot reload nếu config manager hỗ trợ (chỉ chu kỳ poll được áp dụng ngay)."""
+        if not isinstance(self._config_manager, IReloadableConfig):
+            return
+        self._config_manager.subscribe(self._on_config_changed)
+        if not self._config_manager.start_watching():
+            self._logger.warning("Không thể theo dõi file cấu hình - hot reload bị tắt")
+
+    def _stop_config_watching(self) -> None:
+        """Tắt hot reload."""
+        if not isinstance(self._config_manager, IReloadableConfig):
+            return
+        try:
+            self._config_manager.stop_watching()
+            self._config_manager.unsubscribe(self._on_config_changed)
+        except Exception as e:
+            self._logger.error(f"Lỗi khi dừng theo dõi file cấu hình: {e}")
+
+    def _on_config_changed(self, changes: ConfigDiff) -> None:
+        """Callback hot reload."""
+        poll_interval = self._config_manager.get("performance.worker_thread_sleep", 1.0)
+        if isinstance(poll_interval, (int, float)) and poll_interval > 0:
+            self._poll_interval = float(poll_interval)
@@ -0,0 +1,82 @@
+"""
+Giới hạn concurrency có thể điều chỉnh khi đang chạy.
+"""
+
+import threading
+from typing import Optional
+
+
+class AdaptiveLimiter:
+    """
+    Semaphore có giới hạn thay đổi được.
+
+    ThreadPoolExecutor không cho phép đổi số worker sau khi tạo, nên số task chạy đồng thời
+    được giới hạn bằng limiter này. Khi giảm giới hạn, các task đang chạy không bị hủy;
+    chỉ các task mới phải chờ đến khi số task đang chạy xuống dưới giới hạn mới.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ quản lý số lượng slot chạy đồng thời
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        self._limit = limit
+        self._in_use = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Lấy một slot.
+
+        Args:
+            timeout: Thời gian chờ tối đa (None = chờ mãi, 0 = không chờ)
+
+        Returns:
+            bool: True nếu lấy được slot
+        """
+        with self._condition:
+            acquired = self._condition.wait_for(lambda: self._in_use < self._limit, timeout=timeout)
+            if acquired:
+                self._in_use += 1
+            return acquired
+
+    def release(self) -> None:
+        """Trả lại một slot."""
+        with self._condition:
+            if self._in_use > 0:
+                self._in_use -= 1
+            # notify_all: ngoài thread chờ slot còn có thread chờ idle (wait_idle)
+            self._condition.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Chờ đến khi không còn slot nào được sử dụng.
+
+        Args:
+            timeout: Thời gian chờ tối đa (None = chờ mãi)
+
+        Returns:
+            bool: True nếu mọi slot đã được trả trước timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._in_use == 0, timeout=timeout)
+
+    def set_limit(self, limit: int) -> None:
+        """
+        Đổi giới hạn concurrency.
+
+        Args:
+            limit: Giới hạn mới (tối thiểu 1)
+        """
+        with self._condition:
+            self._limit = max(1, limit)
+            self._condition.notify_all()
+
+    def get_limit(self) -> int:
+        """Lấy giới hạn hiện tại."""
+        return self._limit
+
+    def in_use(self) -> int:
+        """Lấy số slot đang được sử dụng."""
+        return self._in_use
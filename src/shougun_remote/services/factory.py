@@ -2,59 +2,235 @@
 Dependency injection container và factory.
 """
 
-from typing import Any, Dict, Type, TypeVar, Optional
+import inspect
+import threading
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar, Union, get_args, get_origin, get_type_hints
 from ..core.service_interface import IService
 from ..core.logger_interface import ILogger, LogLevel
 from ..core.config_interface import IConfigManager
+from ..core.result_store_interface import IResultStore
 from ..config import ConfigManager
 from ..config.logger import LoguruLogger
-from ..repositories import FileRepository
+from ..repositories import FileRepository, ResultStore
 from . import ShougunService, TaskService
 from ..models import Task
 
 T = TypeVar('T')
 
+# (tên tham số, key dependency) - kế hoạch inject của một registration
+ResolutionPlan = List[Tuple[str, Any]]
+
+
+class Lifetime(Enum):
+    """Vòng đời của service trong container."""
+    SINGLETON = "singleton"  # Một instance cho cả container
+    TRANSIENT = "transient"  # Instance mới mỗi lần resolve
+    SCOPED = "scoped"        # Một instance cho mỗi DIScope
+
+
+class _Registration:
+    """Thông tin đăng ký của một service."""
+    
+    __slots__ = ("key", "implementation", "lifetime", "plan")
+    
+    def __init__(self, key: Any, implementation: Callable[..., Any], lifetime: Lifetime):
+        self.key = key
+        self.implementation = implementation
+        self.lifetime = lifetime
+        self.plan: Optional[ResolutionPlan] = None
+
 
 class DIContainer:
     """
     Dependency Injection Container.
     
+    Implementation là class hoặc factory callable; tham số của nó được inject theo type hint
+    (auto-wiring). Kế hoạch inject được tính một lần ở lần resolve đầu tiên, sau đó resolve
+    singleton đã tạo chỉ còn là một lần tra dict.
+    
     Tuân thủ Dependency Inversion Principle (DIP):
     - Quản lý dependencies và inversion of control
     """
     
     def __init__(self):
-        self._services: Dict[Type, Any] = {}
-        self._singletons: Dict[Type, Any] = {}
+        self._registrations: Dict[Any, _Registration] = {}
+        self._singletons: Dict[Any, Any] = {}
+        # RLock: tạo singleton có thể resolve singleton khác trên cùng thread
+        self._lock = threading.RLock()
+    
+    def register(
+        self,
+        interface: Any,
+        implementation: Optional[Callable[..., Any]] = None,
+        lifetime: Lifetime = Lifetime.SINGLETON
+    ) -> None:
+        """
+        Đăng ký service.
+        
+        Args:
+            interface: Key để resolve (thường là interface hoặc class)
+            implementation: Class hoặc factory callable (mặc định chính interface)
+            lifetime: Vòng đời
+        """
+        with self._lock:
+            self._registrations[interface] = _Registration(interface, implementation or interface, lifetime)
+            self._singletons.pop(interface, None)
+            # Registration mới có thể thay đổi kế hoạch của service khác
+            for registration in self._registrations.values():
+                registration.plan = None
     
-    def register_singleton(self, interface: Type[T], implementation: Type[T]) -> None:
+    def register_singleton(self, interface: Any, implementation: Optional[Callable[..., Any]] = None) -> None:
         """Đăng ký singleton service."""
-        self._services[interface] = implementation
+        self.register(interface, implementation, Lifetime.SINGLETON)
     
-    def register_transient(self, interface: Type[T], implementation: Type[T]) -> None:
+    def register_transient(self, interface: Any, implementation: Optional[Callable[..., Any]] = None) -> None:
         """Đăng ký transient service."""
-        self._services[interface] = implementation
+        self.register(interface, implementation, Lifetime.TRANSIENT)
+    
+    def register_scoped(self, interface: Any, implementation: Optional[Callable[..., Any]] = None) -> None:
+        """Đăng ký scoped service."""
+        self.register(interface, implementation, Lifetime.SCOPED)
+    
+    def get_instance(self, interface: Any, instance: Any) -> None:
+        """Đăng ký instance có sẵn."""
+        with self._lock:
+            self.register(interface, lambda: instance, Lifetime.SINGLETON)
+            self._singletons[interface] = instance
+    
+    def is_registered(self, interface: Any) -> bool:
+        """Kiểm tra service đã được đăng ký chưa."""
+        return interface in self._registrations
     
     def get(self, interface: Type[T]) -> T:
-        """Lấy service instance."""
-        if interface in self._singletons:
-            return self._singletons[interface]
+        """
+        Lấy service instance.
         
-        if interface not in self._services:
+        Args:
+            interface: Key đã đăng ký
+            
+        Returns:
+            Instance của service
+            
+        Raises:
+            ValueError: Service chưa đăng ký, thiếu dependency hoặc là scoped service
+        """
+        instance = self._singletons.get(interface)
+        if instance is not None:
+            return instance
+        return self._resolve(interface, None)
+    
+    def create_scope(self) -> "DIScope":
+        """Tạo scope mới cho scoped services."""
+        return DIScope(self)
+    
+    def _resolve(self, interface: Any, scope: Optional["DIScope"]) -> Any:
+        """Resolve theo vòng đời của registration."""
+        instance = self._singletons.get(interface)
+        if instance is not None:
+            return instance
+        
+        registration = self._registrations.get(interface)
+        if registration is None:
             raise ValueError(f"Service {interface} not registered")
         
-        implementation = self._services[interface]
-        instance = implementation()
+        if registration.lifetime is Lifetime.TRANSIENT:
+            return self._create(registration, scope)
+        if registration.lifetime is Lifetime.SCOPED:
+            if scope is None:
+                raise ValueError(f"Scoped service {interface} must be resolved from a scope")
+            return scope._get_or_create(registration)
         
-        # Check if it's a singleton
-        if interface in self._services:
-            self._singletons[interface] = instance
+        # Singleton: double-checked locking để chỉ tạo một instance khi nhiều thread cùng resolve
+        with self._lock:
+            instance = self._singletons.get(interface)
+            if instance is None:
+                # Singleton không được giữ service scoped (scope=None)
+                instance = self._create(registration, None)
+                self._singletons[interface] = instance
+        return instance
+    
+    def _create(self, registration: _Registration, scope: Optional["DIScope"]) -> Any:
+        """Tạo instance theo kế hoạch inject."""
+        plan = registration.plan
+        if plan is None:
+            with self._lock:
+                plan = registration.plan = self._build_plan(registration.implementation)
+        return registration.implementation(**{name: self._resolve(key, scope) for name, key in plan})
+    
+    def _build_plan(self, implementation: Callable[..., Any]) -> ResolutionPlan:
+        """
+        Tính kế hoạch inject từ signature và type hints.
+        
+        Tham số có kiểu đã đăng ký được inject; tham số có giá trị mặc định mà kiểu chưa đăng ký
+        được bỏ qua; tham số bắt buộc không resolve được là lỗi.
+        """
+        target = implementation.__init__ if inspect.isclass(implementation) else implementation
+        try:
+            hints = get_type_hints(target)
+        except Exception:
+            hints = getattr(target, "__annotations__", {})
         
+        plan: ResolutionPlan = []
+        for name, parameter in inspect.signature(implementation).parameters.items():
+            if parameter.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+                continue
+            key = _unwrap_optional(hints.get(name, parameter.annotation))
+            if key is not inspect.Parameter.empty and key in self._registrations:
+                plan.append((name, key))
+            elif parameter.default is inspect.Parameter.empty:
+                raise ValueError(
+                    f"Cannot resolve parameter '{name}' of {getattr(implementation, '__qualname__', implementation)}")
+        return plan
+
+
+class DIScope:
+    """
+    Scope của container - mỗi scope giữ một instance riêng cho scoped services.
+    
+    Dùng làm context manager cho một đơn vị công việc (một request, một lô task...).
+    """
+    
+    def __init__(self, container: DIContainer):
+        self._container = container
+        self._instances: Dict[Any, Any] = {}
+        self._lock = threading.RLock()
+    
+    def get(self, interface: Type[T]) -> T:
+        """Lấy service instance trong scope."""
+        instance = self._instances.get(interface)
+        if instance is not None:
+            return instance
+        return self._container._resolve(interface, self)
+    
+    def _get_or_create(self, registration: _Registration) -> Any:
+        """Tạo scoped instance một lần cho scope này."""
+        with self._lock:
+            instance = self._instances.get(registration.key)
+            if instance is None:
+                instance = self._container._create(registration, self)
+                self._instances[registration.key] = instance
         return instance
     
-    def get_instance(self, interface: Type[T], instance: T) -> None:
-        """Đăng ký instance có sẵn."""
-        self._singletons[interface] = instance
+    def close(self) -> None:
+        """Bỏ các scoped instance."""
+        self._instances.clear()
+    
+    def __enter__(self) -> "DIScope":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    """Optional[X] -> X."""
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
 
 
 class ServiceFactory:
@@ -66,27 +242,41 @@ class ServiceFactory:
     """
     
     @staticmethod
-    def create_shougun_service() -> IService:
-        """Tạo ShougunService với dependencies."""
+    def create_container() -> DIContainer:
+        """
+        Tạo container với các registration mặc định của service.
+        
+        Returns:
+            DIContainer: Container (có thể đăng ký đè trước khi resolve)
+        """
         container = DIContainer()
         
         # Register core services
-        container.register_singleton(ILogger, lambda: LoguruLogger(LogLevel.INFO))
+        container.register_singleton(ILogger, _default_logger)
         container.register_singleton(IConfigManager, ConfigManager)
         container.register_singleton(FileRepository[Task], lambda: FileRepository("data/tasks.json", Task))
+        container.register_singleton(IResultStore, lambda: ResultStore("data/results"))
         
-        # Get dependencies
-        logger = container.get(ILogger)
-        config_manager = container.get(IConfigManager)
-        task_repository = container.get(FileRepository[Task])
-        
-        # Create task service
-        task_service = TaskService(logger, task_repository)
+        # TaskService và ShougunService được auto-wire theo type hints của constructor
+        container.register_singleton(TaskService)
+        container.register_singleton(IService, ShougunService)
         
-        # Create main service
-        service = ShougunService(logger, config_manager, task_service)
+        return container
+    
+    @staticmethod
+    def create_shougun_service() -> IService:
+        """Tạo ShougunService với dependencies."""
+        return ServiceFactory.create_container().get(IService)
+    
+    @staticmethod
+    def create_async_shougun_service() -> IService:
+        """Tạo AsyncShougunService (task chạy dưới dạng coroutine trên một event loop)."""
+        # Import muộn: asyncio chỉ được nạp khi thật sự dùng service bất đồng bộ
+        from .async_service import AsyncShougunService
         
-        return service
+        container = ServiceFactory.create_container()
+        container.register_singleton(AsyncShougunService)
+        return container.get(AsyncShougunService)
     
     @staticmethod
     def create_with_custom_dependencies(
@@ -95,20 +285,20 @@ class ServiceFactory:
         task_repository: Optional[FileRepository[Task]] = None
     ) -> IService:
         """Tạo service với custom dependencies."""
-        # Use provided dependencies or create defaults
-        if logger is None:
-            logger = LoguruLogger(LogLevel.INFO)
-        
-        if config_manager is None:
-            config_manager = ConfigManager()
-        
-        if task_repository is None:
-            task_repository = FileRepository("data/tasks.json", Task)
+        container = ServiceFactory.create_container()
         
-        # Create task service
-        task_service = TaskService(logger, task_repository)
+        # Dependencies được truyền vào thay thế registration mặc định
+        if logger is not None:
+            container.get_instance(ILogger, logger)
+        if config_manager is not None:
+            container.get_instance(IConfigManager, config_manager)
+        if task_repository is not None:
+            container.get_instance(FileRepository[Task], task_repository)
         
-        # Create main service
-        service = ShougunService(logger, config_manager, task_service)
-        
-        return service
+        return container.get(IService)
+
+
+@lru_cache(maxsize=1)
+def _default_logger() -> ILogger:
+    """LoguruLogger dùng chung - logger cấu hình sink toàn cục của loguru nên chỉ cần một instance."""
+    return LoguruLogger(LogLevel.INFO)
@@ -0,0 +1,255 @@
+"""
+Instance guard - đảm bảo chỉ một service chạy trên máy bằng lockfile và advisory lock.
+
+Lock do hệ điều hành giữ theo file descriptor nên tự nhả khi process chết (kể cả crash),
+không cần quét bảng process để phát hiện instance cũ.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import IO, Optional
+
+from ..core.logger_interface import ILogger
+
+LOCK_FILE_NAME = "ShougunRemoteX_Service.lock"
+
+# Windows khóa theo vùng byte và chặn cả đọc vùng bị khóa - khóa một byte nằm ngoài nội dung file
+_WINDOWS_LOCK_OFFSET = 1 << 20
+
+
+@dataclass(frozen=True)
+class InstanceInfo:
+    """Thông tin instance đang giữ lock."""
+    pid: int
+    create_time: float
+    bridge_endpoint: Optional[str] = None
+
+
+class InstanceGuard:
+    """
+    Giữ lockfile độc quyền cho service và chuyển giao từ instance cũ.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ quản lý quyền chạy duy nhất, không biết service làm gì
+    """
+
+    def __init__(self, logger: ILogger, lock_path: Optional[str] = None):
+        """
+        Khởi tạo guard.
+
+        Args:
+            logger: Logger
+            lock_path: Đường dẫn lockfile (mặc định trong thư mục tạm của hệ thống)
+        """
+        self._logger = logger
+        self._lock_path = lock_path or os.path.join(tempfile.gettempdir(), LOCK_FILE_NAME)
+        self._file: Optional[IO[str]] = None
+
+    @property
+    def lock_path(self) -> str:
+        """Đường dẫn lockfile."""
+        return self._lock_path
+
+    def is_held(self) -> bool:
+        """Process hiện tại có đang giữ lock không."""
+        return self._file is not None
+
+    def acquire(self, bridge_endpoint: Optional[str] = None) -> bool:
+        """
+        Thử lấy lock (không chờ).
+
+        Args:
+            bridge_endpoint: Endpoint kênh điều khiển để instance sau yêu cầu dừng
+
+        Returns:
+            bool: True nếu đã giữ lock, False nếu instance khác đang giữ
+        """
+        if self._file is not None:
+            return True
+
+        handle = open(self._lock_path, "a+", encoding="utf-8")
+        if not self._try_lock(handle):
+            handle.close()
+            return False
+
+        self._file = handle
+        self.update(bridge_endpoint)
+        return True
+
+    def update(self, bridge_endpoint: Optional[str] = None) -> None:
+        """
+        Ghi lại thông tin instance vào lockfile.
+
+        Args:
+            bridge_endpoint: Endpoint kênh điều khiển
+        """
+        if self._file is None:
+            return
+        info = InstanceInfo(pid=os.getpid(), create_time=self._process_create_time(os.getpid()),
+                            bridge_endpoint=bridge_endpoint)
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(json.dumps(asdict(info)))
+        self._file.flush()
+
+    def release(self) -> None:
+        """Nhả lock (file được giữ lại để tránh race giữa hai instance mới)."""
+        handle, self._file = self._file, None
+        if handle is None:
+            return
+        try:
+            handle.seek(0)
+            handle.truncate()
+            self._unlock(handle)
+        except OSError as e:
+            self._logger.warning(f"Lỗi khi nhả lock instance: {e}")
+        finally:
+            handle.close()
+
+    def read_owner(self) -> Optional[InstanceInfo]:
+        """
+        Đọc thông tin instance đang giữ lock.
+
+        Returns:
+            Optional[InstanceInfo]: Thông tin, hoặc None nếu chưa có/đang ghi dở
+        """
+        try:
+            with open(self._lock_path, "r", encoding="utf-8") as f:
+                data = json.loads(f.read() or "null")
+            return InstanceInfo(**data) if isinstance(data, dict) else None
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def take_over(self, timeout: float = 10.0, bridge_endpoint: Optional[str] = None) -> bool:
+        """
+        Yêu cầu instance cũ dừng, chờ nó thoát rồi lấy lock.
+
+        Thứ tự: gửi lệnh "shutdown" qua kênh bridge; nếu không được hoặc quá nửa thời gian
+        chờ thì gửi SIGTERM; cuối cùng mới kill.
+
+        Args:
+            timeout: Tổng thời gian chờ tối đa
+            bridge_endpoint: Endpoint ghi vào lockfile khi lấy được lock
+
+        Returns:
+            bool: True nếu đã giữ lock
+        """
+        if self.acquire(bridge_endpoint):
+            return True
+
+        deadline = time.monotonic() + timeout
+        owner = self.read_owner()
+        process = self._find_process(owner) if owner else None
+
+        if process is not None:
+            self._logger.info(f"Phát hiện instance đang chạy (PID {owner.pid}), yêu cầu dừng")
+            graceful = bool(owner.bridge_endpoint) and self._request_shutdown(owner.bridge_endpoint)
+            if not graceful or not self._wait_exit(process, timeout / 2):
+                self._logger.warning(f"Instance PID {owner.pid} không dừng theo yêu cầu, gửi tín hiệu dừng")
+                self._terminate(process, max(deadline - time.monotonic(), 0.0))
+
+        # Lock được hệ điều hành nhả ngay khi process cũ thoát
+        while True:
+            if self.acquire(bridge_endpoint):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    # ------------------------------------------------------------------ helpers
+
+    def _request_shutdown(self, endpoint: str) -> bool:
+        """Gửi lệnh shutdown qua kênh bridge của instance cũ."""
+        # Import muộn: integration phụ thuộc ngược vào services
+        from ..integration.bridge_channel import BridgeClient
+
+        client = BridgeClient(endpoint, timeout=2.0)
+        if not client.connect():
+            return False
+        try:
+            return bool(client.call("shutdown").get("success"))
+        except Exception as e:
+            self._logger.warning(f"Không gửi được lệnh shutdown tới {endpoint}: {e}")
+            return False
+        finally:
+            client.close()
+
+    def _find_process(self, owner: InstanceInfo):
+        """Lấy process của owner, None nếu đã thoát hoặc PID đã bị tái sử dụng."""
+        import psutil
+
+        try:
+            process = psutil.Process(owner.pid)
+            if abs(process.create_time() - owner.create_time) > 1.0:
+                return None
+            return process
+        except psutil.Error:
+            return None
+
+    def _wait_exit(self, process, timeout: float) -> bool:
+        """Chờ process thoát (không polling bảng process)."""
+        import psutil
+
+        try:
+            process.wait(timeout=timeout)
+            return True
+        except psutil.TimeoutExpired:
+            return False
+        except psutil.Error:
+            return True
+
+    def _terminate(self, process, timeout: float) -> None:
+        """SIGTERM, sau đó kill nếu vẫn chưa thoát."""
+        import psutil
+
+        try:
+            process.terminate()
+            if not self._wait_exit(process, timeout):
+                process.kill()
+                self._wait_exit(process, 2.0)
+        except psutil.Error:
+            pass
+
+    @staticmethod
+    def _process_create_time(pid: int) -> float:
+        """Thời điểm tạo process - dùng để phân biệt PID bị tái sử dụng."""
+        import psutil
+
+        try:
+            return psutil.Process(pid).create_time()
+        except psutil.Error:
+            return 0.0
+
+    @staticmethod
+    def _try_lock(handle: IO[str]) -> bool:
+        """Khóa độc quyền không chờ."""
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+
+                handle.seek(_WINDOWS_LOCK_OFFSET)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def _unlock(handle: IO[str]) -> None:
+        """Nhả khóa."""
+        if sys.platform == "win32":
+            import msvcrt
+
+            handle.seek(_WINDOWS_LOCK_OFFSET)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
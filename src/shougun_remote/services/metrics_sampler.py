@@ -0,0 +1,224 @@
+"""
+Metrics sampler - Lấy mẫu tài nguyên của process trong background.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from ..core.logger_interface import ILogger
+
+
+# Các cửa sổ tính trung bình (giống load average): tên -> số giây
+AVERAGE_WINDOWS: Dict[str, int] = {"1m": 60, "5m": 300, "15m": 900}
+
+
+@dataclass(frozen=True)
+class ProcessSnapshot:
+    """
+    Một mẫu đo tài nguyên của process.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ chứa dữ liệu của một lần lấy mẫu
+    """
+    timestamp: float
+    pid: int
+    memory_mb: float
+    cpu_percent: float
+    thread_count: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Chuyển đổi thành dictionary."""
+        return {
+            "timestamp": self.timestamp,
+            "pid": self.pid,
+            "memory_mb": self.memory_mb,
+            "cpu_percent": self.cpu_percent,
+            "thread_count": self.thread_count,
+        }
+
+
+class _WindowAverage:
+    """Trung bình trượt theo số mẫu cố định, cập nhật O(1) mỗi mẫu."""
+
+    def __init__(self, size: int):
+        self._values: Deque[Tuple[float, float]] = deque(maxlen=max(1, size))
+        self._cpu_sum = 0.0
+        self._memory_sum = 0.0
+        self._pushes = 0
+
+    def push(self, cpu_percent: float, memory_mb: float) -> None:
+        """Thêm một mẫu, loại bỏ mẫu cũ nhất nếu cửa sổ đã đầy."""
+        if len(self._values) == self._values.maxlen:
+            old_cpu, old_memory = self._values[0]
+            self._cpu_sum -= old_cpu
+            self._memory_sum -= old_memory
+        self._values.append((cpu_percent, memory_mb))
+        self._cpu_sum += cpu_percent
+        self._memory_sum += memory_mb
+
+        # Tính lại tổng định kỳ để sai số cộng/trừ số thực không tích lũy
+        self._pushes += 1
+        if self._pushes >= self._values.maxlen:
+            self._pushes = 0
+            self._cpu_sum = sum(v[0] for v in self._values)
+            self._memory_sum = sum(v[1] for v in self._values)
+
+    def averages(self) -> Dict[str, float]:
+        """Lấy CPU và bộ nhớ trung bình trong cửa sổ."""
+        count = len(self._values)
+        if count == 0:
+            return {"cpu_percent": 0.0, "memory_mb": 0.0, "samples": 0}
+        return {
+            "cpu_percent": self._cpu_sum / count,
+            "memory_mb": self._memory_sum / count,
+            "samples": count,
+        }
+
+
+class MetricsSampler:
+    """
+    Lấy mẫu RSS, CPU và số thread của process theo chu kỳ vào ring buffer.
+
+    Giữ một psutil.Process duy nhất nên cpu_percent phản ánh đúng khoảng giữa hai lần lấy mẫu
+    (Process mới luôn trả về 0.0 ở lần gọi đầu). Người đọc chỉ lấy snapshot mới nhất đã tính sẵn,
+    không gọi psutil trên luồng của mình.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ thu thập và tổng hợp số đo tài nguyên
+    """
+
+    def __init__(self, logger: ILogger, interval: float = 1.0, history_seconds: int = 900):
+        """
+        Khởi tạo sampler.
+
+        Args:
+            logger: Logger
+            interval: Chu kỳ lấy mẫu (giây)
+            history_seconds: Độ dài lịch sử giữ trong ring buffer (giây)
+        """
+        self._logger = logger
+        self._interval = interval if interval > 0 else 1.0
+        self._history: Deque[ProcessSnapshot] = deque(maxlen=max(1, int(history_seconds / self._interval)))
+        self._windows = {
+            name: _WindowAverage(int(seconds / self._interval))
+            for name, seconds in AVERAGE_WINDOWS.items()
+        }
+        self._latest: Optional[ProcessSnapshot] = None
+        self._averages: Dict[str, Dict[str, float]] = {name: w.averages() for name, w in self._windows.items()}
+        self._subscribers: List[Callable[[ProcessSnapshot], None]] = []
+
+        self._process = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def subscribe(self, callback: Callable[[ProcessSnapshot], None]) -> None:
+        """
+        Đăng ký nhận mỗi mẫu mới.
+
+        Args:
+            callback: Hàm nhận ProcessSnapshot
+        """
+        self._subscribers.append(callback)
+
+    def start(self) -> None:
+        """Lấy mẫu đầu tiên ngay và bắt đầu thread lấy mẫu."""
+        if self._thread and self._thread.is_alive():
+            return
+        self.sample_now()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="MetricsSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """
+        Dừng thread lấy mẫu.
+
+        Args:
+            timeout: Thời gian tối đa chờ thread dừng
+        """
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def sample_now(self) -> ProcessSnapshot:
+        """
+        Lấy một mẫu ngay lập tức và cập nhật ring buffer.
+
+        Returns:
+            ProcessSnapshot: Mẫu vừa lấy
+        """
+        with self._lock:
+            if self._process is None:
+                import psutil
+                self._process = psutil.Process()
+                # Lần gọi đầu chỉ để thiết lập mốc đo CPU
+                self._process.cpu_percent(None)
+
+            process = self._process
+            with process.oneshot():
+                snapshot = ProcessSnapshot(
+                    timestamp=time.time(),
+                    pid=process.pid,
+                    memory_mb=process.memory_info().rss / 1024 / 1024,
+                    cpu_percent=process.cpu_percent(None),
+                    thread_count=process.num_threads(),
+                )
+
+            self._history.append(snapshot)
+            for window in self._windows.values():
+                window.push(snapshot.cpu_percent, snapshot.memory_mb)
+
+            # Gán tham chiếu mới (nguyên tử) để người đọc không cần lock
+            self._averages = {name: w.averages() for name, w in self._windows.items()}
+            self._latest = snapshot
+
+        for callback in self._subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                self._logger.error(f"Lỗi khi xử lý mẫu tài nguyên: {e}")
+        return snapshot
+
+    def get_latest(self) -> Optional[ProcessSnapshot]:
+        """Lấy mẫu mới nhất (O(1), không gọi psutil)."""
+        return self._latest
+
+    def get_latest_usage(self) -> Tuple[float, float]:
+        """
+        Lấy (memory_mb, cpu_percent) của mẫu mới nhất.
+
+        Returns:
+            Tuple[float, float]: Bộ nhớ (MB) và CPU (%)
+        """
+        latest = self._latest
+        if latest is None:
+            latest = self.sample_now()
+        return latest.memory_mb, latest.cpu_percent
+
+    def get_averages(self) -> Dict[str, Dict[str, float]]:
+        """Lấy CPU/bộ nhớ trung bình trong các cửa sổ 1/5/15 phút."""
+        return self._averages
+
+    def get_history(self) -> List[ProcessSnapshot]:
+        """Lấy bản sao lịch sử các mẫu trong ring buffer."""
+        with self._lock:
+            return list(self._history)
+
+    def _run(self) -> None:
+        """Vòng lặp lấy mẫu."""
+        while not self._stop_event.wait(self._interval):
+            try:
+                self.sample_now()
+            except Exception as e:
+                self._logger.error(f"Lỗi khi lấy mẫu tài nguyên: {e}")
+
+
+def empty_snapshot() -> ProcessSnapshot:
+    """Snapshot rỗng dùng khi sampler chưa chạy."""
+    return ProcessSnapshot(timestamp=time.time(), pid=os.getpid(), memory_mb=0.0, cpu_percent=0.0, thread_count=0)
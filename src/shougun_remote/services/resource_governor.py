@@ -0,0 +1,243 @@
+"""
+Resource governor - Áp dụng giới hạn performance.max_memory_mb và performance.cpu_threshold.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core.logger_interface import ILogger
+from ..core.config_interface import IConfigManager
+
+
+# Ngưỡng hồi phục: chỉ coi là hết quá tải khi xuống dưới 90% ngưỡng (tránh dao động lên xuống)
+_RECOVERY_RATIO = 0.9
+
+
+@dataclass(frozen=True)
+class GovernorState:
+    """
+    Trạng thái điều tiết hiện tại.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ chứa dữ liệu trạng thái điều tiết
+    """
+    concurrency: int
+    intake_paused: bool = False
+    memory_pressure: bool = False
+    cpu_pressure: bool = False
+    memory_mb: float = 0.0
+    cpu_percent: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Chuyển đổi thành dictionary."""
+        return {
+            "concurrency": self.concurrency,
+            "intake_paused": self.intake_paused,
+            "memory_pressure": self.memory_pressure,
+            "cpu_pressure": self.cpu_pressure,
+            "memory_mb": self.memory_mb,
+            "cpu_percent": self.cpu_percent,
+        }
+
+
+class ResourceGovernor:
+    """
+    Thread giám sát tài nguyên của process và điều tiết service khi quá tải.
+
+    Khi vượt ngưỡng: giảm một nửa concurrency, tạm dừng nhận sự kiện folder và
+    (khi vừa quá tải bộ nhớ, rồi tối đa một lần mỗi reclaim_cooldown) gọi các reclaimer
+    để xóa cache/thu gọn repository.
+    Khi hết quá tải: tăng dần concurrency mỗi lần lấy mẫu và tiếp tục nhận sự kiện
+    sau một số lần lấy mẫu ổn định liên tiếp.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ quyết định mức điều tiết, việc thực thi do các subscriber đảm nhận
+
+    Tuân thủ Dependency Inversion Principle (DIP):
+    - Phụ thuộc vào abstractions (ILogger, IConfigManager)
+    """
+
+    def __init__(
+        self,
+        logger: ILogger,
+        config_manager: IConfigManager,
+        max_concurrency: int,
+        sample_fn: Callable[[], Tuple[float, float]],
+        recovery_samples: int = 3,
+        reclaim_cooldown: float = 60.0,
+    ):
+        """
+        Khởi tạo governor.
+
+        Args:
+            logger: Logger
+            config_manager: Nguồn ngưỡng và chu kỳ lấy mẫu (đọc lại mỗi lần để hỗ trợ hot reload)
+            max_concurrency: Số task chạy đồng thời tối đa khi không quá tải
+            sample_fn: Hàm trả về (memory_mb, cpu_percent) mới nhất, thường là MetricsSampler.get_latest_usage
+            recovery_samples: Số lần lấy mẫu ổn định liên tiếp trước khi tiếp tục nhận sự kiện
+            reclaim_cooldown: Khoảng cách tối thiểu (giây) giữa hai lần reclaim khi quá tải bộ nhớ kéo dài
+        """
+        self._logger = logger
+        self._config_manager = config_manager
+        self._max_concurrency = max(1, max_concurrency)
+        self._sample_fn = sample_fn
+        self._recovery_samples = recovery_samples
+        self._reclaim_cooldown = max(0.0, reclaim_cooldown)
+        self._last_reclaim: Optional[float] = None
+
+        self._state = GovernorState(concurrency=self._max_concurrency)
+        self._calm_samples = 0
+        self._subscribers: List[Callable[[GovernorState], None]] = []
+        self._reclaimers: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def subscribe(self, callback: Callable[[GovernorState], None]) -> None:
+        """
+        Đăng ký nhận thông báo khi trạng thái điều tiết thay đổi.
+
+        Args:
+            callback: Hàm nhận GovernorState mới
+        """
+        self._subscribers.append(callback)
+
+    def add_reclaimer(self, reclaimer: Callable[[], None]) -> None:
+        """
+        Đăng ký hàm giải phóng bộ nhớ (xóa cache, compact repository...).
+
+        Args:
+            reclaimer: Hàm được gọi khi quá tải bộ nhớ
+        """
+        self._reclaimers.append(reclaimer)
+
+    def get_state(self) -> GovernorState:
+        """Lấy trạng thái điều tiết hiện tại."""
+        return self._state
+
+    def start(self) -> None:
+        """Bắt đầu thread giám sát."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ResourceGovernor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """
+        Dừng thread giám sát.
+
+        Args:
+            timeout: Thời gian tối đa chờ thread dừng
+        """
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def evaluate(self, memory_mb: float, cpu_percent: float) -> GovernorState:
+        """
+        Áp dụng chính sách điều tiết cho một mẫu đo.
+
+        Args:
+            memory_mb: RSS của process (MB)
+            cpu_percent: CPU của process (%)
+
+        Returns:
+            GovernorState: Trạng thái sau khi áp dụng
+        """
+        max_memory = float(self._config_manager.get("performance.max_memory_mb", 0) or 0)
+        cpu_threshold = float(self._config_manager.get("performance.cpu_threshold", 0) or 0)
+
+        # Ngưỡng = 0 (hoặc thiếu) nghĩa là không giới hạn
+        memory_pressure = max_memory > 0 and memory_mb > max_memory
+        cpu_pressure = cpu_threshold > 0 and cpu_percent > cpu_threshold
+        calm = (
+            (max_memory <= 0 or memory_mb < max_memory * _RECOVERY_RATIO)
+            and (cpu_threshold <= 0 or cpu_percent < cpu_threshold * _RECOVERY_RATIO)
+        )
+
+        with self._lock:
+            old_state = self._state
+            concurrency = old_state.concurrency
+            intake_paused = old_state.intake_paused
+
+            if memory_pressure or cpu_pressure:
+                # Quá tải: giảm một nửa concurrency và ngừng nhận sự kiện mới
+                self._calm_samples = 0
+                concurrency = max(1, concurrency // 2)
+                intake_paused = True
+            elif calm:
+                # Hồi phục dần: mỗi mẫu ổn định tăng thêm một slot
+                self._calm_samples += 1
+                concurrency = min(self._max_concurrency, concurrency + 1)
+                if intake_paused and self._calm_samples >= self._recovery_samples:
+                    intake_paused = False
+
+            new_state = replace(
+                old_state,
+                concurrency=concurrency,
+                intake_paused=intake_paused,
+                memory_pressure=memory_pressure,
+                cpu_pressure=cpu_pressure,
+                memory_mb=memory_mb,
+                cpu_percent=cpu_percent,
+            )
+            self._state = new_state
+
+            # Reclaim (gc + compact repository) tốn kém: chỉ chạy khi vừa vào trạng thái quá tải
+            # bộ nhớ, hoặc sau cooldown nếu quá tải kéo dài - không chạy lại mỗi lần lấy mẫu
+            now = time.monotonic()
+            reclaim = memory_pressure and (
+                not old_state.memory_pressure
+                or self._last_reclaim is None
+                or now - self._last_reclaim >= self._reclaim_cooldown
+            )
+            if reclaim:
+                self._last_reclaim = now
+
+        if reclaim:
+            self._reclaim()
+
+        if (new_state.concurrency, new_state.intake_paused) != (old_state.concurrency, old_state.intake_paused):
+            self._logger.info(
+                f"Resource governor: concurrency {old_state.concurrency} -> {new_state.concurrency}, "
+                f"intake_paused={new_state.intake_paused} (memory={memory_mb:.1f}MB, cpu={cpu_percent:.1f}%)"
+            )
+            self._notify(new_state)
+
+        return new_state
+
+    def _reclaim(self) -> None:
+        """Gọi các reclaimer để giải phóng bộ nhớ."""
+        self._logger.warning("Resource governor: vượt ngưỡng bộ nhớ, giải phóng cache và compact repository")
+        for reclaimer in self._reclaimers:
+            try:
+                reclaimer()
+            except Exception as e:
+                self._logger.error(f"Lỗi khi giải phóng bộ nhớ: {e}")
+
+    def _notify(self, state: GovernorState) -> None:
+        """Thông báo trạng thái mới cho subscribers."""
+        for callback in self._subscribers:
+            try:
+                callback(state)
+            except Exception as e:
+                self._logger.error(f"Lỗi khi áp dụng trạng thái điều tiết: {e}")
+
+    def _run(self) -> None:
+        """Vòng lặp lấy mẫu."""
+        while not self._stop_event.is_set():
+            interval = self._config_manager.get("performance.governor_interval", 5.0)
+            if not isinstance(interval, (int, float)) or interval <= 0:
+                interval = 5.0
+            if self._stop_event.wait(interval):
+                break
+            try:
+                memory_mb, cpu_percent = self._sample_fn()
+                self.evaluate(memory_mb, cpu_percent)
+            except Exception as e:
+                self._logger.error(f"Lỗi trong resource governor: {e}")
@@ -0,0 +1,195 @@
+"""
+Retention compactor - chuyển task đã kết thúc quá hạn/quá số lượng sang archive.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from ..core.config_interface import IConfigManager
+from ..core.logger_interface import ILogger
+from ..metrics import MetricsRegistry, get_default_registry
+from ..models import Task, TaskStatus
+from ..repositories import TaskArchive
+
+if TYPE_CHECKING:
+    from . import TaskService
+
+# Chỉ task đã kết thúc mới được archive - PENDING/RUNNING luôn ở lại repository
+TERMINAL_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    Chính sách giữ task của một trạng thái trong repository.
+
+    Task bị archive khi cũ hơn max_age, hoặc khi nằm ngoài max_count task mới nhất.
+    """
+    status: TaskStatus
+    max_age: Optional[timedelta] = None
+    max_count: Optional[int] = None
+
+    def select_expired(self, tasks: List[Task], now: datetime) -> List[Task]:
+        """
+        Chọn các task cần archive.
+
+        Args:
+            tasks: Task có trạng thái của policy
+            now: Thời điểm hiện tại
+
+        Returns:
+            List[Task]: Task hết hạn
+        """
+        ordered = sorted(tasks, key=lambda task: task.updated_at, reverse=True)
+        expired = []
+        for index, task in enumerate(ordered):
+            too_old = self.max_age is not None and now - task.updated_at > self.max_age
+            too_many = self.max_count is not None and index >= self.max_count
+            if too_old or too_many:
+                expired.append(task)
+        return expired
+
+
+def load_policies(config_manager: IConfigManager) -> List[RetentionPolicy]:
+    """
+    Đọc chính sách từ retention.max_age_days và retention.max_count (theo tên trạng thái).
+
+    Args:
+        config_manager: Config manager
+
+    Returns:
+        List[RetentionPolicy]: Chính sách cho các trạng thái có cấu hình
+    """
+    max_age_days = config_manager.get("retention.max_age_days", {}) or {}
+    max_count = config_manager.get("retention.max_count", {}) or {}
+    policies = []
+    for status in TERMINAL_STATUSES:
+        days = max_age_days.get(status.value)
+        count = max_count.get(status.value)
+        age = timedelta(days=days) if isinstance(days, (int, float)) and days > 0 else None
+        count = count if isinstance(count, int) and count >= 0 else None
+        if age is not None or count is not None:
+            policies.append(RetentionPolicy(status, age, count))
+    return policies
+
+
+class RetentionCompactor:
+    """
+    Định kỳ áp dụng chính sách retention: ghi task hết hạn vào archive rồi xóa khỏi repository.
+
+    Archive được ghi trước khi xóa, nên nếu process dừng giữa chừng task có thể xuất hiện hai
+    lần trong archive nhưng không bao giờ bị mất. Blob kết quả không được archive: nó bị xóa cùng
+    task (nếu không còn task nào dùng chung) và bản ghi archive có result_id = None.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ quyết định task nào rời repository và chuyển chúng sang archive
+    """
+
+    def __init__(
+        self,
+        logger: ILogger,
+        task_service: "TaskService",
+        archive: TaskArchive,
+        policies: List[RetentionPolicy],
+        interval: float = 3600.0,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Khởi tạo compactor.
+
+        Args:
+            logger: Logger
+            task_service: Service quản lý task
+            archive: Archive nhận task hết hạn
+            policies: Chính sách theo trạng thái
+            interval: Chu kỳ chạy (giây)
+            metrics: Registry để ghi metrics (mặc định dùng registry của process)
+        """
+        self._logger = logger
+        self._task_service = task_service
+        self._archive = archive
+        self._policies = policies
+        self._interval = interval if interval > 0 else 3600.0
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._run_lock = threading.Lock()
+        self._last_run: Dict[str, Any] = {}
+
+        metrics = metrics or get_default_registry()
+        self._archived = {
+            status: metrics.counter(
+                "shougun_retention_archived_total", "Số task đã chuyển sang archive", {"status": status.value})
+            for status in TERMINAL_STATUSES
+        }
+        self._duration = metrics.histogram("shougun_retention_run_seconds", "Thời gian một lần compact")
+
+    def start(self) -> None:
+        """Chạy một lần ngay rồi bắt đầu thread định kỳ."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="RetentionCompactor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """
+        Dừng thread compact.
+
+        Args:
+            timeout: Thời gian tối đa chờ thread dừng
+        """
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Áp dụng mọi chính sách một lần.
+
+        Args:
+            now: Thời điểm tính tuổi task (mặc định là hiện tại)
+
+        Returns:
+            int: Số task đã archive
+        """
+        now = now or datetime.now()
+        start = time.perf_counter()
+        with self._run_lock:
+            archived = 0
+            for policy in self._policies:
+                expired = policy.select_expired(self._task_service.get_tasks_by_status(policy.status), now)
+                if not expired:
+                    continue
+                removed = self._task_service.remove_tasks(
+                    [task.id for task in expired], policy.status, self._archive_tasks)
+                self._archived[policy.status].inc(removed)
+                archived += removed
+
+            seconds = time.perf_counter() - start
+            self._duration.observe(seconds)
+            self._last_run = {"at": now.isoformat(), "archived": archived, "seconds": seconds}
+        if archived:
+            self._logger.info(f"Đã chuyển {archived} task hết hạn sang archive ({seconds:.3f}s)")
+        return archived
+
+    def _archive_tasks(self, tasks: List[Task]) -> None:
+        """Ghi task sắp bị xóa vào archive (không kèm kết quả - blob bị xóa cùng task)."""
+        self._archive.append(replace(task, result_id=None) for task in tasks)
+
+    def get_last_run(self) -> Dict[str, Any]:
+        """Kết quả lần compact gần nhất."""
+        return dict(self._last_run)
+
+    def _run(self) -> None:
+        """Vòng lặp compact."""
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                self._logger.error(f"Lỗi khi compact task: {e}")
+            if self._stop_event.wait(self._interval):
+                return
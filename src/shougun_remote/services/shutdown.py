@@ -0,0 +1,140 @@
+"""
+Hỗ trợ dừng service có giới hạn thời gian: báo cáo từng pha và checkpoint task bị gián đoạn.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+@dataclass
+class ShutdownReport:
+    """Kết quả một lần dừng service."""
+    timeout: float
+    phases: Dict[str, float] = field(default_factory=dict)
+    interrupted_tasks: List[str] = field(default_factory=list)
+    deadline_exceeded: bool = False
+    finished_at: Optional[datetime] = None
+
+    @property
+    def total_seconds(self) -> float:
+        """Tổng thời gian các pha."""
+        return sum(self.phases.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Chuyển đổi thành dictionary."""
+        return {
+            "timeout": self.timeout,
+            "total_seconds": self.total_seconds,
+            "phases": dict(self.phases),
+            "interrupted_tasks": list(self.interrupted_tasks),
+            "deadline_exceeded": self.deadline_exceeded,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class DrainDeadline:
+    """
+    Mốc thời gian chung cho mọi pha drain.
+
+    Mỗi pha chỉ được chờ phần thời gian còn lại, nên tổng thời gian dừng không vượt
+    quá timeout dù có nhiều thành phần cùng chậm.
+    """
+
+    def __init__(self, timeout: float, report: ShutdownReport):
+        self._deadline = time.monotonic() + max(0.0, timeout)
+        self._report = report
+
+    def remaining(self) -> float:
+        """Số giây còn lại (không âm)."""
+        return max(0.0, self._deadline - time.monotonic())
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Đo thời gian một pha và ghi vào báo cáo.
+
+        Args:
+            name: Tên pha
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._report.phases[name] = time.perf_counter() - start
+
+    def mark_exceeded(self) -> None:
+        """Ghi nhận có pha không kịp hoàn tất trước deadline."""
+        self._report.deadline_exceeded = True
+
+
+class ShutdownCheckpoint:
+    """
+    File ghi các task đang RUNNING khi service dừng.
+
+    Lần khởi động sau đọc file để biết task nào bị gián đoạn (khác với task còn RUNNING
+    do process bị kill, không kịp ghi checkpoint).
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ đọc/ghi checkpoint
+    """
+
+    def __init__(self, file_path: str = "data/shutdown_checkpoint.json"):
+        self._file_path = Path(file_path)
+
+    def get_path(self) -> Path:
+        """Đường dẫn file checkpoint."""
+        return self._file_path
+
+    def save(self, report: ShutdownReport) -> bool:
+        """
+        Ghi checkpoint (ghi file tạm rồi rename để không để lại file hỏng).
+
+        Args:
+            report: Báo cáo của lần dừng hiện tại
+
+        Returns:
+            bool: True nếu thành công
+        """
+        try:
+            self._file_path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {
+                "interrupted_tasks": list(report.interrupted_tasks),
+                "deadline_exceeded": report.deadline_exceeded,
+                "saved_at": datetime.now().isoformat(),
+            }
+            tmp_path = self._file_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._file_path)
+            return True
+        except OSError:
+            return False
+
+    def load(self) -> List[str]:
+        """
+        Đọc danh sách task bị gián đoạn.
+
+        Returns:
+            List[str]: ID task (rỗng nếu không có checkpoint hoặc file hỏng)
+        """
+        try:
+            with open(self._file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return [str(task_id) for task_id in data.get("interrupted_tasks", [])]
+        except (OSError, ValueError, AttributeError):
+            return []
+
+    def clear(self) -> None:
+        """Xóa checkpoint sau khi đã khôi phục."""
+        try:
+            self._file_path.unlink()
+        except FileNotFoundError:
+            pass
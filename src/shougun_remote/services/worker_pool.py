@@ -0,0 +1,361 @@
+"""
+Pool process worker chia task theo shard - chạy task nặng CPU song song thật sự (không bị GIL).
+
+Mỗi worker là một process riêng nối với process chính bằng một Pipe. Task được gán cho worker
+theo crc32(task_id) % N nên cùng một task luôn về cùng worker. Chỉ process chính ghi repository:
+worker chỉ nhận payload và trả kết quả qua pipe.
+"""
+
+import multiprocessing
+import signal
+import threading
+import time
+import zlib
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from ..core.logger_interface import ILogger
+from ..metrics import MetricsRegistry, get_default_registry
+
+# Hàm xử lý task trong process con: nhận Task.to_dict(), ném exception nếu thất bại.
+# Phải là hàm ở cấp module để pickle được khi spawn process.
+TaskFunction = Callable[[Dict[str, Any]], None]
+
+# (task_id, success, error, seconds)
+ResultCallback = Callable[[str, bool, Optional[str], float], None]
+
+
+def simulate_task(payload: Dict[str, Any]) -> None:
+    """Handler mặc định - giống thời gian xử lý giả lập của ShougunService."""
+    time.sleep(0.1)
+
+
+def _worker_main(conn: Connection, handler: TaskFunction) -> None:
+    """
+    Vòng lặp của process worker.
+
+    Args:
+        conn: Đầu pipe phía worker
+        handler: Hàm xử lý task
+    """
+    # Ctrl+C do process chính xử lý và dừng worker có thứ tự
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+
+        task_id, payload = message
+        start = time.perf_counter()
+        try:
+            handler(payload)
+            result = (task_id, True, None, time.perf_counter() - start)
+        except Exception as e:
+            result = (task_id, False, f"{type(e).__name__}: {e}", time.perf_counter() - start)
+        try:
+            conn.send(result)
+        except (EOFError, OSError):
+            break
+    conn.close()
+
+
+class _Worker:
+    """Trạng thái một worker phía process chính."""
+
+    __slots__ = ("index", "process", "conn", "in_flight", "send_lock",
+                 "completed", "failed", "restarts", "queue_depth", "run_time")
+
+    def __init__(self, index: int, metrics: MetricsRegistry):
+        labels = {"worker": str(index)}
+        self.index = index
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.conn: Optional[Connection] = None
+        self.in_flight: Set[str] = set()
+        self.send_lock = threading.Lock()
+        self.completed = metrics.counter(
+            "shougun_worker_tasks_completed_total", "Số task worker process xử lý thành công", labels)
+        self.failed = metrics.counter(
+            "shougun_worker_tasks_failed_total", "Số task worker process xử lý thất bại", labels)
+        self.restarts = metrics.counter(
+            "shougun_worker_restarts_total", "Số lần worker process được khởi động lại sau crash", labels)
+        self.queue_depth = metrics.gauge(
+            "shougun_worker_queue_depth", "Số task đã gửi cho worker process và chưa có kết quả", labels)
+        self.run_time = metrics.histogram(
+            "shougun_worker_task_seconds", "Thời gian xử lý một task trong worker process", labels)
+
+
+class ShardedWorkerPool:
+    """
+    Pool N process worker, mỗi task được gán cho một worker theo hash của ID.
+
+    - Worker crash được phát hiện qua sentinel của process và khởi động lại ngay;
+      task đang chờ trên worker đó được báo thất bại (tránh task lỗi làm crash lặp lại)
+    - Mỗi worker nhận tối đa queue_depth task chưa xong - task thừa ở lại PENDING
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ quản lý process worker và vận chuyển task/kết quả
+    """
+
+    def __init__(
+        self,
+        logger: ILogger,
+        processes: int,
+        on_result: ResultCallback,
+        handler: TaskFunction = simulate_task,
+        metrics: Optional[MetricsRegistry] = None,
+        queue_depth: int = 2
+    ):
+        """
+        Khởi tạo pool.
+
+        Args:
+            logger: Logger
+            processes: Số process worker
+            on_result: Callback nhận kết quả (gọi trên thread thu kết quả của pool)
+            handler: Hàm xử lý task, chạy trong process con
+            metrics: Registry để ghi metrics (mặc định dùng registry của process)
+            queue_depth: Số task tối đa chờ trên mỗi worker
+        """
+        if processes < 1:
+            raise ValueError("processes must be >= 1")
+        self._logger = logger
+        self._on_result = on_result
+        self._handler = handler
+        self._queue_depth = max(1, queue_depth)
+        # spawn trên mọi nền tảng: fork một process đang có nhiều thread không an toàn
+        self._context = multiprocessing.get_context("spawn")
+        metrics = metrics or get_default_registry()
+        self._workers = [_Worker(index, metrics) for index in range(processes)]
+        self._collector: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._stopping = False
+
+    def start(self, timeout: float = 30.0) -> bool:
+        """
+        Khởi động các process worker và thread thu kết quả.
+
+        Args:
+            timeout: Thời gian tối đa chờ các process khởi động
+
+        Returns:
+            bool: True nếu mọi worker đã chạy
+        """
+        try:
+            self._stop_event.clear()
+            self._stopping = False
+            for worker in self._workers:
+                self._spawn(worker)
+            deadline = time.monotonic() + timeout
+            while not all(worker.process.pid for worker in self._workers):
+                if time.monotonic() > deadline:
+                    raise TimeoutError("worker processes did not start")
+                time.sleep(0.01)
+            self._collector = threading.Thread(target=self._collect_loop, name="ShougunWorkerPool", daemon=True)
+            self._collector.start()
+            self._logger.info(f"Đã khởi động {len(self._workers)} worker process")
+            return True
+        except Exception as e:
+            self._logger.error(f"Không thể khởi động worker process: {e}")
+            self.stop(timeout=1.0)
+            return False
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """
+        Dừng các worker sau khi chúng xử lý xong task đã nhận.
+
+        Args:
+            timeout: Thời gian tối đa chờ worker thoát, quá hạn thì terminate
+
+        Returns:
+            bool: True nếu mọi worker thoát tự nhiên
+        """
+        self._stopping = True
+        deadline = time.monotonic() + max(0.0, timeout)
+        for worker in self._workers:
+            with worker.send_lock:
+                if worker.conn is not None:
+                    try:
+                        worker.conn.send(None)
+                    except (EOFError, OSError):
+                        pass
+
+        graceful = True
+        for worker in self._workers:
+            if worker.process is None:
+                continue
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                graceful = False
+                self._logger.warning(f"Worker {worker.index} chưa dừng sau {timeout}s - terminate")
+                worker.process.terminate()
+                worker.process.join(1.0)
+
+        # Thread thu kết quả đọc nốt kết quả còn trong pipe rồi mới dừng
+        self._stop_event.set()
+        if self._collector and self._collector.is_alive():
+            self._collector.join(timeout=2.0)
+        self._collector = None
+        for worker in self._workers:
+            if worker.conn is not None:
+                worker.conn.close()
+                worker.conn = None
+            worker.process = None
+        return graceful
+
+    def shard_of(self, task_id: str) -> int:
+        """
+        Worker phụ trách task.
+
+        Args:
+            task_id: ID task
+
+        Returns:
+            int: Chỉ số worker
+        """
+        return zlib.crc32(task_id.encode("utf-8")) % len(self._workers)
+
+    def can_accept(self, task_id: str) -> bool:
+        """Worker phụ trách task còn chỗ nhận thêm không."""
+        return not self._stopping and len(self._workers[self.shard_of(task_id)].in_flight) < self._queue_depth
+
+    def submit(self, task_id: str, payload: Dict[str, Any]) -> bool:
+        """
+        Gửi task cho worker phụ trách.
+
+        Args:
+            task_id: ID task
+            payload: Dữ liệu task (pickle được)
+
+        Returns:
+            bool: True nếu đã gửi, False nếu worker đầy hoặc pipe bị lỗi
+        """
+        worker = self._workers[self.shard_of(task_id)]
+        with worker.send_lock:
+            if self._stopping or worker.conn is None or len(worker.in_flight) >= self._queue_depth:
+                return False
+            worker.in_flight.add(task_id)
+            try:
+                worker.conn.send((task_id, payload))
+            except (EOFError, OSError):
+                # Worker vừa crash - thread thu kết quả sẽ khởi động lại worker
+                worker.in_flight.discard(task_id)
+                return False
+            worker.queue_depth.set(len(worker.in_flight))
+        return True
+
+    def get_capacity(self) -> int:
+        """Tổng số task có thể chờ trên mọi worker."""
+        return len(self._workers) * self._queue_depth
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        Thống kê từng worker.
+
+        Returns:
+            List[Dict[str, Any]]: pid, số task đang chờ, đã xong, thất bại, số lần restart
+        """
+        return [
+            {
+                "worker": worker.index,
+                "pid": worker.process.pid if worker.process else None,
+                "in_flight": len(worker.in_flight),
+                "completed": int(worker.completed.value()),
+                "failed": int(worker.failed.value()),
+                "restarts": int(worker.restarts.value()),
+            }
+            for worker in self._workers
+        ]
+
+    def _spawn(self, worker: _Worker) -> None:
+        """Tạo process và pipe mới cho worker."""
+        parent_conn, child_conn = self._context.Pipe(duplex=True)
+        process = self._context.Process(
+            target=_worker_main, args=(child_conn, self._handler),
+            name=f"ShougunWorker-{worker.index}", daemon=True)
+        process.start()
+        # Đóng đầu pipe của con ở process chính để nhận EOF khi worker chết
+        child_conn.close()
+        worker.conn = parent_conn
+        worker.process = process
+
+    def _collect_loop(self) -> None:
+        """Thu kết quả từ mọi worker và khởi động lại worker bị crash."""
+        while True:
+            stopping = self._stop_event.is_set()
+            by_conn = {worker.conn: worker for worker in self._workers if worker.conn is not None}
+            by_sentinel = {worker.process.sentinel: worker for worker in self._workers
+                           if worker.process is not None and not self._stopping}
+            ready = wait(list(by_conn) + list(by_sentinel), timeout=0 if stopping else 0.2)
+
+            dead: Set[_Worker] = set()
+            for item in ready:
+                worker = by_conn.get(item)
+                if worker is None:
+                    dead.add(by_sentinel[item])
+                    continue
+                try:
+                    # Đọc hết kết quả đang có trước khi xét worker chết
+                    while worker.conn.poll():
+                        self._complete(worker, *worker.conn.recv())
+                except (EOFError, OSError):
+                    if not self._stopping:
+                        dead.add(worker)
+                    else:
+                        # Worker đã thoát trong lúc dừng - bỏ pipe khỏi danh sách chờ
+                        with worker.send_lock:
+                            worker.conn.close()
+                            worker.conn = None
+
+            for worker in dead:
+                self._restart(worker)
+
+            if stopping:
+                return
+
+    def _complete(self, worker: _Worker, task_id: str, success: bool, error: Optional[str], seconds: float) -> None:
+        """Ghi nhận kết quả một task và báo cho chủ pool."""
+        with worker.send_lock:
+            worker.in_flight.discard(task_id)
+            worker.queue_depth.set(len(worker.in_flight))
+        worker.run_time.observe(seconds)
+        (worker.completed if success else worker.failed).inc()
+        try:
+            self._on_result(task_id, success, error, seconds)
+        except Exception as e:
+            self._logger.error(f"Lỗi khi xử lý kết quả task {task_id}: {e}")
+
+    def _restart(self, worker: _Worker) -> None:
+        """Khởi động lại worker đã chết, báo thất bại cho các task nó đang giữ."""
+        process = worker.process
+        if process is not None:
+            process.join(1.0)
+        exitcode = process.exitcode if process is not None else None
+        with worker.send_lock:
+            lost = list(worker.in_flight)
+            worker.in_flight.clear()
+            worker.queue_depth.set(0)
+            if worker.conn is not None:
+                worker.conn.close()
+                worker.conn = None
+            worker.process = None
+        self._logger.error(f"Worker {worker.index} đã dừng bất thường (exit code {exitcode}), mất {len(lost)} task")
+
+        for task_id in lost:
+            worker.failed.inc()
+            try:
+                self._on_result(task_id, False, f"worker process crashed (exit code {exitcode})", 0.0)
+            except Exception as e:
+                self._logger.error(f"Lỗi khi xử lý kết quả task {task_id}: {e}")
+
+        if self._stopping:
+            return
+        try:
+            with worker.send_lock:
+                self._spawn(worker)
+            worker.restarts.inc()
+            self._logger.info(f"Đã khởi động lại worker {worker.index} (pid {worker.process.pid})")
+        except Exception as e:
+            self._logger.error(f"Không thể khởi động lại worker {worker.index}: {e}")
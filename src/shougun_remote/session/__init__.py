@@ -0,0 +1,83 @@
+"""
+Client seamless session (giao thức packet kiểu Xpra, xem docs/seamless-session/).
+
+Các class được import khi truy cập lần đầu (PEP 562) - service không nạp tầng session
+nếu không dùng tới.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .batcher import DamageBatcher, DamageFrame
+    from .cache import ClientCache, ClientCacheMirror, EncodingCache
+    from .chunks import ChunkAssembler
+    from .compression import CompressionSelector
+    from .damage import DamageAccumulator, DamageRegion
+    from .encoder import EncodePipeline, EncodeRequest, EncodeResult
+    from .net import NetworkConnection, PacketError, PacketHeader, PacketParser, PacketReader
+    from .rencode import PacketCodec
+    from .scroll import ScrollDetector, ScrollResult
+    from .transport import PacketProtocol
+
+_LAZY_ATTRIBUTES = {
+    "ChunkAssembler": ".chunks",
+    "ClientCache": ".cache",
+    "ClientCacheMirror": ".cache",
+    "CompressionSelector": ".compression",
+    "DamageAccumulator": ".damage",
+    "DamageBatcher": ".batcher",
+    "DamageFrame": ".batcher",
+    "DamageRegion": ".damage",
+    "EncodePipeline": ".encoder",
+    "EncodingCache": ".cache",
+    "EncodeRequest": ".encoder",
+    "EncodeResult": ".encoder",
+    "NetworkConnection": ".net",
+    "PacketError": ".net",
+    "PacketCodec": ".rencode",
+    "PacketHeader": ".net",
+    "PacketParser": ".net",
+    "PacketProtocol": ".transport",
+    "PacketReader": ".net",
+    "ScrollDetector": ".scroll",
+    "ScrollResult": ".scroll",
+}
+
+__all__ = [
+    "ChunkAssembler",
+    "ClientCache",
+    "ClientCacheMirror",
+    "CompressionSelector",
+    "DamageAccumulator",
+    "DamageBatcher",
+    "DamageFrame",
+    "DamageRegion",
+    "EncodePipeline",
+    "EncodingCache",
+    "EncodeRequest",
+    "EncodeResult",
+    "NetworkConnection",
+    "PacketError",
+    "PacketCodec",
+    "PacketHeader",
+    "PacketParser",
+    "PacketProtocol",
+    "PacketReader",
+    "ScrollDetector",
+    "ScrollResult",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """Import class khi được truy cập lần đầu."""
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,345 @@
+"""
+Gom damage theo cửa sổ và gửi theo nhịp khung hình.
+
+Thay cho DamageBatcher trong 05-rendering.md (mỗi batch một threading.Timer, độ trễ cố định
+10 ms): mỗi kết nối có một thread lập lịch duy nhất, damage được gom theo cửa sổ bằng
+DamageAccumulator và mỗi cửa sổ có độ trễ batch riêng, điều chỉnh theo ack "damage-sequence"
+(Flow Control trong 02-protocol.md):
+- không gửi nhanh hơn thời gian decode client báo về
+- độ trễ ack vượt mức thấp nhất đã thấy là hàng đợi trên đường truyền: trễ batch tăng theo
+  để không dồn thêm dữ liệu
+- cửa sổ có max_unacked frame chưa được ack thì ngừng gửi tới khi có ack, damage tiếp tục
+  được gom (và gộp) trong lúc chờ
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from ..core.logger_interface import ILogger
+from ..metrics import MetricsRegistry, get_default_registry
+from .damage import DEFAULT_MAX_RECTS, DamageAccumulator, Rect
+
+# Độ trễ batch ban đầu của cửa sổ (giây), như batch.delay trong 03-connection.md
+DEFAULT_DELAY = 0.010
+
+# Giới hạn độ trễ batch (giây)
+DEFAULT_MIN_DELAY = 0.005
+DEFAULT_MAX_DELAY = 0.5
+
+# Số frame chưa được ack tối đa của một cửa sổ
+DEFAULT_MAX_UNACKED = 3
+
+# Frame không được ack trong thời gian này coi như mất (giây)
+DEFAULT_ACK_TIMEOUT = 5.0
+
+# Hệ số làm mượt độ trễ ack, thời gian decode và độ trễ batch
+_SMOOTHING = 0.25
+
+
+@dataclass(frozen=True)
+class DamageFrame:
+    """
+    Một lần flush damage của cửa sổ.
+
+    Hình chữ nhật thứ i được gửi trong packet draw có packet_sequence = sequence + i.
+    """
+    wid: int
+    sequence: int
+    rects: List[Rect]
+
+    @property
+    def last_sequence(self) -> int:
+        """packet_sequence của packet draw cuối cùng trong frame."""
+        return self.sequence + len(self.rects) - 1
+
+
+FlushCallback = Callable[[DamageFrame], None]
+
+
+class _WindowState:
+    """Trạng thái nhịp gửi của một cửa sổ."""
+
+    __slots__ = ("delay", "latency", "min_latency", "decode", "unacked", "due", "last_flush",
+                 "frames", "throttled")
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.latency: Optional[float] = None
+        self.min_latency: Optional[float] = None
+        self.decode = 0.0
+        # (packet_sequence cuối của frame, thời điểm gửi)
+        self.unacked: Deque[Tuple[int, float]] = deque()
+        self.due: Optional[float] = None
+        self.last_flush = 0.0
+        self.frames = 0
+        self.throttled = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "delay": self.delay,
+            "latency": self.latency,
+            "decode": self.decode,
+            "unacked": len(self.unacked),
+            "frames": self.frames,
+            "pending": self.due is not None,
+        }
+
+
+class DamageBatcher:
+    """
+    Lập lịch flush damage của một kết nối trên một thread.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ quyết định khi nào flush cửa sổ nào; encode và gửi packet draw do callback đảm nhận
+    """
+
+    def __init__(
+        self,
+        flush: FlushCallback,
+        logger: Optional[ILogger] = None,
+        delay: float = DEFAULT_DELAY,
+        min_delay: float = DEFAULT_MIN_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        max_unacked: int = DEFAULT_MAX_UNACKED,
+        ack_timeout: float = DEFAULT_ACK_TIMEOUT,
+        max_rects: int = DEFAULT_MAX_RECTS,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Khởi tạo batcher.
+
+        Args:
+            flush: Hàm encode và gửi một DamageFrame (chạy trên thread lập lịch)
+            logger: Logger ghi lỗi của callback
+            delay: Độ trễ batch ban đầu (giây)
+            min_delay: Độ trễ batch tối thiểu (giây)
+            max_delay: Độ trễ batch tối đa (giây)
+            max_unacked: Số frame chưa được ack tối đa mỗi cửa sổ
+            ack_timeout: Thời gian chờ ack tối đa của một frame (giây)
+            max_rects: Số hình chữ nhật tối đa mỗi frame
+            metrics: Registry để ghi metrics (mặc định dùng registry của process)
+        """
+        self._flush = flush
+        self._logger = logger
+        self._min_delay = min_delay
+        self._max_delay = max(min_delay, max_delay)
+        self._initial_delay = max(min_delay, min(delay, self._max_delay))
+        self._max_unacked = max(1, max_unacked)
+        self._ack_timeout = ack_timeout
+        self._accumulator = DamageAccumulator(max_rects=max_rects)
+        self._windows: Dict[int, _WindowState] = {}
+        self._sequence = 1
+
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        metrics = metrics or get_default_registry()
+        self._frames = metrics.counter("shougun_session_damage_frames_total", "Số frame damage đã flush")
+        self._throttled = metrics.counter(
+            "shougun_session_damage_throttled_total", "Số lần cửa sổ bị dừng gửi vì quá nhiều frame chưa ack")
+        self._timeouts = metrics.counter("shougun_session_damage_ack_timeouts_total", "Số frame không được ack")
+        self._latency = metrics.histogram(
+            "shougun_session_damage_ack_latency_seconds", "Thời gian từ khi flush tới khi nhận ack")
+
+    def start(self) -> None:
+        """Bắt đầu thread lập lịch."""
+        with self._condition:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="DamageBatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """
+        Dừng thread lập lịch; damage chưa flush bị bỏ.
+
+        Args:
+            timeout: Thời gian tối đa chờ thread dừng
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def add_damage(self, wid: int, x: int, y: int, width: int, height: int) -> bool:
+        """
+        Thêm damage cho cửa sổ và lập lịch flush.
+
+        Cửa sổ đang rảnh được flush sau min_delay; cửa sổ đang cập nhật liên tục được flush cách
+        lần trước ít nhất độ trễ batch hiện tại của nó.
+
+        Args:
+            wid: ID cửa sổ
+            x: Tọa độ trái
+            y: Tọa độ trên
+            width: Chiều rộng
+            height: Chiều cao
+
+        Returns:
+            bool: False nếu damage không làm thay đổi vùng chờ gửi
+        """
+        with self._condition:
+            if not self._accumulator.add(wid, x, y, width, height):
+                return False
+            state = self._windows.get(wid)
+            if state is None:
+                state = self._windows[wid] = _WindowState(self._initial_delay)
+            if state.due is None:
+                state.due = max(time.monotonic() + self._min_delay, state.last_flush + state.delay)
+                self._condition.notify()
+            return True
+
+    def ack(self, wid: int, sequence: int, decode_time: int = 0) -> bool:
+        """
+        Xử lý ack "damage-sequence" của client.
+
+        Args:
+            wid: ID cửa sổ
+            sequence: packet_sequence được ack
+            decode_time: Thời gian decode client báo (ms, âm nếu decode lỗi)
+
+        Returns:
+            bool: False nếu không có frame nào chờ ack này
+        """
+        now = time.monotonic()
+        with self._condition:
+            state = self._windows.get(wid)
+            if state is None:
+                return False
+            sent = None
+            while state.unacked and state.unacked[0][0] <= sequence:
+                sent = state.unacked.popleft()[1]
+            if sent is None:
+                return False
+
+            latency = now - sent
+            self._latency.observe(latency)
+            state.latency = latency if state.latency is None else state.latency + _SMOOTHING * (latency - state.latency)
+            state.min_latency = latency if state.min_latency is None else min(state.min_latency, latency)
+            if decode_time >= 0:
+                state.decode += _SMOOTHING * (decode_time / 1000.0 - state.decode)
+            self._adapt(state)
+            if state.throttled:
+                state.throttled = False
+                self._condition.notify()
+            return True
+
+    def remove_window(self, wid: int) -> None:
+        """Bỏ damage và trạng thái của cửa sổ (cửa sổ đã đóng)."""
+        with self._condition:
+            self._accumulator.discard(wid)
+            self._windows.pop(wid, None)
+
+    def get_delay(self, wid: int) -> Optional[float]:
+        """Độ trễ batch hiện tại của cửa sổ (giây), None nếu chưa có damage."""
+        with self._condition:
+            state = self._windows.get(wid)
+            return state.delay if state is not None else None
+
+    def get_stats(self) -> Dict[int, Dict[str, Any]]:
+        """Thống kê nhịp gửi theo cửa sổ."""
+        with self._condition:
+            return {wid: state.to_dict() for wid, state in self._windows.items()}
+
+    def _adapt(self, state: _WindowState) -> None:
+        """Tính lại độ trễ batch từ thời gian decode và phần độ trễ ack do hàng đợi."""
+        queueing = max(0.0, state.latency - state.min_latency)
+        target = max(self._min_delay, state.decode + queueing)
+        delay = state.delay + _SMOOTHING * (target - state.delay)
+        state.delay = max(self._min_delay, min(delay, self._max_delay))
+
+    def _take_due(self, now: float) -> Tuple[List[DamageFrame], Optional[float]]:
+        """
+        Lấy các frame tới hạn flush.
+
+        Returns:
+            Tuple[List[DamageFrame], Optional[float]]: (frame cần flush, thời gian chờ tới lần kiểm tra sau)
+        """
+        frames: List[DamageFrame] = []
+        wake: Optional[float] = None
+        for wid, state in self._windows.items():
+            # Frame chờ ack quá lâu coi như mất để cửa sổ không bị dừng mãi
+            while state.unacked and now - state.unacked[0][1] >= self._ack_timeout:
+                state.unacked.popleft()
+                state.delay = min(state.delay * 2, self._max_delay)
+                self._timeouts.inc()
+            if state.unacked:
+                expiry = state.unacked[0][1] + self._ack_timeout
+                wake = expiry if wake is None else min(wake, expiry)
+            if state.due is None:
+                continue
+            if len(state.unacked) >= self._max_unacked:
+                if not state.throttled:
+                    state.throttled = True
+                    self._throttled.inc()
+                continue
+            if state.due > now:
+                wake = state.due if wake is None else min(wake, state.due)
+                continue
+
+            state.due = None
+            rects = self._accumulator.take(wid)
+            if not rects:
+                continue
+            frame = DamageFrame(wid, self._sequence, rects)
+            self._sequence += len(rects)
+            state.unacked.append((frame.last_sequence, now))
+            state.last_flush = now
+            state.frames += 1
+            frames.append(frame)
+        return frames, None if wake is None else max(0.0, wake - now)
+
+    def _run(self) -> None:
+        """Vòng lặp lập lịch."""
+        while True:
+            with self._condition:
+                frames: List[DamageFrame] = []
+                while not frames:
+                    if self._stopping:
+                        return
+                    frames, wait = self._take_due(time.monotonic())
+                    if not frames:
+                        self._condition.wait(wait)
+
+            # Callback chạy ngoài lock để add_damage/ack không bị chặn khi đang encode
+            for frame in frames:
+                try:
+                    self._flush(frame)
+                except Exception as e:
+                    self._rollback(frame)
+                    if self._logger:
+                        self._logger.error(f"Lỗi khi flush damage cửa sổ {frame.wid}: {e}")
+                    continue
+                self._frames.inc()
+
+    def _rollback(self, frame: DamageFrame) -> None:
+        """
+        Bỏ frame flush thất bại khỏi danh sách chờ ack.
+
+        Frame không tới client nên sẽ không bao giờ được ack; giữ lại sẽ chặn cửa sổ tới ack_timeout.
+        Số packet_sequence được trả lại nếu chưa cấp tiếp cho frame khác.
+
+        Args:
+            frame: Frame flush thất bại
+        """
+        with self._condition:
+            if self._sequence == frame.last_sequence + 1:
+                self._sequence = frame.sequence
+            state = self._windows.get(frame.wid)
+            if state is None:
+                return
+            for index, (sequence, _sent) in enumerate(state.unacked):
+                if sequence == frame.last_sequence:
+                    del state.unacked[index]
+                    state.frames -= 1
+                    break
+            if state.throttled and len(state.unacked) < self._max_unacked:
+                state.throttled = False
+                self._condition.notify()
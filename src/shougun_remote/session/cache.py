@@ -0,0 +1,316 @@
+"""
+Cache kết quả encode theo nội dung.
+
+Thay cho EncodingCache trong 05-rendering.md (khóa hash(pixels), giới hạn 100 mục, bỏ theo FIFO):
+khóa là digest mạnh của buffer pixel cùng tham số encode (xxh3-128 nếu đã cài xxhash, nếu không
+BLAKE2b-128), giới hạn theo tổng số byte và bỏ mục ít dùng gần đây nhất (LRU).
+
+Phía client có thể giữ cache riêng (ClientCache, dung lượng gửi trong hello dưới khóa
+"encoding.cache-size"). Server giữ bản sao sổ sách của cache đó (ClientCacheMirror) với cùng
+dung lượng và cùng thứ tự LRU nên biết chính xác client còn giữ nội dung nào: nội dung lặp lại
+(toolbar, con trỏ, icon) được gửi thành packet draw coding "cache" chỉ chứa ID thay vì encode lại.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from ..metrics import MetricsRegistry, get_default_registry
+from .encoder import EncodeRequest
+from .net import Buffer
+
+# Coding của packet draw tham chiếu nội dung trong cache của client
+CACHE_CODING = "cache"
+
+# Option của packet draw: "cache" = ID nội dung cần vẽ lại, "cache-store" = ID để client lưu nội dung mới
+CACHE_OPTION = "cache"
+CACHE_STORE_OPTION = "cache-store"
+
+# Dung lượng mặc định của cache encode phía server
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Nội dung lớn hơn tỷ lệ này của dung lượng cache không được lưu (sẽ đẩy gần hết cache ra)
+MAX_ENTRY_RATIO = 0.25
+
+_DIGEST_SIZE = 16
+
+_digest: Optional[Callable[[Buffer], bytes]] = None
+
+
+def _blake2b_digest(data: Buffer) -> bytes:
+    return hashlib.blake2b(data, digest_size=_DIGEST_SIZE).digest()
+
+
+def _digest_function() -> Callable[[Buffer], bytes]:
+    """Hàm digest nhanh nhất có sẵn (xxhash là dependency không bắt buộc)."""
+    global _digest
+    if _digest is None:
+        try:
+            import xxhash
+            _digest = xxhash.xxh3_128_digest
+        except ImportError:
+            _digest = _blake2b_digest
+    return _digest
+
+
+def content_key(pixels: Buffer, width: int, height: int, coding: str,
+                options: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Khóa cache của một vùng: digest pixel kèm tham số encode.
+
+    Args:
+        pixels: Buffer pixel liền mạch
+        width: Chiều rộng vùng
+        height: Chiều cao vùng
+        coding: Encoding
+        options: Tham số encode (quality, speed...)
+
+    Returns:
+        bytes: Khóa 16 byte
+    """
+    params = repr((width, height, coding, sorted((options or {}).items()))).encode("utf-8")
+    digest = _digest_function()
+    return digest(digest(memoryview(pixels).cast("B")) + params)
+
+
+def request_key(request: EncodeRequest) -> bytes:
+    """Khóa cache của một EncodeRequest."""
+    _, _, width, height = request.rect
+    return content_key(request.pixels, width, height, request.coding, request.options)
+
+
+class _ByteLRU:
+    """LRU giới hạn theo tổng số byte; thứ tự bỏ chỉ phụ thuộc chuỗi thao tác (để hai phía khớp nhau)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self.bytes = 0
+        self.entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int) -> int:
+        """Thêm mục, trả về số mục bị bỏ (mục quá lớn không được thêm)."""
+        if size > self.max_bytes * MAX_ENTRY_RATIO:
+            return 0
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= previous[1]
+        self.entries[key] = (value, size)
+        self.bytes += size
+        evicted = 0
+        while self.bytes > self.max_bytes:
+            _, (_, old_size) = self.entries.popitem(last=False)
+            self.bytes -= old_size
+            evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.bytes = 0
+
+
+class _CacheMetrics:
+    """Metrics hit/miss/eviction của một cache."""
+
+    def __init__(self, metrics: Optional[MetricsRegistry], name: str):
+        metrics = metrics or get_default_registry()
+        labels = {"cache": name}
+        self.hits = metrics.counter("shougun_session_cache_hits_total", "Số lần tìm thấy trong cache", labels)
+        self.misses = metrics.counter("shougun_session_cache_misses_total", "Số lần không có trong cache", labels)
+        self.evictions = metrics.counter("shougun_session_cache_evictions_total", "Số mục bị bỏ khỏi cache", labels)
+        self.bytes = metrics.gauge("shougun_session_cache_bytes", "Tổng số byte đang giữ trong cache", labels)
+
+
+class EncodingCache:
+    """
+    Cache dữ liệu đã encode phía server, thread-safe (dùng từ worker của EncodePipeline).
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ lưu và bỏ kết quả encode; quyết định encode thế nào do encoder đảm nhận
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES, metrics: Optional[MetricsRegistry] = None):
+        """
+        Khởi tạo cache.
+
+        Args:
+            max_bytes: Tổng số byte dữ liệu encode tối đa
+            metrics: Registry để ghi metrics (mặc định dùng registry của process)
+        """
+        self._lru = _ByteLRU(max_bytes)
+        self._lock = threading.Lock()
+        self._metrics = _CacheMetrics(metrics, "encoding")
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """Dữ liệu encode của khóa, None nếu không có."""
+        with self._lock:
+            data = self._lru.get(key)
+        (self._metrics.misses if data is None else self._metrics.hits).inc()
+        return data
+
+    def put(self, key: bytes, data: bytes) -> None:
+        """Lưu dữ liệu encode của khóa."""
+        with self._lock:
+            evicted = self._lru.put(key, data, len(data))
+            size = self._lru.bytes
+        if evicted:
+            self._metrics.evictions.inc(evicted)
+        self._metrics.bytes.set(size)
+
+    def encode(self, request: EncodeRequest, encoder: Callable[[EncodeRequest], bytes]) -> bytes:
+        """
+        Encode request, dùng lại kết quả đã có nếu cùng nội dung và tham số.
+
+        Args:
+            request: Vùng cần encode
+            encoder: Hàm encode khi không có trong cache
+
+        Returns:
+            bytes: Dữ liệu đã encode
+        """
+        key = request_key(request)
+        data = self.get(key)
+        if data is None:
+            data = encoder(request)
+            self.put(key, data)
+        return data
+
+    def clear(self) -> None:
+        """Xóa cache."""
+        with self._lock:
+            self._lru.clear()
+        self._metrics.bytes.set(0)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Số mục và tổng số byte đang giữ."""
+        with self._lock:
+            return {"entries": len(self._lru.entries), "bytes": self._lru.bytes, "max_bytes": self._lru.max_bytes}
+
+
+class ClientCacheMirror:
+    """
+    Sổ sách phía server về nội dung cache của một client.
+
+    Mọi thao tác phải theo đúng thứ tự gửi packet draw (client áp dụng theo thứ tự nhận).
+    """
+
+    def __init__(self, max_bytes: int, metrics: Optional[MetricsRegistry] = None):
+        """
+        Khởi tạo mirror.
+
+        Args:
+            max_bytes: Dung lượng cache client báo trong hello ("encoding.cache-size")
+            metrics: Registry để ghi metrics (mặc định dùng registry của process)
+        """
+        self._lru = _ByteLRU(max_bytes)
+        self._next_id = 1
+        self._metrics = _CacheMetrics(metrics, "client")
+
+    def lookup(self, key: bytes) -> Optional[int]:
+        """
+        ID cache client đang giữ cho nội dung, đánh dấu vừa dùng.
+
+        Args:
+            key: Khóa nội dung (content_key)
+
+        Returns:
+            Optional[int]: ID để gửi trong option "cache", None nếu client không có
+        """
+        cache_id = self._lru.get(key)
+        (self._metrics.misses if cache_id is None else self._metrics.hits).inc()
+        return cache_id
+
+    def store(self, key: bytes, size: int) -> Optional[int]:
+        """
+        Cấp ID cho nội dung mới sắp gửi.
+
+        Args:
+            key: Khóa nội dung
+            size: Kích thước dữ liệu encode được gửi (client lưu đúng dữ liệu này)
+
+        Returns:
+            Optional[int]: ID để gửi trong option "cache-store", None nếu nội dung quá lớn để cache
+        """
+        if size > self._lru.max_bytes * MAX_ENTRY_RATIO:
+            return None
+        cache_id = self._next_id
+        self._next_id += 1
+        evicted = self._lru.put(key, cache_id, size)
+        if evicted:
+            self._metrics.evictions.inc(evicted)
+        return cache_id
+
+    def draw_options(self, key: bytes, size: int, options: Optional[Dict[str, Any]] = None) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Quyết định gửi tham chiếu hay dữ liệu cho một vùng.
+
+        Args:
+            key: Khóa nội dung
+            size: Kích thước dữ liệu encode
+            options: Option của packet draw
+
+        Returns:
+            Tuple[bool, Dict[str, Any]]: (True nếu gửi coding "cache" không kèm dữ liệu, option của packet)
+        """
+        options = dict(options or {})
+        cache_id = self.lookup(key)
+        if cache_id is not None:
+            options[CACHE_OPTION] = cache_id
+            return True, options
+        cache_id = self.store(key, size)
+        if cache_id is not None:
+            options[CACHE_STORE_OPTION] = cache_id
+        return False, options
+
+
+class ClientCache:
+    """Cache phía client: lưu dữ liệu encode theo ID server cấp, cùng chính sách với ClientCacheMirror."""
+
+    def __init__(self, max_bytes: int, metrics: Optional[MetricsRegistry] = None):
+        """
+        Khởi tạo cache.
+
+        Args:
+            max_bytes: Dung lượng cache (gửi cho server trong hello)
+            metrics: Registry để ghi metrics (mặc định dùng registry của process)
+        """
+        self._lru = _ByteLRU(max_bytes)
+        self._metrics = _CacheMetrics(metrics, "client-store")
+
+    def get_hello_capabilities(self) -> Dict[str, Any]:
+        """Capability gửi trong hello để server bật tham chiếu cache."""
+        return {"encoding.cache-size": self._lru.max_bytes}
+
+    def process_draw(self, coding: str, data: Any, options: Dict[str, Any]) -> Optional[Tuple[str, Any]]:
+        """
+        Xử lý cache cho một packet draw vừa nhận.
+
+        Args:
+            coding: Coding của packet
+            data: Dữ liệu của packet
+            options: Option của packet
+
+        Returns:
+            Optional[Tuple[str, Any]]: (coding, dữ liệu) cần decode; None nếu tham chiếu tới nội
+            dung không còn trong cache (client yêu cầu vẽ lại)
+        """
+        if coding == CACHE_CODING:
+            entry = self._lru.get(options.get(CACHE_OPTION))
+            (self._metrics.misses if entry is None else self._metrics.hits).inc()
+            return entry
+        cache_id = options.get(CACHE_STORE_OPTION)
+        if cache_id is not None:
+            payload = bytes(data)
+            # Khóa theo ID: mirror phía server khóa theo nội dung nhưng thứ tự thao tác giống hệt
+            evicted = self._lru.put(cache_id, (coding, payload), len(payload))
+            if evicted:
+                self._metrics.evictions.inc(evicted)
+            data = payload
+        return coding, data
@@ -0,0 +1,213 @@
+"""
+Gửi/nhận payload lớn dưới dạng chunk raw (chunk_index 1-255, xem 02-protocol.md).
+
+Phía gửi thay mỗi phần tử bytes-like đủ lớn của packet (buffer pixel, dữ liệu nén...) bằng
+placeholder "" và gửi phần tử đó thành một packet raw có chunk_index = vị trí của nó trong
+packet, trước packet chính. Dữ liệu lớn vì vậy không đi qua rencode và không bị copy: chunk
+được gửi thẳng từ memoryview của buffer gốc.
+
+Phía nhận ghi mỗi chunk vào buffer cấp phát sẵn đúng kích thước trong header, rồi đặt buffer
+vào packet chính theo chỉ số sau khi packet chính được decode. Chunk cùng chỉ số tới nhiều lần
+được giữ thành danh sách các phần và chỉ nối một lần khi ghép packet.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .compression import CompressionSelector, decompress, packet_coding
+from .net import (
+    FLAG_RENCODEPLUS,
+    MAX_CHUNK_INDEX,
+    MAX_PAYLOAD_SIZE,
+    PacketError,
+    PacketHeader,
+    PacketReader,
+)
+
+# Phần tử bytes-like từ ngưỡng này trở lên được gửi thành chunk raw thay vì encode vào payload
+DEFAULT_CHUNK_THRESHOLD = 16 * 1024
+
+PLACEHOLDER = ""
+
+# send(payload, flags=..., compression=..., chunk_index=...) - NetworkConnection/PacketProtocol.send_packet
+SendFunction = Callable[..., Any]
+EncodeFunction = Callable[[list], bytes]
+
+_BINARY_TYPES = (bytes, bytearray, memoryview)
+
+
+def split_packet(packet: list, threshold: int = DEFAULT_CHUNK_THRESHOLD) -> Tuple[list, List[Tuple[int, memoryview]]]:
+    """
+    Tách các phần tử nhị phân lớn khỏi packet.
+
+    Args:
+        packet: Packet [packet_type, arg1, ...]
+        threshold: Kích thước tối thiểu để tách thành chunk
+
+    Returns:
+        Tuple[list, List[Tuple[int, memoryview]]]: (packet có placeholder, [(chunk_index, dữ liệu)])
+    """
+    chunks: List[Tuple[int, memoryview]] = []
+    main = packet
+    for index in range(1, min(len(packet), MAX_CHUNK_INDEX + 1)):
+        item = packet[index]
+        if isinstance(item, _BINARY_TYPES):
+            view = memoryview(item).cast("B")
+            if len(view) >= threshold:
+                if main is packet:
+                    main = list(packet)
+                main[index] = PLACEHOLDER
+                chunks.append((index, view))
+    return main, chunks
+
+
+def send_packet(send: SendFunction, encode: EncodeFunction, packet: list, flags: int = FLAG_RENCODEPLUS,
+                selector: Optional[CompressionSelector] = None, threshold: int = DEFAULT_CHUNK_THRESHOLD) -> int:
+    """
+    Gửi packet, tách dữ liệu lớn thành chunk raw.
+
+    Args:
+        send: Hàm gửi một packet (NetworkConnection.send_packet hoặc PacketProtocol.send_packet)
+        encode: Hàm encode packet chính thành payload
+        packet: Packet cần gửi
+        flags: Cờ của packet chính
+        selector: Bộ chọn nén cho chunk và packet chính (None để không nén)
+        threshold: Kích thước tối thiểu để tách thành chunk
+
+    Returns:
+        int: Số chunk đã gửi
+    """
+    main, chunks = split_packet(packet, threshold)
+    packet_type = str(packet[0])
+    coding = packet_coding(packet)
+    for index, data in chunks:
+        compression = 0
+        if selector is not None:
+            compression, data = selector.compress(f"{packet_type}-chunk", data, coding)
+        send(data, flags=0, compression=compression, chunk_index=index)
+    payload = encode(main)
+    compression = 0
+    if selector is not None:
+        compression, payload = selector.compress(packet_type, payload)
+    send(payload, flags=flags, compression=compression, chunk_index=0)
+    return len(chunks)
+
+
+class ChunkAssembler:
+    """
+    Giữ các chunk đã nhận cho tới khi packet chính tới.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ ghép chunk vào packet chính; việc đọc socket và decode do caller đảm nhận
+    """
+
+    def __init__(self, max_pending: int = MAX_PAYLOAD_SIZE):
+        """
+        Khởi tạo assembler.
+
+        Args:
+            max_pending: Tổng số byte chunk tối đa được giữ cùng lúc
+        """
+        self._max_pending = max_pending
+        self._chunks: Dict[int, List[memoryview]] = {}
+        self._pending_bytes = 0
+
+    def allocate(self, index: int, size: int) -> memoryview:
+        """
+        Cấp phát buffer đích cho một chunk (để đọc thẳng từ socket vào).
+
+        Chunk cùng chỉ số tới nhiều lần được nối tiếp nhau (khi ghép packet).
+
+        Args:
+            index: Chỉ số chunk (1-255)
+            size: Kích thước payload của chunk
+
+        Returns:
+            memoryview: Vùng ghi đúng size byte
+
+        Raises:
+            PacketError: Chỉ số không hợp lệ hoặc vượt giới hạn bộ nhớ
+        """
+        self._check(index, size)
+        buffer = memoryview(bytearray(size))
+        self._chunks.setdefault(index, []).append(buffer)
+        self._pending_bytes += size
+        return buffer
+
+    def add_chunk(self, index: int, data: memoryview) -> None:
+        """
+        Giữ chunk có buffer riêng (payload từ PacketParser) mà không copy.
+
+        Args:
+            index: Chỉ số chunk (1-255)
+            data: Payload của chunk
+        """
+        self._check(index, len(data))
+        self._chunks.setdefault(index, []).append(data)
+        self._pending_bytes += len(data)
+
+    def assemble(self, packet: list) -> list:
+        """
+        Đặt các chunk đang giữ vào packet chính đã decode.
+
+        Args:
+            packet: Packet chính (có placeholder)
+
+        Returns:
+            list: Packet với dữ liệu chunk (memoryview) ở đúng vị trí
+
+        Raises:
+            PacketError: Chunk trỏ ra ngoài packet
+        """
+        if not self._chunks:
+            return packet
+        chunks, self._chunks = self._chunks, {}
+        self._pending_bytes = 0
+        if max(chunks) >= len(packet):
+            raise PacketError(f"Chunk {max(chunks)} nằm ngoài packet {len(packet)} phần tử")
+        packet = list(packet)
+        for index, parts in chunks.items():
+            # Một phần: dùng thẳng buffer đã nhận; nhiều phần: nối một lần
+            packet[index] = parts[0] if len(parts) == 1 else memoryview(bytearray().join(parts))
+        return packet
+
+    def get_pending_bytes(self) -> int:
+        """Tổng số byte chunk đang chờ packet chính."""
+        return self._pending_bytes
+
+    def reset(self) -> None:
+        """Bỏ mọi chunk đang giữ."""
+        self._chunks.clear()
+        self._pending_bytes = 0
+
+    def _check(self, index: int, size: int) -> None:
+        """Kiểm tra chỉ số và giới hạn bộ nhớ."""
+        if not 1 <= index <= MAX_CHUNK_INDEX:
+            raise PacketError(f"Chunk index không hợp lệ: {index}")
+        if self._pending_bytes + size > self._max_pending:
+            raise PacketError(f"Chunk vượt giới hạn {self._max_pending} bytes")
+
+
+def receive_packet(reader: PacketReader, assembler: ChunkAssembler) -> Optional[Tuple[PacketHeader, memoryview]]:
+    """
+    Đọc tới packet chính tiếp theo; chunk trước nó được đọc thẳng vào buffer của assembler.
+
+    Args:
+        reader: Reader của kết nối
+        assembler: Assembler giữ chunk
+
+    Returns:
+        Optional[Tuple[PacketHeader, memoryview]]: Packet chính (payload chưa giải nén, hợp lệ tới lần
+        đọc tiếp theo), None nếu kết nối đã đóng
+    """
+    while True:
+        header = reader.read_header()
+        if header is None:
+            return None
+        if header.chunk_index == 0:
+            return header, reader.read_payload(header)
+        if header.level:
+            # Chunk nén: giải nén ra buffer mới, buffer nhận nội bộ được dùng lại
+            data = decompress(header.compression, reader.read_payload(header))
+            assembler.add_chunk(header.chunk_index, memoryview(data))
+        else:
+            reader.read_payload_into(header, assembler.allocate(header.chunk_index, header.payload_size))
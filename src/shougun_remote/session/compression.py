@@ -0,0 +1,363 @@
+"""
+Nén payload packet session theo từng packet.
+
+Byte compression trong header (02-protocol.md): 4 bit cao là loại nén (0x10 lz4, 0x40 brotli;
+0x00 với mức > 0 là zlib như Xpra), 4 bit thấp là mức nén (0 = không nén). lz4 và brotli là
+dependency không bắt buộc, chỉ được import khi dùng tới; zlib có sẵn nên luôn dùng được.
+
+CompressionSelector chọn không nén / lz4 / brotli / zlib và mức nén cho từng packet theo loại
+packet, kích thước, tỷ lệ nén đo được của loại đó (đo lại định kỳ bằng lấy mẫu), băng thông
+đường truyền và CPU còn trống - để không tốn CPU nén dữ liệu không nén được (PNG/JPEG/H264...).
+"""
+
+import threading
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..metrics import MetricsRegistry, get_default_registry
+from .net import COMPRESSION_LEVEL_MASK, COMPRESSOR_MASK, MAX_PAYLOAD_SIZE, Buffer, PacketError
+
+NONE = "none"
+ZLIB = "zlib"
+LZ4 = "lz4"
+BROTLI = "brotli"
+
+_COMPRESSOR_BITS = {ZLIB: 0x00, LZ4: 0x10, BROTLI: 0x40}
+_COMPRESSOR_NAMES = {bits: name for name, bits in _COMPRESSOR_BITS.items()}
+
+# Dữ liệu đã nén sẵn - nén thêm chỉ tốn CPU
+PRECOMPRESSED_CODINGS = frozenset({"png", "jpeg", "webp", "h264", "h265", "vp8", "vp9", "av1"})
+
+# Packet nhỏ hơn ngưỡng này không được nén (header của bộ nén lớn hơn phần tiết kiệm)
+DEFAULT_MIN_SIZE = 256
+
+# Loại packet có tỷ lệ nén (nén/gốc) trên ngưỡng này bị coi là không nén được
+DEFAULT_MAX_RATIO = 0.9
+
+# Loại packet không nén được vẫn được thử nén lại mỗi N packet để đo lại tỷ lệ
+DEFAULT_SAMPLE_INTERVAL = 32
+
+# Băng thông (byte/giây) dưới ngưỡng này thì ưu tiên tỷ lệ nén hơn tốc độ
+DEFAULT_LOW_BANDWIDTH = 1024 * 1024
+
+# CPU còn trống (0-1) dưới ngưỡng này thì chỉ dùng bộ nén nhanh nhất
+DEFAULT_LOW_CPU_HEADROOM = 0.2
+
+# Hệ số làm mượt tỷ lệ nén theo loại packet
+_RATIO_SMOOTHING = 0.2
+
+
+def _zlib_compress(data: Buffer, level: int) -> bytes:
+    return zlib.compress(data, level)
+
+
+def _zlib_decompress(data: Buffer) -> bytes:
+    # Giới hạn kích thước sau giải nén để payload độc hại không chiếm hết bộ nhớ
+    decompressor = zlib.decompressobj()
+    result = decompressor.decompress(data, MAX_PAYLOAD_SIZE)
+    if decompressor.unconsumed_tail:
+        raise ValueError("payload giải nén vượt giới hạn")
+    return result
+
+
+def _lz4_compress(data: Buffer, level: int) -> bytes:
+    import lz4.block
+    return lz4.block.compress(data, mode="fast", acceleration=max(1, 10 - level))
+
+
+def _lz4_decompress(data: Buffer) -> bytes:
+    # lz4.block cấp phát theo kích thước 4 byte đầu do peer gửi - kiểm tra trước khi giải nén
+    if len(data) < 4:
+        raise ValueError("payload lz4 thiếu kích thước")
+    size = int.from_bytes(bytes(data[:4]), "little")
+    if size > MAX_PAYLOAD_SIZE:
+        raise ValueError(f"payload giải nén vượt giới hạn ({size} byte)")
+    import lz4.block
+    result = lz4.block.decompress(data)
+    if len(result) != size:
+        raise ValueError("kích thước payload lz4 không khớp")
+    return result
+
+
+def _brotli_compress(data: Buffer, level: int) -> bytes:
+    import brotli
+    return brotli.compress(bytes(data), quality=level)
+
+
+def _brotli_decompress(data: Buffer) -> bytes:
+    # Giải nén từng phần với giới hạn output (brotli >= 1.1) để chặn decompression bomb
+    import brotli
+    limit = MAX_PAYLOAD_SIZE + 1
+    decompressor = brotli.Decompressor()
+    result = bytearray(decompressor.process(bytes(data), output_buffer_limit=limit))
+    while len(result) < limit and not decompressor.is_finished():
+        part = decompressor.process(b"", output_buffer_limit=limit - len(result))
+        if not part:
+            break
+        result += part
+    if len(result) > MAX_PAYLOAD_SIZE:
+        raise ValueError("payload giải nén vượt giới hạn")
+    if not decompressor.is_finished():
+        raise ValueError("payload brotli không đầy đủ")
+    return bytes(result)
+
+
+_COMPRESS: Dict[str, Callable[[Buffer, int], bytes]] = {
+    ZLIB: _zlib_compress,
+    LZ4: _lz4_compress,
+    BROTLI: _brotli_compress,
+}
+
+_DECOMPRESS: Dict[str, Callable[[Buffer], bytes]] = {
+    ZLIB: _zlib_decompress,
+    LZ4: _lz4_decompress,
+    BROTLI: _brotli_decompress,
+}
+
+_available: Optional[List[str]] = None
+
+
+def available_compressors() -> List[str]:
+    """
+    Các bộ nén dùng được trong môi trường hiện tại.
+
+    Returns:
+        List[str]: Tên bộ nén (luôn có zlib)
+    """
+    global _available
+    if _available is None:
+        found = [ZLIB]
+        for name, module in ((LZ4, "lz4.block"), (BROTLI, "brotli")):
+            try:
+                __import__(module)
+                found.append(name)
+            except ImportError:
+                pass
+        _available = found
+    return list(_available)
+
+
+def compression_byte(compressor: str, level: int) -> int:
+    """
+    Tạo byte compression cho header.
+
+    Args:
+        compressor: Tên bộ nén (NONE để không nén)
+        level: Mức nén 1-15
+
+    Returns:
+        int: Byte compression
+    """
+    if compressor == NONE:
+        return 0
+    return _COMPRESSOR_BITS[compressor] | max(1, min(level, COMPRESSION_LEVEL_MASK))
+
+
+def decompress(compression: int, payload: Buffer) -> Buffer:
+    """
+    Giải nén payload theo byte compression trong header.
+
+    Args:
+        compression: Byte compression
+        payload: Payload đã nhận
+
+    Returns:
+        Buffer: Payload gốc (chính payload nếu không nén)
+
+    Raises:
+        PacketError: Loại nén không hỗ trợ hoặc dữ liệu hỏng
+    """
+    if not compression & COMPRESSION_LEVEL_MASK:
+        return payload
+    name = _COMPRESSOR_NAMES.get(compression & COMPRESSOR_MASK)
+    if name is None:
+        raise PacketError(f"Loại nén không hỗ trợ: {compression:#04x}")
+    try:
+        return _DECOMPRESS[name](payload)
+    except ImportError as e:
+        raise PacketError(f"Thiếu thư viện giải nén {name}: {e}") from e
+    except Exception as e:
+        raise PacketError(f"Giải nén {name} thất bại: {e}") from e
+
+
+def packet_coding(packet: list) -> Optional[str]:
+    """Encoding của dữ liệu pixel trong packet draw (None với packet khác)."""
+    if len(packet) > 6 and packet[0] == "draw" and isinstance(packet[6], str):
+        return packet[6]
+    return None
+
+
+class _TypeStats:
+    """Thống kê nén của một loại packet."""
+
+    __slots__ = ("packets", "compressed", "skipped", "bytes_in", "bytes_out", "ratio", "since_sample")
+
+    def __init__(self):
+        self.packets = 0
+        self.compressed = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.ratio: Optional[float] = None
+        self.since_sample = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "packets": self.packets,
+            "compressed": self.compressed,
+            "skipped": self.skipped,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": self.ratio,
+        }
+
+
+class CompressionSelector:
+    """
+    Chọn và áp dụng bộ nén cho từng packet.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ quyết định nén thế nào và ghi nhận hiệu quả nén; không biết về socket hay codec
+    """
+
+    def __init__(
+        self,
+        compressors: Optional[List[str]] = None,
+        min_size: int = DEFAULT_MIN_SIZE,
+        max_ratio: float = DEFAULT_MAX_RATIO,
+        sample_interval: int = DEFAULT_SAMPLE_INTERVAL,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Khởi tạo selector.
+
+        Args:
+            compressors: Bộ nén được phép dùng (mặc định: mọi bộ nén có sẵn, hoặc danh sách peer hỗ trợ)
+            min_size: Kích thước tối thiểu để nén
+            max_ratio: Tỷ lệ nén tối đa để coi là đáng nén
+            sample_interval: Chu kỳ thử nén lại loại packet không nén được
+            metrics: Registry để ghi metrics (mặc định dùng registry của process)
+        """
+        available = available_compressors()
+        self._compressors = [name for name in (available if compressors is None else compressors) if name in available]
+        self._min_size = min_size
+        self._max_ratio = max_ratio
+        self._sample_interval = max(1, sample_interval)
+        self._bandwidth: Optional[float] = None
+        self._cpu_headroom = 1.0
+        self._stats: Dict[str, _TypeStats] = {}
+        self._lock = threading.Lock()
+
+        metrics = metrics or get_default_registry()
+        self._skipped = {
+            reason: metrics.counter(
+                "shougun_session_compression_skipped_total", "Số packet không nén", {"reason": reason})
+            for reason in ("small", "precompressed", "incompressible", "no_gain")
+        }
+        self._compressed_bytes = {
+            name: metrics.counter(
+                "shougun_session_compressed_bytes_total", "Số byte trước khi nén", {"compressor": name})
+            for name in self._compressors
+        }
+
+    def update_link(self, bandwidth: Optional[float] = None, cpu_headroom: Optional[float] = None) -> None:
+        """
+        Cập nhật tình trạng đường truyền và CPU.
+
+        Args:
+            bandwidth: Băng thông ước lượng (byte/giây)
+            cpu_headroom: Tỷ lệ CPU còn trống (0-1)
+        """
+        if bandwidth is not None:
+            self._bandwidth = bandwidth
+        if cpu_headroom is not None:
+            self._cpu_headroom = max(0.0, min(1.0, cpu_headroom))
+
+    def select(self, packet_type: str, size: int, coding: Optional[str] = None) -> Tuple[str, int]:
+        """
+        Chọn bộ nén và mức nén (không thay đổi thống kê).
+
+        Args:
+            packet_type: Loại packet
+            size: Kích thước payload
+            coding: Encoding của dữ liệu pixel (packet draw)
+
+        Returns:
+            Tuple[str, int]: (tên bộ nén hoặc NONE, mức nén)
+        """
+        if not self._compressors or size < self._min_size or coding in PRECOMPRESSED_CODINGS:
+            return NONE, 0
+        stats = self._stats.get(packet_type)
+        if stats and stats.ratio is not None and stats.ratio > self._max_ratio \
+                and stats.since_sample < self._sample_interval:
+            return NONE, 0
+        return self._choose(size)
+
+    def compress(self, packet_type: str, payload: Buffer, coding: Optional[str] = None) -> Tuple[int, Buffer]:
+        """
+        Nén payload nếu đáng nén.
+
+        Args:
+            packet_type: Loại packet
+            payload: Payload đã encode
+            coding: Encoding của dữ liệu pixel (packet draw)
+
+        Returns:
+            Tuple[int, Buffer]: (byte compression, payload cần gửi)
+        """
+        size = len(payload)
+        with self._lock:
+            stats = self._stats.get(packet_type)
+            if stats is None:
+                stats = self._stats[packet_type] = _TypeStats()
+            stats.packets += 1
+            stats.bytes_in += size
+            compressor, level = self.select(packet_type, size, coding)
+            if compressor == NONE:
+                stats.skipped += 1
+                stats.since_sample += 1
+                stats.bytes_out += size
+                self._skipped[self._skip_reason(size, coding)].inc()
+                return 0, payload
+
+        compressed = _COMPRESS[compressor](payload, level)
+
+        with self._lock:
+            ratio = len(compressed) / size
+            stats.ratio = ratio if stats.ratio is None else stats.ratio + _RATIO_SMOOTHING * (ratio - stats.ratio)
+            stats.since_sample = 0
+            if ratio > self._max_ratio:
+                stats.skipped += 1
+                stats.bytes_out += size
+                self._skipped["no_gain"].inc()
+                return 0, payload
+            stats.compressed += 1
+            stats.bytes_out += len(compressed)
+        self._compressed_bytes[compressor].inc(size)
+        return compression_byte(compressor, level), compressed
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Thống kê nén theo loại packet."""
+        with self._lock:
+            return {packet_type: stats.to_dict() for packet_type, stats in self._stats.items()}
+
+    def _choose(self, size: int) -> Tuple[str, int]:
+        """Chọn bộ nén theo băng thông và CPU còn trống."""
+        slow_link = self._bandwidth is not None and self._bandwidth < DEFAULT_LOW_BANDWIDTH
+        busy_cpu = self._cpu_headroom < DEFAULT_LOW_CPU_HEADROOM
+        if slow_link and not busy_cpu and BROTLI in self._compressors:
+            # Đường truyền chậm: tiết kiệm byte đáng hơn CPU; payload lớn dùng mức thấp hơn
+            return BROTLI, 5 if size > 1024 * 1024 else 9
+        if LZ4 in self._compressors:
+            return LZ4, 1 if busy_cpu else 5
+        if ZLIB in self._compressors:
+            return ZLIB, 1 if busy_cpu or not slow_link else 6
+        return self._compressors[0], 1
+
+    def _skip_reason(self, size: int, coding: Optional[str]) -> str:
+        """Lý do không nén (cho metrics)."""
+        if coding in PRECOMPRESSED_CODINGS:
+            return "precompressed"
+        if size < self._min_size or not self._compressors:
+            return "small"
+        return "incompressible"
@@ -0,0 +1,348 @@
+"""
+Vùng damage của cửa sổ (phần màn hình cần gửi lại).
+
+DamageRegion giữ hợp của các hình chữ nhật damage dưới dạng tập hình chữ nhật rời nhau trong mảng
+NumPy (N, 4) [x1, y1, x2, y2). Damage mới được gom rồi hợp theo lô trên lưới tọa độ nén (chỉ gồm
+các cạnh hình chữ nhật), nên diện tích là chính xác và không pixel nào bị gửi hai lần. Khi lấy ra để
+encode, các hình chữ nhật được gộp theo chi phí: gộp nếu phần diện tích thừa nhỏ hơn chi phí gửi
+thêm một hình chữ nhật.
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+Rect = Tuple[int, int, int, int]
+
+# Chi phí cố định của một hình chữ nhật (header packet, khởi tạo encoder...) quy ra số pixel
+DEFAULT_RECT_COST = 2048
+
+# Gửi một hình bao duy nhất nếu phần thừa không quá tỷ lệ này của hình bao
+DEFAULT_MAX_WASTE = 0.25
+
+# Số hình chữ nhật tối đa trả về cho một lần encode
+DEFAULT_MAX_RECTS = 32
+
+# Vùng có không quá số hình này được kiểm tra bằng vòng lặp Python thay vì NumPy
+SCAN_LIMIT = 16
+
+# Trên max_rects * COARSEN_FACTOR hình thì nới ra lưới ô trước khi gộp từng cặp
+COARSEN_FACTOR = 8
+
+# Số damage tối thiểu được gom trước khi chuẩn hóa lại vùng (lớn dần theo số hình đã có)
+NORMALIZE_BATCH = 64
+
+
+def _areas(rects: np.ndarray) -> np.ndarray:
+    return (rects[:, 2] - rects[:, 0]) * (rects[:, 3] - rects[:, 1])
+
+
+def _normalize(rects: np.ndarray) -> np.ndarray:
+    """
+    Hợp các hình chữ nhật thành tập hình rời nhau trên lưới tọa độ nén.
+
+    Lưới chỉ có các cạnh của hình chữ nhật nên kích thước phụ thuộc số hình, không phụ thuộc
+    số pixel. Các đoạn liền nhau trong một dải được nối, rồi dải giống nhau liên tiếp được gộp dọc.
+    """
+    xs = np.unique(rects[:, [0, 2]])
+    ys = np.unique(rects[:, [1, 3]])
+    ix = np.searchsorted(xs, rects[:, [0, 2]])
+    iy = np.searchsorted(ys, rects[:, [1, 3]])
+    mask = np.zeros((len(ys) + 1, len(xs) + 1), dtype=np.int8)
+    for (x1, x2), (y1, y2) in zip(ix.tolist(), iy.tolist()):
+        mask[y1:y2, x1 + 1:x2 + 1] = 1
+    edges = np.diff(mask, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    ends = np.nonzero(edges == -1)[1]
+    if not len(rows):
+        return np.empty((0, 4), dtype=np.int64)
+
+    # Xếp các đoạn theo (đoạn, dòng): đoạn giống hệt ở dòng ngay dưới là phần tiếp theo của cùng một hình
+    span = starts * len(xs) + ends
+    order = np.lexsort((rows, span))
+    span, rows, starts, ends = span[order], rows[order], starts[order], ends[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (span[1:] != span[:-1]) | (rows[1:] != rows[:-1] + 1)
+    last = np.ones(len(rows), dtype=bool)
+    last[:-1] = first[1:]
+    return np.stack((xs[starts[first]], ys[rows[first]], xs[ends[last]], ys[rows[last] + 1]), axis=1).astype(np.int64)
+
+
+def _coarsen(rects: np.ndarray, limit: int) -> np.ndarray:
+    """
+    Giảm số hình bằng cách nới cạnh ra lưới ô vuông, nhân đôi cỡ ô tới khi còn không quá limit hình.
+
+    Rẻ hơn nhiều so với gộp từng cặp khi có hàng trăm damage nhỏ rải rác; các hình gần nhau
+    rơi vào cùng ô và được hợp lại.
+    """
+    tile = 16
+    while len(rects) > limit:
+        snapped = np.concatenate((rects[:, :2] // tile * tile, -(-rects[:, 2:] // tile) * tile), axis=1)
+        rects = _normalize(snapped)
+        tile *= 2
+    return rects
+
+
+class DamageRegion:
+    """
+    Hợp các hình chữ nhật damage của một cửa sổ.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ tính vùng cần vẽ lại; chọn encoding và gửi do tầng khác đảm nhận
+    """
+
+    def __init__(self, rect_cost: int = DEFAULT_RECT_COST, max_waste: float = DEFAULT_MAX_WASTE,
+                 max_rects: int = DEFAULT_MAX_RECTS, exact: bool = False):
+        """
+        Khởi tạo vùng rỗng.
+
+        Args:
+            rect_cost: Chi phí một hình chữ nhật (pixel) khi quyết định gộp
+            max_waste: Tỷ lệ diện tích thừa tối đa để gửi một hình bao duy nhất
+            max_rects: Số hình chữ nhật tối đa khi lấy ra
+            exact: Không bao giờ nới vùng khi damage dồn nhiều (covers()/area() luôn chính xác)
+        """
+        self._rect_cost = rect_cost
+        self._max_waste = max_waste
+        self._max_rects = max(1, max_rects)
+        self._exact = exact
+        self._rects = np.empty((0, 4), dtype=np.int64)
+        self._boxes: List[Rect] = []
+        self._pending: List[Rect] = []
+
+    def __len__(self) -> int:
+        return len(self._get_rects())
+
+    def is_empty(self) -> bool:
+        """Vùng không có damage nào."""
+        return not len(self._rects) and not self._pending
+
+    def add(self, x: int, y: int, width: int, height: int) -> bool:
+        """
+        Thêm một damage.
+
+        Args:
+            x: Tọa độ trái
+            y: Tọa độ trên
+            width: Chiều rộng
+            height: Chiều cao
+
+        Returns:
+            bool: False nếu damage rỗng hoặc nằm trọn trong một hình đã có hay một damage vừa thêm
+        """
+        if width <= 0 or height <= 0:
+            return False
+        x2, y2 = x + width, y + height
+        rects = self._rects
+        # Damage lặp lại (con trỏ nhấp nháy, video) thường trùng với damage vừa thêm
+        recent = self._pending[-SCAN_LIMIT:]
+        if len(rects) <= SCAN_LIMIT:
+            # Vài hình: duyệt Python rẻ hơn chi phí gọi NumPy
+            recent = self._boxes + recent
+        elif np.any((rects[:, 0] <= x) & (rects[:, 1] <= y) & (rects[:, 2] >= x2) & (rects[:, 3] >= y2)):
+            return False
+        if any(x1 <= x and y1 <= y and x2_ >= x2 and y2_ >= y2 for x1, y1, x2_, y2_ in recent):
+            return False
+        self._pending.append((x, y, x2, y2))
+        if len(self._pending) >= max(NORMALIZE_BATCH, len(rects)):
+            self._get_rects()
+        return True
+
+    def add_rects(self, rects: List[Rect]) -> None:
+        """Thêm nhiều damage (x, y, width, height)."""
+        for rect in rects:
+            self.add(*rect)
+
+    def area(self) -> int:
+        """Tổng diện tích (pixel) của vùng."""
+        rects = self._get_rects()
+        return int(_areas(rects).sum()) if len(rects) else 0
+
+    def bounds(self) -> Optional[Rect]:
+        """Hình bao (x, y, width, height), None nếu vùng rỗng."""
+        rects = self._get_rects()
+        if not len(rects):
+            return None
+        x1, y1 = rects[:, :2].min(axis=0)
+        x2, y2 = rects[:, 2:].max(axis=0)
+        return int(x1), int(y1), int(x2 - x1), int(y2 - y1)
+
+    def covers(self, x: int, y: int, width: int, height: int) -> bool:
+        """
+        Kiểm tra vùng có phủ trọn một hình chữ nhật không.
+
+        Args:
+            x: Tọa độ trái
+            y: Tọa độ trên
+            width: Chiều rộng
+            height: Chiều cao
+
+        Returns:
+            bool: True nếu mọi pixel của hình chữ nhật đều nằm trong vùng
+        """
+        if width <= 0 or height <= 0:
+            return True
+        rects = self._get_rects()
+        if not len(rects):
+            return False
+        ix1 = np.maximum(rects[:, 0], x)
+        iy1 = np.maximum(rects[:, 1], y)
+        ix2 = np.minimum(rects[:, 2], x + width)
+        iy2 = np.minimum(rects[:, 3], y + height)
+        overlap = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+        # Các hình rời nhau nên tổng phần giao bằng diện tích được phủ
+        return int(overlap.sum()) >= width * height
+
+    def get_rectangles(self) -> List[Rect]:
+        """
+        Các hình chữ nhật cần encode, đã gộp theo chi phí.
+
+        Returns:
+            List[Rect]: (x, y, width, height) rời nhau, tối đa max_rects hình
+        """
+        rects = self._get_rects()
+        if not len(rects):
+            return []
+        bounds = self.bounds()
+        if len(rects) == 1 or self.area() >= bounds[2] * bounds[3] * (1 - self._max_waste):
+            return [bounds]
+        rects = self._optimize(rects, self._max_rects)
+        return [(int(x1), int(y1), int(x2 - x1), int(y2 - y1)) for x1, y1, x2, y2 in rects.tolist()]
+
+    def take(self) -> List[Rect]:
+        """Lấy các hình chữ nhật cần encode rồi xóa vùng."""
+        rects = self.get_rectangles()
+        self.clear()
+        return rects
+
+    def clear(self) -> None:
+        """Xóa vùng."""
+        self._rects = np.empty((0, 4), dtype=np.int64)
+        self._boxes = []
+        self._pending = []
+
+    def _get_rects(self) -> np.ndarray:
+        """Các hình rời nhau của vùng, chuẩn hóa các damage đang chờ nếu có."""
+        if self._pending:
+            pending = np.array(self._pending, dtype=np.int64)
+            self._pending = []
+            self._rects = _normalize(np.concatenate((self._rects, pending)))
+            if not self._exact and len(self._rects) > self._max_rects * 16:
+                # Giữ số hình chữ nhật có giới hạn khi damage dồn lâu giữa hai lần flush
+                self._rects = self._optimize(self._rects, self._max_rects * 4)
+            self._boxes = self._rects.tolist() if len(self._rects) <= SCAN_LIMIT else []
+        return self._rects
+
+    def _optimize(self, rects: np.ndarray, max_rects: int) -> np.ndarray:
+        """
+        Gộp tham lam các cặp hình có phần thừa nhỏ nhất khi phần thừa rẻ hơn chi phí một hình,
+        hoặc khi vẫn còn nhiều hơn max_rects hình.
+
+        Mỗi vòng gộp cùng lúc mọi cặp là lựa chọn tốt nhất của nhau (theo thứ tự phần thừa tăng
+        dần) nên số vòng tính ma trận phần thừa chỉ tăng theo log số hình.
+        """
+        rects = _coarsen(rects, max_rects * COARSEN_FACTOR).copy()
+        while len(rects) > 1:
+            count = len(rects)
+            areas = _areas(rects)
+            x1 = np.minimum.outer(rects[:, 0], rects[:, 0])
+            y1 = np.minimum.outer(rects[:, 1], rects[:, 1])
+            x2 = np.maximum.outer(rects[:, 2], rects[:, 2])
+            y2 = np.maximum.outer(rects[:, 3], rects[:, 3])
+            waste = (x2 - x1) * (y2 - y1) - areas[:, None] - areas[None, :]
+            np.fill_diagonal(waste, np.iinfo(np.int64).max)
+            indexes = np.arange(count)
+            partner = waste.argmin(axis=1)
+            best = waste[indexes, partner]
+            # Cặp có phần thừa nhỏ nhất luôn được xét, kể cả khi argmin chọn hình khác lúc bằng nhau
+            first = int(np.argmin(best))
+            pairs = np.nonzero(partner[partner] == indexes)[0].tolist() + [first]
+            pairs.sort(key=lambda index: best[index])
+
+            excess = count - max_rects
+            alive = np.ones(count, dtype=bool)
+            merged_any = False
+            for i in pairs:
+                j = int(partner[i])
+                if best[i] > self._rect_cost and excess <= 0:
+                    break
+                if not (alive[i] and alive[j]):
+                    continue
+                merged = np.concatenate((np.minimum(rects[i, :2], rects[j, :2]), np.maximum(rects[i, 2:], rects[j, 2:])))
+                alive[j] = False
+                excess -= 1
+                while True:
+                    # Hình gộp nuốt các hình giao với nó: các hình vẫn rời nhau và số hình luôn giảm
+                    touching = alive & (rects[:, 0] < merged[2]) & (rects[:, 2] > merged[0]) \
+                        & (rects[:, 1] < merged[3]) & (rects[:, 3] > merged[1])
+                    touching[i] = False
+                    if not np.any(touching):
+                        break
+                    alive[touching] = False
+                    excess -= int(np.count_nonzero(touching))
+                    absorbed = rects[touching]
+                    merged = np.concatenate((np.minimum(merged[:2], absorbed[:, :2].min(axis=0)),
+                                             np.maximum(merged[2:], absorbed[:, 2:].max(axis=0))))
+                rects[i] = merged
+                merged_any = True
+            if not merged_any:
+                break
+            rects = rects[alive]
+        return rects
+
+
+class DamageAccumulator:
+    """
+    Gom damage theo cửa sổ giữa hai lần flush.
+
+    Không thread-safe - caller (batcher) tự đồng bộ.
+    """
+
+    def __init__(self, rect_cost: int = DEFAULT_RECT_COST, max_waste: float = DEFAULT_MAX_WASTE,
+                 max_rects: int = DEFAULT_MAX_RECTS):
+        """
+        Khởi tạo accumulator.
+
+        Args:
+            rect_cost: Chi phí một hình chữ nhật (pixel)
+            max_waste: Tỷ lệ diện tích thừa tối đa cho hình bao
+            max_rects: Số hình chữ nhật tối đa mỗi cửa sổ mỗi lần flush
+        """
+        self._options = (rect_cost, max_waste, max_rects)
+        self._regions: Dict[int, DamageRegion] = {}
+
+    def add(self, wid: int, x: int, y: int, width: int, height: int) -> bool:
+        """
+        Thêm damage cho cửa sổ.
+
+        Args:
+            wid: ID cửa sổ
+            x: Tọa độ trái
+            y: Tọa độ trên
+            width: Chiều rộng
+            height: Chiều cao
+
+        Returns:
+            bool: True nếu vùng của cửa sổ thay đổi
+        """
+        region = self._regions.get(wid)
+        if region is None:
+            region = self._regions[wid] = DamageRegion(*self._options)
+        return region.add(x, y, width, height)
+
+    def get_region(self, wid: int) -> Optional[DamageRegion]:
+        """Vùng damage đang gom của cửa sổ."""
+        return self._regions.get(wid)
+
+    def take(self, wid: int) -> List[Rect]:
+        """Lấy các hình chữ nhật cần encode của cửa sổ và xóa vùng."""
+        region = self._regions.pop(wid, None)
+        return region.get_rectangles() if region is not None else []
+
+    def discard(self, wid: int) -> None:
+        """Bỏ damage của cửa sổ (cửa sổ đã đóng)."""
+        self._regions.pop(wid, None)
+
+    def windows(self) -> Iterator[int]:
+        """Các cửa sổ đang có damage."""
+        return iter([wid for wid, region in self._regions.items() if not region.is_empty()])
@@ -0,0 +1,317 @@
+"""
+Pipeline encode vùng damage song song.
+
+Thay cho encode_regions_parallel trong 05-rendering.md (đẩy mọi vùng vào ThreadPoolExecutor(4)
+rồi chờ tất cả): EncodePipeline giữ hàng đợi riêng cho từng cửa sổ và chỉ giao cho pool tối đa
+max_in_flight job cùng lúc. Worker rảnh lấy job kế tiếp lần lượt từ các cửa sổ (round-robin) nên
+một cửa sổ nhiều damage không chặn cửa sổ khác, trong khi kết quả của mỗi cửa sổ vẫn được giao
+đúng thứ tự gửi. Job chưa được giao mà vùng của nó đã bị damage mới hơn phủ trọn thì bị hủy.
+
+Encoder viết bằng Python thuần bị GIL giới hạn - dùng executor="process" để chạy trong process
+pool (encoder phải là hàm cấp module và pixel phải pickle được, ví dụ bytes hoặc ndarray).
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from ..core.logger_interface import ILogger
+from ..metrics import MetricsRegistry, get_default_registry
+from .damage import DamageRegion, Rect
+
+THREAD = "thread"
+PROCESS = "process"
+
+
+@dataclass(frozen=True)
+class EncodeRequest:
+    """Một vùng cần encode (một packet draw)."""
+    wid: int
+    sequence: int
+    rect: Rect
+    pixels: Any
+    coding: str
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class EncodeResult:
+    """Kết quả encode được giao cho tầng gửi."""
+    request: EncodeRequest
+    data: Any = None
+    error: Optional[str] = None
+    cancelled: bool = False
+    elapsed: float = 0.0
+
+
+# Hàm encode: nhận EncodeRequest, trả dữ liệu đã encode (chạy trên worker)
+EncodeFunction = Callable[[EncodeRequest], Any]
+
+# Nhận kết quả theo đúng thứ tự gửi của từng cửa sổ (kể cả job bị hủy, để caller giải phóng sequence)
+DeliverCallback = Callable[[EncodeResult], None]
+
+
+def _timed_encode(encoder: EncodeFunction, request: EncodeRequest) -> Tuple[Any, float]:
+    """Chạy encoder và đo thời gian trên worker (cấp module để pickle được)."""
+    start = time.perf_counter()
+    return encoder(request), time.perf_counter() - start
+
+
+class _Job:
+    """Một request trong pipeline."""
+
+    __slots__ = ("request", "frame", "result", "running")
+
+    def __init__(self, request: EncodeRequest, frame: int):
+        self.request = request
+        self.frame = frame
+        self.result: Optional[EncodeResult] = None
+        self.running = False
+
+
+class _WindowQueue:
+    """Job của một cửa sổ: chờ giao (theo thứ tự gửi) và chờ encode."""
+
+    __slots__ = ("jobs", "queued", "frames", "delivering")
+
+    def __init__(self):
+        self.jobs: Deque[_Job] = deque()
+        self.queued: Deque[_Job] = deque()
+        self.frames = 0
+        self.delivering = False
+
+
+class EncodePipeline:
+    """
+    Encode song song, giao kết quả theo thứ tự từng cửa sổ.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ điều phối encode; chọn encoding và gửi packet do encoder và callback đảm nhận
+    """
+
+    def __init__(
+        self,
+        encoder: EncodeFunction,
+        deliver: DeliverCallback,
+        logger: Optional[ILogger] = None,
+        workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        executor: str = THREAD,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Khởi tạo pipeline.
+
+        Args:
+            encoder: Hàm encode một EncodeRequest
+            deliver: Hàm nhận EncodeResult (chạy trên thread của worker vừa xong)
+            logger: Logger ghi lỗi encode và lỗi của callback
+            workers: Số worker (mặc định: số CPU)
+            max_in_flight: Số job tối đa đang giao cho pool (mặc định: số worker)
+            executor: THREAD hoặc PROCESS (encoder Python thuần)
+            metrics: Registry để ghi metrics (mặc định dùng registry của process)
+        """
+        if executor not in (THREAD, PROCESS):
+            raise ValueError(f"executor không hợp lệ: {executor}")
+        workers = max(1, workers or os.cpu_count() or 1)
+        self._encoder = encoder
+        self._deliver = deliver
+        self._logger = logger
+        self._max_in_flight = max(1, max_in_flight or workers)
+        self._executor: Executor = (
+            ProcessPoolExecutor(max_workers=workers) if executor == PROCESS
+            else ThreadPoolExecutor(max_workers=workers, thread_name_prefix="SessionEncoder")
+        )
+        self._windows: Dict[int, _WindowQueue] = {}
+        # Cửa sổ có job chờ encode, theo thứ tự lấy việc
+        self._ready: Deque[int] = deque()
+        self._in_flight = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+        metrics = metrics or get_default_registry()
+        self._encode_time = metrics.histogram("shougun_session_encode_seconds", "Thời gian encode một vùng")
+        self._superseded = metrics.counter(
+            "shougun_session_encode_superseded_total", "Số vùng bị hủy vì damage mới hơn phủ trọn")
+        self._errors = metrics.counter("shougun_session_encode_errors_total", "Số vùng encode lỗi")
+
+    def submit(self, requests: List[EncodeRequest]) -> bool:
+        """
+        Gửi các vùng của một frame (cùng một cửa sổ) để encode.
+
+        Vùng chưa được giao của các frame trước bị hủy nếu nằm trọn trong frame mới.
+
+        Args:
+            requests: Các vùng theo thứ tự gửi
+
+        Returns:
+            bool: False nếu pipeline đã đóng
+        """
+        if not requests:
+            return True
+        wid = requests[0].wid
+        with self._lock:
+            if self._closed:
+                return False
+            window = self._windows.get(wid)
+            if window is None:
+                window = self._windows[wid] = _WindowQueue()
+            window.frames += 1
+            self._supersede(window, requests)
+            for request in requests:
+                job = _Job(request, window.frames)
+                window.jobs.append(job)
+                window.queued.append(job)
+            if wid not in self._ready:
+                self._ready.append(wid)
+            started = self._dispatch()
+        self._watch(started)
+        self._drain(wid)
+        return True
+
+    def remove_window(self, wid: int) -> None:
+        """Bỏ mọi job của cửa sổ (cửa sổ đã đóng); kết quả đang encode bị bỏ qua."""
+        with self._lock:
+            self._windows.pop(wid, None)
+            if wid in self._ready:
+                self._ready.remove(wid)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Chờ tới khi mọi job đã encode xong và được giao.
+
+        Args:
+            timeout: Thời gian chờ tối đa (None = chờ mãi)
+
+        Returns:
+            bool: True nếu pipeline rảnh trước timeout
+        """
+        with self._idle:
+            # Cửa sổ chỉ bị xóa sau khi mọi kết quả của nó đã được giao
+            return self._idle.wait_for(lambda: not self._in_flight and not self._windows, timeout)
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Đóng pipeline; job chưa bắt đầu bị bỏ.
+
+        Args:
+            wait: Chờ các job đang encode xong
+        """
+        with self._lock:
+            self._closed = True
+            self._windows.clear()
+            self._ready.clear()
+        self._executor.shutdown(wait=wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Số job đang encode, chờ encode và chờ giao."""
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "max_in_flight": self._max_in_flight,
+                "queued": sum(len(w.queued) for w in self._windows.values()),
+                "pending": sum(len(w.jobs) for w in self._windows.values()),
+                "windows": len(self._windows),
+            }
+
+    def _supersede(self, window: _WindowQueue, requests: List[EncodeRequest]) -> None:
+        """Hủy job chưa giao của frame trước mà frame mới phủ trọn (gọi khi giữ lock)."""
+        if not window.jobs:
+            return
+        # Vùng chính xác: vùng bị nới có thể "phủ" cả phần frame mới không vẽ lại
+        region = DamageRegion(exact=True)
+        for request in requests:
+            region.add(*request.rect)
+        cancelled = False
+        for job in window.jobs:
+            if job.frame < window.frames and not (job.result and job.result.cancelled) \
+                    and region.covers(*job.request.rect):
+                # Job đang chạy không dừng được: kết quả của nó sẽ bị bỏ khi xong
+                job.result = EncodeResult(job.request, cancelled=True)
+                self._superseded.inc()
+                cancelled = True
+        if cancelled:
+            window.queued = deque(job for job in window.queued if job.result is None)
+
+    def _dispatch(self) -> List[Tuple[_Job, Future]]:
+        """Giao job cho pool tới khi đủ max_in_flight, lần lượt từng cửa sổ (gọi khi giữ lock)."""
+        started = []
+        while self._in_flight < self._max_in_flight and self._ready:
+            wid = self._ready.popleft()
+            window = self._windows.get(wid)
+            if window is None or not window.queued:
+                continue
+            job = window.queued.popleft()
+            if window.queued:
+                # Cửa sổ còn việc xếp lại cuối hàng: worker kế tiếp lấy việc của cửa sổ khác
+                self._ready.append(wid)
+            job.running = True
+            self._in_flight += 1
+            try:
+                future = self._executor.submit(_timed_encode, self._encoder, job.request)
+            except RuntimeError as e:
+                self._in_flight -= 1
+                job.running = False
+                job.result = EncodeResult(job.request, error=str(e))
+                continue
+            started.append((job, future))
+        return started
+
+    def _watch(self, started: List[Tuple[_Job, Future]]) -> None:
+        """Gắn callback hoàn thành (ngoài lock: future đã xong sẽ gọi callback ngay)."""
+        for job, future in started:
+            future.add_done_callback(lambda done, job=job: self._on_done(job, done))
+
+    def _on_done(self, job: _Job, future: Future) -> None:
+        """Ghi kết quả, giao thêm việc cho pool và giao kết quả theo thứ tự."""
+        try:
+            data, elapsed = future.result()
+            result = EncodeResult(job.request, data=data, elapsed=elapsed)
+            self._encode_time.observe(elapsed)
+        except Exception as e:
+            result = EncodeResult(job.request, error=f"{type(e).__name__}: {e}")
+            self._errors.inc()
+            if self._logger:
+                self._logger.error(f"Lỗi khi encode vùng cửa sổ {job.request.wid}: {e}")
+
+        with self._lock:
+            self._in_flight -= 1
+            job.running = False
+            if job.result is None:
+                job.result = result
+            started = [] if self._closed else self._dispatch()
+            self._idle.notify_all()
+        self._watch(started)
+        self._drain(job.request.wid)
+
+    def _drain(self, wid: int) -> None:
+        """Giao các kết quả đầu hàng đã sẵn sàng của cửa sổ; mỗi cửa sổ chỉ một thread giao tại một thời điểm."""
+        while True:
+            with self._lock:
+                window = self._windows.get(wid)
+                if window is None or window.delivering:
+                    return
+                ready = []
+                # Job bị hủy khi đang chạy vẫn giữ chỗ tới khi chạy xong để không giao trùng sequence
+                while window.jobs and window.jobs[0].result is not None and not window.jobs[0].running:
+                    ready.append(window.jobs.popleft().result)
+                if not ready:
+                    if not window.jobs:
+                        del self._windows[wid]
+                    self._idle.notify_all()
+                    return
+                window.delivering = True
+
+            for result in ready:
+                try:
+                    self._deliver(result)
+                except Exception as e:
+                    if self._logger:
+                        self._logger.error(f"Lỗi khi giao kết quả encode cửa sổ {wid}: {e}")
+            with self._lock:
+                window.delivering = False
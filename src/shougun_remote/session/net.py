@@ -0,0 +1,414 @@
+"""
+Tầng đóng khung packet của giao thức seamless session (xem docs/seamless-session/02-protocol.md).
+
+Mỗi packet gồm header 8 byte (big-endian) và payload:
+
+    offset  size  field
+    0       1     magic         ('P' = 0x50)
+    1       1     flags         (bit 4: rencodeplus, bit 3: flush, bit 1: cipher)
+    2       1     compression   (4 bit cao: loại nén, 4 bit thấp: mức nén)
+    3       1     chunk_index   (0: packet chính, 1-255: chunk dữ liệu lớn)
+    4       4     payload_size  (uint32)
+
+Payload được đọc thẳng vào buffer tái sử dụng bằng recv_into và trả về dưới dạng memoryview,
+nên packet vẽ nhiều MB không bị copy ở tầng mạng (decoder copy tối đa một lần nếu cần giữ dữ liệu).
+"""
+
+import socket
+import struct
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+HEADER = struct.Struct("!BBBBI")
+HEADER_SIZE = HEADER.size
+
+MAGIC = 0x50
+
+FLAG_CIPHER = 0x02
+FLAG_FLUSH = 0x08
+FLAG_RENCODEPLUS = 0x10
+
+COMPRESSOR_MASK = 0xF0
+COMPRESSION_LEVEL_MASK = 0x0F
+
+MAX_CHUNK_INDEX = 255
+
+# Giới hạn payload để peer lỗi không làm client cấp phát bộ nhớ vô hạn (frame 4K RGBA ~ 32MB)
+MAX_PAYLOAD_SIZE = 256 * 1024 * 1024
+
+# Buffer nhận ban đầu - đủ cho packet điều khiển, tự tăng khi gặp packet lớn
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class PacketError(Exception):
+    """Packet không hợp lệ."""
+    pass
+
+
+class PacketHeader(NamedTuple):
+    """Header đã giải mã của một packet."""
+    flags: int
+    compression: int
+    chunk_index: int
+    payload_size: int
+
+    @property
+    def compressor(self) -> int:
+        """Loại nén (4 bit cao của byte compression)."""
+        return self.compression & COMPRESSOR_MASK
+
+    @property
+    def level(self) -> int:
+        """Mức nén (4 bit thấp), 0 nghĩa là không nén."""
+        return self.compression & COMPRESSION_LEVEL_MASK
+
+    @property
+    def flush(self) -> bool:
+        """Không còn packet nào theo ngay sau packet này."""
+        return bool(self.flags & FLAG_FLUSH)
+
+
+def pack_header(flags: int, compression: int, chunk_index: int, payload_size: int) -> bytes:
+    """
+    Đóng gói header packet.
+
+    Args:
+        flags: Cờ giao thức
+        compression: Byte nén (loại | mức)
+        chunk_index: Chỉ số chunk (0 cho packet chính)
+        payload_size: Độ dài payload
+
+    Returns:
+        bytes: Header 8 byte
+    """
+    if not 0 <= chunk_index <= MAX_CHUNK_INDEX:
+        raise PacketError(f"Chunk index không hợp lệ: {chunk_index}")
+    return HEADER.pack(MAGIC, flags, compression, chunk_index, payload_size)
+
+
+def unpack_header(data: Buffer, max_payload: int = MAX_PAYLOAD_SIZE) -> PacketHeader:
+    """
+    Giải mã header packet.
+
+    Args:
+        data: Ít nhất 8 byte (chỉ 8 byte đầu được đọc)
+        max_payload: Giới hạn độ dài payload
+
+    Returns:
+        PacketHeader: Header đã giải mã
+
+    Raises:
+        PacketError: Sai magic byte hoặc payload vượt giới hạn
+    """
+    magic, flags, compression, chunk_index, size = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise PacketError(f"Magic byte không hợp lệ: {magic:#04x}")
+    if size > max_payload:
+        raise PacketError(f"Payload quá lớn: {size} bytes")
+    return PacketHeader(flags, compression, chunk_index, size)
+
+
+class PacketParser:
+    """
+    Parser tăng dần cho dữ liệu đến từng đoạn (asyncio data_received).
+
+    Packet nằm trọn trong một đoạn được trả về dạng slice của đoạn đó (không copy); packet bị
+    cắt qua nhiều đoạn được ghép vào một bytearray cấp phát đúng kích thước (copy một lần).
+    Vì đoạn nhận là bytes bất biến và mỗi packet ghép có buffer riêng, caller có thể giữ view.
+    """
+
+    def __init__(self, max_payload: int = MAX_PAYLOAD_SIZE):
+        """
+        Khởi tạo parser.
+
+        Args:
+            max_payload: Giới hạn độ dài payload
+        """
+        self._max_payload = max_payload
+        self._header_buffer = bytearray(HEADER_SIZE)
+        self._header_fill = 0
+        self._header: Optional[PacketHeader] = None
+        self._payload: Optional[bytearray] = None
+        self._payload_fill = 0
+
+    def feed(self, data: Buffer) -> List[Tuple[PacketHeader, memoryview]]:
+        """
+        Nạp thêm dữ liệu.
+
+        Args:
+            data: Đoạn dữ liệu vừa nhận
+
+        Returns:
+            List[Tuple[PacketHeader, memoryview]]: Các packet đã đủ dữ liệu, theo thứ tự
+
+        Raises:
+            PacketError: Header không hợp lệ
+        """
+        view = memoryview(data).cast("B")
+        packets: List[Tuple[PacketHeader, memoryview]] = []
+        while len(view):
+            if self._header is None:
+                if self._header_fill == 0 and len(view) >= HEADER_SIZE:
+                    header = unpack_header(view, self._max_payload)
+                    view = view[HEADER_SIZE:]
+                else:
+                    take = min(HEADER_SIZE - self._header_fill, len(view))
+                    self._header_buffer[self._header_fill:self._header_fill + take] = view[:take]
+                    self._header_fill += take
+                    view = view[take:]
+                    if self._header_fill < HEADER_SIZE:
+                        break
+                    self._header_fill = 0
+                    header = unpack_header(self._header_buffer, self._max_payload)
+
+                if len(view) >= header.payload_size:
+                    # Payload nằm trọn trong đoạn hiện tại - trả slice, không copy
+                    packets.append((header, view[:header.payload_size]))
+                    view = view[header.payload_size:]
+                    continue
+                self._header = header
+                self._payload = bytearray(header.payload_size)
+                self._payload_fill = 0
+
+            take = min(self._header.payload_size - self._payload_fill, len(view))
+            self._payload[self._payload_fill:self._payload_fill + take] = view[:take]
+            self._payload_fill += take
+            view = view[take:]
+            if self._payload_fill == self._header.payload_size:
+                packets.append((self._header, memoryview(self._payload)))
+                self._header = None
+                self._payload = None
+        return packets
+
+    def is_idle(self) -> bool:
+        """Không có packet nào đang nhận dở."""
+        return self._header is None and self._header_fill == 0
+
+
+class PacketReader:
+    """
+    Đọc packet từ socket vào một buffer tái sử dụng.
+
+    memoryview trả về trỏ vào buffer nội bộ và chỉ hợp lệ tới lần read_packet() tiếp theo;
+    decoder cần giữ dữ liệu lâu hơn phải tự copy (bytes(view)).
+    """
+
+    def __init__(self, sock: socket.socket, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 max_payload: int = MAX_PAYLOAD_SIZE):
+        """
+        Khởi tạo reader.
+
+        Args:
+            sock: Socket đã kết nối (blocking)
+            buffer_size: Kích thước buffer ban đầu
+            max_payload: Giới hạn độ dài payload
+        """
+        self._sock = sock
+        self._max_payload = max_payload
+        self._header = bytearray(HEADER_SIZE)
+        self._header_view = memoryview(self._header)
+        self._buffer = bytearray(max(buffer_size, 1))
+        self._view = memoryview(self._buffer)
+        self._packets = 0
+        self._bytes = 0
+
+    def read_packet(self) -> Optional[Tuple[PacketHeader, memoryview]]:
+        """
+        Đọc một packet.
+
+        Returns:
+            Optional[Tuple[PacketHeader, memoryview]]: (header, payload) hoặc None nếu kết nối đã đóng
+
+        Raises:
+            PacketError: Header không hợp lệ hoặc kết nối đóng giữa packet
+        """
+        header = self.read_header()
+        if header is None:
+            return None
+        return header, self.read_payload(header)
+
+    def read_payload(self, header: PacketHeader) -> memoryview:
+        """
+        Đọc payload của header vừa nhận vào buffer nội bộ.
+
+        Args:
+            header: Header do read_header() trả về
+
+        Returns:
+            memoryview: Payload (hợp lệ tới lần đọc tiếp theo)
+        """
+        payload = self._reserve(header.payload_size)
+        self._recv_exactly(payload, allow_eof=False)
+        self._packets += 1
+        self._bytes += HEADER_SIZE + header.payload_size
+        return payload
+
+    def read_payload_into(self, header: PacketHeader, target: memoryview) -> None:
+        """
+        Đọc payload của header vừa nhận thẳng vào buffer của caller (bỏ qua buffer nội bộ).
+
+        Dùng cho chunk lớn đã biết đích đến, ví dụ buffer pixel cấp phát sẵn.
+
+        Args:
+            header: Header do read_header() trả về
+            target: Vùng nhớ đích, đúng header.payload_size byte
+        """
+        if len(target) != header.payload_size:
+            raise PacketError(f"Buffer đích {len(target)} bytes, payload {header.payload_size} bytes")
+        self._recv_exactly(target, allow_eof=False)
+        self._packets += 1
+        self._bytes += HEADER_SIZE + header.payload_size
+
+    def read_header(self) -> Optional[PacketHeader]:
+        """
+        Chỉ đọc header; caller phải đọc payload bằng read_payload() hoặc read_payload_into().
+
+        Returns:
+            Optional[PacketHeader]: Header hoặc None nếu kết nối đã đóng
+        """
+        if not self._recv_exactly(self._header_view, allow_eof=True):
+            return None
+        return unpack_header(self._header, self._max_payload)
+
+    def get_stats(self) -> Tuple[int, int]:
+        """Số packet và số byte đã đọc."""
+        return self._packets, self._bytes
+
+    def _reserve(self, size: int) -> memoryview:
+        """Trả về view size byte của buffer nội bộ, cấp phát buffer lớn hơn nếu cần."""
+        if size > len(self._buffer):
+            # Không resize bytearray tại chỗ: view cũ có thể vẫn đang được decoder giữ
+            capacity = len(self._buffer)
+            while capacity < size:
+                capacity *= 2
+            self._buffer = bytearray(capacity)
+            self._view = memoryview(self._buffer)
+        return self._view[:size]
+
+    def _recv_exactly(self, view: memoryview, allow_eof: bool) -> bool:
+        """Đọc đủ len(view) byte; False nếu kết nối đóng trước byte đầu tiên và allow_eof."""
+        total = len(view)
+        while len(view):
+            received = self._sock.recv_into(view)
+            if not received:
+                if allow_eof and len(view) == total:
+                    return False
+                raise PacketError("Kết nối đóng giữa packet")
+            view = view[received:]
+        return True
+
+
+class NetworkConnection:
+    """
+    Kết nối TCP của session: gửi packet bằng scatter-gather (header và payload không bị nối lại),
+    nhận packet bằng PacketReader.
+    """
+
+    def __init__(self, sock: Optional[socket.socket] = None, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        Khởi tạo kết nối.
+
+        Args:
+            sock: Socket đã kết nối sẵn (None để gọi connect() sau)
+            buffer_size: Kích thước buffer nhận ban đầu
+        """
+        self._buffer_size = buffer_size
+        self._sock: Optional[socket.socket] = None
+        self._reader: Optional[PacketReader] = None
+        if sock is not None:
+            self._attach(sock)
+
+    def connect(self, host: str, port: int, timeout: float = 10.0) -> bool:
+        """
+        Mở kết nối tới server.
+
+        Args:
+            host: Địa chỉ server
+            port: Cổng
+            timeout: Thời gian chờ kết nối
+
+        Returns:
+            bool: True nếu kết nối thành công
+        """
+        try:
+            sock = socket.create_connection((host, port), timeout=timeout)
+            sock.settimeout(None)
+        except OSError:
+            return False
+        self._attach(sock)
+        return True
+
+    def is_connected(self) -> bool:
+        """Kiểm tra kết nối còn mở không."""
+        return self._sock is not None
+
+    def send_packet(self, payload: Buffer, flags: int = FLAG_RENCODEPLUS, compression: int = 0,
+                    chunk_index: int = 0) -> None:
+        """
+        Gửi một packet.
+
+        Args:
+            payload: Payload đã encode/nén
+            flags: Cờ giao thức
+            compression: Byte nén
+            chunk_index: Chỉ số chunk
+        """
+        header = pack_header(flags, compression, chunk_index, len(payload))
+        self.send_buffers([header, payload])
+
+    def send_buffers(self, buffers: Iterable[Buffer]) -> None:
+        """
+        Gửi nhiều buffer liên tiếp bằng ít syscall nhất có thể.
+
+        Args:
+            buffers: Header và payload đã đóng gói
+        """
+        if self._sock is None:
+            raise ConnectionError("Session not connected")
+        views: List[memoryview] = [memoryview(buffer).cast("B") for buffer in buffers]
+        if not hasattr(self._sock, "sendmsg"):
+            # Windows không có sendmsg - gửi lần lượt (vẫn không nối buffer)
+            for view in views:
+                self._sock.sendall(view)
+            return
+        while views:
+            sent = self._sock.sendmsg(views)
+            while views and sent >= len(views[0]):
+                sent -= len(views[0])
+                views.pop(0)
+            if views and sent:
+                views[0] = views[0][sent:]
+
+    def recv_packet(self) -> Optional[Tuple[PacketHeader, memoryview]]:
+        """
+        Nhận một packet (payload chỉ hợp lệ tới lần gọi tiếp theo).
+
+        Returns:
+            Optional[Tuple[PacketHeader, memoryview]]: (header, payload) hoặc None nếu server đóng kết nối
+        """
+        if self._reader is None:
+            raise ConnectionError("Session not connected")
+        return self._reader.read_packet()
+
+    def get_reader(self) -> Optional[PacketReader]:
+        """Reader của kết nối (dùng để đọc chunk thẳng vào buffer đích)."""
+        return self._reader
+
+    def close(self) -> None:
+        """Đóng kết nối."""
+        sock, self._sock = self._sock, None
+        self._reader = None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def _attach(self, sock: socket.socket) -> None:
+        """Gắn socket đã kết nối."""
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._reader = PacketReader(sock, self._buffer_size)
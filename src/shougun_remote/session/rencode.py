@@ -0,0 +1,561 @@
+"""
+Codec rencodeplus cho payload packet session (thay cho fallback pickle trong tài liệu).
+
+Định dạng theo rencode: số nguyên nhỏ, chuỗi/list/dict ngắn được mã hóa trong một byte kiểu;
+số lớn hơn dùng int1/2/4/8 big-endian; chuỗi UTF-8 dài dùng tiền tố độ dài thập phân
+("123:..."). Mặc định bytes được encode như chuỗi rencode chuẩn để peer rencode/rencodeplus
+đọc được (phía nhận trả str nếu dữ liệu là UTF-8 hợp lệ). Phần mở rộng typed bytes ('/' + độ dài
++ ':' + dữ liệu, luôn decode lại thành bytes) chỉ được dùng khi hai phía cùng công bố trong hello.
+list và tuple đều decode thành list.
+
+Encoder/decoder dùng bảng dispatch theo kiểu (encode) và theo byte kiểu (decode), bảng byte dựng
+sẵn cho số nguyên nhỏ, và bộ nhớ đệm chuỗi đã mã hóa cho tên packet và key thường gặp.
+PacketCodec thêm alias số nguyên cho tên packet sau khi hai phía trao đổi trong hello.
+"""
+
+import struct
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .net import Buffer, PacketError
+
+CHR_FLOAT64 = 44
+CHR_BYTES = 47
+CHR_LIST = 59
+CHR_DICT = 60
+CHR_INT = 61
+CHR_INT1 = 62
+CHR_INT2 = 63
+CHR_INT4 = 64
+CHR_INT8 = 65
+CHR_FLOAT32 = 66
+CHR_TRUE = 67
+CHR_FALSE = 68
+CHR_NONE = 69
+CHR_TERM = 127
+
+INT_POS_FIXED_COUNT = 44
+INT_NEG_FIXED_START = 70
+INT_NEG_FIXED_COUNT = 32
+DICT_FIXED_START = 102
+DICT_FIXED_COUNT = 25
+STR_FIXED_START = 128
+STR_FIXED_COUNT = 64
+LIST_FIXED_START = STR_FIXED_START + STR_FIXED_COUNT
+LIST_FIXED_COUNT = 64
+
+# Số chữ số tối đa của số nguyên dạng thập phân (CHR_INT) và của tiền tố độ dài chuỗi
+MAX_INT_LENGTH = 64
+_MAX_LENGTH_DIGITS = 10
+
+# Số chuỗi tối đa được giữ trong bộ nhớ đệm chuỗi đã mã hóa
+_STRING_CACHE_LIMIT = 4096
+_STRING_CACHE_MAX_LENGTH = 48
+
+_INT1 = struct.Struct("!b")
+_INT2 = struct.Struct("!h")
+_INT4 = struct.Struct("!i")
+_INT8 = struct.Struct("!q")
+_FLOAT32 = struct.Struct("!f")
+_FLOAT64 = struct.Struct("!d")
+
+# Tên packet và key hay gặp - được mã hóa sẵn khi import
+HOT_STRINGS = (
+    "hello", "challenge", "challenge-response", "disconnect", "startup-complete",
+    "new-window", "new-override-redirect", "lost-window", "window-metadata", "map-window",
+    "unmap-window", "configure-window", "close-window", "raise-window", "focus",
+    "draw", "damage-sequence", "eos", "button-action", "pointer-position", "key-action",
+    "wheel-motion", "sound-data", "clipboard-token", "ping", "ping_echo", "cursor",
+    "rgb", "rgb24", "rgb32", "png", "jpeg", "webp", "h264", "vp8", "vp9", "av1", "scroll",
+    "title", "frame", "quality", "speed", "cache", "shift", "control", "",
+)
+
+# Alias mặc định mà phía này nhận (gửi cho peer trong hello)
+DEFAULT_ALIASES = {
+    name: index + 1 for index, name in enumerate((
+        "draw", "damage-sequence", "pointer-position", "button-action", "key-action",
+        "wheel-motion", "new-window", "new-override-redirect", "lost-window", "window-metadata",
+        "configure-window", "raise-window", "focus", "cursor", "sound-data", "ping", "ping_echo",
+        "eos", "scroll",
+    ))
+}
+
+
+class RencodeError(PacketError):
+    """Dữ liệu không encode/decode được."""
+    pass
+
+
+def _fixed(start: int, count: int) -> List[bytes]:
+    return [bytes((start + index,)) for index in range(count)]
+
+
+_LIST_FIXED = _fixed(LIST_FIXED_START, LIST_FIXED_COUNT)
+_DICT_FIXED = _fixed(DICT_FIXED_START, DICT_FIXED_COUNT)
+_SMALL_INTS: Dict[int, bytes] = {}
+for _value in range(-128, 128):
+    if 0 <= _value < INT_POS_FIXED_COUNT:
+        _SMALL_INTS[_value] = bytes((_value,))
+    elif -INT_NEG_FIXED_COUNT <= _value < 0:
+        _SMALL_INTS[_value] = bytes((INT_NEG_FIXED_START - 1 - _value,))
+    else:
+        _SMALL_INTS[_value] = bytes((CHR_INT1,)) + _INT1.pack(_value)
+del _value
+
+_B_LIST = bytes((CHR_LIST,))
+_B_DICT = bytes((CHR_DICT,))
+_B_TERM = bytes((CHR_TERM,))
+_B_TRUE = bytes((CHR_TRUE,))
+_B_FALSE = bytes((CHR_FALSE,))
+_B_NONE = bytes((CHR_NONE,))
+_B_BYTES = bytes((CHR_BYTES,))
+_B_INT = bytes((CHR_INT,))
+_B_INT2 = bytes((CHR_INT2,))
+_B_INT4 = bytes((CHR_INT4,))
+_B_INT8 = bytes((CHR_INT8,))
+_B_FLOAT64 = bytes((CHR_FLOAT64,))
+
+_string_cache: Dict[str, bytes] = {}
+
+
+# --- Encoder ---
+
+_Encoders = Dict[type, Callable[[Any, List[Buffer], Any], None]]
+
+
+def _encode_int(value: int, out: List[Buffer], encoders: _Encoders) -> None:
+    encoded = _SMALL_INTS.get(value)
+    if encoded is not None:
+        out.append(encoded)
+    elif -0x8000 <= value < 0x8000:
+        out.append(_B_INT2 + _INT2.pack(value))
+    elif -0x80000000 <= value < 0x80000000:
+        out.append(_B_INT4 + _INT4.pack(value))
+    elif -0x8000000000000000 <= value < 0x8000000000000000:
+        out.append(_B_INT8 + _INT8.pack(value))
+    else:
+        digits = str(value).encode("ascii")
+        if len(digits) >= MAX_INT_LENGTH:
+            raise RencodeError("Số nguyên quá lớn")
+        out.append(_B_INT + digits + _B_TERM)
+
+
+def _encode_string(value: str) -> bytes:
+    data = value.encode("utf-8")
+    if len(data) < STR_FIXED_COUNT:
+        return bytes((STR_FIXED_START + len(data),)) + data
+    return str(len(data)).encode("ascii") + b":" + data
+
+
+def _encode_str(value: str, out: List[Buffer], encoders: _Encoders) -> None:
+    encoded = _string_cache.get(value)
+    if encoded is None:
+        encoded = _encode_string(value)
+        if len(value) <= _STRING_CACHE_MAX_LENGTH and len(_string_cache) < _STRING_CACHE_LIMIT:
+            _string_cache[value] = encoded
+    out.append(encoded)
+
+
+def _encode_bytes(value: Buffer, out: List[Buffer], encoders: _Encoders) -> None:
+    # Dạng chuỗi rencode chuẩn
+    if type(value) is memoryview:
+        value = value.cast("B")
+    size = len(value)
+    out.append(bytes((STR_FIXED_START + size,)) if size < STR_FIXED_COUNT else str(size).encode("ascii") + b":")
+    out.append(value)
+
+
+def _encode_typed_bytes(value: Buffer, out: List[Buffer], encoders: _Encoders) -> None:
+    if type(value) is memoryview:
+        value = value.cast("B")
+    out.append(_B_BYTES + str(len(value)).encode("ascii") + b":")
+    # b"".join nhận memoryview/bytearray trực tiếp - dữ liệu chỉ được copy một lần khi join
+    out.append(value)
+
+
+def _encode_float(value: float, out: List[Buffer], encoders: _Encoders) -> None:
+    out.append(_B_FLOAT64 + _FLOAT64.pack(value))
+
+
+def _encode_bool(value: bool, out: List[Buffer], encoders: _Encoders) -> None:
+    out.append(_B_TRUE if value else _B_FALSE)
+
+
+def _encode_none(value: None, out: List[Buffer], encoders: _Encoders) -> None:
+    out.append(_B_NONE)
+
+
+def _encode_list(value: Any, out: List[Buffer], encoders: _Encoders) -> None:
+    count = len(value)
+    if count < LIST_FIXED_COUNT:
+        out.append(_LIST_FIXED[count])
+        for item in value:
+            _encode(item, out, encoders)
+    else:
+        out.append(_B_LIST)
+        for item in value:
+            _encode(item, out, encoders)
+        out.append(_B_TERM)
+
+
+def _encode_dict(value: Dict[Any, Any], out: List[Buffer], encoders: _Encoders) -> None:
+    count = len(value)
+    out.append(_DICT_FIXED[count] if count < DICT_FIXED_COUNT else _B_DICT)
+    for key, item in value.items():
+        _encode(key, out, encoders)
+        _encode(item, out, encoders)
+    if count >= DICT_FIXED_COUNT:
+        out.append(_B_TERM)
+
+
+_ENCODERS: _Encoders = {
+    int: _encode_int,
+    str: _encode_str,
+    bytes: _encode_bytes,
+    bytearray: _encode_bytes,
+    memoryview: _encode_bytes,
+    float: _encode_float,
+    bool: _encode_bool,
+    type(None): _encode_none,
+    list: _encode_list,
+    tuple: _encode_list,
+    dict: _encode_dict,
+}
+
+# Bảng encode khi hai phía đã thống nhất phần mở rộng typed bytes
+_TYPED_ENCODERS: _Encoders = {
+    **_ENCODERS, bytes: _encode_typed_bytes, bytearray: _encode_typed_bytes, memoryview: _encode_typed_bytes,
+}
+
+# Kiểm tra theo thứ tự cho subclass (IntEnum, namedtuple...) - bool phải đứng trước int;
+# giá trị là kiểu tra trong bảng encode đang dùng
+_FALLBACK_ENCODERS = (
+    (bool, bool), (int, int), (str, str), (float, float),
+    ((bytes, bytearray, memoryview), bytes), ((list, tuple), list), (dict, dict),
+)
+
+
+def _encode(value: Any, out: List[Buffer], encoders: _Encoders) -> None:
+    encoder = encoders.get(type(value))
+    if encoder is None:
+        for types, key in _FALLBACK_ENCODERS:
+            if isinstance(value, types):
+                encoder = encoders[key]
+                break
+        else:
+            raise RencodeError(f"Kiểu không hỗ trợ: {type(value).__name__}")
+    encoder(value, out, encoders)
+
+
+def dumps(value: Any, typed_bytes: bool = False) -> bytes:
+    """
+    Encode một giá trị.
+
+    Args:
+        value: Giá trị (int, float, bool, None, str, bytes-like, list/tuple, dict)
+        typed_bytes: Encode bytes bằng kiểu riêng (chỉ khi peer hỗ trợ)
+
+    Returns:
+        bytes: Dữ liệu đã encode
+
+    Raises:
+        RencodeError: Kiểu không hỗ trợ
+    """
+    out: List[Buffer] = []
+    _encode(value, out, _TYPED_ENCODERS if typed_bytes else _ENCODERS)
+    return b"".join(out)
+
+
+for _name in HOT_STRINGS:
+    _string_cache[_name] = _encode_string(_name)
+del _name
+
+
+# --- Decoder ---
+
+def _decode_length(data: bytes, pos: int, end_marker: int) -> Tuple[int, int]:
+    """Đọc số thập phân tới end_marker, trả (giá trị, vị trí sau marker)."""
+    end = data.index(end_marker, pos, pos + _MAX_LENGTH_DIGITS + 1)
+    return int(data[pos:end]), end + 1
+
+
+def _take(data: bytes, pos: int, size: int) -> bytes:
+    end = pos + size
+    if size < 0 or end > len(data):
+        raise RencodeError("Dữ liệu bị cắt cụt")
+    return data[pos:end]
+
+
+def _as_text(raw: bytes) -> Any:
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        # Peer rencode gốc gửi dữ liệu nhị phân dưới dạng chuỗi
+        return raw
+
+
+def _decode_fixed_int(data: bytes, pos: int) -> Tuple[Any, int]:
+    return data[pos], pos + 1
+
+
+def _decode_neg_fixed_int(data: bytes, pos: int) -> Tuple[Any, int]:
+    return INT_NEG_FIXED_START - 1 - data[pos], pos + 1
+
+
+def _decode_int1(data: bytes, pos: int) -> Tuple[Any, int]:
+    return _INT1.unpack_from(data, pos + 1)[0], pos + 2
+
+
+def _decode_int2(data: bytes, pos: int) -> Tuple[Any, int]:
+    return _INT2.unpack_from(data, pos + 1)[0], pos + 3
+
+
+def _decode_int4(data: bytes, pos: int) -> Tuple[Any, int]:
+    return _INT4.unpack_from(data, pos + 1)[0], pos + 5
+
+
+def _decode_int8(data: bytes, pos: int) -> Tuple[Any, int]:
+    return _INT8.unpack_from(data, pos + 1)[0], pos + 9
+
+
+def _decode_big_int(data: bytes, pos: int) -> Tuple[Any, int]:
+    end = data.index(CHR_TERM, pos + 1, pos + 2 + MAX_INT_LENGTH)
+    return int(data[pos + 1:end]), end + 1
+
+
+def _decode_float32(data: bytes, pos: int) -> Tuple[Any, int]:
+    return _FLOAT32.unpack_from(data, pos + 1)[0], pos + 5
+
+
+def _decode_float64(data: bytes, pos: int) -> Tuple[Any, int]:
+    return _FLOAT64.unpack_from(data, pos + 1)[0], pos + 9
+
+
+def _decode_true(data: bytes, pos: int) -> Tuple[Any, int]:
+    return True, pos + 1
+
+
+def _decode_false(data: bytes, pos: int) -> Tuple[Any, int]:
+    return False, pos + 1
+
+
+def _decode_none(data: bytes, pos: int) -> Tuple[Any, int]:
+    return None, pos + 1
+
+
+def _decode_fixed_str(data: bytes, pos: int) -> Tuple[Any, int]:
+    size = data[pos] - STR_FIXED_START
+    return _as_text(_take(data, pos + 1, size)), pos + 1 + size
+
+
+def _decode_str(data: bytes, pos: int) -> Tuple[Any, int]:
+    size, pos = _decode_length(data, pos, 58)
+    return _as_text(_take(data, pos, size)), pos + size
+
+
+def _decode_bytes(data: bytes, pos: int) -> Tuple[Any, int]:
+    size, pos = _decode_length(data, pos + 1, 58)
+    return _take(data, pos, size), pos + size
+
+
+def _decode_fixed_list(data: bytes, pos: int) -> Tuple[Any, int]:
+    count = data[pos] - LIST_FIXED_START
+    pos += 1
+    result = []
+    for _ in range(count):
+        item, pos = _DECODERS[data[pos]](data, pos)
+        result.append(item)
+    return result, pos
+
+
+def _decode_list(data: bytes, pos: int) -> Tuple[Any, int]:
+    pos += 1
+    result = []
+    while data[pos] != CHR_TERM:
+        item, pos = _DECODERS[data[pos]](data, pos)
+        result.append(item)
+    return result, pos + 1
+
+
+def _decode_fixed_dict(data: bytes, pos: int) -> Tuple[Any, int]:
+    count = data[pos] - DICT_FIXED_START
+    pos += 1
+    result = {}
+    for _ in range(count):
+        key, pos = _DECODERS[data[pos]](data, pos)
+        result[key], pos = _DECODERS[data[pos]](data, pos)
+    return result, pos
+
+
+def _decode_dict(data: bytes, pos: int) -> Tuple[Any, int]:
+    pos += 1
+    result = {}
+    while data[pos] != CHR_TERM:
+        key, pos = _DECODERS[data[pos]](data, pos)
+        result[key], pos = _DECODERS[data[pos]](data, pos)
+    return result, pos + 1
+
+
+def _decode_invalid(data: bytes, pos: int) -> Tuple[Any, int]:
+    raise RencodeError(f"Byte kiểu không hợp lệ: {data[pos]}")
+
+
+_DECODERS: List[Callable[[bytes, int], Tuple[Any, int]]] = [_decode_invalid] * 256
+for _code in range(INT_POS_FIXED_COUNT):
+    _DECODERS[_code] = _decode_fixed_int
+for _code in range(INT_NEG_FIXED_START, INT_NEG_FIXED_START + INT_NEG_FIXED_COUNT):
+    _DECODERS[_code] = _decode_neg_fixed_int
+for _code in range(DICT_FIXED_START, DICT_FIXED_START + DICT_FIXED_COUNT):
+    _DECODERS[_code] = _decode_fixed_dict
+for _code in range(STR_FIXED_START, STR_FIXED_START + STR_FIXED_COUNT):
+    _DECODERS[_code] = _decode_fixed_str
+for _code in range(LIST_FIXED_START, LIST_FIXED_START + LIST_FIXED_COUNT):
+    _DECODERS[_code] = _decode_fixed_list
+for _code in range(ord("0"), ord("9") + 1):
+    _DECODERS[_code] = _decode_str
+del _code
+_DECODERS[CHR_FLOAT64] = _decode_float64
+_DECODERS[CHR_BYTES] = _decode_bytes
+_DECODERS[CHR_LIST] = _decode_list
+_DECODERS[CHR_DICT] = _decode_dict
+_DECODERS[CHR_INT] = _decode_big_int
+_DECODERS[CHR_INT1] = _decode_int1
+_DECODERS[CHR_INT2] = _decode_int2
+_DECODERS[CHR_INT4] = _decode_int4
+_DECODERS[CHR_INT8] = _decode_int8
+_DECODERS[CHR_FLOAT32] = _decode_float32
+_DECODERS[CHR_TRUE] = _decode_true
+_DECODERS[CHR_FALSE] = _decode_false
+_DECODERS[CHR_NONE] = _decode_none
+
+
+def loads(data: Buffer) -> Any:
+    """
+    Decode một giá trị.
+
+    Args:
+        data: Dữ liệu đã encode (memoryview được copy một lần thành bytes)
+
+    Returns:
+        Any: Giá trị đã decode
+
+    Raises:
+        RencodeError: Dữ liệu không hợp lệ hoặc còn thừa
+    """
+    if not isinstance(data, bytes):
+        data = bytes(data)
+    try:
+        value, pos = _DECODERS[data[0]](data, 0)
+    except RencodeError:
+        raise
+    except (IndexError, ValueError, TypeError, struct.error, RecursionError) as e:
+        raise RencodeError(f"Dữ liệu rencode không hợp lệ: {e}") from e
+    if pos != len(data):
+        raise RencodeError(f"Thừa {len(data) - pos} byte sau dữ liệu")
+    return value
+
+
+class PacketCodec:
+    """
+    Encode/decode packet với alias số nguyên cho tên packet.
+
+    Phía nhận công bố alias của mình trong hello (get_aliases()); phía gửi chỉ dùng alias sau khi
+    nhận được bảng alias của peer (set_peer_aliases()). Typed bytes cũng vậy: phía này công bố
+    get_typed_bytes() và chỉ gửi bytes kiểu riêng khi peer công bố theo (set_peer_typed_bytes()).
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, int]] = None, typed_bytes: bool = True):
+        """
+        Khởi tạo codec.
+
+        Args:
+            aliases: Alias phía này chấp nhận khi nhận (mặc định DEFAULT_ALIASES)
+            typed_bytes: Phía này hỗ trợ phần mở rộng typed bytes
+        """
+        aliases = DEFAULT_ALIASES if aliases is None else aliases
+        self._receive_aliases: Dict[int, str] = {index: name for name, index in aliases.items()}
+        self._send_aliases: Dict[str, bytes] = {}
+        self._typed_bytes = typed_bytes
+        self._encoders = _ENCODERS
+
+    def get_aliases(self) -> Dict[int, str]:
+        """Bảng alias gửi cho peer trong hello ({số: tên packet})."""
+        return dict(self._receive_aliases)
+
+    def set_peer_aliases(self, aliases: Dict[Any, Any]) -> None:
+        """
+        Nhận bảng alias của peer (chấp nhận cả {số: tên} lẫn {tên: số}).
+
+        Args:
+            aliases: Giá trị "aliases" trong hello của peer
+        """
+        send_aliases = {}
+        for key, value in aliases.items():
+            name, index = (value, key) if isinstance(key, int) else (key, value)
+            if isinstance(name, str) and isinstance(index, int) and not isinstance(index, bool):
+                out: List[Buffer] = []
+                _encode_int(index, out, _ENCODERS)
+                send_aliases[name] = out[0]
+        self._send_aliases = send_aliases
+
+    def get_typed_bytes(self) -> bool:
+        """Giá trị "typed-bytes" gửi cho peer trong hello."""
+        return self._typed_bytes
+
+    def set_peer_typed_bytes(self, enabled: Any) -> None:
+        """
+        Nhận giá trị "typed-bytes" trong hello của peer.
+
+        Args:
+            enabled: True nếu peer hỗ trợ (peer rencode gốc không gửi giá trị này)
+        """
+        self._encoders = _TYPED_ENCODERS if self._typed_bytes and enabled is True else _ENCODERS
+
+    def encode(self, packet: list) -> bytes:
+        """
+        Encode packet [packet_type, arg1, ...].
+
+        Args:
+            packet: Packet
+
+        Returns:
+            bytes: Payload
+        """
+        count = len(packet)
+        if not count:
+            raise RencodeError("Packet rỗng")
+        out: List[Buffer] = [_LIST_FIXED[count] if count < LIST_FIXED_COUNT else _B_LIST]
+        encoders = self._encoders
+        alias = self._send_aliases.get(packet[0])
+        if alias is not None:
+            out.append(alias)
+        else:
+            _encode(packet[0], out, encoders)
+        for index in range(1, count):
+            _encode(packet[index], out, encoders)
+        if count >= LIST_FIXED_COUNT:
+            out.append(_B_TERM)
+        return b"".join(out)
+
+    def decode(self, payload: Buffer) -> list:
+        """
+        Decode payload thành packet, đổi alias về tên packet.
+
+        Args:
+            payload: Payload đã giải nén
+
+        Returns:
+            list: Packet
+
+        Raises:
+            RencodeError: Payload không phải packet hợp lệ
+        """
+        packet = loads(payload)
+        if not isinstance(packet, list) or not packet:
+            raise RencodeError("Payload không phải packet")
+        packet_type = packet[0]
+        if isinstance(packet_type, int):
+            name = self._receive_aliases.get(packet_type)
+            if name is None:
+                raise RencodeError(f"Alias không xác định: {packet_type}")
+            packet[0] = name
+        return packet
@@ -0,0 +1,180 @@
+"""
+Phát hiện cuộn (scroll) cho encoding "scroll" trong 05-rendering.md.
+
+Mỗi dòng pixel của frame trước và frame hiện tại được băm thành một số 64 bit (vectorized bằng
+NumPy: các byte của dòng được xem như mảng uint64 rồi nhân với hệ số riêng của từng cột). Các
+dòng có hash duy nhất trong frame trước bỏ phiếu cho độ dời dọc; với độ dời nhiều phiếu nhất, khối
+dòng liên tiếp khớp dài nhất được kiểm tra lại bằng so sánh pixel chính xác rồi gửi thành packet
+draw coding "scroll" (client tự copy pixel), chỉ các dòng mới lộ ra hoặc thay đổi mới cần encode.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .damage import Rect
+
+# Coding của packet draw cuộn
+SCROLL_CODING = "scroll"
+
+# Khối cuộn ngắn hơn số dòng này không đáng gửi riêng
+DEFAULT_MIN_LINES = 16
+
+_weights: Dict[int, np.ndarray] = {}
+
+
+def _column_weights(count: int) -> np.ndarray:
+    """Hệ số lẻ ngẫu nhiên (cố định) cho từng cột uint64 của dòng."""
+    weights = _weights.get(count)
+    if weights is None:
+        rng = np.random.default_rng(0x5C801)
+        weights = rng.integers(0, 2 ** 63, size=count, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        _weights[count] = weights
+    return weights
+
+
+def row_hashes(frame: np.ndarray) -> np.ndarray:
+    """
+    Hash 64 bit của từng dòng pixel.
+
+    Args:
+        frame: Frame (height, width[, channels]) kiểu uint8
+
+    Returns:
+        np.ndarray: Mảng uint64 (height,)
+    """
+    rows = np.ascontiguousarray(frame).reshape(frame.shape[0], -1)
+    if rows.dtype != np.uint8:
+        rows = rows.view(np.uint8)
+    padding = -rows.shape[1] % 8
+    if padding:
+        rows = np.pad(rows, ((0, 0), (0, padding)))
+    words = rows.view(np.uint64)
+    # Phép nhân và cộng uint64 tự tràn (mod 2^64) - đúng điều cần cho hash
+    return (words * _column_weights(words.shape[1])).sum(axis=1, dtype=np.uint64)
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """Các đoạn [start, end) liên tiếp True."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.nonzero(edges == 1)[0].tolist(), np.nonzero(edges == -1)[0].tolist()))
+
+
+@dataclass(frozen=True)
+class ScrollResult:
+    """
+    Kết quả so sánh hai frame.
+
+    scrolls: (hình chữ nhật đích, dy) - client copy pixel từ (x, y - dy) tới hình chữ nhật đích
+    damage: Các dải dòng còn lại cần encode (dòng mới lộ ra hoặc thay đổi)
+    """
+    scrolls: List[Tuple[Rect, int]]
+    damage: List[Rect]
+
+
+def scroll_packet(wid: int, rect: Rect, dy: int, sequence: int) -> list:
+    """
+    Tạo packet draw cuộn (không kèm dữ liệu pixel).
+
+    Args:
+        wid: ID cửa sổ
+        rect: Hình chữ nhật đích (x, y, width, height)
+        dy: Độ dời dọc
+        sequence: packet_sequence
+
+    Returns:
+        list: Packet draw coding "scroll"
+    """
+    x, y, width, height = rect
+    return ["draw", wid, x, y, width, height, SCROLL_CODING, "", sequence, 0, {"scroll": (0, dy), "flush": False}]
+
+
+class ScrollDetector:
+    """
+    Phát hiện cuộn dọc giữa các frame liên tiếp của một cửa sổ.
+
+    Tuân thủ Single Responsibility Principle (SRP):
+    - Chỉ so sánh frame; encode các dòng còn lại và gửi packet do tầng khác đảm nhận
+    """
+
+    def __init__(self, min_lines: int = DEFAULT_MIN_LINES):
+        """
+        Khởi tạo detector.
+
+        Args:
+            min_lines: Số dòng tối thiểu của khối cuộn
+        """
+        self._min_lines = max(1, min_lines)
+        self._previous: Optional[np.ndarray] = None
+        self._hashes: Optional[np.ndarray] = None
+
+    def update(self, frame: np.ndarray) -> Optional[ScrollResult]:
+        """
+        So sánh frame mới với frame trước rồi lưu frame mới.
+
+        Args:
+            frame: Frame đầy đủ của cửa sổ (height, width[, channels]) kiểu uint8
+
+        Returns:
+            Optional[ScrollResult]: None nếu không phát hiện cuộn (hoặc chưa có frame trước,
+            đổi kích thước) - caller encode damage như bình thường
+        """
+        hashes = row_hashes(frame)
+        previous, previous_hashes = self._previous, self._hashes
+        # Lưu bản sao: buffer capture thường được dùng lại cho frame sau
+        self._previous, self._hashes = np.array(frame, copy=True), hashes
+        if previous is None or previous.shape != frame.shape:
+            return None
+        return self._detect(previous, previous_hashes, frame, hashes)
+
+    def reset(self) -> None:
+        """Bỏ frame trước (cửa sổ đổi kích thước hoặc gửi lại toàn bộ)."""
+        self._previous = None
+        self._hashes = None
+
+    def _find_offset(self, previous_hashes: np.ndarray, hashes: np.ndarray) -> Optional[int]:
+        """Độ dời (dòng trước - dòng hiện tại) được nhiều dòng có hash duy nhất khớp nhất."""
+        unique, first, counts = np.unique(previous_hashes, return_index=True, return_counts=True)
+        # Dòng lặp lại (dòng trống, nền) không cho biết vị trí nên không được bỏ phiếu
+        unique, first = unique[counts == 1], first[counts == 1]
+        if not len(unique):
+            return None
+        positions = np.searchsorted(unique, hashes)
+        positions[positions == len(unique)] = 0
+        found = unique[positions] == hashes
+        offsets = first[positions[found]] - np.nonzero(found)[0]
+        offsets = offsets[offsets != 0]
+        if len(offsets) < self._min_lines:
+            return None
+        values, votes = np.unique(offsets, return_counts=True)
+        best = int(np.argmax(votes))
+        return int(values[best]) if votes[best] >= self._min_lines else None
+
+    def _detect(self, previous: np.ndarray, previous_hashes: np.ndarray,
+                frame: np.ndarray, hashes: np.ndarray) -> Optional[ScrollResult]:
+        """Tìm khối cuộn dài nhất và các dải dòng còn lại."""
+        offset = self._find_offset(previous_hashes, hashes)
+        if offset is None:
+            return None
+        height, width = frame.shape[0], frame.shape[1]
+        # Dòng y hiện tại khớp dòng y + offset của frame trước
+        start, end = max(0, -offset), min(height, height - offset)
+        matches = np.zeros(height, dtype=bool)
+        matches[start:end] = hashes[start:end] == previous_hashes[start + offset:end + offset]
+
+        block = None
+        for run_start, run_end in sorted(_runs(matches), key=lambda run: run[0] - run[1]):
+            if run_end - run_start < self._min_lines:
+                break
+            # Hash khớp chưa chắc pixel khớp: kiểm tra chính xác trước khi gửi packet cuộn
+            if np.array_equal(frame[run_start:run_end], previous[run_start + offset:run_end + offset]):
+                block = (run_start, run_end)
+                break
+        if block is None:
+            return None
+
+        changed = hashes != previous_hashes
+        changed[block[0]:block[1]] = False
+        damage = [(0, run_start, width, run_end - run_start) for run_start, run_end in _runs(changed)]
+        return ScrollResult([((0, block[0], width, block[1] - block[0]), -offset)], damage)
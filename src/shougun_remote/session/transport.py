@@ -0,0 +1,207 @@
+"""
+Tầng packet của session trên asyncio.
+
+Packet nhỏ (pointer-position, damage-sequence...) được gom lại và ghi bằng một lần
+transport.writelines() khi gặp packet có cờ flush, khi lượng chờ ghi vượt ngưỡng, hoặc cuối
+vòng lặp hiện tại của event loop - giảm số syscall khi tương tác dày mà không giữ packet
+lâu hơn một tick. Write buffer của transport có ngưỡng high/low; drain() chờ khi vượt ngưỡng.
+"""
+
+import asyncio
+from typing import Any, Callable, List, Optional, Tuple
+
+from .net import (
+    FLAG_FLUSH,
+    FLAG_RENCODEPLUS,
+    MAX_PAYLOAD_SIZE,
+    Buffer,
+    PacketError,
+    PacketHeader,
+    PacketParser,
+    pack_header,
+)
+
+PacketHandler = Callable[[PacketHeader, memoryview], None]
+
+# Lượng dữ liệu gom tối đa trước khi buộc ghi (tránh giữ packet lớn trong bộ nhớ)
+DEFAULT_COALESCE_LIMIT = 64 * 1024
+
+# Ngưỡng write buffer của transport cho backpressure
+DEFAULT_HIGH_WATER = 4 * 1024 * 1024
+DEFAULT_LOW_WATER = 1024 * 1024
+
+
+class PacketProtocol(asyncio.Protocol):
+    """
+    asyncio.Protocol cho packet session.
+
+    Mọi phương thức phải được gọi trên thread của event loop.
+    """
+
+    def __init__(
+        self,
+        packet_handler: PacketHandler,
+        coalesce_limit: int = DEFAULT_COALESCE_LIMIT,
+        high_water: int = DEFAULT_HIGH_WATER,
+        low_water: int = DEFAULT_LOW_WATER,
+        max_payload: int = MAX_PAYLOAD_SIZE
+    ):
+        """
+        Khởi tạo protocol.
+
+        Args:
+            packet_handler: Hàm nhận (header, payload) của mỗi packet đến
+            coalesce_limit: Số byte gom tối đa trước khi buộc ghi
+            high_water: Ngưỡng trên của write buffer (tạm dừng ghi)
+            low_water: Ngưỡng dưới của write buffer (cho ghi tiếp)
+            max_payload: Giới hạn độ dài payload nhận
+        """
+        self._packet_handler = packet_handler
+        self._coalesce_limit = coalesce_limit
+        self._high_water = high_water
+        self._low_water = low_water
+        self._parser = PacketParser(max_payload)
+        self._transport: Optional[asyncio.Transport] = None
+        self._pending: List[Buffer] = []
+        self._pending_bytes = 0
+        self._flush_scheduled = False
+        self._can_write: Optional[asyncio.Event] = None
+        self._closed: Optional[asyncio.Future] = None
+        self._packets_sent = 0
+        self._packets_received = 0
+        self._writes = 0
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Lưu transport và cấu hình backpressure."""
+        loop = asyncio.get_running_loop()
+        self._transport = transport
+        self._can_write = asyncio.Event()
+        self._can_write.set()
+        self._closed = loop.create_future()
+        transport.set_write_buffer_limits(high=self._high_water, low=self._low_water)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """Đánh dấu kết nối đã đóng và giải phóng các coroutine đang chờ drain()."""
+        self._transport = None
+        self._pending.clear()
+        self._pending_bytes = 0
+        if self._can_write is not None:
+            self._can_write.set()
+        if self._closed is not None and not self._closed.done():
+            self._closed.set_result(exc)
+
+    def data_received(self, data: bytes) -> None:
+        """Parse dữ liệu đến và chuyển từng packet cho handler."""
+        try:
+            packets = self._parser.feed(data)
+        except PacketError:
+            self.close()
+            return
+        for header, payload in packets:
+            self._packets_received += 1
+            self._packet_handler(header, payload)
+
+    def pause_writing(self) -> None:
+        """Write buffer vượt ngưỡng trên."""
+        self._can_write.clear()
+
+    def resume_writing(self) -> None:
+        """Write buffer xuống dưới ngưỡng dưới."""
+        self._can_write.set()
+
+    def send_packet(self, payload: Buffer, flags: int = FLAG_RENCODEPLUS, compression: int = 0,
+                    chunk_index: int = 0) -> bool:
+        """
+        Xếp một packet vào hàng chờ ghi.
+
+        Args:
+            payload: Payload đã encode/nén
+            flags: Cờ giao thức (FLAG_FLUSH để ghi ngay cùng các packet đang gom)
+            compression: Byte nén
+            chunk_index: Chỉ số chunk
+
+        Returns:
+            bool: False nếu kết nối đã đóng
+        """
+        if self._transport is None or self._transport.is_closing():
+            return False
+        self._pending.append(pack_header(flags, compression, chunk_index, len(payload)))
+        self._pending.append(payload)
+        self._pending_bytes += len(payload)
+        self._packets_sent += 1
+
+        if flags & FLAG_FLUSH or self._pending_bytes >= self._coalesce_limit:
+            self.flush()
+        elif not self._flush_scheduled:
+            # Không giữ packet quá một tick nếu không có packet flush nào theo sau
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._deferred_flush)
+        return True
+
+    def flush(self) -> None:
+        """Ghi mọi packet đang gom bằng một lần writelines()."""
+        if not self._pending or self._transport is None:
+            return
+        pending, self._pending = self._pending, []
+        self._pending_bytes = 0
+        self._transport.writelines(pending)
+        self._writes += 1
+
+    async def drain(self) -> None:
+        """Chờ tới khi write buffer xuống dưới ngưỡng dưới (backpressure)."""
+        self.flush()
+        if self._can_write is not None:
+            await self._can_write.wait()
+        if self._transport is None:
+            raise ConnectionError("Session connection lost")
+
+    async def wait_closed(self) -> Optional[Exception]:
+        """
+        Chờ kết nối đóng.
+
+        Returns:
+            Optional[Exception]: Lỗi làm mất kết nối (None nếu đóng bình thường)
+        """
+        return await self._closed
+
+    def close(self) -> None:
+        """Ghi nốt packet đang gom rồi đóng kết nối."""
+        if self._transport is not None:
+            self.flush()
+            self._transport.close()
+
+    def is_writable(self) -> bool:
+        """Write buffer còn dưới ngưỡng trên."""
+        return self._transport is not None and self._can_write.is_set()
+
+    def get_stats(self) -> dict:
+        """Số packet gửi/nhận và số lần ghi xuống transport."""
+        return {
+            "packets_sent": self._packets_sent,
+            "packets_received": self._packets_received,
+            "writes": self._writes,
+            "pending_bytes": self._pending_bytes,
+        }
+
+    def _deferred_flush(self) -> None:
+        """Ghi phần còn gom ở cuối tick."""
+        self._flush_scheduled = False
+        self.flush()
+
+
+async def open_connection(host: str, port: int, packet_handler: PacketHandler,
+                          **kwargs: Any) -> Tuple[asyncio.Transport, PacketProtocol]:
+    """
+    Mở kết nối session trên event loop hiện tại.
+
+    Args:
+        host: Địa chỉ server
+        port: Cổng
+        packet_handler: Hàm nhận packet đến
+        **kwargs: Tham số cho PacketProtocol
+
+    Returns:
+        Tuple[asyncio.Transport, PacketProtocol]: Transport và protocol đã kết nối
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.create_connection(lambda: PacketProtocol(packet_handler, **kwargs), host, port)
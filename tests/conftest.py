@@ -0,0 +1,31 @@
+"""
+Fixtures dùng chung cho test.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.core.logger_interface import ILogger, LogLevel
+
+
+class NullLogger(ILogger):
+    """Logger không ghi gì, dùng cho test."""
+
+    def debug(self, message, **kwargs): pass
+    def info(self, message, **kwargs): pass
+    def warning(self, message, **kwargs): pass
+    def error(self, message, **kwargs): pass
+    def critical(self, message, **kwargs): pass
+    def set_level(self, level): pass
+    def get_level(self): return LogLevel.INFO
+
+
+@pytest.fixture
+def null_logger() -> ILogger:
+    """Logger không ghi gì."""
+    return NullLogger()
@@ -0,0 +1,126 @@
+"""
+Test cases cho API server.
+"""
+
+import http.client
+import json
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.core.service_interface import ServiceStatus
+from shougun_remote.integration.api_server import ApiServer
+from shougun_remote.metrics import MetricsRegistry, render_prometheus
+from shougun_remote.models import Task
+from shougun_remote.repositories import FileRepository
+from shougun_remote.services import TaskService
+
+
+class _FakeService:
+    """Service giả chỉ cung cấp trạng thái và thông tin."""
+
+    def get_status(self):
+        return ServiceStatus.RUNNING
+
+    def get_info(self):
+        return {"name": "ShougunService", "status": "running"}
+
+
+@pytest.fixture
+def api(tmp_path, null_logger):
+    """API server chạy trên cổng ngẫu nhiên."""
+    registry = MetricsRegistry()
+    repository = FileRepository(str(tmp_path / "tasks.json"), Task, registry)
+    task_service = TaskService(null_logger, repository, registry)
+    server = ApiServer(
+        null_logger, _FakeService(), task_service, lambda: render_prometheus(registry), port=0
+    )
+    assert server.start()
+    yield server
+    server.stop()
+
+
+def _request(conn, method, path, body=None):
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = conn.getresponse()
+    raw = response.read()
+    return response.status, (json.loads(raw) if raw and response.getheader("Content-Type", "").startswith("application/json") else raw)
+
+
+class TestApiServer:
+    """Test cases cho ApiServer."""
+
+    def test_task_crud_over_keep_alive(self, api):
+        """Test CRUD task trên cùng một kết nối keep-alive."""
+        conn = http.client.HTTPConnection("127.0.0.1", api.get_port(), timeout=5)
+
+        status, body = _request(conn, "POST", "/tasks", {"name": "Task 1"})
+        assert status == 201
+        task_id = body["data"]["id"]
+
+        status, body = _request(conn, "PATCH", f"/tasks/{task_id}", {"status": "completed"})
+        assert status == 200
+        assert body["data"]["status"] == "completed"
+
+        status, body = _request(conn, "GET", "/tasks?status=completed")
+        assert status == 200
+        assert [task["id"] for task in body["data"]] == [task_id]
+
+        status, _ = _request(conn, "DELETE", f"/tasks/{task_id}")
+        assert status == 204
+        status, body = _request(conn, "GET", f"/tasks/{task_id}")
+        assert status == 404
+        assert not body["success"]
+        conn.close()
+
+    def test_errors(self, api):
+        """Test các lỗi 400/404/405."""
+        conn = http.client.HTTPConnection("127.0.0.1", api.get_port(), timeout=5)
+        assert _request(conn, "POST", "/tasks", {})[0] == 400
+        assert _request(conn, "PATCH", "/tasks/x", {"status": "bogus"})[0] == 400
+        assert _request(conn, "GET", "/nowhere")[0] == 404
+        assert _request(conn, "PUT", "/status")[0] == 405
+        conn.close()
+
+    def test_pipelined_requests(self, api):
+        """Test nhiều request gửi liền một lượt được trả lời đúng thứ tự."""
+        requests = b"".join(
+            f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode() for path in ["/health", "/status", "/info"]
+        )
+        with socket.create_connection(("127.0.0.1", api.get_port()), timeout=5) as sock:
+            sock.sendall(requests + b"GET /health HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+            data = b""
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+
+        assert data.count(b"HTTP/1.1 200 OK") == 4
+        assert data.index(b'"ok"') < data.index(b'"running"') < data.index(b"ShougunService")
+
+    def test_streaming_large_listing(self, api):
+        """Test danh sách lớn được stream chunked."""
+        conn = http.client.HTTPConnection("127.0.0.1", api.get_port(), timeout=5)
+        for i in range(600):
+            api._task_service._task_repository._data[f"t{i}"] = Task(id=f"t{i}", name=f"Task {i}")
+
+        conn.request("GET", "/tasks")
+        response = conn.getresponse()
+        assert response.getheader("Transfer-Encoding") == "chunked"
+        assert len(json.loads(response.read())["data"]) == 600
+        conn.close()
+
+    def test_metrics(self, api):
+        """Test endpoint metrics trả về text Prometheus."""
+        conn = http.client.HTTPConnection("127.0.0.1", api.get_port(), timeout=5)
+        status, body = _request(conn, "GET", "/metrics")
+        assert status == 200
+        assert b"# TYPE shougun_tasks_created_total counter" in body
+        conn.close()
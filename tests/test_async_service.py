@@ -0,0 +1,153 @@
+"""
+Test cases cho AsyncShougunService.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.config import ConfigManager
+from shougun_remote.metrics import MetricsRegistry
+from shougun_remote.models import Task, TaskStatus
+from shougun_remote.repositories import FileRepository
+from shougun_remote.services import TaskService
+from shougun_remote.services.async_service import AsyncShougunService
+from shougun_remote.services.shutdown import ShutdownCheckpoint
+
+
+@pytest.fixture
+def make_service(tmp_path, monkeypatch, null_logger):
+    """Tạo AsyncShougunService dùng dữ liệu trong tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ConfigManager, "load_config", lambda self, path: True)
+    services = []
+
+    def factory(handler=None, **settings) -> AsyncShougunService:
+        registry = MetricsRegistry()
+        config_manager = ConfigManager()
+        config_manager.set("performance.worker_thread_sleep", 0.05)
+        config_manager.set("performance.shutdown_timeout", 0.5)
+        for key, value in settings.items():
+            config_manager.set(f"performance.{key}", value)
+        repository = FileRepository(str(tmp_path / "tasks.json"), Task, registry)
+        service = AsyncShougunService(
+            null_logger,
+            config_manager,
+            TaskService(null_logger, repository, registry),
+            registry,
+            ShutdownCheckpoint(str(tmp_path / "checkpoint.json")),
+            handler,
+        )
+        services.append(service)
+        return service
+
+    yield factory
+    for service in services:
+        service.stop()
+
+
+def _wait_for(predicate, timeout=10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestAsyncShougunService:
+    """Test cases cho AsyncShougunService."""
+
+    def test_runs_many_tasks_concurrently_on_few_threads(self, make_service):
+        concurrent = 0
+        peak = 0
+
+        async def handler(task):
+            nonlocal concurrent, peak
+            concurrent += 1
+            peak = max(peak, concurrent)
+            await asyncio.sleep(0.3)
+            concurrent -= 1
+
+        service = make_service(handler, async_max_tasks=100)
+        task_service = service.get_task_service()
+        tasks = [task_service.create_task(f"task {index}") for index in range(150)]
+        threads_before = threading.active_count()
+
+        assert service.start()
+        assert _wait_for(lambda: all(
+            task_service.get_task(task.id).status == TaskStatus.COMPLETED for task in tasks))
+        # Giới hạn bởi semaphore, không bởi số thread
+        assert peak == 100
+        assert threading.active_count() - threads_before < 12
+        # Chuyển sang RUNNING theo lô: không ghi lại file cho từng task
+        metrics = service.get_info()["metrics"]
+        assert metrics["shougun_task_status_updates_total{status=running}"] == 150
+        assert metrics["shougun_repository_writes_total{repository=tasks}"] < 150 * 2 + 20
+
+    def test_task_cancelled_while_waiting_for_a_slot_is_not_run(self, make_service):
+        release = asyncio.Event()
+        ran = []
+
+        async def handler(task):
+            ran.append(task.name)
+            if task.name == "a":
+                await release.wait()
+
+        service = make_service(handler, async_max_tasks=1)
+        task_service = service.get_task_service()
+        first = task_service.create_task("a")
+        time.sleep(0.01)
+        second = task_service.create_task("b")
+        assert service.start()
+        assert _wait_for(lambda: ran == ["a"])
+
+        assert task_service.update_task_status(second.id, TaskStatus.CANCELLED)
+        service._loop.call_soon_threadsafe(release.set)
+        assert _wait_for(lambda: task_service.get_task(first.id).status == TaskStatus.COMPLETED)
+        time.sleep(0.2)
+        assert ran == ["a"]
+        assert task_service.get_task(second.id).status == TaskStatus.CANCELLED
+        assert task_service.update_tasks_status([first.id, second.id], TaskStatus.PENDING, TaskStatus.FAILED) == []
+
+    def test_task_created_while_running_wakes_dispatcher(self, make_service):
+        service = make_service(worker_thread_sleep=30.0)
+        assert service.start()
+        task = service.get_task_service().create_task("late")
+        assert _wait_for(lambda: service.get_task_service().get_task(task.id).status == TaskStatus.COMPLETED, 3.0)
+
+    def test_folder_events_are_handled_on_event_loop(self, make_service):
+        service = make_service()
+        handled = []
+        service._json_reader.process_json_data = lambda path, data: handled.append(
+            threading.current_thread().name) or True
+        assert service.start()
+
+        watcher = threading.Thread(target=service._on_folder_file, args=("device.json", {"status": "ok"}))
+        watcher.start()
+        watcher.join()
+        assert _wait_for(lambda: handled == ["AsyncShougunService"])
+
+    def test_stop_cancels_overdue_tasks_into_checkpoint(self, make_service):
+        async def stuck(task):
+            await asyncio.sleep(60)
+
+        service = make_service(stuck)
+        task = service.get_task_service().create_task("stuck")
+        assert service.start()
+        assert _wait_for(lambda: service.get_task_service().get_task(task.id).status == TaskStatus.RUNNING)
+
+        started = time.perf_counter()
+        assert service.stop()
+        assert time.perf_counter() - started < 2.0
+        report = service.get_shutdown_report()
+        assert report.deadline_exceeded
+        assert report.interrupted_tasks == [task.id]
+        assert service.get_info()["last_shutdown"]["interrupted_tasks"] == [task.id]
@@ -0,0 +1,98 @@
+"""
+Test cases cho hot reload cấu hình.
+"""
+
+import json
+import threading
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.config import ConfigManager, diff_config, validate_config
+
+
+def _write_config(path: Path, data: dict) -> None:
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+class TestConfigReload:
+    """Test cases cho ConfigManager.reload và subscribers."""
+
+    def test_reload_pushes_diff(self, tmp_path):
+        """Test reload gửi diff cho subscriber."""
+        config_path = tmp_path / "service.json"
+        _write_config(config_path, {"performance": {"worker_thread_sleep": 1.0}, "logging": {"level": "INFO"}})
+
+        config_manager = ConfigManager()
+        assert config_manager.load_config(config_path)
+
+        received = []
+        config_manager.subscribe(received.append)
+
+        _write_config(config_path, {"performance": {"worker_thread_sleep": 0.5}, "logging": {"level": "INFO"}})
+        assert config_manager.reload()
+
+        assert config_manager.get("performance.worker_thread_sleep") == 0.5
+        assert received == [{"performance.worker_thread_sleep": (1.0, 0.5)}]
+
+    def test_reload_rejects_invalid_config(self, tmp_path):
+        """Test cấu hình không hợp lệ không được áp dụng."""
+        config_path = tmp_path / "service.json"
+        _write_config(config_path, {"performance": {"worker_thread_sleep": 1.0}})
+
+        config_manager = ConfigManager()
+        assert config_manager.load_config(config_path)
+
+        received = []
+        config_manager.subscribe(received.append)
+
+        _write_config(config_path, {"performance": {"worker_thread_sleep": -1}})
+        assert not config_manager.reload()
+        config_path.write_text("{ not json", encoding="utf-8")
+        assert not config_manager.reload()
+
+        assert config_manager.get("performance.worker_thread_sleep") == 1.0
+        assert received == []
+
+    def test_watcher_triggers_reload(self, tmp_path):
+        """Test sửa file cấu hình tự động kích hoạt reload."""
+        config_path = tmp_path / "service.json"
+        _write_config(config_path, {"logging": {"level": "INFO"}})
+
+        config_manager = ConfigManager()
+        assert config_manager.load_config(config_path)
+
+        changed = threading.Event()
+        config_manager.subscribe(lambda changes: changed.set())
+        assert config_manager.start_watching()
+
+        try:
+            _write_config(config_path, {"logging": {"level": "DEBUG"}})
+            assert changed.wait(timeout=5.0)
+            assert config_manager.get("logging.level") == "DEBUG"
+        finally:
+            config_manager.stop_watching()
+
+
+class TestConfigHelpers:
+    """Test cases cho validate_config và diff_config."""
+
+    @pytest.mark.parametrize("config", [
+        [],
+        {"logging": {"level": "VERBOSE"}},
+        {"performance": {"max_memory_mb": "512"}},
+        {"integration": {"api_port": True}},
+    ])
+    def test_validate_config_errors(self, config):
+        """Test các cấu hình không hợp lệ."""
+        assert validate_config(config)
+
+    def test_diff_config(self):
+        """Test diff giữa hai cấu hình lồng nhau."""
+        old = {"a": {"b": 1, "c": 2}, "d": 3}
+        new = {"a": {"b": 1, "c": 5}, "e": 4}
+        assert diff_config(old, new) == {"a.c": (2, 5), "d": (3, None), "e": (None, 4)}
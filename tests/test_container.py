@@ -0,0 +1,97 @@
+"""
+Test cases cho DIContainer.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.core.logger_interface import ILogger
+from shougun_remote.services.factory import DIContainer, Lifetime, ServiceFactory
+
+
+class Clock:
+    pass
+
+
+class Session:
+    def __init__(self, clock: Clock):
+        self.clock = clock
+
+
+class Handler:
+    def __init__(self, session: Session, clock: Clock, retries: int = 3, label: Optional[str] = None):
+        self.session = session
+        self.clock = clock
+        self.retries = retries
+
+
+class SlowSingleton:
+    created = 0
+
+    def __init__(self):
+        time.sleep(0.05)
+        SlowSingleton.created += 1
+
+
+class TestDIContainer:
+    """Test cases cho DIContainer."""
+
+    def test_lifetimes(self):
+        container = DIContainer()
+        container.register_singleton(Clock)
+        container.register_transient(Handler)
+        container.register_scoped(Session)
+
+        with pytest.raises(ValueError):
+            container.get(Session)
+
+        with container.create_scope() as scope:
+            first = scope.get(Handler)
+            second = scope.get(Handler)
+            assert first is not second
+            assert first.session is second.session
+            assert first.clock is container.get(Clock)
+            assert first.retries == 3
+
+        with container.create_scope() as other:
+            assert other.get(Session) is not first.session
+
+    def test_autowiring_reports_missing_dependency(self):
+        container = DIContainer()
+        container.register_transient(Session)
+        with pytest.raises(ValueError, match="clock"):
+            container.get(Session)
+
+        # Registration mới làm mới kế hoạch inject
+        container.register_singleton(Clock)
+        assert isinstance(container.get(Session).clock, Clock)
+
+    def test_singleton_created_once_under_contention(self):
+        container = DIContainer()
+        container.register(SlowSingleton, lifetime=Lifetime.SINGLETON)
+        SlowSingleton.created = 0
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(container.get(SlowSingleton))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert SlowSingleton.created == 1
+        assert all(result is results[0] for result in results)
+
+    def test_factory_shares_logger(self, null_logger):
+        service = ServiceFactory.create_with_custom_dependencies(logger=null_logger)
+        assert service._logger is null_logger
+        assert service.get_task_service()._logger is null_logger
+
+        container = ServiceFactory.create_container()
+        assert container.get(ILogger) is ServiceFactory.create_container().get(ILogger)
@@ -0,0 +1,194 @@
+"""
+Test cases cho kênh IPC của CSharpBridge.
+"""
+
+import json
+import socket
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.config import ConfigManager
+from shougun_remote.core.service_interface import ServiceStatus
+from shougun_remote.integration.bridge_channel import BridgeChannelServer, BridgeClient, parse_endpoint
+from shougun_remote.integration.commands import CommandDispatcher
+from shougun_remote.integration.csharp_bridge import CSharpBridge
+from shougun_remote.integration.framing import (
+    FRAME_REQUEST,
+    HEADER_SIZE,
+    FrameError,
+    decode_request,
+    encode_request,
+    pack_header,
+    unpack_header,
+)
+from shougun_remote.metrics import MetricsRegistry
+from shougun_remote.models import Task
+from shougun_remote.repositories import FileRepository
+from shougun_remote.services import TaskService
+
+
+class _FakeService:
+    """Service giả: lifecycle chỉ đổi trạng thái, task dùng TaskService thật."""
+
+    def __init__(self, task_service):
+        self._task_service = task_service
+        self._status = ServiceStatus.STOPPED
+        self.release = threading.Event()
+        self.release.set()
+
+    def start(self):
+        # Cho phép test giữ lệnh "start" lại để kiểm tra response không theo thứ tự
+        self.release.wait(5)
+        self._status = ServiceStatus.RUNNING
+        return True
+
+    def stop(self):
+        self._status = ServiceStatus.STOPPED
+        return True
+
+    def get_status(self):
+        return self._status
+
+    def get_info(self):
+        return {"status": self._status.value}
+
+    def get_task_service(self):
+        return self._task_service
+
+    def get_config_manager(self):
+        return ConfigManager()
+
+
+@pytest.fixture
+def service(tmp_path, null_logger):
+    registry = MetricsRegistry()
+    repository = FileRepository(str(tmp_path / "tasks.json"), Task, registry)
+    return _FakeService(TaskService(null_logger, repository, registry))
+
+
+@pytest.fixture
+def channel(service, null_logger):
+    """Kênh bridge trên TCP loopback cổng ngẫu nhiên."""
+    server = BridgeChannelServer(null_logger, CommandDispatcher(service), "tcp:127.0.0.1:0")
+    assert server.start()
+    yield server
+    server.stop()
+
+
+class TestFraming:
+    """Test cases cho định dạng frame."""
+
+    def test_request_round_trip(self):
+        payload = encode_request("create_task", {"name": "Tác vụ"})
+        assert decode_request(payload) == ("create_task", {"name": "Tác vụ"})
+        assert decode_request(encode_request("status")) == ("status", {})
+
+    def test_invalid_frames(self):
+        with pytest.raises(FrameError):
+            decode_request(b"\x09abc")
+        with pytest.raises(FrameError):
+            decode_request(b"\x01x[1]")
+        with pytest.raises(FrameError):
+            unpack_header(pack_header(1 << 30, 1, FRAME_REQUEST))
+
+    def test_parse_endpoint(self):
+        assert parse_endpoint("tcp:127.0.0.1:8081") == ("tcp", ("127.0.0.1", 8081))
+        assert parse_endpoint("unix:/tmp/x.sock") == ("unix", "/tmp/x.sock")
+        with pytest.raises(ValueError):
+            parse_endpoint("pipe:foo")
+
+
+class TestBridgeChannel:
+    """Test cases cho BridgeChannelServer và BridgeClient."""
+
+    def test_commands_over_persistent_connection(self, channel):
+        client = BridgeClient(channel.get_endpoint())
+        assert client.connect()
+        try:
+            assert client.call("ping")["message"] == "pong"
+            created = client.call("create_task", {"name": "Task 1"})
+            assert created["success"]
+            task_id = created["data"]["id"]
+            assert client.call("update_task", {"id": task_id, "status": "completed"})["success"]
+            listed = client.call("list_tasks", {"status": "completed"})
+            assert [task["id"] for task in listed["data"]] == [task_id]
+            assert client.call("delete_task", {"id": task_id})["success"]
+
+            unknown = client.call("bogus")
+            assert not unknown["success"]
+            assert "Unknown command" in unknown["message"]
+        finally:
+            client.close()
+
+    def test_responses_are_multiplexed(self, channel, service):
+        """Lệnh chậm không chặn các lệnh gửi sau trên cùng kết nối."""
+        client = BridgeClient(channel.get_endpoint())
+        assert client.connect()
+        try:
+            service.release.clear()
+            slow = client.submit("start")
+            fast = [client.submit("status") for _ in range(100)]
+            assert all(future.result(5)["data"]["status"] == "stopped" for future in fast)
+            assert not slow.done()
+
+            service.release.set()
+            assert slow.result(5)["success"]
+            assert client.call("status")["data"]["status"] == "running"
+        finally:
+            service.release.set()
+            client.close()
+
+    def test_malformed_payload_gets_error_response(self, channel):
+        _, address = parse_endpoint(channel.get_endpoint())
+        with socket.create_connection(address, timeout=5) as sock:
+            sock.sendall(pack_header(3, 7, FRAME_REQUEST) + b"\x09ab")
+            header = sock.recv(HEADER_SIZE, socket.MSG_WAITALL)
+            length, request_id, _, _ = unpack_header(header)
+            body = json.loads(sock.recv(length, socket.MSG_WAITALL))
+        assert request_id == 7
+        assert body == {"success": False, "message": "Invalid request"}
+
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix socket không được hỗ trợ")
+    def test_bridge_serves_unix_socket(self, service, tmp_path):
+        bridge = CSharpBridge(service)
+        assert bridge.initialize()
+        endpoint = f"unix:{tmp_path / 'bridge.sock'}"
+        assert bridge.serve(endpoint)
+        client = BridgeClient(bridge.get_endpoint())
+        try:
+            assert client.connect()
+            assert client.call("status")["success"]
+        finally:
+            client.close()
+            bridge.close()
+        assert not (tmp_path / "bridge.sock").exists()
+
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix socket không được hỗ trợ")
+    def test_unix_endpoint_in_use_is_not_taken_over(self, service, null_logger, tmp_path):
+        endpoint = f"unix:{tmp_path / 'bridge.sock'}"
+        first = BridgeChannelServer(null_logger, CommandDispatcher(service), endpoint)
+        second = BridgeChannelServer(null_logger, CommandDispatcher(service), endpoint)
+        assert first.start()
+        try:
+            assert not second.start()
+            client = BridgeClient(endpoint)
+            try:
+                assert client.connect()
+                assert client.call("status")["success"]
+            finally:
+                client.close()
+        finally:
+            first.stop()
+
+        # File socket cũ không còn ai lắng nghe thì được dùng lại
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(tmp_path / "bridge.sock"))
+        stale.close()
+        assert second.start()
+        second.stop()
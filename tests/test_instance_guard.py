@@ -0,0 +1,115 @@
+"""
+Test cases cho InstanceGuard.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.services.instance_guard import InstanceGuard
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+sys.path.insert(0, str(SRC_DIR.parent))
+
+from python_service import ensure_single_instance
+
+# Instance "cũ": giữ lock, mở kênh bridge (tùy chọn) và chờ lệnh shutdown
+_OWNER_SCRIPT = """
+import sys, threading
+sys.path.insert(0, {src!r})
+from loguru import logger
+from shougun_remote.integration.bridge_channel import BridgeChannelServer
+from shougun_remote.integration.commands import CommandDispatcher
+from shougun_remote.services.instance_guard import InstanceGuard
+
+class Service:
+    def __init__(self):
+        self.stop = threading.Event()
+    def request_shutdown(self):
+        self.stop.set()
+
+service = Service()
+guard = InstanceGuard(logger, {lock!r})
+assert guard.acquire()
+endpoint = None
+if {with_bridge!r}:
+    channel = BridgeChannelServer(logger, CommandDispatcher(service), "tcp:127.0.0.1:0")
+    channel.start()
+    endpoint = channel.get_endpoint()
+guard.update(endpoint)
+print("ready", flush=True)
+service.stop.wait(30)
+guard.release()
+print("stopped", flush=True)
+"""
+
+
+def _spawn_owner(lock_path, with_bridge):
+    script = _OWNER_SCRIPT.format(src=str(SRC_DIR), lock=str(lock_path), with_bridge=with_bridge)
+    child = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, text=True)
+    assert child.stdout.readline().strip() == "ready"
+    return child
+
+
+@pytest.fixture
+def lock_path(tmp_path):
+    return tmp_path / "service.lock"
+
+
+class TestInstanceGuard:
+    """Test cases cho InstanceGuard."""
+
+    def test_second_guard_is_rejected(self, lock_path, null_logger):
+        first = InstanceGuard(null_logger, str(lock_path))
+        second = InstanceGuard(null_logger, str(lock_path))
+        assert first.acquire("tcp:127.0.0.1:9")
+        try:
+            assert not second.acquire()
+            owner = second.read_owner()
+            assert owner.bridge_endpoint == "tcp:127.0.0.1:9"
+        finally:
+            first.release()
+        assert second.acquire()
+        second.release()
+
+    def test_take_over_asks_owner_to_shut_down(self, lock_path, null_logger):
+        child = _spawn_owner(lock_path, with_bridge=True)
+        guard = InstanceGuard(null_logger, str(lock_path))
+        try:
+            assert guard.take_over(timeout=10.0)
+            # Thoát tự nhiên sau lệnh shutdown, không bị kill
+            # (không kiểm tra returncode: psutil.wait() của guard đã thu hồi process con)
+            assert child.communicate(timeout=5)[0].strip() == "stopped"
+        finally:
+            guard.release()
+            if child.poll() is None:
+                child.kill()
+
+    def test_take_over_terminates_owner_without_channel(self, lock_path, null_logger):
+        child = _spawn_owner(lock_path, with_bridge=False)
+        guard = InstanceGuard(null_logger, str(lock_path))
+        try:
+            assert guard.take_over(timeout=4.0)
+            assert child.communicate(timeout=5)[0].strip() == ""
+        finally:
+            guard.release()
+            if child.poll() is None:
+                child.kill()
+
+    def test_probe_does_not_take_over(self, lock_path, null_logger):
+        child = _spawn_owner(lock_path, with_bridge=True)
+        guard = InstanceGuard(null_logger, str(lock_path))
+        try:
+            # --profile-startup chỉ thử lấy lock, instance đang chạy không bị dừng
+            assert not ensure_single_instance(guard, take_over=False)
+            assert child.poll() is None
+        finally:
+            guard.release()
+            child.kill()
+            child.communicate(timeout=5)
@@ -0,0 +1,116 @@
+"""
+Test cases cho metrics registry và exporter Prometheus.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.metrics import MetricsRegistry, render_prometheus
+from shougun_remote.metrics.instruments import _bucket_index, _bucket_lower, _bucket_upper
+from shougun_remote.models import Task
+from shougun_remote.repositories import FileRepository
+
+
+class TestMetricsRegistry:
+    """Test cases cho MetricsRegistry."""
+
+    def test_counter_sharded_across_threads(self):
+        """Test counter không mất cập nhật khi nhiều thread cùng tăng."""
+        registry = MetricsRegistry()
+        counter = registry.counter("events_total")
+
+        def work():
+            for _ in range(10000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counter.value() == 80000
+        assert registry.counter("events_total") is counter
+
+    def test_cells_of_finished_threads_are_folded(self):
+        """Test ô của thread đã kết thúc được gộp vào ô chung và giải phóng."""
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total")
+        histogram = registry.histogram("job_seconds")
+
+        def work():
+            counter.inc()
+            histogram.observe(0.5)
+
+        for _ in range(50):
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+
+        assert counter.value() == 50
+        assert histogram.summary()["count"] == 50
+        assert histogram.summary()["max"] == 0.5
+        assert counter._cells.count() == 0
+        assert histogram._shards.count() == 0
+
+    def test_histogram_percentiles(self):
+        """Test percentile của histogram có sai số tương đối nhỏ."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds")
+        for ms in range(1, 1001):
+            histogram.observe(ms / 1000)
+
+        summary = histogram.summary()
+        assert summary["count"] == 1000
+        assert abs(summary["p50"] - 0.5) / 0.5 < 0.04
+        assert abs(summary["p99"] - 0.99) / 0.99 < 0.04
+        assert summary["max"] == 1.0
+
+    def test_bucket_bounds_contain_value(self):
+        """Test mỗi giá trị nằm trong bucket của nó."""
+        for value in [0, 1, 63, 64, 65, 127, 128, 1000, 123456789]:
+            index = _bucket_index(value)
+            assert value <= _bucket_upper(index)
+            assert index == 0 or _bucket_upper(index - 1) < value
+            assert _bucket_lower(index) <= value
+            assert _bucket_lower(index) == (0 if index == 0 else _bucket_upper(index - 1) + 1)
+
+    def test_cumulative_counts_include_values_on_a_bound(self):
+        """Test giá trị đúng bằng cận được đếm vào bucket `le` của cận đó."""
+        histogram = MetricsRegistry().histogram("latency_seconds")
+        for value in (0.1, 0.1, 0.5, 1.0):
+            histogram.observe(value)
+        assert histogram.cumulative_counts((0.05, 0.1, 0.5, 1.0, 2.0)) == [0, 2, 3, 4, 4]
+
+    def test_render_prometheus(self):
+        """Test xuất text Prometheus."""
+        registry = MetricsRegistry()
+        registry.counter("requests_total", "Requests", {"method": "GET"}).inc(3)
+        registry.gauge("in_flight").set(2)
+        registry.histogram("save_seconds").observe(0.003)
+
+        text = render_prometheus(registry, buckets=(0.001, 0.01))
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{method="GET"} 3' in text
+        assert "in_flight 2" in text
+        assert 'save_seconds_bucket{le="0.001"} 0' in text
+        assert 'save_seconds_bucket{le="0.01"} 1' in text
+        assert 'save_seconds_bucket{le="+Inf"} 1' in text
+        assert "save_seconds_count 1" in text
+
+    def test_repository_metrics(self, tmp_path):
+        """Test FileRepository ghi metrics đọc/ghi."""
+        registry = MetricsRegistry()
+        repository = FileRepository(str(tmp_path / "tasks.json"), Task, registry)
+        repository.create(Task(id="t1", name="Task"))
+        repository.get_by_id("t1")
+
+        snapshot = registry.snapshot()
+        assert snapshot["shougun_repository_writes_total{repository=tasks}"] == 1
+        assert snapshot["shougun_repository_reads_total{repository=tasks}"] == 1
+        assert snapshot["shougun_repository_bytes_written_total{repository=tasks}"] == (tmp_path / "tasks.json").stat().st_size
+        assert snapshot["shougun_repository_save_seconds{repository=tasks}"]["count"] == 1
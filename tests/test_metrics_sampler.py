@@ -0,0 +1,42 @@
+"""
+Test cases cho MetricsSampler.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.services.metrics_sampler import MetricsSampler, _WindowAverage
+
+
+class TestMetricsSampler:
+    """Test cases cho MetricsSampler."""
+
+    def test_sample_now_updates_latest_and_history(self, null_logger):
+        """Test lấy mẫu cập nhật snapshot mới nhất và ring buffer."""
+        sampler = MetricsSampler(null_logger, interval=1.0, history_seconds=3)
+        assert sampler.get_latest() is None
+
+        for _ in range(5):
+            snapshot = sampler.sample_now()
+
+        assert sampler.get_latest() is snapshot
+        assert snapshot.pid == os.getpid()
+        assert snapshot.memory_mb > 0
+        assert snapshot.thread_count >= 1
+        assert len(sampler.get_history()) == 3
+        assert sampler.get_averages()["1m"]["samples"] == 5
+
+    def test_window_average_slides(self):
+        """Test trung bình trượt chỉ tính các mẫu trong cửa sổ."""
+        window = _WindowAverage(3)
+        for value in [10.0, 20.0, 30.0, 40.0, 50.0]:
+            window.push(value, value * 2)
+
+        averages = window.averages()
+        assert averages["samples"] == 3
+        assert averages["cpu_percent"] == 40.0
+        assert averages["memory_mb"] == 80.0
@@ -0,0 +1,103 @@
+"""
+Test cases cho resource governor và adaptive limiter.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from shougun_remote.config import ConfigManager
+from shougun_remote.services.concurrency import AdaptiveLimiter
+from shougun_remote.services.resource_governor import ResourceGovernor
+
+
+@pytest.fixture
+def governor(null_logger) -> ResourceGovernor:
+    config_manager = ConfigManager()
+    config_manager.set("performance.max_memory_mb", 100)
+    config_manager.set("performance.cpu_threshold", 50.0)
+    return ResourceGovernor(null_logger, config_manager, 8, lambda: (0.0, 0.0), recovery_samples=2)
+
+
+class TestResourceGovernor:
+    """Test cases cho ResourceGovernor.evaluate."""
+
+    def test_pressure_shrinks_and_recovers(self, governor):
+        """Test quá tải thu hẹp concurrency rồi hồi phục dần."""
+        states = []
+        governor.subscribe(states.append)
+
+        state = governor.evaluate(memory_mb=50, cpu_percent=90.0)
+        assert state.concurrency == 4
+        assert state.intake_paused
+        assert state.cpu_pressure and not state.memory_pressure
+
+        state = governor.evaluate(memory_mb=50, cpu_percent=90.0)
+        assert state.concurrency == 2
+
+        # Mẫu ổn định đầu tiên: tăng 1 slot nhưng vẫn tạm dừng nhận sự kiện
+        state = governor.evaluate(memory_mb=50, cpu_percent=10.0)
+        assert state.concurrency == 3
+        assert state.intake_paused
+
+        state = governor.evaluate(memory_mb=50, cpu_percent=10.0)
+        assert state.concurrency == 4
+        assert not state.intake_paused
+        assert len(states) == 4
+
+    def test_hysteresis_band_holds_state(self, governor):
+        """Test vùng giữa 90% và 100% ngưỡng không thay đổi trạng thái."""
+        governor.evaluate(memory_mb=150, cpu_percent=0.0)
+        state = governor.evaluate(memory_mb=95, cpu_percent=0.0)
+        assert state.concurrency == 4
+        assert state.intake_paused
+
+    def test_memory_pressure_runs_reclaimers(self, governor):
+        """Test quá tải bộ nhớ gọi reclaimer."""
+        calls = []
+        governor.add_reclaimer(lambda: calls.append(True))
+
+        governor.evaluate(memory_mb=50, cpu_percent=90.0)
+        assert calls == []
+        governor.evaluate(memory_mb=150, cpu_percent=0.0)
+        assert calls == [True]
+
+    def test_sustained_memory_pressure_respects_cooldown(self, null_logger):
+        """Test quá tải bộ nhớ kéo dài không reclaim lại mỗi lần lấy mẫu."""
+        config_manager = ConfigManager()
+        config_manager.set("performance.max_memory_mb", 100)
+        governor = ResourceGovernor(null_logger, config_manager, 8, lambda: (0.0, 0.0), reclaim_cooldown=3600)
+        calls = []
+        governor.add_reclaimer(lambda: calls.append(True))
+
+        for _ in range(5):
+            governor.evaluate(memory_mb=150, cpu_percent=0.0)
+        assert calls == [True]
+
+        # Hết quá tải rồi quá tải lại: reclaim ngay khi vào lại trạng thái quá tải
+        governor.evaluate(memory_mb=50, cpu_percent=0.0)
+        governor.evaluate(memory_mb=150, cpu_percent=0.0)
+        assert calls == [True, True]
+
+
+class TestAdaptiveLimiter:
+    """Test cases cho AdaptiveLimiter."""
+
+    def test_set_limit(self):
+        """Test thu hẹp và mở rộng giới hạn."""
+        limiter = AdaptiveLimiter(2)
+        assert limiter.acquire(timeout=0)
+        assert limiter.acquire(timeout=0)
+        assert not limiter.acquire(timeout=0)
+
+        limiter.set_limit(1)
+        limiter.release()
+        assert not limiter.acquire(timeout=0)
+
+        limiter.set_limit(3)
+        assert limiter.acquire(timeout=0)
+        assert limiter.in_use() == 2
@@ -0,0 +1,142 @@
+"""
+Test cases cho ResultStore và kết quả task.
+"""
+
+import http.client
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.core.service_interface import ServiceStatus
+from shougun_remote.integration.api_server import ApiServer
+from shougun_remote.metrics import MetricsRegistry
+from shougun_remote.models import Task
+from shougun_remote.repositories import FileRepository, ResultStore
+from shougun_remote.services import TaskService
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path / "results"), MetricsRegistry())
+
+
+@pytest.fixture
+def task_service(tmp_path, store, null_logger):
+    registry = MetricsRegistry()
+    repository = FileRepository(str(tmp_path / "tasks.json"), Task, registry)
+    return TaskService(null_logger, repository, registry, store)
+
+
+class TestResultStore:
+    """Test cases cho ResultStore."""
+
+    def test_streaming_writer_and_mapped_view(self, store, tmp_path):
+        with store.open_writer() as writer:
+            for _ in range(64):
+                writer.write(b"x" * 4096)
+            result_id = writer.commit()
+
+        assert store.get_blob_path(result_id).parent.parent.parent == tmp_path / "results"
+        assert store.size(result_id) == 64 * 4096
+        with store.open_view(result_id) as view:
+            assert len(view) == 64 * 4096
+            assert view[:3] == b"xxx"
+
+        # Cùng nội dung -> cùng blob
+        assert store.put(b"x" * 64 * 4096) == result_id
+        assert store.read(store.put(b"")) == b""
+
+    def test_aborted_writer_leaves_nothing(self, store):
+        with pytest.raises(RuntimeError):
+            with store.open_writer() as writer:
+                writer.write(b"partial")
+                raise RuntimeError("handler failed")
+        assert list(store.get_temp_dir().iterdir()) == []
+
+    def test_invalid_ids_are_rejected(self, store):
+        assert store.open_view("../../tasks.json") is None
+        assert not store.delete("../tasks")
+
+
+class TestTaskResults:
+    """Test cases cho kết quả task trong TaskService."""
+
+    def test_result_is_released_with_last_reference(self, task_service, store):
+        first = task_service.create_task("first")
+        second = task_service.create_task("second")
+        result_id = task_service.store_result(first.id, iter([b"shared ", b"output"]))
+        assert task_service.store_result(second.id, b"shared output") == result_id
+        assert "shared" not in Path(task_service._task_repository._file_path).read_text(encoding="utf-8")
+
+        assert task_service.delete_task(first.id)
+        assert store.exists(result_id)
+        with task_service.open_result(second.id) as view:
+            assert bytes(view) == b"shared output"
+
+        assert task_service.delete_task(second.id)
+        assert not store.exists(result_id)
+
+    def test_reused_blob_survives_concurrent_release(self, task_service, store):
+        first = task_service.create_task("first")
+        second = task_service.create_task("second")
+        result_id = task_service.store_result(first.id, b"shared output")
+
+        original_open_writer = store.open_writer
+        committed = threading.Event()
+
+        def open_writer():
+            writer = original_open_writer()
+            original_commit = writer.commit
+
+            def slow_commit():
+                # Blob trùng nội dung đã được dùng lại nhưng chưa gắn vào task
+                committed_id = original_commit()
+                committed.set()
+                threading.Event().wait(0.2)
+                return committed_id
+
+            writer.commit = slow_commit
+            return writer
+
+        store.open_writer = open_writer
+        writer = threading.Thread(target=task_service.store_result, args=(second.id, b"shared output"))
+        writer.start()
+        assert committed.wait(5)
+        assert task_service.delete_task(first.id)
+        writer.join()
+
+        assert task_service.get_task(second.id).result_id == result_id
+        assert store.exists(result_id)
+
+    def test_garbage_collection_removes_orphans(self, task_service, store):
+        task = task_service.create_task("kept")
+        kept = task_service.store_result(task.id, b"kept")
+        orphan = store.put(b"orphan")
+        assert task_service.collect_result_garbage() == 1
+        assert store.exists(kept) and not store.exists(orphan)
+
+    def test_result_is_served_over_api(self, task_service, null_logger):
+        task = task_service.create_task("big")
+        payload = bytes(range(256)) * 1024
+        task_service.store_result(task.id, payload)
+
+        class Service:
+            def get_status(self):
+                return ServiceStatus.RUNNING
+
+        server = ApiServer(null_logger, Service(), task_service, lambda: "", port=0)
+        assert server.start()
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", server.get_port(), timeout=5)
+            conn.request("GET", f"/tasks/{task.id}/result")
+            response = conn.getresponse()
+            assert response.status == 200
+            assert response.read() == payload
+            conn.close()
+        finally:
+            server.stop()
@@ -0,0 +1,168 @@
+"""
+Test cases cho retention: chính sách, compactor và archive.
+"""
+
+import gzip
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.config import ConfigManager
+from shougun_remote.metrics import MetricsRegistry
+from shougun_remote.models import Task, TaskStatus
+from shougun_remote.repositories import FileRepository, ResultStore, TaskArchive
+from shougun_remote.services import TaskService
+from shougun_remote.services.retention import RetentionCompactor, RetentionPolicy, load_policies
+
+NOW = datetime(2026, 3, 10, 12, 0, 0)
+
+
+@pytest.fixture
+def repository(tmp_path):
+    return FileRepository(str(tmp_path / "tasks.json"), Task, MetricsRegistry())
+
+
+@pytest.fixture
+def task_service(tmp_path, repository, null_logger):
+    return TaskService(null_logger, repository, MetricsRegistry(), ResultStore(str(tmp_path / "results")))
+
+
+def _add(service, repository, name, status, age_days, result=None):
+    """Tạo task với trạng thái và tuổi cho trước."""
+    task = service.create_task(name)
+    if result is not None:
+        service.store_result(task.id, result)
+        task = service.get_task(task.id)
+    task.status = status
+    task.updated_at = NOW - timedelta(days=age_days)
+    repository.update(task)
+    return task
+
+
+class TestRetentionPolicy:
+    """Test cases cho RetentionPolicy."""
+
+    def test_selects_by_age_and_count(self):
+        tasks = [Task(id=str(i), name=str(i), updated_at=NOW - timedelta(days=i)) for i in range(6)]
+
+        by_age = RetentionPolicy(TaskStatus.COMPLETED, max_age=timedelta(days=3))
+        assert {task.id for task in by_age.select_expired(tasks, NOW)} == {"4", "5"}
+
+        by_count = RetentionPolicy(TaskStatus.COMPLETED, max_count=2)
+        assert {task.id for task in by_count.select_expired(tasks, NOW)} == {"2", "3", "4", "5"}
+
+    def test_load_policies_skips_unconfigured_statuses(self, monkeypatch):
+        monkeypatch.setattr(ConfigManager, "load_config", lambda self, path: True)
+        config_manager = ConfigManager()
+        config_manager.set("retention.max_age_days", {"completed": 7})
+        config_manager.set("retention.max_count", {"failed": 100})
+
+        policies = {policy.status: policy for policy in load_policies(config_manager)}
+        assert set(policies) == {TaskStatus.COMPLETED, TaskStatus.FAILED}
+        assert policies[TaskStatus.COMPLETED].max_age == timedelta(days=7)
+        assert policies[TaskStatus.FAILED].max_count == 100
+
+
+class TestRetentionCompactor:
+    """Test cases cho RetentionCompactor."""
+
+    def test_run_once_archives_and_removes(self, tmp_path, task_service, repository, null_logger):
+        old = _add(task_service, repository, "old", TaskStatus.COMPLETED, 10, b"old output")
+        fresh = _add(task_service, repository, "fresh", TaskStatus.COMPLETED, 1)
+        running = _add(task_service, repository, "running", TaskStatus.RUNNING, 30)
+        result_id = old.result_id
+
+        registry = MetricsRegistry()
+        archive = TaskArchive(str(tmp_path / "archive"))
+        compactor = RetentionCompactor(
+            null_logger, task_service, archive,
+            [RetentionPolicy(TaskStatus.COMPLETED, max_age=timedelta(days=7))], metrics=registry)
+
+        assert compactor.run_once(NOW) == 1
+        assert {task.id for task in task_service.get_all_tasks()} == {fresh.id, running.id}
+        assert archive.get_by_id(old.id).name == "old"
+        # Blob bị xóa cùng task - bản ghi archive không trỏ tới blob không còn tồn tại
+        assert not task_service._result_store.exists(result_id)
+        assert archive.get_by_id(old.id).result_id is None
+        assert compactor.get_last_run()["archived"] == 1
+        assert registry.snapshot()["shougun_retention_archived_total{status=completed}"] == 1
+
+        # Lần chạy sau không còn gì để archive
+        assert compactor.run_once(NOW) == 0
+
+
+    def test_task_requeued_after_selection_is_kept(self, tmp_path, task_service, repository, null_logger):
+        requeued = _add(task_service, repository, "requeued", TaskStatus.COMPLETED, 10)
+        expired = _add(task_service, repository, "expired", TaskStatus.COMPLETED, 10)
+
+        class RequeueAfterSelect(RetentionPolicy):
+            def select_expired(self, tasks, now):
+                selected = super().select_expired(tasks, now)
+                # Task được đưa lại PENDING (PATCH /tasks/{id}) ngay sau khi compactor chọn task hết hạn
+                task_service.update_task_status(requeued.id, TaskStatus.PENDING)
+                return selected
+
+        archive = TaskArchive(str(tmp_path / "archive"))
+        compactor = RetentionCompactor(
+            null_logger, task_service, archive,
+            [RequeueAfterSelect(TaskStatus.COMPLETED, max_age=timedelta(days=7))], metrics=MetricsRegistry())
+
+        assert compactor.run_once(NOW) == 1
+        assert task_service.get_task(requeued.id).status == TaskStatus.PENDING
+        assert task_service.get_task(expired.id) is None
+        assert archive.get_by_id(requeued.id) is None and archive.get_by_id(expired.id) is not None
+
+
+class TestTaskArchive:
+    """Test cases cho TaskArchive."""
+
+    def test_queries_filter_by_status_and_date(self, tmp_path):
+        archive = TaskArchive(str(tmp_path / "archive"))
+        tasks = [
+            Task(id="a", name="a", status=TaskStatus.COMPLETED, updated_at=NOW - timedelta(days=3)),
+            Task(id="b", name="b", status=TaskStatus.FAILED, updated_at=NOW - timedelta(days=3)),
+            Task(id="c", name="c", status=TaskStatus.COMPLETED, updated_at=NOW),
+        ]
+        assert archive.append(tasks[:2]) == 2
+        assert archive.append(tasks[2:]) == 1
+
+        assert len(archive.list_days()) == 2
+        assert [task.id for task in archive.iter_tasks()] == ["a", "b", "c"]
+        assert [task.id for task in archive.iter_tasks(status=TaskStatus.COMPLETED)] == ["a", "c"]
+        assert [task.id for task in archive.iter_tasks(since=NOW - timedelta(days=1))] == ["c"]
+        assert [task.id for task in archive.iter_tasks(until=NOW - timedelta(days=1))] == ["a", "b"]
+
+    def test_truncated_member_is_ignored(self, tmp_path):
+        archive = TaskArchive(str(tmp_path / "archive"))
+        archive.append([Task(id="a", name="a", updated_at=NOW)])
+        path = archive.get_path(NOW.date())
+        complete = path.read_bytes()
+        archive.append([Task(id="b", name="b", updated_at=NOW)])
+        path.write_bytes(path.read_bytes()[:len(complete) + 10])
+
+        assert [task.id for task in archive.iter_tasks()] == ["a"]
+        with gzip.open(path, "rb") as f:
+            with pytest.raises(EOFError):
+                f.read()
+
+    def test_bad_line_skips_only_that_line(self, tmp_path):
+        archive = TaskArchive(str(tmp_path / "archive"))
+        archive.append([Task(id="a", name="a", updated_at=NOW)])
+        with gzip.open(archive.get_path(NOW.date()), "ab") as f:
+            f.write(b'{"id": "broken", \n{"name": "no id"}\n')
+        archive.append([Task(id="b", name="b", updated_at=NOW), Task(id="c", name="c", updated_at=NOW)])
+
+        assert [task.id for task in archive.iter_tasks()] == ["a", "b", "c"]
+
+
+def test_delete_many_saves_once(repository):
+    for name in ("a", "b", "c"):
+        repository.create(Task(id=name, name=name))
+    assert repository.delete_many(["a", "c", "missing"]) == 2
+    assert [task.id for task in repository.get_all()] == ["b"]
+    assert [task.id for task in FileRepository(repository._file_path, Task).get_all()] == ["b"]
@@ -0,0 +1,141 @@
+"""
+Test cases cho DamageBatcher.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.metrics import MetricsRegistry
+from shougun_remote.session.batcher import DamageBatcher
+
+
+class _Recorder:
+    """Callback flush ghi lại các frame."""
+
+    def __init__(self):
+        self.frames = []
+        self.event = threading.Event()
+
+    def __call__(self, frame):
+        self.frames.append(frame)
+        self.event.set()
+
+    def wait(self, count, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while len(self.frames) < count and time.monotonic() < deadline:
+            time.sleep(0.002)
+        return len(self.frames) >= count
+
+
+def _batcher(recorder, **kwargs):
+    batcher = DamageBatcher(recorder, metrics=MetricsRegistry(), **kwargs)
+    batcher.start()
+    return batcher
+
+
+def test_damage_is_batched_per_window_on_one_thread():
+    recorder = _Recorder()
+    threads = threading.active_count()
+    batcher = _batcher(recorder, min_delay=0.02)
+    try:
+        for col in range(40):
+            batcher.add_damage(1, col * 9, 0, 9, 18)
+        batcher.add_damage(2, 0, 0, 10, 10)
+        assert threading.active_count() == threads + 1
+        assert recorder.wait(2)
+        frames = {frame.wid: frame for frame in recorder.frames}
+        assert frames[1].rects == [(0, 0, 360, 18)]
+        assert frames[2].rects == [(0, 0, 10, 10)]
+        assert frames[1].sequence != frames[2].sequence
+    finally:
+        batcher.stop()
+
+
+def test_unacked_frames_are_capped():
+    recorder = _Recorder()
+    batcher = _batcher(recorder, min_delay=0.001, delay=0.001, max_unacked=1)
+    try:
+        batcher.add_damage(1, 0, 0, 10, 10)
+        assert recorder.wait(1)
+        batcher.add_damage(1, 20, 0, 10, 10)
+        batcher.add_damage(1, 20, 20, 10, 10)
+        time.sleep(0.05)
+        assert len(recorder.frames) == 1
+        assert batcher.get_stats()[1]["pending"]
+
+        assert batcher.ack(1, recorder.frames[0].last_sequence, 2)
+        assert recorder.wait(2)
+        assert recorder.frames[1].rects == [(20, 0, 10, 30)]
+        assert not batcher.ack(1, recorder.frames[0].last_sequence)
+    finally:
+        batcher.stop()
+
+
+def test_delay_adapts_to_ack_latency_and_decode_time():
+    recorder = _Recorder()
+    batcher = _batcher(recorder, min_delay=0.001, delay=0.01, max_delay=0.5)
+
+    def frame_with_latency(latency, decode_time):
+        count = len(recorder.frames)
+        batcher.add_damage(1, 0, 0, 10, 10)
+        assert recorder.wait(count + 1)
+        time.sleep(latency)
+        batcher.ack(1, recorder.frames[-1].last_sequence, decode_time)
+
+    try:
+        for _ in range(8):
+            frame_with_latency(0.0, 0)
+        fast = batcher.get_delay(1)
+        assert fast < 0.01
+
+        for _ in range(8):
+            frame_with_latency(0.05, 30)
+        slow = batcher.get_delay(1)
+        assert slow > 0.03
+        assert batcher.get_stats()[1]["decode"] > 0.02
+    finally:
+        batcher.stop()
+
+
+def test_lost_acks_do_not_stall_window():
+    recorder = _Recorder()
+    batcher = _batcher(recorder, min_delay=0.001, max_unacked=1, ack_timeout=0.05)
+    try:
+        batcher.add_damage(1, 0, 0, 10, 10)
+        assert recorder.wait(1)
+        batcher.add_damage(1, 50, 50, 10, 10)
+        assert recorder.wait(2)
+        batcher.remove_window(1)
+        assert batcher.get_delay(1) is None
+    finally:
+        batcher.stop()
+
+
+def test_failed_flush_does_not_hold_the_window():
+    recorder = _Recorder()
+    failures = [True]
+
+    def flush(frame):
+        if failures.pop(0) if failures else False:
+            raise ConnectionError("socket closed")
+        recorder(frame)
+
+    batcher = DamageBatcher(flush, metrics=MetricsRegistry(), min_delay=0.001, delay=0.001,
+                            max_unacked=1, ack_timeout=60.0)
+    batcher.start()
+    try:
+        batcher.add_damage(1, 0, 0, 10, 10)
+        deadline = time.monotonic() + 2.0
+        while failures and time.monotonic() < deadline:
+            time.sleep(0.002)
+        batcher.add_damage(1, 20, 0, 10, 10)
+        assert recorder.wait(1)
+        assert recorder.frames[0].sequence == 1
+        assert batcher.get_stats()[1]["unacked"] == 1 and batcher.get_stats()[1]["frames"] == 1
+    finally:
+        batcher.stop()
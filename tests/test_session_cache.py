@@ -0,0 +1,87 @@
+"""
+Test cases cho cache encode của seamless session.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.metrics import MetricsRegistry
+from shougun_remote.session.cache import (
+    CACHE_CODING,
+    ClientCache,
+    ClientCacheMirror,
+    EncodingCache,
+    content_key,
+)
+from shougun_remote.session.encoder import EncodeRequest
+
+
+def test_key_covers_pixels_and_encoding_parameters():
+    pixels = bytes(range(256)) * 4
+    key = content_key(pixels, 16, 16, "png")
+    assert key == content_key(bytearray(pixels), 16, 16, "png", {})
+    assert len(key) == 16
+    assert key != content_key(pixels, 32, 8, "png")
+    assert key != content_key(pixels, 16, 16, "jpeg")
+    assert content_key(pixels, 16, 16, "jpeg", {"quality": 80}) != content_key(pixels, 16, 16, "jpeg", {"quality": 50})
+    assert key != content_key(pixels[:-1] + b"\x00", 16, 16, "png")
+
+
+def test_cache_is_bounded_by_bytes_with_lru_eviction():
+    registry = MetricsRegistry()
+    cache = EncodingCache(max_bytes=900, metrics=registry)
+    for name in (b"a", b"b", b"c", b"d"):
+        cache.put(name, name * 200)
+    assert cache.get(b"a") is not None
+    cache.put(b"e", b"e" * 200)
+    # b là mục ít dùng gần đây nhất, a vừa được đọc nên còn
+    assert cache.get(b"b") is None and cache.get(b"a") is not None
+    assert cache.get_stats()["bytes"] <= 900
+    cache.put(b"huge", b"x" * 600)
+    assert cache.get(b"huge") is None
+
+    snapshot = registry.snapshot()
+    assert snapshot["shougun_session_cache_evictions_total{cache=encoding}"] == 1
+    assert snapshot["shougun_session_cache_hits_total{cache=encoding}"] == 2
+    assert snapshot["shougun_session_cache_misses_total{cache=encoding}"] == 2
+
+
+def test_repeated_requests_are_encoded_once():
+    calls = []
+
+    def encoder(request):
+        calls.append(request.sequence)
+        return b"encoded"
+
+    cache = EncodingCache(metrics=MetricsRegistry())
+    icon = bytes(32 * 32 * 4)
+    for sequence in range(3):
+        assert cache.encode(EncodeRequest(1, sequence, (sequence * 40, 0, 32, 32), icon, "png"), encoder) == b"encoded"
+    cache.encode(EncodeRequest(1, 9, (0, 0, 32, 32), icon, "png", {"quality": 10}), encoder)
+    assert calls == [0, 9]
+
+
+def test_client_cache_stays_in_sync_with_server_mirror():
+    rng = random.Random(5)
+    mirror = ClientCacheMirror(max_bytes=5000, metrics=MetricsRegistry())
+    client = ClientCache(max_bytes=5000, metrics=MetricsRegistry())
+    assert client.get_hello_capabilities() == {"encoding.cache-size": 5000}
+    contents = {index: bytes([index]) * rng.randint(100, 1500) for index in range(20)}
+
+    references = 0
+    for _ in range(500):
+        index = rng.choice([0, 1, 2] * 5 + list(contents))
+        data = contents[index]
+        key = content_key(data, len(data), 1, "rgb")
+        reference, options = mirror.draw_options(key, len(data))
+        if reference:
+            references += 1
+            assert client.process_draw(CACHE_CODING, b"", options) == ("rgb", data)
+        else:
+            assert client.process_draw("rgb", memoryview(data), options) == ("rgb", data)
+    assert references > 100
+    assert client.process_draw(CACHE_CODING, b"", {"cache": 10 ** 6}) is None
@@ -0,0 +1,98 @@
+"""
+Test cases cho gửi/nhận chunk raw của session.
+"""
+
+import json
+import socket
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.session.chunks import ChunkAssembler, receive_packet, send_packet, split_packet
+from shougun_remote.session.net import NetworkConnection, PacketError, PacketParser, pack_header
+
+PIXELS = bytes(range(256)) * 4096
+
+
+def _encode(packet):
+    return json.dumps(packet).encode("utf-8")
+
+
+def _draw_packet():
+    return ["draw", 1, 0, 0, 1024, 256, "rgb", PIXELS, 7, 4096, {}]
+
+
+def test_split_replaces_large_buffers_without_copy():
+    packet = _draw_packet()
+    main, chunks = split_packet(packet)
+    assert main[7] == "" and packet[7] is PIXELS
+    assert [index for index, _ in chunks] == [7]
+    assert chunks[0][1].obj is PIXELS
+
+    small = ["pointer-position", 1, (5, 5), b"tiny"]
+    assert split_packet(small) == (small, [])
+
+
+def test_blocking_round_trip_reads_chunks_into_preallocated_buffers():
+    left, right = socket.socketpair()
+    sender, receiver = NetworkConnection(left), NetworkConnection(right)
+    thread = threading.Thread(target=send_packet, args=(sender.send_packet, _encode, _draw_packet()))
+    thread.start()
+
+    assembler = ChunkAssembler()
+    header, payload = receive_packet(receiver.get_reader(), assembler)
+    thread.join()
+    assert header.chunk_index == 0
+    assert assembler.get_pending_bytes() == len(PIXELS)
+
+    packet = assembler.assemble(json.loads(bytes(payload)))
+    assert packet[7] == PIXELS and len(packet[7].obj) == len(PIXELS)
+    assert assembler.get_pending_bytes() == 0
+    sender.close()
+    receiver.close()
+
+
+def test_parser_path_keeps_chunk_payloads():
+    stream = []
+
+    def send(payload, flags, compression, chunk_index):
+        stream.append(pack_header(flags, compression, chunk_index, len(payload)) + bytes(payload))
+
+    assert send_packet(send, _encode, _draw_packet()) == 1
+    assembler = ChunkAssembler()
+    packets = []
+    for header, payload in PacketParser().feed(b"".join(stream)):
+        if header.chunk_index:
+            assembler.add_chunk(header.chunk_index, payload)
+        else:
+            packets.append(assembler.assemble(json.loads(bytes(payload))))
+    assert packets[0][7] == PIXELS and packets[0][:7] == ["draw", 1, 0, 0, 1024, 256, "rgb"]
+
+
+def test_invalid_chunks_are_rejected():
+    assembler = ChunkAssembler(max_pending=100)
+    with pytest.raises(PacketError):
+        assembler.allocate(1, 101)
+    assembler.allocate(5, 10)
+    with pytest.raises(PacketError):
+        assembler.assemble(["ping", 1])
+
+
+def test_repeated_chunk_index_keeps_parts_until_assemble():
+    assembler = ChunkAssembler()
+    first = assembler.allocate(3, 4)
+    first[:] = b"abcd"
+    second = assembler.allocate(3, 2)
+    second[:] = b"ef"
+    assembler.add_chunk(3, memoryview(b"gh"))
+    assert first.tobytes() == b"abcd"
+    assert assembler.get_pending_bytes() == 8
+
+    packet = assembler.assemble(["draw", 1, 0, ""])
+    assert bytes(packet[3]) == b"abcdefgh"
+    assert assembler.get_pending_bytes() == 0
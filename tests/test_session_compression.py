@@ -0,0 +1,118 @@
+"""
+Test cases cho nén payload packet session.
+"""
+
+import json
+import os
+import socket
+import sys
+import threading
+import zlib
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.metrics import MetricsRegistry
+from shougun_remote.session.chunks import ChunkAssembler, receive_packet, send_packet
+from shougun_remote.session.compression import (
+    BROTLI,
+    LZ4,
+    NONE,
+    ZLIB,
+    CompressionSelector,
+    available_compressors,
+    compression_byte,
+    decompress,
+)
+from shougun_remote.session.net import MAX_PAYLOAD_SIZE, NetworkConnection, PacketError
+
+TEXT = b"window-metadata title=Terminal - user@host " * 200
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_compression_byte_round_trip():
+    assert ZLIB in available_compressors()
+    assert compression_byte(NONE, 5) == 0
+    assert compression_byte(ZLIB, 6) == 0x06
+
+    selector = CompressionSelector(metrics=MetricsRegistry())
+    compression, payload = selector.compress("window-metadata", TEXT)
+    assert compression & 0x0F and len(payload) < len(TEXT)
+    assert decompress(compression, payload) == TEXT
+    assert decompress(0, b"raw") == b"raw"
+    with pytest.raises(PacketError):
+        decompress(0x23, b"x")
+
+
+def test_small_and_precompressed_payloads_are_not_compressed(registry):
+    selector = CompressionSelector(metrics=registry)
+    assert selector.compress("pointer-position", b"tiny") == (0, b"tiny")
+    assert selector.compress("draw-chunk", TEXT, coding="png") == (0, TEXT)
+    snapshot = registry.snapshot()
+    assert snapshot["shougun_session_compression_skipped_total{reason=small}"] == 1
+    assert snapshot["shougun_session_compression_skipped_total{reason=precompressed}"] == 1
+
+
+def test_incompressible_type_is_sampled(registry):
+    selector = CompressionSelector(sample_interval=4, metrics=registry)
+    noise = os.urandom(4096)
+    for _ in range(6):
+        assert selector.compress("sound-data", noise)[0] == 0
+
+    stats = selector.get_stats()["sound-data"]
+    # Lần đầu đo tỷ lệ, 4 lần bỏ qua, lần thứ 6 đo lại
+    assert stats["ratio"] > 0.9 and stats["skipped"] == 6 and stats["compressed"] == 0
+    assert registry.snapshot()["shougun_session_compression_skipped_total{reason=incompressible}"] == 4
+
+
+def test_link_conditions_change_the_choice():
+    selector = CompressionSelector([ZLIB], metrics=MetricsRegistry())
+    assert selector.select("draw", 100000) == (ZLIB, 1)
+    selector.update_link(bandwidth=64 * 1024)
+    assert selector.select("draw", 100000) == (ZLIB, 6)
+    selector.update_link(cpu_headroom=0.05)
+    assert selector.select("draw", 100000) == (ZLIB, 1)
+    assert CompressionSelector([], metrics=MetricsRegistry()).select("draw", 100000) == (NONE, 0)
+
+
+def test_compressed_chunks_round_trip():
+    left, right = socket.socketpair()
+    sender, receiver = NetworkConnection(left), NetworkConnection(right)
+    pixels = bytes(64 * 1024)
+    packet = ["draw", 1, 0, 0, 128, 128, "rgb", pixels, 1, 512, {}]
+    selector = CompressionSelector(metrics=MetricsRegistry())
+    thread = threading.Thread(
+        target=send_packet, args=(sender.send_packet, lambda p: json.dumps(p).encode(), packet), kwargs={"selector": selector})
+    thread.start()
+
+    assembler = ChunkAssembler()
+    header, payload = receive_packet(receiver.get_reader(), assembler)
+    thread.join()
+    decoded = assembler.assemble(json.loads(bytes(decompress(header.compression, payload))))
+    assert decoded[7] == pixels
+    assert selector.get_stats()["draw-chunk"]["bytes_out"] < len(pixels) // 10
+    sender.close()
+    receiver.close()
+
+
+def test_decompression_is_capped_for_every_compressor():
+    # lz4: kích thước khai báo vượt giới hạn bị từ chối trước khi cấp phát
+    oversized = (MAX_PAYLOAD_SIZE + 1).to_bytes(4, "little") + b"\x00" * 16
+    with pytest.raises(PacketError, match="vượt giới hạn"):
+        decompress(compression_byte(LZ4, 1), oversized)
+
+    bomb = zlib.compress(bytes(MAX_PAYLOAD_SIZE + 1), 9)
+    with pytest.raises(PacketError, match="vượt giới hạn"):
+        decompress(compression_byte(ZLIB, 9), bomb)
+
+    brotli = pytest.importorskip("brotli")
+    with pytest.raises(PacketError, match="vượt giới hạn"):
+        decompress(compression_byte(BROTLI, 9), brotli.compress(bytes(MAX_PAYLOAD_SIZE + 1)))
+    assert decompress(compression_byte(BROTLI, 9), brotli.compress(TEXT)) == TEXT
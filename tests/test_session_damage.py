@@ -0,0 +1,120 @@
+"""
+Test cases cho vùng damage của seamless session.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add src and examples to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "examples"))
+
+from session_benchmark import bench_damage
+from shougun_remote.session.damage import DamageAccumulator, DamageRegion
+
+
+def _coverage(rects, size=(400, 400)):
+    """Số lần mỗi pixel được phủ."""
+    canvas = np.zeros(size, dtype=int)
+    for x, y, w, h in rects:
+        canvas[y:y + h, x:x + w] += 1
+    return canvas
+
+
+def test_union_is_exact_and_disjoint():
+    rng = random.Random(3)
+    for _ in range(50):
+        region = DamageRegion(max_rects=1000)
+        mask = np.zeros((400, 400), dtype=bool)
+        for _ in range(rng.randint(1, 80)):
+            x, y = rng.randrange(300), rng.randrange(300)
+            w, h = rng.randint(1, 99), rng.randint(1, 99)
+            region.add(x, y, w, h)
+            mask[y:y + h, x:x + w] = True
+        inner = [(x1, y1, x2 - x1, y2 - y1) for x1, y1, x2, y2 in region._get_rects().tolist()]
+        coverage = _coverage(inner)
+        assert coverage.max() == 1
+        assert np.array_equal(coverage == 1, mask)
+        assert region.area() == mask.sum()
+
+        rects = region.get_rectangles()
+        coverage = _coverage(rects)
+        assert coverage.max() == 1 and (coverage[mask] == 1).all()
+        for _ in range(5):
+            x, y = rng.randrange(380), rng.randrange(380)
+            assert region.covers(x, y, 20, 20) == bool(mask[y:y + 20, x:x + 20].all())
+
+
+def test_contained_and_empty_damage_is_ignored():
+    region = DamageRegion()
+    assert region.add(0, 0, 0, 10) is False
+    assert region.is_empty()
+    assert region.add(0, 0, 100, 100) is True
+    assert region.add(10, 10, 20, 20) is False
+    assert region.area() == 10000 and len(region) == 1
+
+
+def test_bounding_box_or_separate_rects_by_cost():
+    region = DamageRegion()
+    # Hai dòng chữ sát nhau: phần thừa nhỏ, gửi một hình bao
+    region.add(0, 0, 800, 18)
+    region.add(0, 18, 720, 18)
+    assert region.get_rectangles() == [(0, 0, 800, 36)]
+
+    # Hai góc đối diện: hình bao thừa quá nhiều, gửi riêng
+    region.clear()
+    region.add(0, 0, 10, 10)
+    region.add(1000, 700, 10, 10)
+    assert sorted(region.get_rectangles()) == [(0, 0, 10, 10), (1000, 700, 10, 10)]
+
+    # Hai hình gần nhau: phần thừa rẻ hơn chi phí một hình chữ nhật
+    region = DamageRegion(max_waste=0.0)
+    region.add(0, 0, 30, 30)
+    region.add(35, 0, 30, 30)
+    assert region.get_rectangles() == [(0, 0, 65, 30)]
+    assert DamageRegion().take() == [] and DamageRegion().bounds() is None
+
+
+def test_rectangles_are_limited():
+    region = DamageRegion(max_rects=4)
+    for index in range(50):
+        region.add(index * 37 % 1900, index * 53 % 1000, 8, 8)
+    rects = region.take()
+    assert len(rects) <= 4
+    assert region.is_empty()
+
+
+def test_exact_region_is_not_coarsened():
+    # Hơn max_rects * 16 damage rời nhau: vùng thường bị nới, vùng exact thì không
+    loose, exact = DamageRegion(max_rects=2), DamageRegion(max_rects=2, exact=True)
+    for row in range(8):
+        for col in range(8):
+            loose.add(col * 10, row * 10, 2, 2)
+            exact.add(col * 10, row * 10, 2, 2)
+    assert loose.covers(4, 4, 2, 2)
+    assert not exact.covers(4, 4, 2, 2) and exact.covers(10, 10, 2, 2)
+    assert exact.area() == 64 * 4
+
+
+def test_accumulator_keeps_region_per_window():
+    accumulator = DamageAccumulator()
+    assert accumulator.add(1, 0, 0, 10, 10)
+    assert accumulator.add(2, 5, 5, 10, 10)
+    assert not accumulator.add(1, 2, 2, 4, 4)
+    assert sorted(accumulator.windows()) == [1, 2]
+    assert accumulator.get_region(1).area() == 100
+
+    assert accumulator.take(1) == [(0, 0, 10, 10)]
+    assert accumulator.take(1) == []
+    accumulator.discard(2)
+    assert list(accumulator.windows()) == []
+
+
+def test_benchmark_runs():
+    results = bench_damage(iterations=1)
+    scattered = results["scattered"]
+    assert scattered["DamageRegion"]["bytes"] < scattered["merge_regions"]["bytes"]
+    assert all(result["DamageRegion"]["rects"] <= 32 for result in results.values())
@@ -0,0 +1,162 @@
+"""
+Test cases cho EncodePipeline.
+"""
+
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.metrics import MetricsRegistry
+from shougun_remote.session.encoder import PROCESS, EncodePipeline, EncodeRequest
+
+
+def zlib_encoder(request):
+    """Encoder cấp module (pickle được cho process pool)."""
+    return zlib.compress(request.pixels)
+
+
+def _request(wid, sequence, rect=(0, 0, 10, 10), pixels=b"x" * 300):
+    return EncodeRequest(wid, sequence, rect, pixels, "rgb")
+
+
+class _Collector:
+    def __init__(self):
+        self.results = []
+        self.lock = threading.Lock()
+
+    def __call__(self, result):
+        with self.lock:
+            self.results.append(result)
+
+    def sequences(self, wid):
+        return [r.request.sequence for r in self.results if r.request.wid == wid]
+
+
+def test_results_are_delivered_in_window_order():
+    def encoder(request):
+        # Job đầu chậm nhất: các job sau xong trước nhưng vẫn phải chờ
+        time.sleep(0.05 if request.sequence % 10 == 0 else 0.001)
+        return request.sequence
+
+    collector = _Collector()
+    pipeline = EncodePipeline(encoder, collector, workers=4, metrics=MetricsRegistry())
+    try:
+        for wid in (1, 2):
+            for frame in range(3):
+                base = wid * 100 + frame * 10
+                pipeline.submit([_request(wid, base + i, (i * 20, frame * 20, 10, 10)) for i in range(4)])
+        assert pipeline.wait_idle(timeout=5)
+        for wid in (1, 2):
+            sequences = collector.sequences(wid)
+            assert sequences == sorted(sequences) and len(sequences) == 12
+        assert all(r.data == r.request.sequence for r in collector.results)
+    finally:
+        pipeline.close()
+
+
+def test_in_flight_is_bounded_and_windows_share_workers():
+    gate = threading.Event()
+    running = []
+    lock = threading.Lock()
+
+    def encoder(request):
+        with lock:
+            running.append(request.wid)
+        gate.wait(2)
+        return b""
+
+    collector = _Collector()
+    pipeline = EncodePipeline(encoder, collector, workers=4, max_in_flight=1, metrics=MetricsRegistry())
+    try:
+        pipeline.submit([_request(1, i, (i * 20, 0, 10, 10)) for i in range(6)])
+        pipeline.submit([_request(2, 100)])
+        time.sleep(0.05)
+        stats = pipeline.get_stats()
+        assert stats["in_flight"] == 1 and stats["queued"] == 6
+        gate.set()
+        assert pipeline.wait_idle(timeout=5)
+        # Cửa sổ 2 chỉ chờ job đã xếp hàng trước nó, không phải chờ cả 6 job của cửa sổ 1
+        assert running == [1, 1, 2, 1, 1, 1, 1]
+    finally:
+        pipeline.close()
+
+
+def test_superseded_regions_are_cancelled():
+    gate = threading.Event()
+
+    def encoder(request):
+        gate.wait(2)
+        return request.sequence
+
+    collector = _Collector()
+    registry = MetricsRegistry()
+    pipeline = EncodePipeline(encoder, collector, workers=1, metrics=registry)
+    try:
+        pipeline.submit([_request(1, 1, (0, 0, 50, 50))])
+        pipeline.submit([_request(1, 2, (0, 0, 20, 20)), _request(1, 3, (100, 100, 20, 20))])
+        pipeline.submit([_request(1, 4, (0, 0, 100, 100))])
+        gate.set()
+        assert pipeline.wait_idle(timeout=5)
+        results = {r.request.sequence: r for r in collector.results}
+        assert [r.request.sequence for r in collector.results] == [1, 2, 3, 4]
+        assert results[1].cancelled and results[1].data is None
+        assert results[2].cancelled and not results[3].cancelled
+        assert results[4].data == 4
+        assert registry.snapshot()["shougun_session_encode_superseded_total"] == 2
+    finally:
+        pipeline.close()
+
+
+def test_many_rects_do_not_cancel_uncovered_jobs():
+    gate = threading.Event()
+
+    def encoder(request):
+        gate.wait(2)
+        return request.sequence
+
+    collector = _Collector()
+    pipeline = EncodePipeline(encoder, collector, workers=1, metrics=MetricsRegistry())
+    try:
+        pipeline.submit([_request(1, 1, (0, 0, 2, 2)), _request(1, 2, (4, 4, 2, 2))])
+        # Hơn 512 hình rời nhau, không hình nào phủ (4, 4, 2, 2)
+        grid = [(col * 10, row * 10, 2, 2) for row in range(25) for col in range(25)]
+        pipeline.submit([_request(1, 3 + index, rect) for index, rect in enumerate(grid)])
+        gate.set()
+        assert pipeline.wait_idle(timeout=10)
+        results = {r.request.sequence: r for r in collector.results}
+        assert results[1].cancelled and not results[2].cancelled
+    finally:
+        pipeline.close()
+
+
+def test_encoder_errors_are_delivered():
+    def encoder(request):
+        raise ValueError("bad pixels")
+
+    collector = _Collector()
+    pipeline = EncodePipeline(encoder, collector, workers=1, metrics=MetricsRegistry())
+    pipeline.submit([_request(1, 1)])
+    assert pipeline.wait_idle(timeout=5)
+    assert "bad pixels" in collector.results[0].error
+    pipeline.close()
+    assert not pipeline.submit([_request(1, 2)])
+    with pytest.raises(ValueError):
+        EncodePipeline(encoder, collector, executor="fork")
+
+
+def test_process_pool_encoder():
+    collector = _Collector()
+    pipeline = EncodePipeline(zlib_encoder, collector, workers=2, executor=PROCESS, metrics=MetricsRegistry())
+    try:
+        pipeline.submit([_request(1, i, (i * 20, 0, 10, 10), bytes([i]) * 1000) for i in range(4)])
+        assert pipeline.wait_idle(timeout=30)
+        assert [zlib.decompress(r.data) for r in collector.results] == [bytes([i]) * 1000 for i in range(4)]
+    finally:
+        pipeline.close()
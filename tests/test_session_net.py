@@ -0,0 +1,90 @@
+"""
+Test cases cho tầng đóng khung packet của session.
+"""
+
+import socket
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.session.net import (
+    FLAG_FLUSH,
+    FLAG_RENCODEPLUS,
+    HEADER_SIZE,
+    NetworkConnection,
+    PacketError,
+    PacketReader,
+    pack_header,
+    unpack_header,
+)
+
+
+@pytest.fixture
+def connection_pair():
+    left, right = socket.socketpair()
+    sender, receiver = NetworkConnection(left), NetworkConnection(right, buffer_size=16)
+    yield sender, receiver
+    sender.close()
+    receiver.close()
+
+
+def test_header_round_trip():
+    header = pack_header(FLAG_RENCODEPLUS | FLAG_FLUSH, 0x15, 3, 1234)
+    assert len(header) == HEADER_SIZE and header[:1] == b"P"
+
+    parsed = unpack_header(header)
+    assert (parsed.chunk_index, parsed.payload_size) == (3, 1234)
+    assert parsed.flush and parsed.compressor == 0x10 and parsed.level == 5
+
+    with pytest.raises(PacketError):
+        unpack_header(b"X" + header[1:])
+    with pytest.raises(PacketError):
+        unpack_header(header, max_payload=100)
+
+
+def test_large_payload_is_read_into_reused_buffer(connection_pair):
+    sender, receiver = connection_pair
+    payload = bytes(range(256)) * 8192
+    thread = threading.Thread(target=lambda: (sender.send_packet(payload), sender.send_packet(b"ack")))
+    thread.start()
+
+    header, view = receiver.recv_packet()
+    assert header.payload_size == len(payload)
+    assert isinstance(view, memoryview) and view == payload
+    buffer = view.obj
+
+    header, view = receiver.recv_packet()
+    thread.join()
+    # Packet nhỏ tiếp theo dùng lại buffer đã tăng kích thước
+    assert view.obj is buffer and view == b"ack"
+
+
+def test_payload_can_be_read_into_caller_buffer(connection_pair):
+    sender, receiver = connection_pair
+    sender.send_packet(b"pixels" * 10, chunk_index=1)
+
+    reader = receiver.get_reader()
+    header = reader.read_header()
+    target = bytearray(header.payload_size)
+    reader.read_payload_into(header, memoryview(target))
+    assert header.chunk_index == 1 and target == b"pixels" * 10
+
+
+def test_eof_and_truncated_packets():
+    left, right = socket.socketpair()
+    reader = PacketReader(right)
+    left.sendall(pack_header(FLAG_RENCODEPLUS, 0, 0, 10) + b"short")
+    left.close()
+    with pytest.raises(PacketError):
+        reader.read_packet()
+    right.close()
+
+    left, right = socket.socketpair()
+    left.close()
+    assert PacketReader(right).read_packet() is None
+    right.close()
@@ -0,0 +1,86 @@
+"""
+Test cases cho codec rencodeplus.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src and examples to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "examples"))
+
+from session_benchmark import bench_codec
+from shougun_remote.session.rencode import PacketCodec, RencodeError, dumps, loads
+
+
+def test_wire_format_matches_rencode():
+    assert dumps(1) == b"\x01"
+    assert dumps(-1) == b"F"
+    assert dumps(100) == b">d"
+    assert dumps(1000) == b"?\x03\xe8"
+    assert dumps("abc") == b"\x83abc"
+    assert dumps("x" * 70) == b"70:" + b"x" * 70
+    assert dumps([1, 2]) == b"\xc2\x01\x02"
+    assert dumps({}) == b"f"
+    assert dumps(None) == b"E" and dumps(True) == b"C"
+    # bytes mặc định là chuỗi rencode chuẩn
+    assert dumps(b"ab") == dumps(bytearray(b"ab")) == b"\x82ab"
+    assert dumps(memoryview(b"y" * 70)) == b"70:" + b"y" * 70
+    assert dumps(b"ab", typed_bytes=True) == b"/2:ab"
+
+
+def test_round_trip_keeps_types():
+    value = [
+        "draw", 1, -5, 300, -70000, 2 ** 40, 2 ** 80, 1.5, None, False,
+        "é" * 40, b"\x00" * 10, bytearray(b"ab"), memoryview(b"cd"),
+        (1, 2), list(range(100)), {"title": "xterm", 3: [4]}, {str(i): i for i in range(30)},
+    ]
+    decoded = loads(dumps(value, typed_bytes=True))
+    assert decoded[:11] == value[:11]
+    assert decoded[11:14] == [b"\x00" * 10, b"ab", b"cd"] and all(type(item) is bytes for item in decoded[11:14])
+    assert decoded[14:] == [[1, 2], list(range(100)), {"title": "xterm", 3: [4]}, {str(i): i for i in range(30)}]
+    assert loads(memoryview(dumps(value, typed_bytes=True))) == decoded
+    assert loads(dumps([b"ab", b"\xff"])) == ["ab", b"\xff"]
+
+
+def test_invalid_payloads_are_rejected():
+    for payload in (b"", b"\x85ab", b"\xc3\x01", b"/-5:abc", b"\x01\x01", b"\x2d", b"g\xc0\x01"):
+        with pytest.raises(RencodeError):
+            loads(payload)
+    with pytest.raises(RencodeError):
+        dumps({1, 2})
+
+
+def test_aliases_are_used_after_negotiation():
+    server, client = PacketCodec(), PacketCodec()
+    packet = ["pointer-position", 1, [150, 200], [], []]
+    assert client.encode(packet) == dumps(packet)
+
+    client.set_peer_aliases(server.get_aliases())
+    encoded = client.encode(packet)
+    assert len(encoded) < len(dumps(packet))
+    assert server.decode(encoded) == packet
+
+    with pytest.raises(RencodeError):
+        PacketCodec(aliases={}).decode(encoded)
+
+
+def test_typed_bytes_only_after_both_sides_agree():
+    server, client = PacketCodec(), PacketCodec()
+    packet = ["clipboard-contents", 1, b"ab"]
+    assert client.encode(packet) == dumps(packet)
+
+    client.set_peer_typed_bytes(None)
+    assert client.encode(packet) == dumps(packet)
+    client.set_peer_typed_bytes(PacketCodec(typed_bytes=False).get_typed_bytes())
+    assert client.encode(packet) == dumps(packet)
+
+    client.set_peer_typed_bytes(server.get_typed_bytes())
+    assert server.decode(client.encode(packet)) == packet
+
+
+def test_benchmark_runs():
+    results = bench_codec(iterations=2)
+    assert results["rencodeplus+aliases"]["bytes"] < results["rencodeplus"]["bytes"] < results["json"]["bytes"]
@@ -0,0 +1,90 @@
+"""
+Test cases cho phát hiện cuộn.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add src and examples to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "examples"))
+
+from session_benchmark import bench_scroll
+from shougun_remote.session.scroll import ScrollDetector, row_hashes, scroll_packet
+
+
+def _page(height, width=200, seed=1):
+    """Trang nội dung giả lập: mỗi dòng khác nhau, có cả dòng trống lặp lại."""
+    rng = np.random.default_rng(seed)
+    page = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    page[::7] = 255
+    return page
+
+
+def _apply(previous, frame, result):
+    """Client: copy khối cuộn rồi vẽ các dải dòng được encode."""
+    canvas = previous.copy()
+    for (x, y, width, height), dy in result.scrolls:
+        canvas[y:y + height, x:x + width] = previous[y - dy:y - dy + height, x:x + width]
+    for x, y, width, height in result.damage:
+        canvas[y:y + height, x:x + width] = frame[y:y + height, x:x + width]
+    return canvas
+
+
+def test_row_hashes_identify_rows():
+    frame = _page(50, width=13)
+    hashes = row_hashes(frame)
+    assert hashes.dtype == np.uint64 and len(hashes) == 50
+    assert hashes[0] == hashes[7] and hashes[1] != hashes[2]
+    assert np.array_equal(row_hashes(frame[10:20]), hashes[10:20])
+
+
+def test_terminal_scroll_sends_only_exposed_rows():
+    page = _page(600)
+    detector = ScrollDetector()
+    assert detector.update(page[:480]) is None
+
+    frame = page[36:516]
+    result = detector.update(frame)
+    assert result.scrolls == [((0, 0, 200, 444), -36)]
+    assert result.damage == [(0, 444, 200, 36)]
+    assert np.array_equal(_apply(page[:480], frame, result), frame)
+
+
+def test_browser_scroll_keeps_fixed_header_and_footer():
+    page = _page(800, seed=2)
+    header, footer = _page(40, seed=3), _page(30, seed=4)
+
+    def browser(offset):
+        return np.concatenate((header, page[offset:offset + 410], footer))
+
+    detector = ScrollDetector()
+    detector.update(browser(100))
+    result = detector.update(browser(60))
+    assert result.scrolls == [((0, 80, 200, 370), 40)]
+    assert result.damage == [(0, 40, 200, 40)]
+    assert np.array_equal(_apply(browser(100), browser(60), result), browser(60))
+
+
+def test_no_scroll_without_shift():
+    page = _page(300)
+    detector = ScrollDetector()
+    detector.update(page)
+    assert detector.update(page) is None
+    changed = page.copy()
+    changed[100:110] = 0
+    assert detector.update(changed) is None
+    assert detector.update(_page(300, seed=9)) is None
+    assert detector.update(_page(200)) is None
+
+
+def test_scroll_packet_format():
+    assert scroll_packet(1, (0, 40, 200, 370), -36, 12) == \
+        ["draw", 1, 0, 40, 200, 370, "scroll", "", 12, 0, {"scroll": (0, -36), "flush": False}]
+
+
+def test_benchmark_runs():
+    results = bench_scroll(iterations=1)
+    assert results["scroll"]["bytes"] < results["full"]["bytes"] / 4
@@ -0,0 +1,88 @@
+"""
+Test cases cho PacketProtocol (asyncio) và PacketParser.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.session.net import FLAG_FLUSH, FLAG_RENCODEPLUS, PacketParser, pack_header
+from shougun_remote.session.transport import PacketProtocol, open_connection
+
+
+def test_parser_handles_arbitrary_splits():
+    stream = b"".join(
+        pack_header(FLAG_RENCODEPLUS, 0, 0, len(payload)) + payload
+        for payload in (b"a", b"", b"x" * 1000, b"tail")
+    )
+    for step in (1, 3, 8, 9, 4096):
+        parser = PacketParser()
+        packets = []
+        for offset in range(0, len(stream), step):
+            packets.extend(parser.feed(stream[offset:offset + step]))
+        assert [bytes(payload) for _, payload in packets] == [b"a", b"", b"x" * 1000, b"tail"]
+        assert parser.is_idle()
+
+
+def test_small_packets_are_coalesced_until_flush():
+    async def scenario():
+        received = []
+        got_all = asyncio.Event()
+
+        def on_packet(header, payload):
+            received.append((header.flush, bytes(payload)))
+            if len(received) == 4:
+                got_all.set()
+
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(lambda: PacketProtocol(on_packet), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        transport, client = await open_connection("127.0.0.1", port, lambda header, payload: None)
+
+        for index in range(3):
+            client.send_packet(f"pointer-{index}".encode())
+        assert client.get_stats()["writes"] == 0
+        client.send_packet(b"key", flags=FLAG_RENCODEPLUS | FLAG_FLUSH)
+        assert client.get_stats()["writes"] == 1
+
+        await asyncio.wait_for(got_all.wait(), 5)
+        assert received == [(False, b"pointer-0"), (False, b"pointer-1"), (False, b"pointer-2"), (True, b"key")]
+
+        # Không có packet flush theo sau - vẫn được ghi ở cuối tick
+        client.send_packet(b"ack")
+        await asyncio.sleep(0)
+        assert client.get_stats()["writes"] == 2 and client.get_stats()["pending_bytes"] == 0
+
+        await client.drain()
+        client.close()
+        assert await client.wait_closed() is None
+        assert not client.send_packet(b"late")
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(scenario())
+
+
+def test_drain_waits_while_writing_is_paused():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(lambda: PacketProtocol(lambda header, payload: None), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        transport, client = await open_connection("127.0.0.1", port, lambda header, payload: None)
+
+        client.pause_writing()
+        assert not client.is_writable()
+        waiter = asyncio.ensure_future(client.drain())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        client.resume_writing()
+        await asyncio.wait_for(waiter, 1)
+
+        client.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(scenario())
@@ -0,0 +1,117 @@
+"""
+Test cases cho ring buffer shared memory.
+
+ShmRingConsumer đóng vai host C#; test cuối chạy consumer trong process riêng.
+"""
+
+import json
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.integration.shm_ring import (
+    RECORD_SIZE,
+    RecordKind,
+    ShmRingConsumer,
+    ShmRingProducer,
+    StatusCode,
+)
+from shougun_remote.metrics import MetricsRegistry
+from shougun_remote.models import TaskStatus
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+
+@pytest.fixture
+def producer():
+    ring = ShmRingProducer(f"shougun_test_{uuid.uuid4().hex[:8]}", capacity=8, metrics=MetricsRegistry())
+    yield ring
+    ring.close()
+
+
+class TestShmRing:
+    """Test cases cho ShmRingProducer/ShmRingConsumer."""
+
+    def test_records_round_trip(self, producer):
+        consumer = ShmRingConsumer(producer.name, doorbell=False)
+        try:
+            assert RECORD_SIZE == 64
+            assert producer.publish_task("task_1700000000_abcdef12", TaskStatus.RUNNING)
+            assert producer.publish_device("device-01", "connected")
+
+            first, second = consumer.poll()
+            assert (first.sequence, first.kind, first.status_code, first.task_id) == (
+                0, RecordKind.TASK, StatusCode.TASK_RUNNING, "task_1700000000_abcdef12")
+            assert (second.sequence, second.kind, second.status_code, second.device_id) == (
+                1, RecordKind.DEVICE, StatusCode.DEVICE_CONNECTED, "device-01")
+            assert consumer.poll() == []
+        finally:
+            consumer.close()
+
+    def test_full_ring_drops_instead_of_blocking(self, producer):
+        consumer = ShmRingConsumer(producer.name, doorbell=False)
+        try:
+            results = [producer.publish(RecordKind.TASK, StatusCode.TASK_PENDING, task_id=str(i)) for i in range(10)]
+            assert results == [True] * 8 + [False] * 2
+            assert [record.task_id for record in consumer.poll()] == [str(i) for i in range(8)]
+            # Slot đã được trả lại sau khi consumer đọc
+            assert producer.publish(RecordKind.TASK, StatusCode.TASK_PENDING, task_id="8")
+            assert consumer.poll()[0].sequence == 8
+        finally:
+            consumer.close()
+
+    def test_doorbell_wakes_waiting_consumer(self, producer):
+        consumer = ShmRingConsumer(producer.name)
+        woke = threading.Event()
+
+        def wait_for_record():
+            if consumer.wait(timeout=5.0):
+                woke.set()
+
+        try:
+            waiter = threading.Thread(target=wait_for_record)
+            waiter.start()
+            # Chờ consumer đặt cờ consumer_waiting (offset 136) rồi mới ghi
+            while not producer._buf[136]:
+                time.sleep(0.001)
+            producer.publish_task("task_x", TaskStatus.COMPLETED)
+            waiter.join(timeout=5.0)
+            assert woke.is_set()
+            assert consumer.poll()[0].status_code == StatusCode.TASK_COMPLETED
+        finally:
+            consumer.close()
+
+    def test_consumer_in_separate_process(self, producer):
+        """Consumer ở process khác đọc được toàn bộ luồng sự kiện theo thứ tự."""
+        script = (
+            "import json, sys\n"
+            f"sys.path.insert(0, {str(SRC_DIR)!r})\n"
+            "from shougun_remote.integration.shm_ring import ShmRingConsumer\n"
+            f"consumer = ShmRingConsumer({producer.name!r})\n"
+            "print('ready', flush=True)\n"
+            "seen = []\n"
+            "while len(seen) < 50 and consumer.wait(5.0):\n"
+            "    seen.extend(record.task_id for record in consumer.poll())\n"
+            "consumer.close()\n"
+            "print(json.dumps(seen))\n"
+        )
+        child = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, text=True)
+        try:
+            assert child.stdout.readline().strip() == "ready"
+            sent = 0
+            while sent < 50:
+                if producer.publish(RecordKind.TASK, StatusCode.TASK_COMPLETED, task_id=f"t{sent}"):
+                    sent += 1
+            output, _ = child.communicate(timeout=10)
+        finally:
+            if child.poll() is None:
+                child.kill()
+        assert json.loads(output) == [f"t{i}" for i in range(50)]
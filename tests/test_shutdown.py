@@ -0,0 +1,146 @@
+"""
+Test cases cho quá trình dừng service có giới hạn thời gian.
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.config import ConfigManager
+from shougun_remote.metrics import MetricsRegistry
+from shougun_remote.models import Task, TaskStatus
+from shougun_remote.repositories import FileRepository
+from shougun_remote.services import ShougunService, TaskService
+from shougun_remote.services.shutdown import ShutdownCheckpoint
+
+
+@pytest.fixture
+def make_service(tmp_path, monkeypatch, null_logger):
+    """Tạo service dùng dữ liệu trong tmp_path (mỗi lần gọi giống một process mới)."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ConfigManager, "load_config", lambda self, path: True)
+    services = []
+
+    def factory() -> ShougunService:
+        registry = MetricsRegistry()
+        config_manager = ConfigManager()
+        config_manager.set("performance.worker_thread_sleep", 0.02)
+        config_manager.set("performance.shutdown_timeout", 0.5)
+        repository = FileRepository(str(tmp_path / "tasks.json"), Task, registry)
+        service = ShougunService(
+            null_logger,
+            config_manager,
+            TaskService(null_logger, repository, registry),
+            registry,
+            ShutdownCheckpoint(str(tmp_path / "checkpoint.json")),
+        )
+        services.append(service)
+        return service
+
+    yield factory
+    for service in services:
+        service.stop()
+
+
+def _wait_for(predicate, timeout=5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestGracefulShutdown:
+    """Test cases cho stop() và khôi phục task bị gián đoạn."""
+
+    def test_drains_finished_tasks(self, make_service):
+        service = make_service()
+        task = service.get_task_service().create_task("quick")
+        assert service.start()
+        assert _wait_for(lambda: service.get_task_service().get_task(task.id).status == TaskStatus.COMPLETED)
+
+        assert service.stop()
+        report = service.get_shutdown_report()
+        assert not report.deadline_exceeded
+        assert report.interrupted_tasks == []
+        assert {"intake", "folder_events", "worker", "tasks", "checkpoint", "flush"} <= set(report.phases)
+        assert service.get_info()["last_shutdown"]["total_seconds"] == report.total_seconds
+
+    def test_interrupted_task_is_checkpointed_and_requeued(self, make_service, tmp_path):
+        release = threading.Event()
+        first = make_service()
+        original_run = first._run_task
+
+        def stuck_run(task_id, limiter):
+            release.wait(10)
+            original_run(task_id, limiter)
+
+        first._run_task = stuck_run
+        task = first.get_task_service().create_task("slow")
+        try:
+            assert first.start()
+            assert _wait_for(lambda: first.get_task_service().get_task(task.id).status == TaskStatus.RUNNING)
+
+            started = time.perf_counter()
+            assert first.stop()
+            # Bị giới hạn bởi shutdown_timeout thay vì chờ task kẹt
+            assert time.perf_counter() - started < 2.0
+            report = first.get_shutdown_report()
+            assert report.deadline_exceeded
+            assert report.interrupted_tasks == [task.id]
+            checkpoint = json.loads((tmp_path / "checkpoint.json").read_text(encoding="utf-8"))
+            assert checkpoint["interrupted_tasks"] == [task.id]
+
+            # "Process" mới đọc lại file dữ liệu: task bị gián đoạn được chạy lại
+            second = make_service()
+            assert second.start()
+            assert second.get_startup_timings()["recovery"] >= 0
+            assert not (tmp_path / "checkpoint.json").exists()
+            assert _wait_for(
+                lambda: second.get_task_service().get_task(task.id).status == TaskStatus.COMPLETED)
+        finally:
+            release.set()
+
+    def test_restart_keeps_slots_of_leftover_tasks_separate(self, make_service):
+        release_old = threading.Event()
+        release_new = threading.Event()
+        service = make_service()
+        original_run = service._run_task
+        tasks = service.get_task_service()
+        old = tasks.create_task("old")
+
+        def stuck_run(task_id, limiter):
+            # Đánh dấu đang chạy như _run_task để restart không đưa task lại hàng đợi
+            with service._running_lock:
+                service._running_ids.add(task_id)
+            (release_old if task_id == old.id else release_new).wait(10)
+            original_run(task_id, limiter)
+
+        service._run_task = stuck_run
+        try:
+            assert service.start()
+            assert _wait_for(lambda: tasks.get_task(old.id).status == TaskStatus.RUNNING)
+            assert service.stop()
+            assert service.get_shutdown_report().deadline_exceeded
+
+            # Task cũ vẫn chạy trên thread của lần chạy trước khi service khởi động lại
+            assert service.start()
+            new = tasks.create_task("new")
+            assert _wait_for(lambda: tasks.get_task(new.id).status == TaskStatus.RUNNING)
+            assert service._limiter.in_use() == 1
+
+            release_old.set()
+            assert _wait_for(lambda: tasks.get_task(old.id).status == TaskStatus.COMPLETED)
+            # Slot của task cũ được trả cho limiter cũ, không làm limiter mới mất slot đang dùng
+            assert service._limiter.in_use() == 1
+        finally:
+            release_old.set()
+            release_new.set()
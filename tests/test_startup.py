@@ -0,0 +1,70 @@
+"""
+Test cases cho import muộn và StartupProfiler.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.metrics.startup import StartupProfiler
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+
+def _modules_after(statement: str) -> set:
+    """Chạy statement trong interpreter mới và trả về các module đã nạp."""
+    script = (
+        "import json, sys\n"
+        f"sys.path.insert(0, {str(SRC_DIR)!r})\n"
+        f"{statement}\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return set(json.loads(output))
+
+
+class TestLazyImports:
+    """Test các dependency tùy chọn không bị nạp khi khởi động."""
+
+    def test_factory_import_defers_optional_dependencies(self):
+        modules = _modules_after("from shougun_remote.services.factory import ServiceFactory")
+        for name in ("watchdog", "yaml", "shougun_remote.integration.api_server", "shougun_remote.monitors.folder_monitor"):
+            assert name not in modules
+
+    def test_package_attributes_resolve_on_access(self):
+        modules = _modules_after(
+            "import shougun_remote\n"
+            "assert 'shougun_remote.services' not in sys.modules\n"
+            "assert shougun_remote.CSharpBridge.__name__ == 'CSharpBridge'\n"
+            "from shougun_remote.monitors import JsonReader"
+        )
+        assert "shougun_remote.integration.csharp_bridge" in modules
+        assert "watchdog" not in modules
+
+    def test_logger_setup_deferred_until_first_message(self):
+        modules = _modules_after(
+            "from shougun_remote.config.logger import LoguruLogger\n"
+            "logger = LoguruLogger()\n"
+            "assert not logger._configured"
+        )
+        assert "loguru" in modules
+
+
+class TestStartupProfiler:
+    """Test cases cho StartupProfiler."""
+
+    def test_sections_and_report(self):
+        profiler = StartupProfiler()
+        with profiler.section("import fractions"):
+            import fractions  # noqa: F401
+        profiler.add_phases("service.start", {"config": 0.002, "api_server": 0.010})
+
+        names = [section.name for section in profiler.get_sections()]
+        assert names == ["import fractions", "service.start.config", "service.start.api_server"]
+        report = profiler.format_report()
+        assert "service.start.api_server" in report
+        assert "total (wall clock)" in report
@@ -0,0 +1,158 @@
+"""
+Test cases cho ShardedWorkerPool và chế độ worker process của ShougunService.
+"""
+
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shougun_remote.config import ConfigManager
+from shougun_remote.metrics import MetricsRegistry
+from shougun_remote.models import Task, TaskStatus
+from shougun_remote.repositories import FileRepository
+from shougun_remote.services import ShougunService, TaskService
+from shougun_remote.services.shutdown import ShutdownCheckpoint
+from shougun_remote.services.worker_pool import ShardedWorkerPool
+
+
+def checksum_handler(payload):
+    """Handler nặng CPU vừa phải; task tên "boom" thất bại, "crash" làm chết process."""
+    if payload["name"] == "boom":
+        raise ValueError("boom")
+    if payload["name"] == "crash":
+        os._exit(3)
+    total = 0
+    for value in range(20000):
+        total = (total * 31 + value) % 1000003
+
+
+@pytest.fixture
+def pool(null_logger):
+    results = queue.Queue()
+    registry = MetricsRegistry()
+    pool = ShardedWorkerPool(
+        null_logger, 2, lambda *result: results.put(result), checksum_handler, registry, queue_depth=4)
+    assert pool.start()
+    pool.results = results
+    yield pool
+    pool.stop(timeout=5.0)
+
+
+def _collect(results, count, timeout=20.0):
+    collected = {}
+    deadline = time.monotonic() + timeout
+    while len(collected) < count:
+        task_id, success, error, _ = results.get(timeout=max(0.1, deadline - time.monotonic()))
+        collected[task_id] = (success, error)
+    return collected
+
+
+class TestShardedWorkerPool:
+    """Test cases cho ShardedWorkerPool."""
+
+    def test_tasks_are_sharded_and_reported(self, pool):
+        task_ids = [f"task_{index}" for index in range(6)]
+        assert {pool.shard_of(task_id) for task_id in task_ids} == {0, 1}
+        for task_id in task_ids:
+            assert pool.submit(task_id, {"name": task_id})
+        assert pool.submit("task_bad", {"name": "boom"})
+
+        results = _collect(pool.results, 7)
+        assert all(results[task_id] == (True, None) for task_id in task_ids)
+        assert results["task_bad"] == (False, "ValueError: boom")
+        stats = pool.get_stats()
+        assert sum(worker["completed"] for worker in stats) == 6
+        assert all(worker["pid"] != os.getpid() for worker in stats)
+
+    def test_crashed_worker_is_restarted(self, pool):
+        shard = pool.shard_of("task_crash")
+        old_pid = pool.get_stats()[shard]["pid"]
+        assert pool.submit("task_crash", {"name": "crash"})
+
+        success, error = _collect(pool.results, 1)["task_crash"]
+        assert not success and "crashed" in error
+        deadline = time.monotonic() + 10
+        while pool.get_stats()[shard]["restarts"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool.get_stats()[shard]["pid"] not in (None, old_pid)
+
+        # Worker mới tiếp tục nhận task của shard đó
+        task_id = next(f"after_{index}" for index in range(100) if pool.shard_of(f"after_{index}") == shard)
+        assert pool.submit(task_id, {"name": "ok"})
+        assert _collect(pool.results, 1)[task_id] == (True, None)
+
+
+class TestProcessWorkerMode:
+    """ShougunService với performance.worker_mode = "process"."""
+
+    def test_service_runs_tasks_in_worker_processes(self, tmp_path, monkeypatch, null_logger):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(ConfigManager, "load_config", lambda self, path: True)
+        registry = MetricsRegistry()
+        config_manager = ConfigManager()
+        config_manager.set("performance.worker_thread_sleep", 0.02)
+        config_manager.set("performance.worker_mode", "process")
+        config_manager.set("performance.worker_processes", 2)
+        task_service = TaskService(null_logger, FileRepository(str(tmp_path / "tasks.json"), Task, registry), registry)
+        service = ShougunService(
+            null_logger, config_manager, task_service, registry, ShutdownCheckpoint(str(tmp_path / "checkpoint.json")))
+        tasks = [task_service.create_task(f"task {index}") for index in range(8)]
+        try:
+            assert service.start()
+            deadline = time.monotonic() + 20
+            while time.monotonic() < deadline and not all(
+                    task_service.get_task(task.id).status == TaskStatus.COMPLETED for task in tasks):
+                time.sleep(0.02)
+            assert all(task_service.get_task(task.id).status == TaskStatus.COMPLETED for task in tasks)
+            snapshot = registry.snapshot()
+            assert sum(snapshot[f"shougun_worker_tasks_completed_total{{worker={index}}}"] for index in (0, 1)) == 8
+        finally:
+            assert service.stop()
+        assert service.get_shutdown_report().interrupted_tasks == []
+
+    def test_rejected_submit_ends_the_pass(self, tmp_path, monkeypatch, null_logger):
+        class RestartingPool:
+            """Pool có worker đang khởi động lại: mọi submit đều bị từ chối."""
+
+            submits = 0
+
+            def get_capacity(self):
+                return 2
+
+            def can_accept(self, task_id):
+                return True
+
+            def submit(self, task_id, payload):
+                RestartingPool.submits += 1
+                return False
+
+            def stop(self, timeout):
+                return True
+
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(ConfigManager, "load_config", lambda self, path: True)
+        registry = MetricsRegistry()
+        config_manager = ConfigManager()
+        config_manager.set("performance.worker_thread_sleep", 0.05)
+        config_manager.set("performance.worker_mode", "process")
+        task_service = TaskService(null_logger, FileRepository(str(tmp_path / "tasks.json"), Task, registry), registry)
+        service = ShougunService(
+            null_logger, config_manager, task_service, registry, ShutdownCheckpoint(str(tmp_path / "checkpoint.json")))
+        monkeypatch.setattr(service, "_create_worker_pool", RestartingPool)
+        tasks = [task_service.create_task(f"task {index}") for index in range(3)]
+        try:
+            assert service.start()
+            time.sleep(0.3)
+            # Mỗi vòng worker chỉ thử một lần rồi chờ, không quay vòng PENDING <-> RUNNING
+            assert RestartingPool.submits <= 10
+            assert all(task_service.get_task(task.id).status == TaskStatus.PENDING for task in tasks)
+            assert service._limiter.in_use() == 0
+        finally:
+            assert service.stop()